@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for per-frame audio buffering cost.
+
+Compares the previous buffering code (deque of samples, bytearray slicing,
+np.concatenate in the VAD) against the NumPy RingBuffer versions now in
+server/audio/buffer.py. Only the buffering work is timed - no model runs -
+so the numbers isolate the Python overhead paid on every microphone frame.
+
+Usage:
+    python bench_audio.py --frames 2000 --frame-samples 4096
+"""
+import argparse
+import time
+from collections import deque
+from typing import Callable
+
+import numpy as np
+
+from server.audio.buffer import AudioBuffer, ChunkedAudioBuffer, RingBuffer
+
+SAMPLE_RATE = 16000
+VAD_WINDOW = 512
+
+
+# Previous implementations, kept here only as a baseline
+
+class LegacyAudioBuffer:
+    def __init__(self, max_seconds: float = 30.0, sample_rate: int = SAMPLE_RATE):
+        self._buffer = deque(maxlen=int(max_seconds * sample_rate))
+
+    def write(self, audio_data: bytes) -> None:
+        for sample in np.frombuffer(audio_data, dtype=np.int16):
+            self._buffer.append(sample)
+
+    def read(self, num_samples: int) -> np.ndarray:
+        return np.array(list(self._buffer)[-num_samples:], dtype=np.int16)
+
+
+class LegacyChunkedAudioBuffer:
+    def __init__(self, chunk_ms: int = 30, sample_rate: int = SAMPLE_RATE, max_chunks: int = 1000):
+        self.bytes_per_chunk = int(sample_rate * chunk_ms / 1000) * 2
+        self._chunks: deque[bytes] = deque(maxlen=max_chunks)
+        self._pending = bytearray()
+
+    def write(self, audio_data: bytes) -> None:
+        self._pending.extend(audio_data)
+        while len(self._pending) >= self.bytes_per_chunk:
+            self._chunks.append(bytes(self._pending[:self.bytes_per_chunk]))
+            del self._pending[:self.bytes_per_chunk]
+
+    def read_all_chunks(self) -> list[bytes]:
+        chunks = list(self._chunks)
+        self._chunks.clear()
+        return chunks
+
+
+class LegacyVADBuffering:
+    def __init__(self):
+        self._buffer = np.array([], dtype=np.float32)
+
+    def process_chunk(self, audio_chunk: bytes) -> int:
+        samples = np.frombuffer(audio_chunk, dtype=np.int16).astype(np.float32) / 32768.0
+        self._buffer = np.concatenate([self._buffer, samples])
+        windows = 0
+        while len(self._buffer) >= VAD_WINDOW:
+            chunk = self._buffer[:VAD_WINDOW]
+            self._buffer = self._buffer[VAD_WINDOW:]
+            windows += int(chunk.size > 0)
+        return windows
+
+
+class RingVADBuffering:
+    """Mirrors SileroVAD.process_chunk without the model call."""
+
+    def __init__(self):
+        self._buffer = RingBuffer(VAD_WINDOW * 64, np.float32)
+        self._window = np.empty(VAD_WINDOW, dtype=np.float32)
+
+    def process_chunk(self, audio_chunk: bytes) -> int:
+        samples = np.multiply(
+            np.frombuffer(audio_chunk, dtype=np.int16), 1.0 / 32768.0, dtype=np.float32
+        )
+        windows = 0
+        offset = 0
+        while offset < len(samples):
+            room = self._buffer.capacity - len(self._buffer)
+            self._buffer.write(samples[offset:offset + room])
+            offset += room
+            for chunk in self._buffer.windows(VAD_WINDOW):
+                np.copyto(self._window, chunk)
+                windows += 1
+        return windows
+
+
+def time_per_frame(fn: Callable[[bytes], object], frames: list[bytes]) -> float:
+    """Mean seconds per call of fn over all frames."""
+    started = time.perf_counter()
+    for frame in frames:
+        fn(frame)
+    return (time.perf_counter() - started) / len(frames)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Audio buffering microbenchmark")
+    parser.add_argument("--frames", type=int, default=2000, help="Frames per case")
+    parser.add_argument("--frame-samples", type=int, default=4096, help="Samples per frame (browser sends 4096)")
+    parser.add_argument("--read-samples", type=int, default=SAMPLE_RATE, help="Samples read back per frame")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [
+        rng.integers(-2000, 2000, args.frame_samples, dtype=np.int16).tobytes()
+        for _ in range(args.frames)
+    ]
+
+    legacy_audio, ring_audio = LegacyAudioBuffer(), AudioBuffer()
+    legacy_chunked, ring_chunked = LegacyChunkedAudioBuffer(), ChunkedAudioBuffer()
+    legacy_vad, ring_vad = LegacyVADBuffering(), RingVADBuffering()
+    legacy_session, ring_session = bytearray(), RingBuffer(30 * SAMPLE_RATE, np.int16)
+
+    def legacy_audio_step(frame):
+        legacy_audio.write(frame)
+        legacy_audio.read(args.read_samples)
+
+    def ring_audio_step(frame):
+        ring_audio.write(frame)
+        ring_audio.read(args.read_samples)
+
+    def legacy_chunked_step(frame):
+        legacy_chunked.write(frame)
+        legacy_chunked.read_all_chunks()
+
+    def ring_chunked_step(frame):
+        ring_chunked.write(frame)
+        for _ in ring_chunked.iter_chunks():
+            pass
+
+    def legacy_session_step(frame):
+        legacy_session.extend(frame)
+        if len(legacy_session) > 30 * SAMPLE_RATE * 2:
+            del legacy_session[:len(frame)]
+
+    cases = [
+        ("AudioBuffer write+read", legacy_audio_step, ring_audio_step),
+        ("ChunkedAudioBuffer write+drain", legacy_chunked_step, ring_chunked_step),
+        ("VAD window buffering", legacy_vad.process_chunk, ring_vad.process_chunk),
+        ("Session accumulation", legacy_session_step, ring_session.extend),
+    ]
+
+    frame_ms = args.frame_samples / SAMPLE_RATE * 1000
+    print(f"{args.frames} frames of {args.frame_samples} samples ({frame_ms:.0f} ms each)\n")
+    print(f"{'case':<32} {'before (us)':>12} {'after (us)':>12} {'speedup':>9}")
+    for name, before_fn, after_fn in cases:
+        before = time_per_frame(before_fn, frames)
+        after = time_per_frame(after_fn, frames)
+        print(f"{name:<32} {before * 1e6:>12.1f} {after * 1e6:>12.1f} {before / after:>8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,48 @@
+"""model metadata
+
+Revision ID: 3b5a90f2c6e1
+Revises: e9c714da8d57
+Create Date: 2026-10-18 14:36:51.902117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b5a90f2c6e1'
+down_revision: Union[str, None] = 'e9c714da8d57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('model_metadata',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('mtime', sa.Float(), nullable=False),
+    sa.Column('quick_hash', sa.String(), nullable=True),
+    sa.Column('model_type', sa.String(), nullable=True),
+    sa.Column('unet_prefix', sa.String(), nullable=True),
+    sa.Column('unet_config', sa.Text(), nullable=True),
+    sa.Column('parameters', sa.BigInteger(), nullable=True),
+    sa.Column('weight_dtype', sa.String(), nullable=True),
+    sa.Column('tensors', sa.Text(), nullable=True),
+    sa.Column('safetensors_metadata', sa.Text(), nullable=True),
+    sa.Column('cover_images', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('path')
+    )
+    op.create_index(op.f('ix_model_metadata_model_type'), 'model_metadata', ['model_type'], unique=False)
+    op.create_index(op.f('ix_model_metadata_quick_hash'), 'model_metadata', ['quick_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_model_metadata_quick_hash'), table_name='model_metadata')
+    op.drop_index(op.f('ix_model_metadata_model_type'), table_name='model_metadata')
+    op.drop_table('model_metadata')
@@ -0,0 +1,55 @@
+"""prompt history
+
+Revision ID: e9c714da8d57
+Revises:
+Create Date: 2026-10-18 10:12:04.518233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9c714da8d57'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('prompt_history',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('prompt_id', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('completed', sa.Boolean(), nullable=True),
+    sa.Column('create_time', sa.Integer(), nullable=True),
+    sa.Column('data', sa.Text(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('prompt_id')
+    )
+    op.create_index(op.f('ix_prompt_history_create_time'), 'prompt_history', ['create_time'], unique=False)
+    op.create_index(op.f('ix_prompt_history_status'), 'prompt_history', ['status'], unique=False)
+    op.create_table('prompt_history_output',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('history_id', sa.Integer(), nullable=False),
+    sa.Column('filename', sa.String(), nullable=False),
+    sa.Column('subfolder', sa.String(), nullable=True),
+    sa.Column('type', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['history_id'], ['prompt_history.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_prompt_history_output_filename'), 'prompt_history_output', ['filename'], unique=False)
+    op.create_index(op.f('ix_prompt_history_output_history_id'), 'prompt_history_output', ['history_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_prompt_history_output_history_id'), table_name='prompt_history_output')
+    op.drop_index(op.f('ix_prompt_history_output_filename'), table_name='prompt_history_output')
+    op.drop_table('prompt_history_output')
+    op.drop_index(op.f('ix_prompt_history_status'), table_name='prompt_history')
+    op.drop_index(op.f('ix_prompt_history_create_time'), table_name='prompt_history')
+    op.drop_table('prompt_history')
@@ -1,3 +1,4 @@
+from sqlalchemy import BigInteger, Boolean, Column, Float, ForeignKey, Integer, String, Text
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -11,4 +12,47 @@ def to_dict(obj):
         if (val := getattr(obj, field))
     }
 
-# TODO: Define models here
+
+class PromptHistory(Base):
+    """A finished prompt: the /history entry as JSON plus indexed columns to query it by."""
+
+    __tablename__ = "prompt_history"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)  # insertion order, the pagination key
+    prompt_id = Column(String, nullable=False, unique=True)
+    status = Column(String, index=True)
+    completed = Column(Boolean)
+    create_time = Column(Integer, index=True)
+    data = Column(Text, nullable=False)
+
+
+class PromptHistoryOutput(Base):
+    """A file listed in a history entry's outputs, so prompts can be found by what they produced."""
+
+    __tablename__ = "prompt_history_output"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    history_id = Column(Integer, ForeignKey("prompt_history.id"), nullable=False, index=True)
+    filename = Column(String, nullable=False, index=True)
+    subfolder = Column(String)
+    type = Column(String)
+
+
+class ModelMetadata(Base):
+    """What is known about a model file without loading it; valid while its size and mtime match."""
+
+    __tablename__ = "model_metadata"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    path = Column(String, nullable=False, unique=True)
+    size = Column(BigInteger, nullable=False)
+    mtime = Column(Float, nullable=False)
+    quick_hash = Column(String, index=True)
+    model_type = Column(String, index=True)
+    unet_prefix = Column(String)
+    unet_config = Column(Text)
+    parameters = Column(BigInteger)
+    weight_dtype = Column(String)
+    tensors = Column(Text)  # safetensors header: {key: [dtype, shape]}
+    safetensors_metadata = Column(Text)  # __metadata__ without the cover images
+    cover_images = Column(Text)  # JSON list of base64 images (ssmd_cover_images)
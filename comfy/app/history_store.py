@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import copy
+import json
+import queue
+import logging
+import threading
+from typing import Callable, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.database.db import create_session
+from app.database.models import PromptHistory, PromptHistoryOutput
+from comfy_execution.utils import output_files
+
+
+class HistoryStore:
+    """
+    Prompt history persisted in the app database.
+
+    put() is what PromptQueue.task_done calls: it only records the entry in
+    memory and queues it, so the executor never waits on the database. A
+    writer thread serializes and commits queued entries in batches and then
+    drops them from memory; until then they are served from there. Entries
+    that can't be written (a failed commit, outputs that aren't JSON) stay
+    in memory and are listed as the newest ones until restart. Lists never
+    wait on the writer (max_items pruning applies as entries are written),
+    are paginated on insertion order (keyset, ?before=<prompt_id>) and can
+    be filtered on the indexed status and output filename columns.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] | None = None, max_items: int = 10000) -> None:
+        self.session_factory = session_factory or create_session
+        self.max_items = max_items
+        self.lock = threading.Lock()
+        self.pending: dict[str, dict] = {}  # prompt_id -> entry not yet committed
+        self.ops: queue.Queue = queue.Queue()
+        threading.Thread(target=self.writer, name="history_writer", daemon=True).start()
+
+    def put(self, prompt_id: str, entry: dict) -> None:
+        with self.lock:
+            self.pending[prompt_id] = entry
+        self.ops.put(("put", prompt_id, entry))
+
+    def delete(self, prompt_id: str) -> None:
+        with self.lock:
+            self.pending.pop(prompt_id, None)
+        self.ops.put(("delete", prompt_id, None))
+        self.flush()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.pending.clear()
+        self.ops.put(("clear", None, None))
+        self.flush()
+
+    def flush(self) -> None:
+        """Wait until everything queued so far has been written."""
+        self.ops.join()
+
+    def get(self, prompt_id: str) -> Optional[dict]:
+        with self.lock:
+            entry = self.pending.get(prompt_id)
+        if entry is not None:
+            return copy.deepcopy(entry)
+        with self.session_factory() as session:
+            data = session.scalar(select(PromptHistory.data).where(PromptHistory.prompt_id == prompt_id))
+        return None if data is None else json.loads(data)
+
+    def list(self, max_items: Optional[int] = None, offset: int = -1, before: Optional[str] = None,
+             status: Optional[str] = None, filename: Optional[str] = None) -> dict[str, dict]:
+        """
+        Entries oldest first, like the in-memory history: from offset when it
+        is given, otherwise the newest max_items (before the entry of prompt
+        id `before`, when given).
+        """
+        # No flush: reads never wait on the writer. Ids still in pending are
+        # served from memory and left out of the query, so an entry committed
+        # meanwhile is neither lost nor listed twice
+        with self.lock:
+            unsaved_ids = list(self.pending)
+            unsaved = [(prompt_id, copy.deepcopy(entry)) for prompt_id, entry in self.pending.items() if self.matches(entry, status, filename)]
+        if before in unsaved_ids:
+            # Every saved entry is older than an unsaved one
+            older = set(unsaved_ids[:unsaved_ids.index(before)])
+            unsaved = [(prompt_id, entry) for prompt_id, entry in unsaved if prompt_id in older]
+            before = None
+        elif before is not None:
+            unsaved = []
+
+        query = select(PromptHistory.prompt_id, PromptHistory.data)
+        if unsaved_ids:
+            query = query.where(PromptHistory.prompt_id.not_in(unsaved_ids))
+        if status is not None:
+            query = query.where(PromptHistory.status == status)
+        if filename is not None:
+            query = query.where(PromptHistory.id.in_(select(PromptHistoryOutput.history_id).where(PromptHistoryOutput.filename == filename)))
+        if before is not None:
+            query = query.where(PromptHistory.id < select(PromptHistory.id).where(PromptHistory.prompt_id == before).scalar_subquery())
+
+        newest_first = offset < 0
+        saved = 0
+        with self.session_factory() as session:
+            if unsaved and not newest_first:
+                saved = session.scalar(select(func.count()).select_from(query.subquery()))
+            query = query.order_by(PromptHistory.id.desc() if newest_first else PromptHistory.id)
+            if not newest_first:
+                query = query.offset(offset)
+            if max_items is not None:
+                query = query.limit(max_items)
+            rows = session.execute(query).all()
+
+        entries = [(prompt_id, json.loads(data)) for prompt_id, data in rows]
+        if newest_first:
+            entries.reverse()
+            entries += unsaved
+            if max_items is not None:
+                entries = entries[max(0, len(entries) - max_items):]
+        else:
+            entries += unsaved[max(0, offset - saved):]
+            if max_items is not None:
+                entries = entries[:max_items]
+        return dict(entries)
+
+    @staticmethod
+    def matches(entry: dict, status: Optional[str], filename: Optional[str]) -> bool:
+        if status is not None and (entry.get("status") or {}).get("status_str") != status:
+            return False
+        return filename is None or any(file["filename"] == filename for file in output_files(entry.get("outputs")))
+
+    def writer(self) -> None:
+        while True:
+            batch = [self.ops.get()]
+            while True:
+                try:
+                    batch.append(self.ops.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                unwritten = self.write(batch)
+                with self.lock:
+                    for op, prompt_id, entry in batch:
+                        if op == "put" and prompt_id not in unwritten and self.pending.get(prompt_id) is entry:
+                            del self.pending[prompt_id]
+            except Exception:
+                # Entries stay in memory and are still served until restart
+                logging.exception("Failed to write prompt history to the database")
+            finally:
+                for _ in batch:
+                    self.ops.task_done()
+
+    def write(self, batch: list[tuple]) -> set[str]:
+        """Apply a batch of queued operations; returns the ids of entries that could not be serialized."""
+        unwritten = set()
+        with self.session_factory() as session:
+            for op, prompt_id, entry in batch:
+                if op == "clear":
+                    session.execute(delete(PromptHistoryOutput))
+                    session.execute(delete(PromptHistory))
+                    continue
+                self.remove(session, PromptHistory.prompt_id == prompt_id)
+                if op == "put":
+                    try:
+                        data = json.dumps(entry)
+                    except (TypeError, ValueError) as e:
+                        logging.warning(f"Prompt history: keeping {prompt_id} in memory only, it can't be stored: {e}")
+                        unwritten.add(prompt_id)
+                        continue
+                    self.insert(session, prompt_id, entry, data)
+            cutoff = session.scalar(select(PromptHistory.id).order_by(PromptHistory.id.desc()).offset(self.max_items).limit(1))
+            if cutoff is not None:
+                self.remove(session, PromptHistory.id <= cutoff)
+            session.commit()
+        return unwritten
+
+    @staticmethod
+    def remove(session: Session, condition) -> None:
+        session.execute(delete(PromptHistoryOutput).where(PromptHistoryOutput.history_id.in_(select(PromptHistory.id).where(condition))))
+        session.execute(delete(PromptHistory).where(condition))
+
+    @staticmethod
+    def insert(session: Session, prompt_id: str, entry: dict, data: str) -> None:
+        status = entry.get("status") or {}
+        prompt = entry.get("prompt")
+        extra_data = prompt[3] if prompt is not None and len(prompt) > 3 and isinstance(prompt[3], dict) else {}
+        row = PromptHistory(
+            prompt_id=prompt_id,
+            status=status.get("status_str"),
+            completed=status.get("completed"),
+            create_time=extra_data.get("create_time"),
+            data=data,
+        )
+        session.add(row)
+        session.flush()
+        session.add_all(
+            PromptHistoryOutput(history_id=row.id, filename=file["filename"], subfolder=file.get("subfolder"), type=file.get("type"))
+            for file in output_files(entry.get("outputs"))
+        )
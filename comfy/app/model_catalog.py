@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import os
+import copy
+import json
+import hashlib
+import logging
+import threading
+from typing import Callable, Optional
+
+import folder_paths
+import comfy.utils
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.database.db import create_session
+from app.database.models import ModelMetadata, to_dict
+
+# safetensors header dtype -> torch dtype name
+SAFETENSORS_DTYPES = {
+    "F64": "float64", "F32": "float32", "F16": "float16", "BF16": "bfloat16",
+    "I64": "int64", "I32": "int32", "I16": "int16", "I8": "int8", "U8": "uint8", "BOOL": "bool",
+    "F8_E4M3": "float8_e4m3fn", "F8_E5M2": "float8_e5m2",
+}
+
+QUICK_HASH_CHUNK = 1024 * 1024
+
+
+def quick_hash(path: str, size: int) -> str:
+    """
+    Hash of the size and three 1 MB samples (start, middle, end) of a file.
+    Cheap enough for every model on a slow disk and enough to tell copies
+    apart from different files; it does not verify a file's contents.
+    """
+    h = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, "rb") as f:
+        for offset in sorted({0, max(0, size // 2 - QUICK_HASH_CHUNK // 2), max(0, size - QUICK_HASH_CHUNK)}):
+            f.seek(offset)
+            h.update(f.read(QUICK_HASH_CHUNK))
+    return h.hexdigest()
+
+
+def encode_config(value):
+    """JSON-safe form of a detected unet config, keeping tuples and torch dtypes."""
+    if isinstance(value, dict):
+        if not all(isinstance(k, str) for k in value):
+            raise TypeError("unet config keys must be strings")
+        return {k: encode_config(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return {"__tuple__": [encode_config(v) for v in value]}
+    if isinstance(value, list):
+        return [encode_config(v) for v in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if type(value).__name__ == "dtype" and str(value).startswith("torch."):
+        return {"__dtype__": str(value)[len("torch."):]}
+    raise TypeError(f"can't store {type(value).__name__} in the model catalog")
+
+
+def decode_config(value):
+    import torch
+    if isinstance(value, dict):
+        if "__tuple__" in value:
+            return tuple(decode_config(v) for v in value["__tuple__"])
+        if "__dtype__" in value:
+            return getattr(torch, value["__dtype__"])
+        return {k: decode_config(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [decode_config(v) for v in value]
+    return value
+
+
+class ModelCatalog:
+    """
+    Metadata of the files in the model folders, kept in the app database.
+
+    For each file: size and mtime (a record is only used while both still
+    match), a quick content hash for finding duplicates and, for
+    safetensors files, the header (key shapes and dtypes), the metadata and
+    cover images, and what model detection makes of the header: the model
+    type, unet config, parameter count and weight dtype. Detection runs on
+    "meta" tensors built from the header, so no weights are read.
+
+    build() catalogs new and changed files (started in the background at
+    startup); checkpoint loaders get cached detection results through
+    comfy.model_detection.set_detection_cache(catalog.detection).
+    """
+
+    excluded_folders = ["configs", "custom_nodes"]
+
+    def __init__(self, session_factory: Callable[[], Session] | None = None) -> None:
+        self.session_factory = session_factory or create_session
+        self.build_lock = threading.Lock()
+        self.building = False
+
+    def get(self, path: str) -> Optional[dict]:
+        """The record for path if it is still valid for the file on disk."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        with self.session_factory() as session:
+            row = session.scalar(select(ModelMetadata).where(ModelMetadata.path == path))
+            if row is None or row.size != st.st_size or row.mtime != st.st_mtime:
+                return None
+            return to_dict(row)
+
+    def lookup(self, path: str) -> Optional[dict]:
+        """The record for path, cataloging the file now if needed."""
+        record = self.get(path)
+        if record is None and os.path.isfile(path):
+            record = self.store(self.describe(path))
+        return record
+
+    def describe(self, path: str) -> dict:
+        st = os.stat(path)
+        record = {column: None for column in ModelMetadata.__table__.columns.keys() if column != "id"}
+        record.update(path=path, size=st.st_size, mtime=st.st_mtime, quick_hash=quick_hash(path, st.st_size))
+        if not path.lower().endswith((".safetensors", ".sft")):
+            return record
+
+        header = comfy.utils.safetensors_header(path)
+        if header is None:
+            return record
+        header = json.loads(header)
+        metadata = header.pop("__metadata__", None) or {}
+        tensors = {key: [info["dtype"], info["shape"]] for key, info in header.items()}
+        stored_metadata = dict(metadata)
+        cover_images = stored_metadata.pop("ssmd_cover_images", None)
+        record.update(
+            tensors=json.dumps(tensors),
+            safetensors_metadata=json.dumps(stored_metadata),
+            cover_images=cover_images,  # already a JSON list
+        )
+        record.update(self.detect(tensors, metadata))
+        return record
+
+    @staticmethod
+    def detect(tensors: dict[str, list], metadata: dict) -> dict:
+        """Model detection over a header: unet prefix, config, model type, parameters and weight dtype."""
+        try:
+            import torch
+            import comfy.model_detection
+
+            sd = {key: torch.empty(shape, dtype=getattr(torch, SAFETENSORS_DTYPES[dtype]), device="meta") for key, (dtype, shape) in tensors.items()}
+            prefix = comfy.model_detection.unet_prefix_from_state_dict(sd)
+            weight_dtype = comfy.utils.weight_dtype(sd, prefix)
+            out = {
+                "unet_prefix": prefix,
+                "parameters": comfy.utils.calculate_parameters(sd, prefix),
+                "weight_dtype": None if weight_dtype is None else str(weight_dtype)[len("torch."):],
+            }
+            unet_config = comfy.model_detection.detect_unet_config(sd, prefix, metadata=dict(metadata))
+            if unet_config is not None:
+                out["unet_config"] = json.dumps(encode_config(unet_config))
+                model_config = comfy.model_detection.model_config_from_unet_config(copy.deepcopy(unet_config), sd)
+                if model_config is not None:
+                    out["model_type"] = type(model_config).__name__
+            elif any("lora_" in key for key in tensors):
+                out["model_type"] = "lora"
+            return out
+        except Exception as e:
+            logging.debug(f"Model catalog: detection failed: {e}")
+            return {}
+
+    def store(self, record: dict) -> dict:
+        with self.session_factory() as session:
+            row = session.scalar(select(ModelMetadata).where(ModelMetadata.path == record["path"]))
+            if row is None:
+                row = ModelMetadata()
+                session.add(row)
+            for key, value in record.items():
+                setattr(row, key, value)
+            session.commit()
+        return {key: value for key, value in record.items() if value}
+
+    def detection(self, path: str) -> Optional[dict]:
+        """Cached detection results for a checkpoint (see comfy.model_detection.cached_detection)."""
+        record = self.get(path)
+        if record is None:
+            self.build_in_background()
+            return None
+        if "unet_config" not in record:
+            return None
+        import torch
+        return {
+            "unet_prefix": record["unet_prefix"],
+            "unet_config": decode_config(json.loads(record["unet_config"])),
+            "parameters": record.get("parameters", 0),
+            "weight_dtype": getattr(torch, record["weight_dtype"]) if "weight_dtype" in record else None,
+        }
+
+    def cover_images(self, path: str) -> list[str]:
+        """Base64 cover images stored in a safetensors file's metadata."""
+        record = self.lookup(path)
+        if record is None or "cover_images" not in record:
+            return []
+        return json.loads(record["cover_images"])
+
+    def duplicates(self) -> list[dict]:
+        """Groups of cataloged files with the same size and quick hash."""
+        with self.session_factory() as session:
+            hashes = select(ModelMetadata.quick_hash).group_by(ModelMetadata.quick_hash).having(func.count() > 1)
+            rows = session.execute(
+                select(ModelMetadata.quick_hash, ModelMetadata.size, ModelMetadata.path)
+                .where(ModelMetadata.quick_hash.in_(hashes))
+                .order_by(ModelMetadata.quick_hash, ModelMetadata.path)
+            ).all()
+        groups: dict[str, dict] = {}
+        for quick_hash_, size, path in rows:
+            groups.setdefault(quick_hash_, {"hash": quick_hash_, "size": size, "paths": []})["paths"].append(path)
+        return list(groups.values())
+
+    def model_files(self) -> dict[str, tuple[int, float]]:
+        """Path -> (size, mtime) of the files in the model folders, from folder_paths.model_index."""
+        files = {}
+        for folder_name, (paths, _) in list(folder_paths.folder_names_and_paths.items()):
+            if folder_name in self.excluded_folders:
+                continue
+            for root in paths:
+                if not os.path.isdir(root):
+                    continue
+                for relative_path, (size, mtime, _) in folder_paths.model_index.file_info(root).items():
+                    if os.path.splitext(relative_path)[-1].lower() in folder_paths.supported_pt_extensions:
+                        files[os.path.join(root, relative_path)] = (size, mtime)
+        return files
+
+    def build(self) -> int:
+        """Catalog files that are new or changed since they were cataloged and drop deleted ones; returns how many were cataloged."""
+        with self.build_lock:
+            files = self.model_files()
+            with self.session_factory() as session:
+                known = {path: (size, mtime) for path, size, mtime in session.execute(select(ModelMetadata.path, ModelMetadata.size, ModelMetadata.mtime))}
+            changed = [path for path, stat in files.items() if known.get(path) != stat]
+            for path in changed:
+                try:
+                    self.store(self.describe(path))
+                except Exception as e:
+                    logging.warning(f"Model catalog: skipping {path}: {e}")
+            gone = [path for path in known if path not in files and not os.path.exists(path)]
+            if gone:
+                with self.session_factory() as session:
+                    session.execute(delete(ModelMetadata).where(ModelMetadata.path.in_(gone)))
+                    session.commit()
+            if changed:
+                logging.info(f"Model catalog: cataloged {len(changed)} model files")
+            return len(changed)
+
+    def build_in_background(self) -> None:
+        if self.building:
+            return
+        self.building = True
+
+        def run():
+            try:
+                self.build()
+            except Exception:
+                logging.exception("Model catalog: build failed")
+            finally:
+                self.building = False
+
+        threading.Thread(target=run, name="model_catalog", daemon=True).start()
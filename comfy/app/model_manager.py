@@ -3,29 +3,20 @@ from __future__ import annotations
 import os
 import base64
 import json
-import time
-import logging
+import asyncio
 import folder_paths
 import glob
 import comfy.utils
 from aiohttp import web
 from PIL import Image
 from io import BytesIO
-from folder_paths import map_legacy, filter_files_extensions, filter_files_content_types
+from folder_paths import map_legacy, filter_files_content_types
 
 
 class ModelFileManager:
     def __init__(self) -> None:
-        self.cache: dict[str, tuple[list[dict], dict[str, float], float]] = {}
-
-    def get_cache(self, key: str, default=None) -> tuple[list[dict], dict[str, float], float] | None:
-        return self.cache.get(key, default)
-
-    def set_cache(self, key: str, value: tuple[list[dict], dict[str, float], float]):
-        self.cache[key] = value
-
-    def clear_cache(self):
-        self.cache.clear()
+        # app.model_catalog.ModelCatalog, set once the database is available
+        self.catalog = None
 
     def add_routes(self, routes):
         # NOTE: This is an experiment to replace `/models`
@@ -46,7 +37,8 @@ class ModelFileManager:
             folder = request.match_info.get("folder", None)
             if not folder in folder_paths.folder_names_and_paths:
                 return web.Response(status=404)
-            files = self.get_model_file_list(folder)
+            # The first listing of a folder stats its files; keep that off the event loop
+            files = await asyncio.to_thread(self.get_model_file_list, folder)
             return web.json_response(files)
 
         @routes.get("/experiment/models/preview/{folder}/{path_index}/{filename:.*}")
@@ -62,7 +54,7 @@ class ModelFileManager:
             folder = folders[0][path_index]
             full_filename = os.path.join(folder, filename)
 
-            previews = self.get_model_previews(full_filename)
+            previews = await asyncio.to_thread(self.get_model_previews, full_filename)
             default_preview = previews[0] if len(previews) > 0 else None
             if default_preview is None or (isinstance(default_preview, str) and not os.path.isfile(default_preview)):
                 return web.Response(status=404)
@@ -76,6 +68,12 @@ class ModelFileManager:
             except:
                 return web.Response(status=404)
 
+        @routes.get("/experiment/models/duplicates")
+        async def get_model_duplicates(request):
+            if self.catalog is None:
+                return web.Response(status=503, text="The model catalog requires the database")
+            return web.json_response(await asyncio.to_thread(self.catalog.duplicates))
+
     def get_model_file_list(self, folder_name: str):
         folder_name = map_legacy(folder_name)
         folders = folder_paths.folder_names_and_paths[folder_name]
@@ -84,78 +82,30 @@ class ModelFileManager:
         for index, folder in enumerate(folders[0]):
             if not os.path.isdir(folder):
                 continue
-            out = self.cache_model_file_list_(folder)
-            if out is None:
-                out = self.recursive_search_models_(folder, index)
-                self.set_cache(folder, out)
-            output_list.extend(out[0])
+            output_list.extend(self.recursive_search_models_(folder, index))
 
         return output_list
 
-    def cache_model_file_list_(self, folder: str):
-        model_file_list_cache = self.get_cache(folder)
-
-        if model_file_list_cache is None:
-            return None
-        if not os.path.isdir(folder):
-            return None
-        if os.path.getmtime(folder) != model_file_list_cache[1]:
-            return None
-        for x in model_file_list_cache[1]:
-            time_modified = model_file_list_cache[1][x]
-            folder = x
-            if os.path.getmtime(folder) != time_modified:
-                return None
-
-        return model_file_list_cache
-
-    def recursive_search_models_(self, directory: str, pathIndex: int) -> tuple[list[str], dict[str, float], float]:
-        if not os.path.isdir(directory):
-            return [], {}, time.perf_counter()
-
-        excluded_dir_names = [".git"]
+    def recursive_search_models_(self, directory: str, pathIndex: int) -> list[dict]:
+        """Model files under directory with their metadata, answered from folder_paths.model_index."""
         # TODO use settings
         include_hidden_files = False
 
-        result: list[str] = []
-        dirs: dict[str, float] = {}
-
-        for dirpath, subdirs, filenames in os.walk(directory, followlinks=True, topdown=True):
-            subdirs[:] = [d for d in subdirs if d not in excluded_dir_names]
-            if not include_hidden_files:
-                subdirs[:] = [d for d in subdirs if not d.startswith(".")]
-                filenames = [f for f in filenames if not f.startswith(".")]
-
-            filenames = filter_files_extensions(filenames, folder_paths.supported_pt_extensions)
-
-            for file_name in filenames:
-                try:
-                    full_path = os.path.join(dirpath, file_name)
-                    relative_path = os.path.relpath(full_path, directory)
-
-                    # Get file metadata
-                    file_info = {
-                        "name": relative_path,
-                        "pathIndex": pathIndex,
-                        "modified": os.path.getmtime(full_path),  # Add modification time
-                        "created": os.path.getctime(full_path),   # Add creation time
-                        "size": os.path.getsize(full_path)        # Add file size
-                    }
-                    result.append(file_info)
-
-                except Exception as e:
-                    logging.warning(f"Warning: Unable to access {file_name}. Error: {e}. Skipping this file.")
-                    continue
-
-            for d in subdirs:
-                path: str = os.path.join(dirpath, d)
-                try:
-                    dirs[path] = os.path.getmtime(path)
-                except FileNotFoundError:
-                    logging.warning(f"Warning: Unable to access {path}. Skipping this path.")
-                    continue
+        result: list[dict] = []
+        for relative_path, (size, modified, created) in sorted(folder_paths.model_index.file_info(directory).items()):
+            if os.path.splitext(relative_path)[-1].lower() not in folder_paths.supported_pt_extensions:
+                continue
+            if not include_hidden_files and any(part.startswith(".") for part in relative_path.split(os.sep)):
+                continue
+            result.append({
+                "name": relative_path,
+                "pathIndex": pathIndex,
+                "modified": modified,
+                "created": created,
+                "size": size,
+            })
 
-        return result, dirs, time.perf_counter()
+        return result
 
     def get_model_previews(self, filepath: str) -> list[str | BytesIO]:
         dirname = os.path.dirname(filepath)
@@ -167,7 +117,6 @@ class ModelFileManager:
         match_files = glob.glob(f"{basename}.*", recursive=False)
         image_files = filter_files_content_types(match_files, "image")
         safetensors_file = next(filter(lambda x: x.endswith(".safetensors"), match_files), None)
-        safetensors_metadata = {}
 
         result: list[str | BytesIO] = []
 
@@ -178,18 +127,20 @@ class ModelFileManager:
             if _basename == f"{basename}.preview":
                 result.append(filename)
 
+        safetensors_images = None
         if safetensors_file:
             safetensors_filepath = os.path.join(dirname, safetensors_file)
-            header = comfy.utils.safetensors_header(safetensors_filepath, max_size=8*1024*1024)
-            if header:
-                safetensors_metadata = json.loads(header)
-        safetensors_images = safetensors_metadata.get("__metadata__", {}).get("ssmd_cover_images", None)
+            if self.catalog is not None:
+                safetensors_images = self.catalog.cover_images(safetensors_filepath)
+            else:
+                header = comfy.utils.safetensors_header(safetensors_filepath, max_size=8*1024*1024)
+                if header:
+                    safetensors_images = json.loads(header).get("__metadata__", {}).get("ssmd_cover_images", None)
+                    if safetensors_images:
+                        safetensors_images = json.loads(safetensors_images)
         if safetensors_images:
-            safetensors_images = json.loads(safetensors_images)
             for image in safetensors_images:
                 result.append(BytesIO(base64.b64decode(image)))
 
         return result
 
-    def __exit__(self, exc_type, exc_value, traceback):
-        self.clear_cache()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import os
+import gzip
+import json
+import asyncio
+import hashlib
+import logging
+import threading
+import traceback
+from typing import Callable
+
+import folder_paths
+from aiohttp import web
+
+
+class NodeInfoRegistry:
+    """
+    Precomputed /object_info.
+
+    Node info is built once (in the background at startup) and kept as
+    serialized and gzipped bytes with a content-hash ETag. While a node's
+    info is built, the model folders (and input directory) its INPUT_TYPES
+    lists are recorded through folder_paths.folder_reads; on later requests
+    only nodes whose classes changed, or whose recorded folders changed,
+    are rebuilt.
+    """
+
+    def __init__(self, node_info: Callable[[str], dict], mappings: Callable[[], dict] | None = None) -> None:
+        self.node_info = node_info
+        self.mappings = mappings or self.node_class_mappings
+        self.lock = threading.Lock()
+        self.infos: dict[str, dict] = {}
+        self.classes: dict[str, type] = {}
+        self.dependencies: dict[str, set[str]] = {}
+        self.signatures: dict[str, object] = {}
+        self.snapshot: tuple[bytes, bytes, str] | None = None  # (json, gzipped json, etag)
+
+    @staticmethod
+    def node_class_mappings() -> dict:
+        import nodes
+        return nodes.NODE_CLASS_MAPPINGS
+
+    @staticmethod
+    def signature(source: str):
+        """Cheap fingerprint of a file-list source; changes when its listing does."""
+        try:
+            if source == folder_paths.INPUT_DIRECTORY_SOURCE:
+                return os.stat(folder_paths.get_input_directory()).st_mtime_ns
+            roots = tuple(os.stat(path).st_mtime_ns if os.path.isdir(path) else None for path in folder_paths.get_folder_paths(source))
+            return roots, hash(tuple(folder_paths.get_filename_list(source)))
+        except (KeyError, OSError):
+            return None
+
+    def build_in_background(self) -> None:
+        threading.Thread(target=self.refresh, name="object_info", daemon=True).start()
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rebuild what changed since the last call; returns whether the output changed."""
+        with self.lock, folder_paths.cache_helper:
+            mappings = dict(self.mappings())
+            dirty = {name for name, cls in mappings.items() if force or self.classes.get(name) is not cls}
+            removed = set(self.classes) - set(mappings)
+            changed = {source for source, sig in self.signatures.items() if self.signature(source) != sig}
+            dirty.update(name for name, sources in self.dependencies.items() if name in mappings and sources & changed)
+            if not dirty and not removed and self.snapshot is not None:
+                return False
+
+            for name in removed:
+                self.classes.pop(name, None)
+                self.infos.pop(name, None)
+                self.dependencies.pop(name, None)
+            for name in dirty:
+                reads: set[str] = set()
+                token = folder_paths.folder_reads.set(reads)
+                try:
+                    self.infos[name] = self.node_info(name)
+                except Exception:
+                    self.infos.pop(name, None)
+                    logging.error(f"[ERROR] An error occurred while retrieving information for the '{name}' node.")
+                    logging.error(traceback.format_exc())
+                finally:
+                    folder_paths.folder_reads.reset(token)
+                self.classes[name] = mappings[name]
+                self.dependencies[name] = reads
+
+            used = set().union(*self.dependencies.values()) if self.dependencies else set()
+            self.signatures = {source: self.signatures[source] if source in self.signatures and source not in changed else self.signature(source) for source in used}
+
+            # Keep NODE_CLASS_MAPPINGS order, as the frontend lists nodes in it
+            body = json.dumps({name: self.infos[name] for name in mappings if name in self.infos}).encode("utf-8")
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            if self.snapshot is not None and self.snapshot[2] == etag:
+                return False
+            self.snapshot = (body, gzip.compress(body, compresslevel=6), etag)
+            logging.debug(f"object_info rebuilt {len(dirty)} of {len(mappings)} node classes")
+            return True
+
+    async def response(self, request: web.Request) -> web.Response:
+        await asyncio.to_thread(self.refresh, request.rel_url.query.get("refresh") == "true")
+        body, gzip_body, etag = self.snapshot
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if etag in request.headers.get("If-None-Match", ""):
+            return web.Response(status=304, headers=headers)
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            body = gzip_body
+        return web.Response(body=body, content_type="application/json", headers=headers)
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import os
+import asyncio
+import hashlib
+import logging
+import threading
+import concurrent.futures
+from collections import OrderedDict
+from io import BytesIO
+
+import folder_paths
+from aiohttp import web
+from PIL import Image
+
+
+class PreviewManager:
+    """
+    Transcoded variants of images served by /view: previews (webp/jpeg),
+    single channels and thumbnails (max_size).
+
+    Transcoding runs in a thread pool so it never blocks the event loop, and
+    results are kept in a size-bounded disk cache keyed by the source file's
+    path, mtime and size plus the requested variant. The same key is the
+    ETag, so revalidation is answered before the image is touched.
+    """
+
+    def __init__(self, cache_dir: str | None = None, max_bytes: int = 512 * 1024 * 1024, workers: int | None = None) -> None:
+        self.cache_dir = cache_dir or os.path.join(folder_paths.get_system_user_directory("cache"), "previews")
+        self.max_bytes = max_bytes
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers or min(4, os.cpu_count() or 1), thread_name_prefix="view_preview")
+        self.entries: OrderedDict[str, int] | None = None  # cache file -> size, oldest first
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.inflight: dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def variant(query) -> tuple[str, int, str, int] | None:
+        """(format, quality, channel, max_size) requested by a /view query, or None for the file as is."""
+        channel = query.get("channel", "rgba")
+        max_size = int(query["max_size"]) if query.get("max_size", "").isdigit() else 0
+        if "preview" in query:
+            preview_info = query["preview"].split(";")
+            image_format = preview_info[0]
+            if image_format not in ["webp", "jpeg"] or "a" in query.get("channel", ""):
+                image_format = "webp"
+            quality = int(preview_info[-1]) if preview_info[-1].isdigit() else 90
+            return image_format, quality, channel if channel == "rgb" else "rgba", max_size
+        if channel in ("rgb", "a") or max_size > 0:
+            return "png", 0, channel, max_size
+        return None
+
+    async def response(self, file: str, filename: str, variant: tuple[str, int, str, int], if_none_match: str | None = None) -> web.Response:
+        image_format, quality, channel, max_size = variant
+        st = os.stat(file)
+        key = hashlib.sha256(f"{os.path.abspath(file)}|{st.st_mtime_ns}|{st.st_size}|{image_format}|{quality}|{channel}|{max_size}".encode()).hexdigest()[:32]
+        headers = {
+            "ETag": f'"{key}"',
+            # The URL names the file, not its version: always revalidate (cheap 304)
+            "Cache-Control": "no-cache",
+            "Content-Disposition": f"filename=\"{filename}\"",
+        }
+        if if_none_match is not None and f'"{key}"' in if_none_match:
+            return web.Response(status=304, headers=headers)
+
+        future = self.inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.pool, self.render, file, key, variant)
+            self.inflight[key] = future
+            future.add_done_callback(lambda _: self.inflight.pop(key, None))
+        body = await asyncio.shield(future)
+        return web.Response(body=body, content_type=f"image/{image_format}", headers=headers)
+
+    def render(self, file: str, key: str, variant: tuple[str, int, str, int]) -> bytes:
+        """Cached bytes of a variant, transcoding on a miss (worker thread)."""
+        image_format, quality, channel, max_size = variant
+        path = os.path.join(self.cache_dir, f"{key}.{image_format}")
+        if self.max_bytes > 0:
+            self.load_index()
+            try:
+                with open(path, "rb") as f:
+                    body = f.read()
+                self.touch(path)
+                return body
+            except FileNotFoundError:
+                pass
+
+        with Image.open(file) as img:
+            if max_size > 0:
+                if img.format == "JPEG":
+                    img.draft("RGB", (max_size, max_size))
+                img.thumbnail((max_size, max_size))
+            if channel == "a":
+                a = img.getchannel("A") if img.mode == "RGBA" else Image.new("L", img.size, 255)
+                img = Image.new("RGBA", img.size)
+                img.putalpha(a)
+            elif image_format == "jpeg" or channel == "rgb":
+                img = img.convert("RGB")
+            buffer = BytesIO()
+            if image_format == "png":
+                img.save(buffer, format="PNG")
+            else:
+                img.save(buffer, format=image_format, quality=quality)
+        body = buffer.getvalue()
+
+        if self.max_bytes > 0:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(body)
+                os.replace(tmp, path)
+                self.add(path, len(body))
+            except OSError as e:
+                logging.warning(f"Could not cache preview {path}: {e}")
+        return body
+
+    def load_index(self) -> None:
+        """Read the sizes of existing cache files once, oldest first."""
+        with self.lock:
+            if self.entries is not None:
+                return
+            files = []
+            if os.path.isdir(self.cache_dir):
+                for entry in os.scandir(self.cache_dir):
+                    if entry.is_file() and not entry.name.endswith(".tmp"):
+                        st = entry.stat()
+                        files.append((st.st_mtime, entry.path, st.st_size))
+            files.sort()
+            self.entries = OrderedDict((path, size) for _, path, size in files)
+            self.total_bytes = sum(self.entries.values())
+
+    def touch(self, path: str) -> None:
+        with self.lock:
+            if self.entries is not None and path in self.entries:
+                self.entries.move_to_end(path)
+        try:
+            os.utime(path)  # keeps the LRU order across restarts
+        except OSError:
+            pass
+
+    def add(self, path: str, size: int) -> None:
+        """Record a new cache file and evict the least recently used beyond max_bytes."""
+        evict = []
+        with self.lock:
+            self.total_bytes += size - self.entries.pop(path, 0)
+            self.entries[path] = size
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                old_path, old_size = self.entries.popitem(last=False)
+                self.total_bytes -= old_size
+                evict.append(old_path)
+        for old_path in evict:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
@@ -7,6 +7,25 @@ import logging
 import torch
 
 
+# Optional path -> detection results lookup for model files, set by the model
+# catalog (app/model_catalog.py). Results are a dict with "unet_prefix",
+# "unet_config", "parameters" and "weight_dtype", or None when not known.
+detection_cache = None
+
+def set_detection_cache(lookup):
+    global detection_cache
+    detection_cache = lookup
+
+def cached_detection(path):
+    if detection_cache is None:
+        return None
+    try:
+        return detection_cache(path)
+    except Exception as e:
+        logging.warning("Could not look up cached model detection for {}: {}".format(path, e))
+        return None
+
+
 def detect_layer_quantization(metadata):
     quant_key = "_quantization_metadata"
     if metadata is not None and quant_key in metadata:
@@ -759,8 +778,9 @@ def model_config_from_unet_config(unet_config, state_dict=None):
     logging.error("no match {}".format(unet_config))
     return None
 
-def model_config_from_unet(state_dict, unet_key_prefix, use_base_if_no_match=False, metadata=None):
-    unet_config = detect_unet_config(state_dict, unet_key_prefix, metadata=metadata)
+def model_config_from_unet(state_dict, unet_key_prefix, use_base_if_no_match=False, metadata=None, unet_config=None):
+    if unet_config is None:
+        unet_config = detect_unet_config(state_dict, unet_key_prefix, metadata=metadata)
     if unet_config is None:
         return None
     model_config = model_config_from_unet_config(unet_config, state_dict)
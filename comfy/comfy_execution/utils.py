@@ -44,3 +44,17 @@ class CurrentNodeContext:
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.token is not None:
             current_executing_context.reset(self.token)
+
+def output_files(outputs: Optional[dict]) -> list[dict]:
+    """
+    File references ({"filename", "subfolder", "type"}) listed in the UI
+    outputs of a prompt, as stored in its history entry.
+    """
+    files = []
+    for node_output in (outputs or {}).values():
+        if not isinstance(node_output, dict):
+            continue
+        for items in node_output.values():
+            if isinstance(items, list):
+                files.extend(item for item in items if isinstance(item, dict) and isinstance(item.get("filename"), str))
+    return files
@@ -32,7 +32,7 @@ from comfy_execution.graph import (
 from comfy_execution.graph_utils import GraphBuilder, is_link
 from comfy_execution.validation import validate_node_input
 from comfy_execution.progress import get_progress_state, reset_progress_state, add_progress_handler, WebUIProgressHandler
-from comfy_execution.utils import CurrentNodeContext
+from comfy_execution.utils import CurrentNodeContext, output_files
 from comfy_api.internal import _ComfyNodeInternal, _NodeOutputInternal, first_real_override, is_class, make_locked_method_func
 from comfy_api.latest import io
 
@@ -1097,6 +1097,7 @@ class PromptQueue:
         self.queue = []
         self.currently_running = {}
         self.history = {}
+        self.history_store = None
         self.flags = {}
 
     def put(self, item):
@@ -1127,8 +1128,6 @@ class PromptQueue:
                   status: Optional['PromptQueue.ExecutionStatus'], process_item=None):
         with self.mutex:
             prompt = self.currently_running.pop(item_id)
-            if len(self.history) > MAXIMUM_HISTORY_SIZE:
-                self.history.pop(next(iter(self.history)))
 
             status_dict: Optional[dict] = None
             if status is not None:
@@ -1137,14 +1136,28 @@ class PromptQueue:
             if process_item is not None:
                 prompt = process_item(prompt)
 
-            self.history[prompt[1]] = {
+            entry = {
                 "prompt": prompt,
                 "outputs": {},
                 'status': status_dict,
             }
-            self.history[prompt[1]].update(history_result)
+            entry.update(history_result)
+            if self.history_store is not None:
+                self.history_store.put(prompt[1], entry)
+            else:
+                if len(self.history) > MAXIMUM_HISTORY_SIZE:
+                    self.history.pop(next(iter(self.history)))
+                self.history[prompt[1]] = entry
             self.server.queue_updated()
 
+    def set_history_store(self, history_store):
+        """Keep history in a persistent store (app.history_store.HistoryStore) instead of memory."""
+        with self.mutex:
+            for prompt_id, entry in self.history.items():
+                history_store.put(prompt_id, entry)
+            self.history = {}
+            self.history_store = history_store
+
     # Note: slow
     def get_current_queue(self):
         with self.mutex:
@@ -1182,16 +1195,42 @@ class PromptQueue:
                     return True
         return False
 
-    def get_history(self, prompt_id=None, max_items=None, offset=-1, map_function=None):
+    def get_history(self, prompt_id=None, max_items=None, offset=-1, map_function=None, before=None, status=None, filename=None):
+        history_store = self.history_store
+        if history_store is not None:
+            # The store has its own locking: reads never wait on the executor
+            if prompt_id is None:
+                out = history_store.list(max_items=max_items, offset=offset, before=before, status=status, filename=filename)
+            else:
+                p = history_store.get(prompt_id)
+                out = {} if p is None else {prompt_id: p}
+            if map_function is not None:
+                out = {k: map_function(p) for k, p in out.items()}
+            return out
+
         with self.mutex:
             if prompt_id is None:
+                history = self.history
+                if before is not None or status is not None or filename is not None:
+                    history = {}
+                    for k, p in self.history.items():
+                        if k == before:
+                            break
+                        if status is not None and (p.get('status') or {}).get('status_str') != status:
+                            continue
+                        if filename is not None and not any(f["filename"] == filename for f in output_files(p.get("outputs"))):
+                            continue
+                        history[k] = p
+                    if before is not None and before not in self.history:
+                        history = {}
+
                 out = {}
                 i = 0
                 if offset < 0 and max_items is not None:
-                    offset = len(self.history) - max_items
-                for k in self.history:
+                    offset = len(history) - max_items
+                for k in history:
                     if i >= offset:
-                        p = self.history[k]
+                        p = history[k]
                         if map_function is not None:
                             p = map_function(p)
                         out[k] = p
@@ -1210,10 +1249,16 @@ class PromptQueue:
                 return {}
 
     def wipe_history(self):
+        if self.history_store is not None:
+            self.history_store.clear()
+            return
         with self.mutex:
             self.history = {}
 
     def delete_history_item(self, id_to_delete):
+        if self.history_store is not None:
+            self.history_store.delete(id_to_delete)
+            return
         with self.mutex:
             self.history.pop(id_to_delete, None)
 
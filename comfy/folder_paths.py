@@ -1,13 +1,19 @@
 from __future__ import annotations
 
 import os
+import re
+import json
 import time
+import atexit
 import mimetypes
 import logging
+import threading
+from contextvars import ContextVar
 from typing import Literal, List
 from collections.abc import Collection
 
 from comfy.cli_args import args
+import utils.inotify as _inotify
 
 supported_pt_extensions: set[str] = {'.ckpt', '.pt', '.pt2', '.bin', '.pth', '.safetensors', '.pkl', '.sft'}
 
@@ -89,6 +95,17 @@ class CacheHelper:
 
 cache_helper = CacheHelper()
 
+# Sources of file lists read in the current context: model folder names, and
+# INPUT_DIRECTORY_SOURCE for the input directory. Set by callers that cache
+# results derived from those lists (see app/node_info_registry.py).
+folder_reads: ContextVar[set[str] | None] = ContextVar("folder_reads", default=None)
+INPUT_DIRECTORY_SOURCE = "@input"
+
+def record_folder_read(source: str) -> None:
+    reads = folder_reads.get()
+    if reads is not None:
+        reads.add(source)
+
 extension_mimetypes_cache = {
     "webp" : "image",
     "fbx" : "model",
@@ -127,6 +144,7 @@ def get_temp_directory() -> str:
 
 def get_input_directory() -> str:
     global input_directory
+    record_folder_read(INPUT_DIRECTORY_SOURCE)
     return input_directory
 
 def get_user_directory() -> str:
@@ -298,6 +316,7 @@ def add_model_folder_path(folder_name: str, full_folder_path: str, is_default: b
 
 def get_folder_paths(folder_name: str) -> list[str]:
     folder_name = map_legacy(folder_name)
+    record_folder_read(folder_name)
     return folder_names_and_paths[folder_name][0][:]
 
 def recursive_search(directory: str, excluded_dir_names: list[str] | None=None) -> tuple[list[str], dict[str, float]]:
@@ -345,6 +364,269 @@ def filter_files_extensions(files: Collection[str], extensions: Collection[str])
     return sorted(list(filter(lambda a: os.path.splitext(a)[-1].lower() in extensions or len(extensions) == 0, files)))
 
 
+class _IndexedRoot:
+    def __init__(self):
+        self.dirs: dict[str, float] = {}  # directory -> mtime when it was listed
+        self.files: dict[str, dict[str, tuple[int, float, float] | None]] = {}  # directory -> {name: (size, mtime, ctime), None until stat'ed}
+        self.generation = 0  # bumped whenever a file is added or removed
+        self.watched = False
+
+
+class ModelFileIndex:
+    """
+    The files under model folder roots, shared by get_filename_list and the
+    model manager (app/model_manager.py), which also reads their size and
+    times from here.
+
+    A root is walked once, or loaded from the index saved by a previous run
+    (see load) and checked against its directory mtimes. After that, on
+    Linux an inotify watch on each directory feeds changes in and a lookup
+    only applies the pending events. Where watches can't be added, or with
+    --model-index-polling, a lookup stats the root's directories and lists
+    again only those whose mtime moved.
+    """
+    excluded_dir_names = [".git"]
+    watch_mask = (_inotify.IN_CREATE | _inotify.IN_DELETE | _inotify.IN_MOVED_FROM | _inotify.IN_MOVED_TO
+                  | _inotify.IN_CLOSE_WRITE | _inotify.IN_ATTRIB | _inotify.IN_DELETE_SELF | _inotify.IN_ONLYDIR)
+    save_interval = 30.0
+
+    def __init__(self, polling: bool = False):
+        self.polling = polling
+        self.path: str | None = None
+        self._roots: dict[str, _IndexedRoot] = {}
+        self._lock = threading.RLock()
+        self._inotify: _inotify.Inotify | None = None
+        self._watches: dict[int, tuple[str, str]] = {}  # wd -> (root, directory)
+        self._dirty = False
+        self._saved_at = 0.0
+
+    def generation(self, root: str) -> int:
+        with self._lock:
+            return self._refresh(root).generation
+
+    def list_files(self, root: str) -> tuple[int, list[str]]:
+        """The generation and the paths (relative to root) of all files under root."""
+        with self._lock:
+            entry = self._refresh(root)
+            files = []
+            for directory, names in entry.files.items():
+                relative_dir = os.path.relpath(directory, root)
+                files.extend(names if relative_dir == "." else (os.path.join(relative_dir, name) for name in names))
+            return entry.generation, files
+
+    def file_info(self, root: str) -> dict[str, tuple[int, float, float]]:
+        """Relative path -> (size, mtime, ctime) of all files under root; only files not seen yet are stat'ed."""
+        with self._lock:
+            entry = self._refresh(root)
+            out = {}
+            for directory, names in entry.files.items():
+                relative_dir = os.path.relpath(directory, root)
+                for name, info in names.items():
+                    if info is None:
+                        try:
+                            st = os.stat(os.path.join(directory, name))
+                        except OSError as e:
+                            logging.warning(f"Warning: Unable to access {name}. Error: {e}. Skipping this file.")
+                            continue
+                        info = names[name] = (st.st_size, st.st_mtime, st.st_ctime)
+                        self._dirty = True
+                    out[name if relative_dir == "." else os.path.join(relative_dir, name)] = info
+            self._maybe_save()
+            return out
+
+    def _refresh(self, root: str) -> _IndexedRoot:
+        self._read_events()
+        entry = self._roots.get(root)
+        if entry is None:
+            entry = self._roots[root] = _IndexedRoot()
+            self._add_tree(root, entry, root)
+            self._watch(root, entry)
+        elif not entry.watched:
+            self._poll(root, entry)
+            self._watch(root, entry)
+        self._maybe_save()
+        return entry
+
+    def _add_tree(self, root: str, entry: _IndexedRoot, path: str) -> None:
+        files, dirs = recursive_search(path, excluded_dir_names=self.excluded_dir_names)
+        for file in files:
+            directory, name = os.path.split(os.path.join(path, file))
+            entry.files.setdefault(directory, {})[name] = None
+        entry.dirs.update(dirs)
+        entry.generation += 1
+        self._dirty = True
+        if entry.watched:
+            for directory in dirs:
+                self._add_watch(root, entry, directory)
+
+    def _remove_tree(self, entry: _IndexedRoot, path: str) -> None:
+        prefix = os.path.join(path, "")
+        for directory in [d for d in entry.dirs if d == path or d.startswith(prefix)]:
+            del entry.dirs[directory]
+        for directory in [d for d in entry.files if d == path or d.startswith(prefix)]:
+            del entry.files[directory]
+        for wd, (_, directory) in list(self._watches.items()):
+            if directory == path or directory.startswith(prefix):
+                del self._watches[wd]
+                self._inotify.rm_watch(wd)
+        entry.generation += 1
+        self._dirty = True
+
+    def _poll(self, root: str, entry: _IndexedRoot) -> None:
+        if not entry.dirs:
+            if os.path.isdir(root):
+                self._add_tree(root, entry, root)
+            return
+        for directory, mtime in list(entry.dirs.items()):
+            if directory not in entry.dirs:
+                continue  # removed with its parent
+            try:
+                current = os.path.getmtime(directory)
+            except OSError:
+                self._remove_tree(entry, directory)
+                continue
+            if current != mtime:
+                self._relist(root, entry, directory, current)
+
+    def _relist(self, root: str, entry: _IndexedRoot, directory: str, mtime: float) -> None:
+        """List one directory again: its files and which subdirectories appeared or went away."""
+        files: dict[str, None] = {}
+        subdirs = set()
+        with os.scandir(directory) as it:
+            for item in it:
+                if item.is_dir():
+                    if item.name not in self.excluded_dir_names:
+                        subdirs.add(item.path)
+                else:
+                    files[item.name] = None
+        entry.dirs[directory] = mtime
+        entry.files[directory] = files
+        entry.generation += 1
+        self._dirty = True
+        for path in [d for d in entry.dirs if os.path.dirname(d) == directory and d not in subdirs]:
+            self._remove_tree(entry, path)
+        for path in subdirs - entry.dirs.keys():
+            self._add_tree(root, entry, path)
+
+    def _watch(self, root: str, entry: _IndexedRoot) -> None:
+        if self.polling or not entry.dirs:
+            return
+        try:
+            if self._inotify is None:
+                self._inotify = _inotify.Inotify()
+            entry.watched = True
+            for directory in list(entry.dirs):
+                self._add_watch(root, entry, directory)
+        except OSError as e:
+            logging.info(f"Not watching model folders ({e}), they are checked on each lookup instead.")
+            self.polling = True
+            entry.watched = False
+            return
+        # Catch changes made between listing the directories and watching them
+        self._poll(root, entry)
+
+    def _add_watch(self, root: str, entry: _IndexedRoot, directory: str) -> None:
+        try:
+            self._watches[self._inotify.add_watch(directory, self.watch_mask)] = (root, directory)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            for wd, (watched_root, _) in list(self._watches.items()):
+                if watched_root == root:
+                    del self._watches[wd]
+                    self._inotify.rm_watch(wd)
+            entry.watched = False
+            raise
+
+    def _read_events(self) -> None:
+        if self._inotify is None:
+            return
+        for wd, mask, _, name in self._inotify.read():
+            if mask & _inotify.IN_Q_OVERFLOW:
+                # Events were dropped: check everything against mtimes once
+                for entry in self._roots.values():
+                    entry.watched = False
+                continue
+            if wd not in self._watches:
+                continue
+            root, directory = self._watches[wd]
+            entry = self._roots.get(root)
+            if mask & _inotify.IN_IGNORED:
+                del self._watches[wd]
+                continue
+            if entry is None:
+                continue
+            if mask & _inotify.IN_DELETE_SELF:
+                if directory == root:
+                    self._remove_tree(entry, root)
+                    entry.watched = False  # checked for reappearing on each lookup
+                continue
+            path = os.path.join(directory, name)
+            if mask & _inotify.IN_ISDIR:
+                if name in self.excluded_dir_names:
+                    continue
+                if mask & (_inotify.IN_CREATE | _inotify.IN_MOVED_TO):
+                    self._add_tree(root, entry, path)
+                elif mask & (_inotify.IN_DELETE | _inotify.IN_MOVED_FROM):
+                    self._remove_tree(entry, path)
+                continue
+            names = entry.files.setdefault(directory, {})
+            if mask & (_inotify.IN_DELETE | _inotify.IN_MOVED_FROM):
+                if name in names:
+                    del names[name]
+                    entry.generation += 1
+            else:
+                if name not in names:
+                    entry.generation += 1
+                names[name] = None  # created or written: stat again when asked
+            self._dirty = True
+
+    def load(self, path: str) -> None:
+        """Use `path` to keep the index between runs, loading what a previous run saved there."""
+        with self._lock:
+            self.path = path
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                for root, saved in data.get("roots", {}).items():
+                    entry = _IndexedRoot()
+                    entry.dirs = saved["dirs"]
+                    entry.files = {d: {name: tuple(info) if info else None for name, info in names.items()} for d, names in saved["files"].items()}
+                    self._roots.setdefault(root, entry)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+                logging.warning(f"Ignoring the saved model file index {path}: {e}")
+        atexit.register(self.save)
+
+    def save(self) -> None:
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return
+            data = {"roots": {root: {"dirs": entry.dirs, "files": entry.files} for root, entry in self._roots.items()}}
+            self._dirty = False
+            self._saved_at = time.monotonic()
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(f"{self.path}.tmp", self.path)
+            except OSError as e:
+                logging.warning(f"Could not save the model file index {self.path}: {e}")
+
+    def _maybe_save(self) -> None:
+        if self._dirty and self.path is not None and time.monotonic() - self._saved_at > self.save_interval:
+            self.save()
+
+    def clear(self):
+        with self._lock:
+            for wd in self._watches:
+                self._inotify.rm_watch(wd)
+            self._watches.clear()
+            self._roots.clear()
+
+model_index = ModelFileIndex(polling=args.model_index_polling)
+
 
 def get_full_path(folder_name: str, filename: str) -> str | None:
     """
@@ -383,9 +665,9 @@ def get_filename_list_(folder_name: str) -> tuple[list[str], dict[str, float], f
     folders = folder_names_and_paths[folder_name]
     output_folders = {}
     for x in folders[0]:
-        files, folders_all = recursive_search(x, excluded_dir_names=[".git"])
+        generation, files = model_index.list_files(x)
         output_list.update(filter_files_extensions(files, folders[1]))
-        output_folders = {**output_folders, **folders_all}
+        output_folders[x] = generation
 
     return sorted(list(output_list)), output_folders, time.perf_counter()
 
@@ -401,22 +683,19 @@ def cached_filename_list_(folder_name: str) -> tuple[list[str], dict[str, float]
         return None
     out = filename_list_cache[folder_name]
 
-    for x in out[1]:
-        time_modified = out[1][x]
-        folder = x
-        if os.path.getmtime(folder) != time_modified:
-            return None
-
+    # out[1] holds the model_index generation of each root the list was built from
     folders = folder_names_and_paths[folder_name]
+    if set(out[1]) != set(folders[0]):
+        return None
     for x in folders[0]:
-        if os.path.isdir(x):
-            if x not in out[1]:
-                return None
+        if model_index.generation(x) != out[1][x]:
+            return None
 
     return out
 
 def get_filename_list(folder_name: str) -> list[str]:
     folder_name = map_legacy(folder_name)
+    record_folder_read(folder_name)
     out = cached_filename_list_(folder_name)
     if out is None:
         out = get_filename_list_(folder_name)
@@ -425,16 +704,75 @@ def get_filename_list(folder_name: str) -> list[str]:
     cache_helper.set(folder_name, out)
     return list(out[0])
 
-def get_save_image_path(filename_prefix: str, output_dir: str, image_width=0, image_height=0) -> tuple[str, str, int, str, str]:
-    def map_filename(filename: str) -> tuple[int, str]:
-        prefix_len = len(os.path.basename(filename_prefix))
-        prefix = filename[:prefix_len + 1]
-        try:
-            digits = int(filename[prefix_len + 1:].split('_')[0])
-        except:
-            digits = 0
-        return digits, prefix
+class SaveCounterIndex:
+    """
+    Highest "{prefix}_{counter:05}_" counter per output folder and prefix.
 
+    A folder is listed once, the first time it is saved to. Later lookups
+    only stat the folder: if its mtime moved because something else wrote
+    there (another process, a node that names files itself) it is listed
+    again; files created through `claim` update the index in place.
+    """
+    _counter_re = re.compile(r"_(\d+)(?=_|$)")
+
+    def __init__(self):
+        self._folders: dict[str, tuple[int, dict[str, int]]] = {}
+        self._lock = threading.Lock()
+
+    def _scan(self, folder: str) -> dict[str, int]:
+        counters: dict[str, int] = {}
+        for name in os.listdir(folder):
+            # Every "_<digits>_" may end a prefix, e.g. "img_2024_x_00001_.png"
+            # counts for both "img" and "img_2024_x"
+            for match in self._counter_re.finditer(name):
+                key = os.path.normcase(name[:match.start()])
+                counters[key] = max(counters.get(key, 0), int(match.group(1)))
+        return counters
+
+    def _entry(self, folder: str) -> tuple[int, dict[str, int]]:
+        key = os.path.normcase(os.path.abspath(folder))
+        mtime = os.stat(folder).st_mtime_ns
+        entry = self._folders.get(key)
+        if entry is None or entry[0] != mtime:
+            entry = (mtime, self._scan(folder))
+            self._folders[key] = entry
+        return entry
+
+    def next_counter(self, folder: str, prefix: str) -> int:
+        with self._lock:
+            return self._entry(folder)[1].get(os.path.normcase(prefix), 0) + 1
+
+    def claim(self, folder: str, prefix: str, counter: int, extension: str) -> tuple[str, int]:
+        """
+        Create "{prefix}_{counter:05}_.{extension}" exclusively, moving on to the
+        next counter while the name is taken (e.g. by another process).
+
+        Returns the file name and the counter it was created with.
+        """
+        with self._lock:
+            counters = self._entry(folder)[1]
+            while True:
+                file = f"{prefix}_{counter:05}_.{extension}"
+                try:
+                    os.close(os.open(os.path.join(folder, file), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666))
+                    break
+                except FileExistsError:
+                    counter += 1
+            key = os.path.normcase(prefix)
+            counters[key] = max(counters.get(key, 0), counter)
+            # Our create moved the folder's mtime; record it so the next lookup
+            # needs no listing. Only a foreign file created in the same instant
+            # goes unseen, and claims never overwrite whatever is on disk.
+            self._folders[os.path.normcase(os.path.abspath(folder))] = (os.stat(folder).st_mtime_ns, counters)
+            return file, counter
+
+    def clear(self):
+        with self._lock:
+            self._folders.clear()
+
+save_counters = SaveCounterIndex()
+
+def get_save_image_path(filename_prefix: str, output_dir: str, image_width=0, image_height=0) -> tuple[str, str, int, str, str]:
     def compute_vars(input: str, image_width: int, image_height: int) -> str:
         input = input.replace("%width%", str(image_width))
         input = input.replace("%height%", str(image_height))
@@ -464,14 +802,17 @@ def get_save_image_path(filename_prefix: str, output_dir: str, image_width=0, im
         raise Exception(err)
 
     try:
-        counter = max(filter(lambda a: os.path.normcase(a[1][:-1]) == os.path.normcase(filename) and a[1][-1] == "_", map(map_filename, os.listdir(full_output_folder))))[0] + 1
-    except ValueError:
-        counter = 1
+        counter = save_counters.next_counter(full_output_folder, filename)
     except FileNotFoundError:
         os.makedirs(full_output_folder, exist_ok=True)
         counter = 1
     return full_output_folder, filename, counter, subfolder, filename_prefix
 
+def claim_save_file(full_output_folder: str, filename: str, counter: int, extension: str) -> tuple[str, int]:
+    """Atomically create the first free "{filename}_{counter:05}_.{extension}" at or after
+    `counter` in a folder returned by get_save_image_path; returns (file, counter)."""
+    return save_counters.claim(full_output_folder, filename, counter, extension)
+
 def get_input_subfolders() -> list[str]:
     """Returns a list of all subfolder paths in the input directory, recursively.
 
@@ -74,6 +74,9 @@ def apply_custom_paths():
         logging.info(f"Setting user directory to: {user_dir}")
         folder_paths.set_user_directory(user_dir)
 
+    # Keep the model file index between runs so startup doesn't walk every model folder
+    folder_paths.model_index.load(os.path.join(folder_paths.get_system_user_directory("cache"), "model_index.json"))
+
 
 def execute_prestartup_script():
     if args.disable_all_custom_nodes and len(args.whitelist_custom_nodes) == 0:
@@ -318,11 +321,21 @@ def cleanup_temp():
         shutil.rmtree(temp_dir, ignore_errors=True)
 
 
-def setup_database():
+def setup_database(prompt_server=None):
     try:
-        from app.database.db import init_db, dependencies_available
+        from app.database.db import init_db, dependencies_available, can_create_session
         if dependencies_available():
             init_db()
+            if prompt_server is not None and can_create_session():
+                from app.history_store import HistoryStore
+                from app.model_catalog import ModelCatalog
+                import comfy.model_detection
+                prompt_server.prompt_queue.set_history_store(HistoryStore(max_items=execution.MAXIMUM_HISTORY_SIZE))
+
+                model_catalog = ModelCatalog()
+                prompt_server.model_file_manager.catalog = model_catalog
+                comfy.model_detection.set_detection_cache(model_catalog.detection)
+                model_catalog.build_in_background()
     except Exception as e:
         logging.error(f"Failed to initialize database. Please ensure you have installed the latest requirements. If the error persists, please report this as in future the database will be required: {e}")
 
@@ -361,7 +374,7 @@ def start_comfyui(asyncio_loop=None):
     hook_breaker_ac10a0.restore_functions()
 
     cuda_malloc_warning()
-    setup_database()
+    setup_database(prompt_server)
 
     prompt_server.add_routes()
     hijack_progress(prompt_server)
@@ -12,6 +12,8 @@ import math
 import time
 import random
 import logging
+import asyncio
+import concurrent.futures
 
 from PIL import Image, ImageOps, ImageSequence
 from PIL.PngImagePlugin import PngInfo
@@ -1571,6 +1573,26 @@ class KSamplerAdvanced:
             disable_noise = True
         return common_ksampler(model, noise_seed, steps, cfg, sampler_name, scheduler, positive, negative, latent_image, denoise=denoise, disable_noise=disable_noise, start_step=start_at_step, last_step=end_at_step, force_full_denoise=force_full_denoise)
 
+_image_save_pool = None
+
+def get_image_save_pool():
+    """Threads that compress and write saved images (zlib releases the GIL)."""
+    global _image_save_pool
+    if _image_save_pool is None:
+        _image_save_pool = concurrent.futures.ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="image_save")
+    return _image_save_pool
+
+def write_png(pixels, path, metadata, compress_level):
+    try:
+        Image.fromarray(pixels).save(path, pnginfo=metadata, compress_level=compress_level)
+    except Exception:
+        # Don't leave the claimed, empty file behind
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+
 class SaveImage:
     def __init__(self):
         self.output_dir = folder_paths.get_output_directory()
@@ -1591,39 +1613,55 @@ class SaveImage:
         }
 
     RETURN_TYPES = ()
-    FUNCTION = "save_images"
+    FUNCTION = "save_images_async"
 
     OUTPUT_NODE = True
 
     CATEGORY = "image"
     DESCRIPTION = "Saves the input images to your ComfyUI output directory."
 
-    def save_images(self, images, filename_prefix="ComfyUI", prompt=None, extra_pnginfo=None):
+    def queue_images(self, images, filename_prefix="ComfyUI", prompt=None, extra_pnginfo=None):
+        """Claim the output files and queue the PNG encodes; returns (ui results, pending writes)."""
         filename_prefix += self.prefix_append
         full_output_folder, filename, counter, subfolder, filename_prefix = folder_paths.get_save_image_path(filename_prefix, self.output_dir, images[0].shape[1], images[0].shape[0])
+        metadata = None
+        if not args.disable_metadata:
+            metadata = PngInfo()
+            if prompt is not None:
+                metadata.add_text("prompt", json.dumps(prompt))
+            if extra_pnginfo is not None:
+                for x in extra_pnginfo:
+                    metadata.add_text(x, json.dumps(extra_pnginfo[x]))
+
         results = list()
+        writes = list()
         for (batch_number, image) in enumerate(images):
-            i = 255. * image.cpu().numpy()
-            img = Image.fromarray(np.clip(i, 0, 255).astype(np.uint8))
-            metadata = None
-            if not args.disable_metadata:
-                metadata = PngInfo()
-                if prompt is not None:
-                    metadata.add_text("prompt", json.dumps(prompt))
-                if extra_pnginfo is not None:
-                    for x in extra_pnginfo:
-                        metadata.add_text(x, json.dumps(extra_pnginfo[x]))
-
+            pixels = np.clip(255. * image.cpu().numpy(), 0, 255).astype(np.uint8)
             filename_with_batch_num = filename.replace("%batch_num%", str(batch_number))
-            file = f"{filename_with_batch_num}_{counter:05}_.png"
-            img.save(os.path.join(full_output_folder, file), pnginfo=metadata, compress_level=self.compress_level)
+            file, counter = folder_paths.claim_save_file(full_output_folder, filename_with_batch_num, counter, "png")
+            writes.append(get_image_save_pool().submit(write_png, pixels, os.path.join(full_output_folder, file), metadata, self.compress_level))
             results.append({
                 "filename": file,
                 "subfolder": subfolder,
                 "type": self.type
             })
             counter += 1
+        return results, writes
+
+    def save_images(self, images, filename_prefix="ComfyUI", prompt=None, extra_pnginfo=None):
+        results, writes = self.queue_images(images, filename_prefix, prompt, extra_pnginfo)
+        for write in writes:
+            write.result()
+        return { "ui": { "images": results } }
 
+    async def save_images_async(self, images, filename_prefix="ComfyUI", prompt=None, extra_pnginfo=None, **kwargs):
+        # The executor runs other nodes while the PNGs are compressed and
+        # publishes the outputs once they are on disk
+        if type(self).save_images is not SaveImage.save_images:
+            # A subclass customising the synchronous entry point keeps working
+            return self.save_images(images, filename_prefix, prompt=prompt, extra_pnginfo=extra_pnginfo, **kwargs)
+        results, writes = self.queue_images(images, filename_prefix, prompt, extra_pnginfo)
+        await asyncio.gather(*(asyncio.wrap_future(write) for write in writes))
         return { "ui": { "images": results } }
 
 class PreviewImage(SaveImage):
@@ -36,6 +36,8 @@ from comfy_api.internal import _ComfyNodeInternal
 from app.user_manager import UserManager
 from app.model_manager import ModelFileManager
 from app.custom_node_manager import CustomNodeManager
+from app.preview_manager import PreviewManager
+from app.node_info_registry import NodeInfoRegistry
 from app.subgraph_manager import SubgraphManager
 from typing import Optional, Union
 from api_server.routes.internal.internal_routes import InternalRoutes
@@ -81,7 +83,7 @@ async def compress_body(request: web.Request, handler):
     response: web.Response = await handler(request)
     if not isinstance(response, web.Response):
         return response
-    if response.content_type not in ["application/json", "text/plain"]:
+    if response.content_type not in ["application/json", "text/plain"] or "Content-Encoding" in response.headers:
         return response
     if response.body and "gzip" in accept_encoding:
         response.enable_compression()
@@ -194,6 +196,7 @@ class PromptServer():
         self.user_manager = UserManager()
         self.model_file_manager = ModelFileManager()
         self.custom_node_manager = CustomNodeManager()
+        self.preview_manager = PreviewManager(max_bytes=int(args.view_cache_size * 1024 * 1024))
         self.subgraph_manager = SubgraphManager()
         self.internal_routes = InternalRoutes(self)
         self.supports = ["custom_nodes_from_web"]
@@ -493,62 +496,9 @@ class PromptServer():
                 file = os.path.join(output_dir, filename)
 
                 if os.path.isfile(file):
-                    if 'preview' in request.rel_url.query:
-                        with Image.open(file) as img:
-                            preview_info = request.rel_url.query['preview'].split(';')
-                            image_format = preview_info[0]
-                            if image_format not in ['webp', 'jpeg'] or 'a' in request.rel_url.query.get('channel', ''):
-                                image_format = 'webp'
-
-                            quality = 90
-                            if preview_info[-1].isdigit():
-                                quality = int(preview_info[-1])
-
-                            buffer = BytesIO()
-                            if image_format in ['jpeg'] or request.rel_url.query.get('channel', '') == 'rgb':
-                                img = img.convert("RGB")
-                            img.save(buffer, format=image_format, quality=quality)
-                            buffer.seek(0)
-
-                            return web.Response(body=buffer.read(), content_type=f'image/{image_format}',
-                                                headers={"Content-Disposition": f"filename=\"{filename}\""})
-
-                    if 'channel' not in request.rel_url.query:
-                        channel = 'rgba'
-                    else:
-                        channel = request.rel_url.query["channel"]
-
-                    if channel == 'rgb':
-                        with Image.open(file) as img:
-                            if img.mode == "RGBA":
-                                r, g, b, a = img.split()
-                                new_img = Image.merge('RGB', (r, g, b))
-                            else:
-                                new_img = img.convert("RGB")
-
-                            buffer = BytesIO()
-                            new_img.save(buffer, format='PNG')
-                            buffer.seek(0)
-
-                            return web.Response(body=buffer.read(), content_type='image/png',
-                                                headers={"Content-Disposition": f"filename=\"{filename}\""})
-
-                    elif channel == 'a':
-                        with Image.open(file) as img:
-                            if img.mode == "RGBA":
-                                _, _, _, a = img.split()
-                            else:
-                                a = Image.new('L', img.size, 255)
-
-                            # alpha img
-                            alpha_img = Image.new('RGBA', img.size)
-                            alpha_img.putalpha(a)
-                            alpha_buffer = BytesIO()
-                            alpha_img.save(alpha_buffer, format='PNG')
-                            alpha_buffer.seek(0)
-
-                            return web.Response(body=alpha_buffer.read(), content_type='image/png',
-                                                headers={"Content-Disposition": f"filename=\"{filename}\""})
+                    variant = self.preview_manager.variant(request.rel_url.query)
+                    if variant is not None:
+                        return await self.preview_manager.response(file, filename, variant, request.headers.get("If-None-Match"))
                     else:
                         # Get content type from mimetype, defaulting to 'application/octet-stream'
                         content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
@@ -674,17 +624,11 @@ class PromptServer():
                 info['api_node'] = obj_class.API_NODE
             return info
 
+        self.node_info_registry = NodeInfoRegistry(node_info)
+
         @routes.get("/object_info")
         async def get_object_info(request):
-            with folder_paths.cache_helper:
-                out = {}
-                for x in nodes.NODE_CLASS_MAPPINGS:
-                    try:
-                        out[x] = node_info(x)
-                    except Exception:
-                        logging.error(f"[ERROR] An error occurred while retrieving information for the '{x}' node.")
-                        logging.error(traceback.format_exc())
-                return web.json_response(out)
+            return await self.node_info_registry.response(request)
 
         @routes.get("/object_info/{node_class}")
         async def get_object_info_node(request):
@@ -706,12 +650,18 @@ class PromptServer():
             else:
                 offset = -1
 
-            return web.json_response(self.prompt_queue.get_history(max_items=max_items, offset=offset))
+            # Keyset pagination: ?before=<prompt_id> returns the max_items entries preceding it
+            before = request.rel_url.query.get("before", None)
+            status = request.rel_url.query.get("status", None)
+            filename = request.rel_url.query.get("filename", None)
+
+            history = await asyncio.to_thread(self.prompt_queue.get_history, max_items=max_items, offset=offset, before=before, status=status, filename=filename)
+            return web.json_response(history)
 
         @routes.get("/history/{prompt_id}")
         async def get_history_prompt_id(request):
             prompt_id = request.match_info.get("prompt_id", None)
-            return web.json_response(self.prompt_queue.get_history(prompt_id=prompt_id))
+            return web.json_response(await asyncio.to_thread(self.prompt_queue.get_history, prompt_id=prompt_id))
 
         @routes.get("/queue")
         async def get_queue(request):
@@ -837,11 +787,11 @@ class PromptServer():
             json_data =  await request.json()
             if "clear" in json_data:
                 if json_data["clear"]:
-                    self.prompt_queue.wipe_history()
+                    await asyncio.to_thread(self.prompt_queue.wipe_history)
             if "delete" in json_data:
                 to_delete = json_data['delete']
                 for id_to_delete in to_delete:
-                    self.prompt_queue.delete_history_item(id_to_delete)
+                    await asyncio.to_thread(self.prompt_queue.delete_history_item, id_to_delete)
 
             return web.Response(status=200)
 
@@ -854,6 +804,7 @@ class PromptServer():
         self.model_file_manager.add_routes(self.routes)
         self.custom_node_manager.add_routes(self.routes, self.app, nodes.LOADED_MODULE_DIRS.items())
         self.subgraph_manager.add_routes(self.routes, nodes.LOADED_MODULE_DIRS.items())
+        self.node_info_registry.build_in_background()
         self.app.add_subapp('/internal', self.internal_routes.get_app())
 
         # Prefix every route with /api for easier matching for delegation.
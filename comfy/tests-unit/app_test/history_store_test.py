@@ -0,0 +1,105 @@
+import pytest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.models import Base
+from app.history_store import HistoryStore
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'comfyui.db'}")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def entry(prompt_id, status="success", filename=None):
+    outputs = {}
+    if filename is not None:
+        outputs["9"] = {"images": [{"filename": filename, "subfolder": "", "type": "output"}]}
+    return {
+        "prompt": (0, prompt_id, {}, {"create_time": 1000}, ["9"]),
+        "outputs": outputs,
+        "status": {"status_str": status, "completed": status == "success", "messages": []},
+        "meta": {},
+    }
+
+
+def test_entries_survive_restart(session_factory):
+    store = HistoryStore(session_factory)
+    store.put("a", entry("a", filename="ComfyUI_00001_.png"))
+    assert store.get("a")["outputs"]["9"]["images"][0]["filename"] == "ComfyUI_00001_.png"
+    store.flush()
+
+    reopened = HistoryStore(session_factory)
+    assert reopened.get("a")["status"]["status_str"] == "success"
+    assert reopened.get("missing") is None
+
+
+def test_keyset_pagination_and_filters(session_factory):
+    store = HistoryStore(session_factory)
+    for i in range(5):
+        store.put(f"p{i}", entry(f"p{i}", status="error" if i == 3 else "success", filename=f"img_{i}.png"))
+
+    assert list(store.list()) == ["p0", "p1", "p2", "p3", "p4"]
+    assert list(store.list(max_items=2)) == ["p3", "p4"]
+    assert list(store.list(max_items=2, before="p3")) == ["p1", "p2"]
+    assert list(store.list(max_items=2, offset=1)) == ["p1", "p2"]
+    assert list(store.list(status="error")) == ["p3"]
+    assert list(store.list(filename="img_2.png")) == ["p2"]
+
+
+def test_delete_clear_and_prune(session_factory):
+    store = HistoryStore(session_factory, max_items=3)
+    for i in range(5):
+        store.put(f"p{i}", entry(f"p{i}"))
+    store.flush()  # Pruning happens as entries are written
+    assert list(store.list()) == ["p2", "p3", "p4"]
+
+    store.delete("p3")
+    assert store.get("p3") is None
+    assert list(store.list()) == ["p2", "p4"]
+
+    store.clear()
+    assert store.list() == {}
+
+
+def test_unserializable_entry_is_kept_in_memory(session_factory):
+    store = HistoryStore(session_factory)
+    bad = entry("p1", filename="img_1.png")
+    bad["meta"] = {"9": {"node": object()}}
+    store.put("p0", entry("p0"))
+    store.put("p1", bad)
+    store.put("p2", entry("p2"))
+    store.flush()
+
+    assert list(store.list()) == ["p0", "p2", "p1"]
+    assert list(store.list(max_items=1)) == ["p1"]
+    assert list(store.list(max_items=1, before="p1")) == ["p2"]
+    assert list(store.list(offset=2)) == ["p1"]
+    assert list(store.list(filename="img_1.png")) == ["p1"]
+    assert store.get("p1") is not None
+
+    assert list(HistoryStore(session_factory).list()) == ["p0", "p2"]
+
+
+def test_list_does_not_wait_for_the_writer(session_factory):
+    store = HistoryStore(session_factory)
+    store.put("p0", entry("p0"))
+    store.flush()
+
+    release = threading.Event()
+    write = store.write
+    store.write = lambda batch: release.wait() and write(batch)
+    store.put("p1", entry("p1"))
+    store.put("p2", entry("p2"))
+    with ThreadPoolExecutor(1) as executor:
+        assert list(executor.submit(store.list).result(timeout=5)) == ["p0", "p1", "p2"]
+        assert list(executor.submit(store.list, max_items=1, before="p2").result(timeout=5)) == ["p1"]
+
+    release.set()
+    store.flush()
+    assert store.pending == {}
+    assert list(store.list()) == ["p0", "p1", "p2"]
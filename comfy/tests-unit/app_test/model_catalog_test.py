@@ -0,0 +1,71 @@
+import pytest
+import os
+import json
+import struct
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.models import Base
+from app.model_catalog import ModelCatalog, decode_config, encode_config
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'comfyui.db'}")
+    Base.metadata.create_all(engine)
+    return ModelCatalog(sessionmaker(bind=engine))
+
+
+def write_safetensors(path, tensors, metadata=None):
+    header = {key: {"dtype": dtype, "shape": shape, "data_offsets": [0, 0]} for key, (dtype, shape) in tensors.items()}
+    if metadata is not None:
+        header["__metadata__"] = metadata
+    header_bytes = json.dumps(header).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+
+
+def test_header_is_cataloged_once(catalog, tmp_path):
+    model = tmp_path / "model.safetensors"
+    write_safetensors(model, {"lora_unet_down.weight": ["F16", [4, 8]]}, {"ssmd_cover_images": json.dumps(["aW1n"]), "title": "x"})
+
+    record = catalog.lookup(str(model))
+    assert json.loads(record["tensors"]) == {"lora_unet_down.weight": ["F16", [4, 8]]}
+    assert json.loads(record["safetensors_metadata"]) == {"title": "x"}
+    assert record["model_type"] == "lora"
+
+    with patch("app.model_catalog.comfy.utils.safetensors_header", side_effect=AssertionError("header read again")):
+        assert catalog.cover_images(str(model)) == ["aW1n"]
+
+
+def test_record_invalidated_by_size_and_mtime(catalog, tmp_path):
+    model = tmp_path / "model.safetensors"
+    write_safetensors(model, {"a": ["F32", [1]]})
+    catalog.lookup(str(model))
+    assert catalog.get(str(model)) is not None
+
+    write_safetensors(model, {"a": ["F32", [1]], "b": ["F32", [2]]})
+    os.utime(model, ns=(0, os.stat(model).st_mtime_ns + 10**9))
+    assert catalog.get(str(model)) is None
+    assert "b" in json.loads(catalog.lookup(str(model))["tensors"])
+
+
+def test_build_finds_duplicates(catalog, tmp_path):
+    for name in ["a.safetensors", "b.safetensors", "c.safetensors"]:
+        write_safetensors(tmp_path / name, {"w": ["F16", [2]]} if name != "c.safetensors" else {"w": ["F16", [3]]})
+
+    with patch.dict("folder_paths.folder_names_and_paths", {"checkpoints": ([str(tmp_path)], {".safetensors"})}):
+        assert catalog.build() == 3
+        assert catalog.build() == 0
+
+    duplicates = catalog.duplicates()
+    assert len(duplicates) == 1
+    assert [os.path.basename(path) for path in duplicates[0]["paths"]] == ["a.safetensors", "b.safetensors"]
+
+
+def test_unet_config_round_trip():
+    import torch
+    config = {"image_model": "flux", "depth": (2, 4), "channel_mult": [1, 2], "dtype": torch.bfloat16, "attn": None}
+    assert decode_config(json.loads(json.dumps(encode_config(config)))) == config
@@ -0,0 +1,96 @@
+import pytest
+import os
+import gzip
+import json
+from unittest.mock import patch
+from aiohttp.test_utils import make_mocked_request
+
+import folder_paths
+from app.node_info_registry import NodeInfoRegistry
+
+
+class CheckpointLoader:
+    @classmethod
+    def INPUT_TYPES(s):
+        return {"required": {"ckpt_name": (folder_paths.get_filename_list("checkpoints"),)}}
+
+
+class StaticNode:
+    @classmethod
+    def INPUT_TYPES(s):
+        return {"required": {"value": ("INT",)}}
+
+
+@pytest.fixture
+def models_dir(tmp_path):
+    (tmp_path / "a.safetensors").touch()
+    with patch.dict(folder_paths.folder_names_and_paths, {"checkpoints": ([str(tmp_path)], {".safetensors"})}):
+        yield tmp_path
+
+
+@pytest.fixture
+def registry(models_dir):
+    mappings = {"CheckpointLoader": CheckpointLoader, "StaticNode": StaticNode}
+    built = []
+
+    def node_info(name):
+        built.append(name)
+        return {"name": name, "input": mappings[name].INPUT_TYPES()}
+
+    registry = NodeInfoRegistry(node_info, mappings=lambda: mappings)
+    registry.built = built
+    registry.node_mappings = mappings
+    return registry
+
+
+def touch_dir(path):
+    mtime = os.stat(path).st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_builds_once(registry):
+    assert registry.refresh()
+    assert sorted(registry.built) == ["CheckpointLoader", "StaticNode"]
+    assert registry.dependencies["CheckpointLoader"] == {"checkpoints"}
+    assert registry.dependencies["StaticNode"] == set()
+
+    assert not registry.refresh()
+    assert len(registry.built) == 2
+
+
+def test_model_folder_change_rebuilds_dependents_only(registry, models_dir):
+    registry.refresh()
+    etag = registry.snapshot[2]
+    (models_dir / "b.safetensors").touch()
+    touch_dir(models_dir)
+
+    assert registry.refresh()
+    assert registry.built[2:] == ["CheckpointLoader"]
+    info = json.loads(registry.snapshot[0])
+    assert info["CheckpointLoader"]["input"]["required"]["ckpt_name"][0] == ["a.safetensors", "b.safetensors"]
+    assert registry.snapshot[2] != etag
+
+
+def test_node_classes_added_and_removed(registry):
+    registry.refresh()
+
+    class NewNode(StaticNode):
+        pass
+
+    registry.node_mappings["NewNode"] = NewNode
+    del registry.node_mappings["StaticNode"]
+    assert registry.refresh()
+    assert registry.built[2:] == ["NewNode"]
+    assert list(json.loads(registry.snapshot[0])) == ["CheckpointLoader", "NewNode"]
+
+
+@pytest.mark.asyncio
+async def test_response_etag_and_gzip(registry):
+    response = await registry.response(make_mocked_request("GET", "/object_info", headers={"Accept-Encoding": "gzip, br"}))
+    assert response.status == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.body))["StaticNode"]["name"] == "StaticNode"
+
+    etag = response.headers["ETag"]
+    response = await registry.response(make_mocked_request("GET", "/object_info", headers={"If-None-Match": etag}))
+    assert response.status == 304
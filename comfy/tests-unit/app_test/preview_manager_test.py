@@ -0,0 +1,79 @@
+import pytest
+import os
+from io import BytesIO
+from PIL import Image
+from aiohttp import web
+from unittest.mock import patch
+from app.preview_manager import PreviewManager
+
+pytestmark = (
+    pytest.mark.asyncio
+)  # This applies the asyncio mark to all test functions in the module
+
+@pytest.fixture
+def preview_manager(tmp_path):
+    return PreviewManager(cache_dir=str(tmp_path / "cache"), max_bytes=1024 * 1024)
+
+@pytest.fixture
+def app(preview_manager, tmp_path):
+    app = web.Application()
+    routes = web.RouteTableDef()
+
+    @routes.get("/view")
+    async def view(request):
+        filename = request.rel_url.query["filename"]
+        file = os.path.join(tmp_path, filename)
+        variant = preview_manager.variant(request.rel_url.query)
+        return await preview_manager.response(file, filename, variant, request.headers.get("If-None-Match"))
+
+    app.add_routes(routes)
+    return app
+
+@pytest.fixture
+def image_file(tmp_path):
+    Image.new('RGBA', (400, 200), (255, 0, 0, 128)).save(tmp_path / "image.png")
+    return tmp_path / "image.png"
+
+def test_variant_parsing():
+    assert PreviewManager.variant({}) is None
+    assert PreviewManager.variant({"channel": "rgba"}) is None
+    assert PreviewManager.variant({"preview": "webp;50"}) == ("webp", 50, "rgba", 0)
+    assert PreviewManager.variant({"preview": "jpeg", "channel": "a"}) == ("webp", 90, "rgba", 0)
+    assert PreviewManager.variant({"channel": "rgb"}) == ("png", 0, "rgb", 0)
+    assert PreviewManager.variant({"max_size": "128"}) == ("png", 0, "rgba", 128)
+
+async def test_thumbnail_is_cached_and_revalidated(aiohttp_client, app, image_file, preview_manager):
+    client = await aiohttp_client(app)
+    response = await client.get('/view?filename=image.png&preview=webp;80&max_size=100')
+    assert response.status == 200
+    assert response.content_type == 'image/webp'
+    etag = response.headers["ETag"]
+    assert Image.open(BytesIO(await response.read())).size == (100, 50)
+
+    # Served from the disk cache without decoding the source again
+    with patch('app.preview_manager.Image.open', side_effect=AssertionError("transcoded twice")):
+        response = await client.get('/view?filename=image.png&preview=webp;80&max_size=100')
+        assert response.status == 200
+        assert response.headers["ETag"] == etag
+
+        response = await client.get('/view?filename=image.png&preview=webp;80&max_size=100', headers={"If-None-Match": etag})
+        assert response.status == 304
+
+async def test_changed_source_gets_new_etag(aiohttp_client, app, image_file):
+    client = await aiohttp_client(app)
+    first = await client.get('/view?filename=image.png&channel=rgb')
+    Image.new('RGB', (10, 10), 'blue').save(image_file)
+    os.utime(image_file, ns=(0, os.stat(image_file).st_mtime_ns + 10**9))
+    second = await client.get('/view?filename=image.png&channel=rgb')
+    assert first.headers["ETag"] != second.headers["ETag"]
+    assert Image.open(BytesIO(await second.read())).size == (10, 10)
+
+def test_cache_is_size_bounded(tmp_path):
+    manager = PreviewManager(cache_dir=str(tmp_path), max_bytes=250)
+    manager.load_index()
+    for name in ["a", "b", "c"]:
+        path = tmp_path / name
+        path.write_bytes(b"x" * 100)
+        manager.add(str(path), 100)
+    assert sorted(os.listdir(tmp_path)) == ["b", "c"]
+    assert manager.total_bytes == 200
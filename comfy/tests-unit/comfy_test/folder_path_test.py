@@ -116,6 +116,77 @@ def test_get_save_image_path(temp_dir):
         assert filename_prefix == "test"
 
 
+def test_save_counter_index_lists_folder_once(temp_dir):
+    folder_paths.save_counters.clear()
+    for name in ["test_00005_.png", "test_00003_.webp", "other_00009_.png", "notes.txt"]:
+        open(os.path.join(temp_dir, name), "w").close()
+
+    with patch("folder_paths.os.listdir", wraps=os.listdir) as listdir:
+        _, filename, counter, _, _ = folder_paths.get_save_image_path("test", temp_dir)
+        assert counter == 6
+        for expected in (6, 7, 8):
+            file, counter = folder_paths.claim_save_file(temp_dir, filename, counter, "png")
+            assert (file, counter) == (f"test_{expected:05}_.png", expected)
+            counter = folder_paths.get_save_image_path("test", temp_dir)[2]
+        assert counter == 9
+        assert folder_paths.get_save_image_path("other", temp_dir)[2] == 10
+        assert listdir.call_count == 1
+
+
+def test_save_counter_index_sees_foreign_files(temp_dir):
+    folder_paths.save_counters.clear()
+    assert folder_paths.get_save_image_path("test", temp_dir)[2] == 1
+
+    # Written by another process: claims skip it, lookups rescan once the folder changed
+    open(os.path.join(temp_dir, "test_00001_.png"), "w").close()
+    assert folder_paths.claim_save_file(temp_dir, "test", 1, "png") == ("test_00002_.png", 2)
+    open(os.path.join(temp_dir, "test_00040_.png"), "w").close()
+    mtime = os.stat(temp_dir).st_mtime_ns + 1_000_000_000
+    os.utime(temp_dir, ns=(mtime, mtime))
+    assert folder_paths.get_save_image_path("test", temp_dir)[2] == 41
+
+def touch_dir(path):
+    mtime = os.stat(path).st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+@pytest.mark.parametrize("polling", [False, True])
+def test_model_index_updates_incrementally(temp_dir, polling):
+    os.makedirs(os.path.join(temp_dir, "sub"))
+    open(os.path.join(temp_dir, "a.safetensors"), "w").close()
+    index = folder_paths.ModelFileIndex(polling=polling)
+
+    with patch("folder_paths.recursive_search", wraps=folder_paths.recursive_search) as walk:
+        assert sorted(index.list_files(temp_dir)[1]) == ["a.safetensors"]
+        generation = index.generation(temp_dir)
+
+        with open(os.path.join(temp_dir, "sub", "b.safetensors"), "w") as f:
+            f.write("x" * 10)
+        os.remove(os.path.join(temp_dir, "a.safetensors"))
+        touch_dir(temp_dir)
+        touch_dir(os.path.join(temp_dir, "sub"))
+
+        assert index.generation(temp_dir) != generation
+        assert index.list_files(temp_dir)[1] == [os.path.join("sub", "b.safetensors")]
+        assert index.file_info(temp_dir)[os.path.join("sub", "b.safetensors")][0] == 10
+        assert walk.call_count == 1
+    index.clear()
+
+def test_model_index_persists(temp_dir):
+    models = os.path.join(temp_dir, "models")
+    os.makedirs(os.path.join(models, "sub"))
+    open(os.path.join(models, "sub", "a.safetensors"), "w").close()
+    index = folder_paths.ModelFileIndex(polling=True)
+    index.load(os.path.join(temp_dir, "model_index.json"))
+    index.file_info(models)
+    index.save()
+
+    reloaded = folder_paths.ModelFileIndex(polling=True)
+    reloaded.load(os.path.join(temp_dir, "model_index.json"))
+    with patch("folder_paths.recursive_search", side_effect=AssertionError("walked again")), \
+         patch("folder_paths.os.stat", wraps=os.stat) as stat:
+        assert list(reloaded.file_info(models)) == [os.path.join("sub", "a.safetensors")]
+        assert stat.call_count == 2  # the two directories' mtimes, no files
+
 def test_base_path_changes(set_base_dir):
     test_dir = os.path.abspath("/test/dir")
     set_base_dir(test_dir)
@@ -8,6 +8,8 @@ class VoiceAgentApp {
         // WebSocket
         this.ws = null;
         this.wsUrl = `ws://${window.location.host}/ws`;
+        // Resume token from the server; reconnecting with it keeps the conversation
+        this.sessionToken = sessionStorage.getItem('sessionToken');
         
         // Audio handler
         this.audioHandler = new AudioHandler();
@@ -410,7 +412,10 @@ class VoiceAgentApp {
     connect() {
         this.updateStatus('connecting', 'Connecting...');
         
-        this.ws = new WebSocket(this.wsUrl);
+        const url = this.sessionToken
+            ? `${this.wsUrl}?resume=${encodeURIComponent(this.sessionToken)}`
+            : this.wsUrl;
+        this.ws = new WebSocket(url);
         
         this.ws.onopen = () => {
             this.isConnected = true;
@@ -475,6 +480,15 @@ class VoiceAgentApp {
                     this.hideToolIndicator();
                     break;
                     
+                case 'session':
+                    this.sessionToken = message.token;
+                    sessionStorage.setItem('sessionToken', message.token);
+                    break;
+                    
+                case 'image_progress':
+                    this.showToolIndicator(`generate_image ${message.value}/${message.max}`);
+                    break;
+                    
                 case 'flyout':
                     this.showInFlyout(message.flyout_type, message.content);
                     break;
@@ -25,6 +25,8 @@ class VoiceAgentApp {
         // WebSocket
         this.ws = null;
         this.wsUrl = `ws://${window.location.host}/ws`;
+        // Resume token from the server; reconnecting with it keeps the conversation
+        this.sessionToken = sessionStorage.getItem('sessionToken');
         this.reconnectAttempts = 0;
         this.maxReconnectAttempts = 10;
         this.reconnectDelay = 1000;
@@ -622,7 +624,10 @@ class VoiceAgentApp {
         this.updateStatus('connecting', 'Connecting...');
         
         try {
-            this.ws = new WebSocket(this.wsUrl);
+            const url = this.sessionToken
+                ? `${this.wsUrl}?resume=${encodeURIComponent(this.sessionToken)}`
+                : this.wsUrl;
+            this.ws = new WebSocket(url);
             this.ws.binaryType = 'arraybuffer';  // Ensure binary data is sent/received as ArrayBuffer
             
             this.ws.onopen = () => {
@@ -723,6 +728,13 @@ class VoiceAgentApp {
                     // Handle music state updates from server
                     updateMusicState(message);
                     break;
+                case 'session':
+                    this.sessionToken = message.token;
+                    sessionStorage.setItem('sessionToken', message.token);
+                    break;
+                case 'image_progress':
+                    this.showToolIndicator(`generate_image ${message.value}/${message.max}`);
+                    break;
                 case 'flyout':
                     this.showInFlyout(message.flyout_type, message.content);
                     break;
@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+"""
+Multi-client WebSocket load generator for the Voice Agent server.
+
+Opens N simulated clients against /ws, each streaming real-time-paced
+microphone audio with the same 1-byte TTS flag header the browser uses,
+mixing spoken turns, typed `text_message` turns and barge-ins. Ramps the
+session count through the requested levels and reports the maximum number
+of concurrent sessions that still meet the latency SLO.
+
+Usage:
+    python loadtest.py --sessions 1,2,4,8,16 --duration 60 --slo-ms 2000 \\
+        --audio samples/utterance.wav --server-pid $(pgrep -f server.main)
+
+A real 16 kHz mono PCM16 WAV recording is strongly recommended for --audio;
+the synthetic fallback signal may not be classified as speech by Silero.
+"""
+import argparse
+import asyncio
+import base64
+import io
+import json
+import math
+import random
+import struct
+import time
+import wave
+from dataclasses import dataclass, field
+from typing import Optional
+
+import httpx
+import numpy as np
+import websockets
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2
+
+TEXT_PROMPTS = [
+    "What time is it?",
+    "What's the date today?",
+    "Tell me a joke.",
+    "What day of the week is January first?",
+    "How much memory does this computer have?",
+]
+
+
+# ----------------------------------------------------------------------------
+# Audio helpers
+# ----------------------------------------------------------------------------
+
+def load_utterance(path: Optional[str]) -> bytes:
+    """Load a 16 kHz mono PCM16 WAV file, or synthesize a voice-like signal."""
+    if path:
+        with wave.open(path, "rb") as wav:
+            if wav.getframerate() != SAMPLE_RATE or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+                raise SystemExit(f"{path}: expected 16 kHz mono 16-bit PCM WAV")
+            return wav.readframes(wav.getnframes())
+
+    # 1.5 s of a harmonic, syllable-modulated tone
+    t = np.arange(int(1.5 * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 140 + 20 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2
+    signal = 0.25 * voiced * envelope
+    return (np.clip(signal, -1, 1) * 32767).astype(np.int16).tobytes()
+
+
+def silence(frame_bytes: int) -> bytes:
+    """Low-level noise floor rather than digital zeros."""
+    noise = np.random.normal(0, 30, frame_bytes // BYTES_PER_SAMPLE)
+    return noise.astype(np.int16).tobytes()
+
+
+def wav_duration(data: bytes) -> float:
+    """Duration in seconds of a WAV payload (0 if it cannot be parsed)."""
+    try:
+        with wave.open(io.BytesIO(data), "rb") as wav:
+            return wav.getnframes() / float(wav.getframerate())
+    except (wave.Error, EOFError, struct.error):
+        return len(data) / (SAMPLE_RATE * BYTES_PER_SAMPLE)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile; NaN for an empty list."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+# ----------------------------------------------------------------------------
+# Per-session statistics
+# ----------------------------------------------------------------------------
+
+@dataclass
+class TurnRecord:
+    """Timing of one user turn, relative to the moment the user finished."""
+    kind: str                      # "voice" or "text"
+    started: float
+    first_response_ms: Optional[float] = None
+    first_audio_ms: Optional[float] = None
+    completed: bool = False
+
+
+@dataclass
+class SessionStats:
+    """Everything one simulated client observed."""
+    turns: list[TurnRecord] = field(default_factory=list)
+    barge_in_ms: list[float] = field(default_factory=list)
+    barge_ins_missed: int = 0
+    dropped_turns: int = 0
+    misordered: int = 0
+    errors: int = 0
+    messages: int = 0
+    connect_failed: bool = False
+
+
+class SimulatedClient:
+    """One browser-like client: mic stream + control messages."""
+
+    def __init__(
+        self,
+        index: int,
+        url: str,
+        utterance: bytes,
+        frame_ms: int,
+        text_ratio: float,
+        barge_in_ratio: float,
+        turn_timeout: float,
+    ):
+        self.index = index
+        self.url = url
+        self.utterance = utterance
+        self.frame_bytes = int(SAMPLE_RATE * frame_ms / 1000) * BYTES_PER_SAMPLE
+        self.frame_s = frame_ms / 1000.0
+        self.text_ratio = text_ratio
+        self.barge_in_ratio = barge_in_ratio
+        self.turn_timeout = turn_timeout
+        self.stats = SessionStats()
+
+        self._ws = None
+        self._state = "idle"
+        self._playing_until = 0.0
+        self._turn: Optional[TurnRecord] = None
+        self._turn_done = asyncio.Event()
+        self._last_chunk = ""
+        self._barge_in_sent: Optional[float] = None
+
+    async def run(self, stop_at: float) -> SessionStats:
+        try:
+            self._ws = await websockets.connect(self.url, max_size=None, open_timeout=10)
+        except Exception:
+            self.stats.connect_failed = True
+            return self.stats
+
+        receiver = asyncio.create_task(self._receive())
+        try:
+            await self._send_json({"type": "start_listening"})
+            # Stagger sessions so frames do not arrive in lock-step
+            await asyncio.sleep(random.uniform(0, 1.0))
+            while time.monotonic() < stop_at:
+                if random.random() < self.text_ratio:
+                    await self._text_turn()
+                else:
+                    await self._voice_turn()
+                await self._wait_for_turn(stop_at)
+                await self._stream_silence(random.uniform(0.5, 1.5))
+        except websockets.ConnectionClosed:
+            self.stats.errors += 1
+        finally:
+            receiver.cancel()
+            await self._ws.close()
+        return self.stats
+
+    # -- sending --------------------------------------------------------------
+
+    async def _send_json(self, data: dict) -> None:
+        await self._ws.send(json.dumps(data))
+
+    async def _send_frame(self, pcm: bytes) -> None:
+        """Send one mic frame with the TTS-playing flag, paced in real time."""
+        flag = 1 if time.monotonic() < self._playing_until else 0
+        await self._ws.send(bytes([flag]) + pcm)
+
+    async def _stream(self, pcm: bytes) -> None:
+        next_at = time.monotonic()
+        for offset in range(0, len(pcm), self.frame_bytes):
+            await self._send_frame(pcm[offset:offset + self.frame_bytes])
+            next_at += self.frame_s
+            await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+
+    async def _stream_silence(self, seconds: float) -> None:
+        frames = max(1, int(seconds / self.frame_s))
+        await self._stream(b"".join(silence(self.frame_bytes) for _ in range(frames)))
+
+    async def _voice_turn(self) -> None:
+        await self._stream(self.utterance)
+        self._begin_turn("voice")
+        # Keep the mic open: trailing silence lets the server's VAD endpoint
+        await self._stream_silence(1.0)
+
+    async def _text_turn(self) -> None:
+        self._begin_turn("text")
+        await self._send_json({"type": "text_message", "text": random.choice(TEXT_PROMPTS)})
+
+    def _begin_turn(self, kind: str) -> None:
+        self._turn = TurnRecord(kind=kind, started=time.monotonic())
+        self.stats.turns.append(self._turn)
+        self._turn_done.clear()
+        self._last_chunk = ""
+
+    async def _wait_for_turn(self, stop_at: float) -> None:
+        """Keep streaming mic audio until the turn finishes or times out."""
+        deadline = min(stop_at, self._turn.started + self.turn_timeout)
+        barged = False
+        while not self._turn_done.is_set() and time.monotonic() < deadline:
+            playing = time.monotonic() < self._playing_until
+            if playing and not barged and random.random() < self.barge_in_ratio:
+                barged = True
+                self._barge_in_sent = time.monotonic()
+                await self._stream(self.utterance[: self.frame_bytes * 4])
+                continue
+            await self._stream_silence(self.frame_s)
+
+        if not self._turn_done.is_set() and time.monotonic() >= self._turn.started + self.turn_timeout:
+            self.stats.dropped_turns += 1
+        if self._barge_in_sent is not None:
+            self.stats.barge_ins_missed += 1
+            self._barge_in_sent = None
+
+    # -- receiving ------------------------------------------------------------
+
+    async def _receive(self) -> None:
+        try:
+            async for raw in self._ws:
+                if isinstance(raw, bytes):
+                    continue
+                self.stats.messages += 1
+                self._handle(json.loads(raw))
+        except (websockets.ConnectionClosed, asyncio.CancelledError):
+            pass
+
+    def _elapsed_ms(self) -> float:
+        return (time.monotonic() - self._turn.started) * 1000.0
+
+    def _handle(self, msg: dict) -> None:
+        msg_type = msg.get("type")
+        turn = self._turn
+
+        if msg_type == "state":
+            new_state = msg.get("state")
+            if new_state == "interrupted" and self._barge_in_sent is not None:
+                self.stats.barge_in_ms.append((time.monotonic() - self._barge_in_sent) * 1000.0)
+                self._barge_in_sent = None
+                self._playing_until = 0.0
+                self._finish_turn()
+            elif new_state == "listening" and self._state == "processing" and turn and not turn.first_response_ms:
+                # Empty transcript or LLM error: the turn ended without a reply
+                self._finish_turn()
+            self._state = new_state
+
+        elif msg_type == "response_chunk" and turn:
+            text = msg.get("text", "")
+            # Chunks carry the accumulated response, so each must extend the last
+            if not text.startswith(self._last_chunk):
+                self.stats.misordered += 1
+            self._last_chunk = text
+            if turn.first_response_ms is None:
+                turn.first_response_ms = self._elapsed_ms()
+
+        elif msg_type == "response" and turn:
+            if turn.first_response_ms is None:
+                turn.first_response_ms = self._elapsed_ms()
+
+        elif msg_type == "audio" and turn:
+            if turn.first_audio_ms is None:
+                turn.first_audio_ms = self._elapsed_ms()
+            duration = wav_duration(base64.b64decode(msg.get("data", "")))
+            self._playing_until = max(self._playing_until, time.monotonic()) + duration
+            asyncio.get_running_loop().call_later(duration, self._playback_done)
+
+        elif msg_type == "error":
+            self.stats.errors += 1
+            self._finish_turn()
+
+    def _playback_done(self) -> None:
+        if time.monotonic() < self._playing_until - 0.01:
+            return
+        self._finish_turn()
+        if self._ws is not None and self._state == "speaking":
+            asyncio.create_task(self._send_json({"type": "playback_done"}))
+
+    def _finish_turn(self) -> None:
+        if self._turn is not None and not self._turn.completed:
+            self._turn.completed = True
+            self._turn_done.set()
+
+
+# ----------------------------------------------------------------------------
+# Monitors
+# ----------------------------------------------------------------------------
+
+class LoopLagMonitor:
+    """Measures scheduling delay of this (client) event loop."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.samples: list[float] = []
+
+    async def run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval) * 1000.0)
+
+
+class ServerMonitor:
+    """Samples server responsiveness (/health RTT) and process CPU/RSS."""
+
+    def __init__(self, base_url: str, pid: Optional[int], interval: float = 1.0):
+        self.base_url = base_url
+        self.interval = interval
+        self.health_rtt_ms: list[float] = []
+        self.cpu_percent: list[float] = []
+        self.rss_mb: list[float] = []
+        self._process = None
+        if pid:
+            import psutil
+            self._process = psutil.Process(pid)
+
+    def _sample_process(self) -> None:
+        procs = [self._process] + self._process.children(recursive=True)
+        cpu = rss = 0.0
+        for proc in procs:
+            try:
+                cpu += proc.cpu_percent(None)
+                rss += proc.memory_info().rss
+            except Exception:
+                continue
+        self.cpu_percent.append(cpu)
+        self.rss_mb.append(rss / (1024 * 1024))
+
+    async def run(self) -> None:
+        if self._process is not None:
+            self._process.cpu_percent(None)  # prime the counter
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=5.0) as client:
+            while True:
+                start = time.perf_counter()
+                try:
+                    await client.get("/health")
+                    self.health_rtt_ms.append((time.perf_counter() - start) * 1000.0)
+                except httpx.HTTPError:
+                    self.health_rtt_ms.append(float("inf"))
+                if self._process is not None:
+                    self._sample_process()
+                await asyncio.sleep(self.interval)
+
+
+# ----------------------------------------------------------------------------
+# Load levels
+# ----------------------------------------------------------------------------
+
+@dataclass
+class LevelResult:
+    sessions: int
+    turns: int
+    completed: int
+    dropped: int
+    misordered: int
+    errors: int
+    connect_failures: int
+    response_p50_ms: float
+    response_p95_ms: float
+    audio_p95_ms: float
+    barge_in_p95_ms: float
+    barge_ins_missed: int
+    client_lag_p99_ms: float
+    server_rtt_p95_ms: float
+    server_cpu_max: float
+    server_rss_max_mb: float
+
+    def meets(self, slo_ms: float, max_drop_rate: float) -> bool:
+        if self.turns == 0 or self.connect_failures:
+            return False
+        drop_rate = self.dropped / self.turns
+        return self.response_p95_ms <= slo_ms and drop_rate <= max_drop_rate and self.misordered == 0
+
+
+async def run_level(args: argparse.Namespace, sessions: int, utterance: bytes) -> LevelResult:
+    stop_at = time.monotonic() + args.duration
+    clients = [
+        SimulatedClient(
+            i, args.url, utterance, args.frame_ms,
+            args.text_ratio, args.barge_in_ratio, args.turn_timeout,
+        )
+        for i in range(sessions)
+    ]
+    lag = LoopLagMonitor()
+    server = ServerMonitor(args.http_url, args.server_pid)
+    monitors = [asyncio.create_task(lag.run()), asyncio.create_task(server.run())]
+    try:
+        stats = await asyncio.gather(*(c.run(stop_at) for c in clients))
+    finally:
+        for task in monitors:
+            task.cancel()
+
+    turns = [t for s in stats for t in s.turns]
+    # The reported latency is time to first audible output (or text for
+    # turns that produced no audio)
+    latencies = [
+        t.first_audio_ms if t.first_audio_ms is not None else t.first_response_ms
+        for t in turns if t.first_response_ms is not None or t.first_audio_ms is not None
+    ]
+    return LevelResult(
+        sessions=sessions,
+        turns=len(turns),
+        completed=sum(1 for t in turns if t.completed),
+        dropped=sum(s.dropped_turns for s in stats),
+        misordered=sum(s.misordered for s in stats),
+        errors=sum(s.errors for s in stats),
+        connect_failures=sum(1 for s in stats if s.connect_failed),
+        response_p50_ms=percentile(latencies, 50),
+        response_p95_ms=percentile(latencies, 95),
+        audio_p95_ms=percentile([t.first_audio_ms for t in turns if t.first_audio_ms is not None], 95),
+        barge_in_p95_ms=percentile([ms for s in stats for ms in s.barge_in_ms], 95),
+        barge_ins_missed=sum(s.barge_ins_missed for s in stats),
+        client_lag_p99_ms=percentile(lag.samples, 99),
+        server_rtt_p95_ms=percentile(server.health_rtt_ms, 95),
+        server_cpu_max=max(server.cpu_percent, default=float("nan")),
+        server_rss_max_mb=max(server.rss_mb, default=float("nan")),
+    )
+
+
+def find_server_pid(port: int) -> Optional[int]:
+    """Best-effort lookup of the process listening on the server port."""
+    try:
+        import psutil
+        for conn in psutil.net_connections(kind="tcp"):
+            if conn.laddr and conn.laddr.port == port and conn.status == psutil.CONN_LISTEN:
+                return conn.pid
+    except Exception:
+        pass
+    return None
+
+
+def print_level(result: LevelResult, slo_ms: float, max_drop_rate: float) -> None:
+    verdict = "PASS" if result.meets(slo_ms, max_drop_rate) else "FAIL"
+    print(
+        f"{result.sessions:>5} sessions | turns {result.turns:>4} (dropped {result.dropped}, "
+        f"misordered {result.misordered}, errors {result.errors}) | "
+        f"latency p50 {result.response_p50_ms:7.0f} ms p95 {result.response_p95_ms:7.0f} ms | "
+        f"barge-in p95 {result.barge_in_p95_ms:5.0f} ms | "
+        f"server rtt p95 {result.server_rtt_p95_ms:5.0f} ms cpu {result.server_cpu_max:5.0f}% "
+        f"rss {result.server_rss_max_mb:6.0f} MB | client lag p99 {result.client_lag_p99_ms:4.0f} ms | {verdict}",
+        flush=True,
+    )
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Voice Agent WebSocket load generator")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--sessions", default="1,2,4,8,16", help="Comma-separated session counts to ramp through")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds per load level")
+    parser.add_argument("--slo-ms", type=float, default=2000.0, help="p95 time-to-first-output SLO")
+    parser.add_argument("--max-drop-rate", type=float, default=0.01, help="Allowed fraction of timed-out turns")
+    parser.add_argument("--audio", help="16 kHz mono PCM16 WAV utterance to stream")
+    parser.add_argument("--frame-ms", type=int, default=256, help="Mic frame size (browser sends 4096 samples)")
+    parser.add_argument("--text-ratio", type=float, default=0.3, help="Fraction of turns sent as text_message")
+    parser.add_argument("--barge-in-ratio", type=float, default=0.2, help="Chance of barging in during playback")
+    parser.add_argument("--turn-timeout", type=float, default=30.0)
+    parser.add_argument("--server-pid", type=int, help="Server PID for CPU/RAM sampling (auto-detected if local)")
+    parser.add_argument("--json", help="Write the full report to this file")
+    args = parser.parse_args()
+
+    args.url = f"ws://{args.host}:{args.port}/ws"
+    args.http_url = f"http://{args.host}:{args.port}"
+    if args.server_pid is None and args.host in ("localhost", "127.0.0.1"):
+        args.server_pid = find_server_pid(args.port)
+
+    utterance = load_utterance(args.audio)
+    levels = [int(n) for n in args.sessions.split(",") if n.strip()]
+
+    print(f"Load test against {args.url} (server pid: {args.server_pid or 'unknown'})")
+    print(f"SLO: p95 time-to-first-output <= {args.slo_ms:.0f} ms, drop rate <= {args.max_drop_rate:.1%}\n")
+
+    results: list[LevelResult] = []
+    sustained = 0
+    for sessions in levels:
+        result = await run_level(args, sessions, utterance)
+        results.append(result)
+        print_level(result, args.slo_ms, args.max_drop_rate)
+        if result.meets(args.slo_ms, args.max_drop_rate):
+            sustained = sessions
+        else:
+            break
+
+    print(f"\nMaximum sessions sustained at SLO: {sustained}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "slo_ms": args.slo_ms,
+                "max_drop_rate": args.max_drop_rate,
+                "max_sessions": sustained,
+                "levels": [r.__dict__ for r in results],
+            }, f, indent=2)
+
+    return 0 if sustained else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
@@ -3,6 +3,7 @@ Audio package.
 """
 
 from .buffer import AudioBuffer, ChunkedAudioBuffer
+from .ingest import AudioIngestQueue
 from .vad import SileroVAD
 
-__all__ = ["AudioBuffer", "ChunkedAudioBuffer", "SileroVAD"]
+__all__ = ["AudioBuffer", "ChunkedAudioBuffer", "AudioIngestQueue", "SileroVAD"]
@@ -2,12 +2,129 @@
 Audio Buffer Utilities
 Circular buffers and utilities for real-time audio processing.
 """
+import io
+import wave
 import numpy as np
-from collections import deque
-from typing import Optional
+from typing import Iterator, Optional
 import struct
 
 
+class RingBuffer:
+    """
+    Preallocated ring of samples with vectorized writes and zero-copy reads.
+
+    Storage is mirrored: every sample is written twice, at i and
+    i + capacity, so any run of up to `capacity` consecutive samples is one
+    contiguous slice. Reads (`latest`, `oldest`, `windows`) therefore return
+    NumPy views instead of copies. Views are read-only and only valid until
+    the next write.
+    """
+
+    def __init__(self, capacity: int, dtype=np.int16):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        self._data = np.zeros(2 * capacity, dtype=self.dtype)
+        self._readonly = self._data.view()
+        self._readonly.flags.writeable = False
+        self._start = 0   # index of the oldest sample, always < capacity
+        self._size = 0
+
+    def write(self, samples: np.ndarray) -> int:
+        """
+        Append samples, overwriting the oldest ones when full.
+
+        Returns:
+            Number of samples dropped from the front to make room
+        """
+        samples = np.asarray(samples)
+        count = len(samples)
+        if count == 0:
+            return 0
+        cap = self.capacity
+        dropped = max(0, self._size + count - cap)
+        if count > cap:
+            samples = samples[-cap:]
+            count = cap
+
+        pos = (self._start + self._size) % cap
+        end = pos + count
+        self._data[pos:end] = samples
+        if end <= cap:
+            self._data[pos + cap:end + cap] = samples
+        else:
+            split = cap - pos
+            self._data[pos + cap:] = samples[:split]
+            self._data[:end - cap] = samples[split:]
+
+        self._size = min(self._size + count, cap)
+        self._start = (pos + count - self._size) % cap
+        return dropped
+
+    def extend(self, pcm_data: bytes) -> int:
+        """Append raw PCM bytes in this buffer's dtype."""
+        return self.write(np.frombuffer(pcm_data, dtype=self.dtype))
+
+    def _view(self, begin: int, length: int) -> np.ndarray:
+        return self._readonly[begin:begin + length]
+
+    def latest(self, num_samples: Optional[int] = None) -> np.ndarray:
+        """View of the most recent samples (all of them by default)."""
+        n = self._size if num_samples is None else min(num_samples, self._size)
+        return self._view(self._start + self._size - n, n)
+
+    def oldest(self, num_samples: Optional[int] = None) -> np.ndarray:
+        """View of the oldest samples without consuming them."""
+        n = self._size if num_samples is None else min(num_samples, self._size)
+        return self._view(self._start, n)
+
+    def consume(self, num_samples: int) -> None:
+        """Drop samples from the front."""
+        n = min(num_samples, self._size)
+        self._start = (self._start + n) % self.capacity
+        self._size -= n
+
+    def windows(self, size: int) -> Iterator[np.ndarray]:
+        """
+        Yield and consume consecutive full windows of `size` samples.
+
+        A trailing partial window stays buffered for the next write.
+        """
+        data = self._readonly
+        cap = self.capacity
+        while self._size >= size:
+            start = self._start
+            self._start = (start + size) % cap
+            self._size -= size
+            yield data[start:start + size]
+
+    def clear(self) -> None:
+        """Forget all samples (storage is kept)."""
+        self._start = 0
+        self._size = 0
+
+    def tobytes(self) -> bytes:
+        """Copy out all samples as raw bytes."""
+        return self.latest().tobytes()
+
+    def __bytes__(self) -> bytes:
+        return self.tobytes()
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the buffered samples in bytes."""
+        return self._size * self.dtype.itemsize
+
+    @property
+    def allocated_bytes(self) -> int:
+        """Memory held by the (mirrored) storage."""
+        return self._data.nbytes
+
+    def __len__(self) -> int:
+        return self._size
+
+
 class AudioBuffer:
     """
     Circular audio buffer for real-time streaming.
@@ -17,24 +134,15 @@ class AudioBuffer:
     def __init__(self, max_seconds: float = 30.0, sample_rate: int = 16000):
         self.sample_rate = sample_rate
         self.max_samples = int(max_seconds * sample_rate)
-        self._buffer = deque(maxlen=self.max_samples)
-        self._lock_free = True  # We use deque which is thread-safe for append/pop
+        self._buffer = RingBuffer(self.max_samples, np.int16)
     
     def write(self, audio_data: bytes) -> None:
         """Write PCM16 audio bytes to buffer."""
-        # Convert bytes to int16 samples
-        samples = np.frombuffer(audio_data, dtype=np.int16)
-        for sample in samples:
-            self._buffer.append(sample)
+        self._buffer.extend(audio_data)
     
     def read(self, num_samples: Optional[int] = None) -> np.ndarray:
-        """Read samples from buffer (does not remove them)."""
-        if num_samples is None:
-            return np.array(self._buffer, dtype=np.int16)
-        
-        # Read last N samples
-        samples = list(self._buffer)[-num_samples:]
-        return np.array(samples, dtype=np.int16)
+        """Read samples from buffer (does not remove them). Returns a read-only view."""
+        return self._buffer.latest(num_samples)
     
     def read_bytes(self, num_samples: Optional[int] = None) -> bytes:
         """Read samples as PCM16 bytes."""
@@ -76,57 +184,65 @@ class ChunkedAudioBuffer:
         self.samples_per_chunk = int(sample_rate * chunk_ms / 1000)
         self.bytes_per_chunk = self.samples_per_chunk * 2  # 16-bit = 2 bytes
         
-        self._chunks: deque[bytes] = deque(maxlen=max_chunks)
-        self._pending: bytearray = bytearray()
+        # Complete chunks live in the ring; a partial chunk is simply the
+        # samples past the last chunk boundary
+        self._ring = RingBuffer(self.samples_per_chunk * (max_chunks + 1), np.int16)
+        self.max_chunks = max_chunks
+    
+    def _trim(self) -> None:
+        """Keep at most max_chunks complete chunks plus the partial one."""
+        excess = self.num_chunks - self.max_chunks
+        if excess > 0:
+            self._ring.consume(excess * self.samples_per_chunk)
     
     def write(self, audio_data: bytes) -> int:
         """
         Write audio data, chunking as needed.
         Returns number of complete chunks added.
         """
-        self._pending.extend(audio_data)
-        chunks_added = 0
-        
-        # Extract complete chunks
-        while len(self._pending) >= self.bytes_per_chunk:
-            chunk = bytes(self._pending[:self.bytes_per_chunk])
-            self._chunks.append(chunk)
-            del self._pending[:self.bytes_per_chunk]
-            chunks_added += 1
-        
+        pending = len(self._ring) % self.samples_per_chunk
+        chunks_added = (pending + len(audio_data) // 2) // self.samples_per_chunk
+        self._ring.extend(audio_data)
+        self._trim()
         return chunks_added
     
     def read_chunk(self) -> Optional[bytes]:
         """Read and remove the oldest chunk."""
-        if self._chunks:
-            return self._chunks.popleft()
-        return None
+        if self.num_chunks == 0:
+            return None
+        chunk = self._ring.oldest(self.samples_per_chunk).tobytes()
+        self._ring.consume(self.samples_per_chunk)
+        return chunk
     
     def read_all_chunks(self) -> list[bytes]:
         """Read and remove all chunks."""
-        chunks = list(self._chunks)
-        self._chunks.clear()
-        return chunks
+        return [window.tobytes() for window in self._ring.windows(self.samples_per_chunk)]
+    
+    def iter_chunks(self) -> Iterator[np.ndarray]:
+        """Consume complete chunks as zero-copy int16 views."""
+        return self._ring.windows(self.samples_per_chunk)
     
     def peek_chunks(self, n: int = None) -> list[bytes]:
         """Peek at chunks without removing."""
-        if n is None:
-            return list(self._chunks)
-        return list(self._chunks)[:n]
+        count = self.num_chunks if n is None else min(n, self.num_chunks)
+        samples = self._ring.oldest(count * self.samples_per_chunk)
+        return [
+            samples[i:i + self.samples_per_chunk].tobytes()
+            for i in range(0, len(samples), self.samples_per_chunk)
+        ]
     
     def clear(self) -> None:
         """Clear buffer and pending data."""
-        self._chunks.clear()
-        self._pending.clear()
+        self._ring.clear()
     
     @property
     def num_chunks(self) -> int:
-        return len(self._chunks)
+        return len(self._ring) // self.samples_per_chunk
     
     @property
     def duration_seconds(self) -> float:
         """Total duration of buffered audio."""
-        return (len(self._chunks) * self.chunk_ms) / 1000.0
+        return (self.num_chunks * self.chunk_ms) / 1000.0
 
 
 def pcm16_to_float32(pcm_data: bytes) -> np.ndarray:
@@ -168,3 +284,12 @@ def apply_fade(audio_data: bytes, fade_ms: int, sample_rate: int, fade_in: bool
         samples[-fade_samples:] *= fade
     
     return samples.astype(np.int16).tobytes()
+
+
+def wav_duration_seconds(wav_data: bytes) -> float:
+    """Duration of a WAV payload in seconds (0.0 if it cannot be parsed)."""
+    try:
+        with wave.open(io.BytesIO(wav_data), "rb") as wav:
+            return wav.getnframes() / float(wav.getframerate())
+    except (wave.Error, EOFError, struct.error):
+        return 0.0
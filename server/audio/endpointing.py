@@ -0,0 +1,158 @@
+"""
+Adaptive End-of-Turn Detection
+Decides how much trailing silence ends an utterance instead of a fixed wait.
+"""
+from dataclasses import dataclass, replace
+from typing import Optional
+import structlog
+
+logger = structlog.get_logger()
+
+# Words that almost never end a finished sentence
+_CONTINUATION_WORDS = {
+    "a", "an", "and", "are", "as", "at", "because", "but", "for", "from",
+    "if", "in", "is", "like", "my", "of", "on", "or", "so", "that", "the",
+    "then", "to", "uh", "um", "was", "which", "with", "your",
+}
+
+
+def transcript_is_complete(text: Optional[str]) -> Optional[bool]:
+    """
+    Rough syntactic completeness of an interim transcript.
+
+    Returns:
+        True if it ends like a finished sentence, False if it clearly
+        trails off mid-thought, None if there is no signal either way
+    """
+    if not text or not text.strip():
+        return None
+    text = text.strip()
+    if text.endswith("..."):
+        return False
+    if text[-1] in ".?!":
+        return True
+    if text[-1] in ",;:-":
+        return False
+    last_word = text.split()[-1].lower().strip("\"'")
+    if last_word in _CONTINUATION_WORDS:
+        return False
+    return None
+
+
+@dataclass(frozen=True)
+class EndpointConfig:
+    """Per-session endpointing thresholds."""
+    min_silence_ms: int = 300        # Default trailing silence
+    fast_silence_ms: int = 150       # When the user is clearly finished
+    max_silence_ms: int = 900        # When the user is clearly mid-thought
+    min_utterance_ms: int = 500      # Shorter utterances are not sent to STT
+    short_utterance_ms: int = 1200   # Short replies ("yes", "stop") end faster
+    quiet_probability: float = 0.15  # Silence this confident means "done"
+    hesitation_probability: float = 0.3  # Silence this uncertain means "thinking"
+    use_transcript: bool = False     # Use interim transcripts as a hint
+
+    @classmethod
+    def from_settings(cls) -> "EndpointConfig":
+        """Build the default configuration from server settings."""
+        from ..config import settings
+        return cls(
+            min_silence_ms=settings.endpoint_min_silence_ms,
+            fast_silence_ms=settings.endpoint_fast_silence_ms,
+            max_silence_ms=settings.endpoint_max_silence_ms,
+            min_utterance_ms=settings.endpoint_min_utterance_ms,
+            use_transcript=settings.endpoint_use_transcript,
+        )
+
+    def updated(self, **changes) -> "EndpointConfig":
+        """Copy with changes applied, keeping fast <= default <= max."""
+        config = replace(self, **{k: v for k, v in changes.items() if v is not None})
+        fast = max(0, min(config.fast_silence_ms, config.min_silence_ms))
+        maximum = max(config.min_silence_ms, config.max_silence_ms)
+        return replace(config, fast_silence_ms=fast, max_silence_ms=maximum)
+
+
+class EndpointDetector:
+    """
+    Adaptive trailing-silence detector for one session.
+
+    Fed every VAD window, it picks the silence needed to end the turn from
+    three signals:
+    - how confidently silent the pause is (probabilities near zero vs.
+      hovering just under the threshold, as with breaths and "um"s)
+    - how long the utterance is (short replies are usually complete)
+    - whether the interim transcript, if any, reads as a finished sentence
+    """
+
+    def __init__(self, config: Optional[EndpointConfig] = None, sample_rate: int = 16000):
+        self.config = config or EndpointConfig()
+        self.sample_rate = sample_rate
+        self.transcript: Optional[str] = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new utterance."""
+        self._speech_samples = 0
+        self._silence_samples = 0
+        self._silence_prob_sum = 0.0
+        self._silence_windows = 0
+        self.transcript = None
+
+    def observe(self, probability: float, is_speech: bool, num_samples: int) -> None:
+        """Record one VAD window."""
+        if is_speech:
+            self._speech_samples += num_samples
+            self._silence_samples = 0
+            self._silence_prob_sum = 0.0
+            self._silence_windows = 0
+            self.transcript = None  # Stale once the user speaks again
+        elif self._speech_samples:
+            self._silence_samples += num_samples
+            self._silence_prob_sum += probability
+            self._silence_windows += 1
+
+    def set_transcript(self, text: Optional[str]) -> None:
+        """Provide an interim transcript of the audio so far."""
+        self.transcript = text
+
+    @property
+    def speech_ms(self) -> float:
+        return self._speech_samples * 1000 / self.sample_rate
+
+    @property
+    def silence_ms(self) -> float:
+        return self._silence_samples * 1000 / self.sample_rate
+
+    def required_silence_ms(self) -> float:
+        """Trailing silence needed to end the current utterance."""
+        config = self.config
+        score = 0
+
+        # Probability trajectory during the pause
+        if self._silence_windows:
+            mean_prob = self._silence_prob_sum / self._silence_windows
+            if mean_prob <= config.quiet_probability:
+                score += 1
+            elif mean_prob >= config.hesitation_probability:
+                score -= 1
+
+        # Utterance length
+        if self.speech_ms < config.short_utterance_ms:
+            score += 1
+
+        # Interim transcript completeness
+        if config.use_transcript:
+            complete = transcript_is_complete(self.transcript)
+            if complete is True:
+                score += 1
+            elif complete is False:
+                score -= 2
+
+        if score >= 2:
+            return config.fast_silence_ms
+        if score < 0:
+            return config.max_silence_ms
+        return config.min_silence_ms
+
+    def should_end(self) -> bool:
+        """Whether the current pause ends the turn."""
+        return self._speech_samples > 0 and self.silence_ms >= self.required_silence_ms()
@@ -0,0 +1,183 @@
+"""
+Per-session Audio Ingest Queue
+Ordered, bounded delivery of microphone frames to a single consumer task.
+"""
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+import structlog
+
+from .. import metrics
+
+logger = structlog.get_logger()
+
+FrameHandler = Callable[[bytes, bool], Awaitable[None]]
+
+
+@dataclass
+class AudioFrame:
+    """One binary WebSocket frame: PCM16 audio plus the TTS-playing flag."""
+    data: bytes
+    tts_playing: bool
+
+
+class AudioIngestQueue:
+    """
+    Bounded ring of incoming audio frames with exactly one consumer.
+
+    Frames are handed to `handler(audio, tts_playing)` strictly in arrival
+    order, one call at a time. When the consumer falls behind, consecutive
+    frames with the same TTS flag are merged into a single call. When the
+    ring is full the oldest frame is dropped and counted.
+    """
+
+    def __init__(
+        self,
+        handler: FrameHandler,
+        max_frames: int = 64,
+        max_coalesce_bytes: int = 32000,
+        name: str = "",
+    ):
+        """
+        Initialize the ingest queue.
+
+        Args:
+            handler: Async callback receiving (audio_bytes, tts_playing)
+            max_frames: Ring capacity in frames
+            max_coalesce_bytes: Upper bound on a merged batch
+            name: Identifier for logging (usually the client ID)
+        """
+        self.handler = handler
+        self.max_frames = max_frames
+        self.max_coalesce_bytes = max_coalesce_bytes
+        self.name = name
+
+        self._frames: deque[AudioFrame] = deque()
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._depth = metrics.QUEUE_DEPTH.labels(queue="audio_ingest")
+        self._overloaded = False
+
+        self.frames_dropped = 0
+        self.frames_coalesced = 0
+
+    def start(self) -> None:
+        """Start the consumer task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the consumer and discard anything still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._discard()
+
+    def put(self, data: bytes, tts_playing: bool) -> bool:
+        """
+        Enqueue a frame without blocking.
+
+        Returns:
+            False if the ring was full and the oldest frame was dropped
+        """
+        accepted = True
+        if len(self._frames) >= self.max_frames:
+            self._frames.popleft()
+            self._depth.dec()
+            self.frames_dropped += 1
+            metrics.AUDIO_FRAMES_DROPPED.inc()
+            accepted = False
+            if not self._overloaded:
+                self._overloaded = True
+                logger.warning("audio_ingest_overloaded", client_id=self.name, capacity=self.max_frames)
+
+        self._frames.append(AudioFrame(data, tts_playing))
+        self._depth.inc()
+        self._ready.set()
+        return accepted
+
+    def drain(self, playback_only: bool = False) -> int:
+        """
+        Discard queued frames on barge-in.
+
+        Args:
+            playback_only: Only drop frames captured while TTS was playing,
+                keeping any speech recorded after playback stopped
+
+        Returns:
+            Number of frames dropped
+        """
+        if playback_only:
+            kept = deque(frame for frame in self._frames if not frame.tts_playing)
+            drained = len(self._frames) - len(kept)
+            self._frames = kept
+            self._depth.dec(drained)
+            if not self._frames:
+                self._ready.clear()
+        else:
+            drained = self._discard()
+        if drained:
+            metrics.AUDIO_FRAMES_DRAINED.inc(drained)
+            logger.debug("audio_ingest_drained", client_id=self.name, frames=drained)
+        return drained
+
+    def _discard(self) -> int:
+        count = len(self._frames)
+        self._frames.clear()
+        self._depth.dec(count)
+        self._ready.clear()
+        return count
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    @property
+    def queued_bytes(self) -> int:
+        """Bytes of audio waiting to be processed."""
+        return sum(len(frame.data) for frame in self._frames)
+
+    def _next_batch(self) -> AudioFrame:
+        """Pop the next frame, merging any same-flag frames queued behind it."""
+        frame = self._frames.popleft()
+        self._depth.dec()
+        if not self._frames or len(frame.data) >= self.max_coalesce_bytes:
+            return frame
+
+        parts = [frame.data]
+        size = len(frame.data)
+        while (
+            self._frames
+            and self._frames[0].tts_playing == frame.tts_playing
+            and size + len(self._frames[0].data) <= self.max_coalesce_bytes
+        ):
+            nxt = self._frames.popleft()
+            self._depth.dec()
+            parts.append(nxt.data)
+            size += len(nxt.data)
+
+        merged = len(parts) - 1
+        if merged:
+            self.frames_coalesced += merged
+            metrics.AUDIO_FRAMES_COALESCED.inc(merged)
+            return AudioFrame(b"".join(parts), frame.tts_playing)
+        return frame
+
+    async def _run(self) -> None:
+        """Consumer loop: one handler call at a time, in order."""
+        while True:
+            await self._ready.wait()
+            while self._frames:
+                batch = self._next_batch()
+                try:
+                    await self.handler(batch.data, batch.tts_playing)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error("audio_ingest_handler_error", client_id=self.name, error=str(e))
+            self._ready.clear()
+            self._overloaded = False
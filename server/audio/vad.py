@@ -2,13 +2,62 @@
 Voice Activity Detection (VAD)
 Using Silero VAD for accurate speech detection.
 """
+import copy
+import importlib
+import time
+from pathlib import Path
 import torch
 import numpy as np
-from typing import Tuple
+from typing import Optional, Tuple
 import structlog
 
+from .. import metrics
+from .buffer import RingBuffer
+from .endpointing import EndpointDetector
+
 logger = structlog.get_logger()
 
+SILERO_HUB_REPO = "snakers4/silero-vad"
+
+
+def load_silero_model(use_onnx: bool = False, model_dir: Optional[str] = None):
+    """
+    Load Silero VAD weights, avoiding the network whenever possible.
+    
+    Tried in order:
+    1. the `silero-vad` package, which ships the weights in the wheel
+    2. `silero_vad.jit` in model_dir (TorchScript only)
+    3. the torch.hub cache of a previous download, loaded as a local repo
+    4. a torch.hub download from GitHub
+    
+    Returns:
+        (model, source) where source names the path that was used
+    """
+    try:
+        package = importlib.import_module("silero_vad")
+        return package.load_silero_vad(onnx=use_onnx), "package"
+    except ImportError:
+        pass
+    
+    if model_dir and not use_onnx:
+        path = Path(model_dir) / "silero_vad.jit"
+        if path.exists():
+            return torch.jit.load(str(path), map_location="cpu"), str(path)
+    
+    cached = Path(torch.hub.get_dir()) / f"{SILERO_HUB_REPO.replace('/', '_')}_master"
+    if cached.exists():
+        model, _ = torch.hub.load(str(cached), "silero_vad", source="local", onnx=use_onnx)
+        return model, "hub_cache"
+    
+    logger.warning("vad_weights_downloading", repo=SILERO_HUB_REPO)
+    model, _ = torch.hub.load(
+        repo_or_dir=SILERO_HUB_REPO,
+        model='silero_vad',
+        force_reload=False,
+        onnx=use_onnx
+    )
+    return model, "hub_download"
+
 
 class SileroVAD:
     """
@@ -24,6 +73,8 @@ class SileroVAD:
         min_silence_ms: int = 300,
         device: str = "cuda",
         use_onnx: bool = False,
+        endpointer: Optional[EndpointDetector] = None,
+        model_dir: Optional[str] = None,
     ):
         """
         Initialize Silero VAD.
@@ -33,6 +84,9 @@ class SileroVAD:
             sample_rate: Audio sample rate (8000 or 16000)
             min_speech_ms: Minimum speech duration to trigger
             min_silence_ms: Minimum silence to end speech
+            endpointer: Adaptive end-of-turn detector; replaces the fixed
+                min_silence_ms when set
+            model_dir: Directory holding local weights (silero_vad.jit)
         """
         self.threshold = threshold
         self.sample_rate = sample_rate
@@ -42,14 +96,10 @@ class SileroVAD:
         self.use_onnx = use_onnx
         self.min_speech_samples = int(sample_rate * min_speech_ms / 1000)
         self.min_silence_samples = int(sample_rate * min_silence_ms / 1000)
+        self.endpointer = endpointer
         
         # Load Silero VAD model - default to TorchScript for CUDA acceleration
-        self.model, self.utils = torch.hub.load(
-            repo_or_dir='snakers4/silero-vad',
-            model='silero_vad',
-            force_reload=False,
-            onnx=use_onnx
-        )
+        self.model, source = load_silero_model(use_onnx, model_dir)
         if not use_onnx:
             self.model.to(self.device)
         
@@ -61,9 +111,12 @@ class SileroVAD:
         self._speech_samples = 0
         self._silence_samples = 0
         self._triggered = False
-        self._buffer = np.array([], dtype=np.float32)
         
-        logger.info("vad_initialized", threshold=threshold, sample_rate=sample_rate)
+        # Pending samples and a reusable float32 window for model input
+        self._buffer = RingBuffer(self._chunk_size * 64, np.float32)
+        self._window = np.empty(self._chunk_size, dtype=np.float32)
+        
+        logger.info("vad_initialized", threshold=threshold, sample_rate=sample_rate, source=source)
     
     def reset(self) -> None:
         """Reset VAD state."""
@@ -71,8 +124,26 @@ class SileroVAD:
         self._speech_samples = 0
         self._silence_samples = 0
         self._triggered = False
-        self._buffer = np.array([], dtype=np.float32)
+        self._buffer.clear()
         self.model.reset_states()
+        if self.endpointer is not None:
+            self.endpointer.reset()
+    
+    def clone(self, endpointer: Optional[EndpointDetector] = None) -> "SileroVAD":
+        """
+        Create an independent VAD (e.g. per session) without reloading weights.
+        
+        The TorchScript model keeps its recurrent state inside the module, so
+        it is deep-copied; the ONNX wrapper keeps state on the wrapper and can
+        share the underlying inference session.
+        """
+        other = copy.copy(self)
+        other.model = copy.copy(self.model) if self.use_onnx else copy.deepcopy(self.model)
+        other._buffer = RingBuffer(self._chunk_size * 64, np.float32)
+        other._window = np.empty(self._chunk_size, dtype=np.float32)
+        other.endpointer = endpointer
+        other.reset()
+        return other
     
     def process_chunk(self, audio_chunk: bytes) -> Tuple[float, bool, bool]:
         """
@@ -85,50 +156,76 @@ class SileroVAD:
         Returns:
             Tuple of (speech_probability, is_speech, speech_ended)
         """
-        # Convert to float32
-        samples = np.frombuffer(audio_chunk, dtype=np.int16).astype(np.float32) / 32768.0
-        
-        # Add to buffer
-        self._buffer = np.concatenate([self._buffer, samples])
+        # Convert to float32 in one vectorized pass
+        samples = np.multiply(
+            np.frombuffer(audio_chunk, dtype=np.int16), 1.0 / 32768.0, dtype=np.float32
+        )
         
-        # Process all complete chunks
         speech_prob = 0.0
-        is_speech = False
-        while len(self._buffer) >= self._chunk_size:
-            chunk = self._buffer[:self._chunk_size]
-            self._buffer = self._buffer[self._chunk_size:]
+        offset = 0
+        while offset < len(samples):
+            # Feed at most what the ring can hold, then drain full windows
+            room = self._buffer.capacity - len(self._buffer)
+            self._buffer.write(samples[offset:offset + room])
+            offset += room
             
-            audio_tensor = torch.from_numpy(chunk)
-            if not self.use_onnx:
-                audio_tensor = audio_tensor.to(self.device)
-            speech_prob = self.model(audio_tensor, self.sample_rate).item()
+            for chunk in self._buffer.windows(self._chunk_size):
+                speech_prob, _, speech_ended = self._process_window(chunk)
+                if speech_ended:
+                    # Keep the rest of this chunk buffered for the next call
+                    self._buffer.write(samples[offset:])
+                    return speech_prob, self._is_speaking, True
+        
+        return speech_prob, self._is_speaking, False
+    
+    def _process_window(self, chunk: np.ndarray) -> Tuple[float, bool, bool]:
+        """Run the model on one window and advance the state machine."""
+        # Ring views are read-only; torch needs a writable array
+        np.copyto(self._window, chunk)
+        
+        window_started = time.perf_counter()
+        audio_tensor = torch.from_numpy(self._window)
+        if not self.use_onnx:
+            audio_tensor = audio_tensor.to(self.device)
+        speech_prob = self.model(audio_tensor, self.sample_rate).item()
+        metrics.VAD_WINDOW_SECONDS.observe(time.perf_counter() - window_started)
+        
+        is_speech = speech_prob >= self.threshold
+        if self.endpointer is not None:
+            self.endpointer.observe(speech_prob, is_speech, len(chunk))
+        
+        # State machine for speech detection
+        if is_speech:
+            self._speech_samples += len(chunk)
+            self._silence_samples = 0
             
-            is_speech = speech_prob >= self.threshold
+            # Check if we've detected enough speech
+            if self._speech_samples >= self.min_speech_samples:
+                if not self._triggered:
+                    self._triggered = True
+                    logger.debug("speech_start_detected", prob=speech_prob)
+                self._is_speaking = True
+        else:
+            self._silence_samples += len(chunk)
             
-            # State machine for speech detection
-            if is_speech:
-                self._speech_samples += len(chunk)
-                self._silence_samples = 0
-                
-                # Check if we've detected enough speech
-                if self._speech_samples >= self.min_speech_samples:
-                    if not self._triggered:
-                        self._triggered = True
-                        logger.debug("speech_start_detected", prob=speech_prob)
-                    self._is_speaking = True
-            else:
-                self._silence_samples += len(chunk)
-                
-                # Check if speech has ended
-                if self._is_speaking and self._silence_samples >= self.min_silence_samples:
-                    self._is_speaking = False
-                    self._triggered = False
-                    self._speech_samples = 0
-                    logger.debug("speech_end_detected", prob=speech_prob)
-                    return speech_prob, self._is_speaking, True  # speech_ended
+            # Check if speech has ended
+            if self._is_speaking and self._silence_elapsed():
+                self._is_speaking = False
+                self._triggered = False
+                self._speech_samples = 0
+                logger.debug("speech_end_detected", prob=speech_prob, silence_samples=self._silence_samples)
+                if self.endpointer is not None:
+                    self.endpointer.reset()
+                return speech_prob, self._is_speaking, True  # speech_ended
         
         return speech_prob, self._is_speaking, False
     
+    def _silence_elapsed(self) -> bool:
+        """Whether the current pause is long enough to end the utterance."""
+        if self.endpointer is not None:
+            return self.endpointer.should_end()
+        return self._silence_samples >= self.min_silence_samples
+    
     @property
     def is_speaking(self) -> bool:
         """Whether speech is currently detected."""
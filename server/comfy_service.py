@@ -5,23 +5,80 @@ Manages ComfyUI as an embedded service within Felix
 
 import os
 import sys
+import json
+import time
+import uuid
+import struct
 import asyncio
-import subprocess
 import httpx
 import structlog
+from collections import deque
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Awaitable, Callable
 import signal
 
+from .config import settings
+
 logger = structlog.get_logger(__name__)
 
+# Binary WebSocket frames (comfy/protocol.py): a big-endian event type,
+# then for previews a big-endian image format and the encoded image
+PREVIEW_IMAGE_EVENT = 1
+PREVIEW_MIME_TYPES = {1: "image/jpeg", 2: "image/png"}
+
+# How often to check history for a prompt while the event socket is down
+EVENTS_FALLBACK_POLL = 5.0
+
+
+def warmup_workflow(checkpoint: str) -> Dict[str, Any]:
+    """Smallest prompt that loads a checkpoint and runs the sampler once."""
+    return {
+        "1": {"class_type": "CheckpointLoaderSimple", "inputs": {"ckpt_name": checkpoint}},
+        "2": {"class_type": "CLIPTextEncode", "inputs": {"text": "warm-up", "clip": ["1", 1]}},
+        "3": {"class_type": "EmptyLatentImage", "inputs": {"width": 64, "height": 64, "batch_size": 1}},
+        "4": {
+            "class_type": "KSampler",
+            "inputs": {
+                "seed": 0, "steps": 1, "cfg": 1.0, "sampler_name": "euler",
+                "scheduler": "normal", "denoise": 1.0, "model": ["1", 0],
+                "positive": ["2", 0], "negative": ["2", 0], "latent_image": ["3", 0],
+            },
+        },
+        "5": {"class_type": "VAEDecode", "inputs": {"samples": ["4", 0], "vae": ["1", 2]}},
+        "6": {"class_type": "PreviewImage", "inputs": {"images": ["5", 0]}},
+    }
+
+
+class ComfyUIExecutionError(RuntimeError):
+    """A queued prompt failed or was interrupted inside ComfyUI."""
+
+
+ProgressCallback = Callable[[int, int, Optional[str]], Awaitable[None]]
+PreviewCallback = Callable[[str, bytes], Awaitable[None]]
+
+
+@dataclass
+class ComfyJob:
+    """A queued prompt and the outputs its nodes have produced so far."""
+    prompt_id: str
+    future: asyncio.Future
+    outputs: Dict[str, Any] = field(default_factory=dict)
+    on_progress: Optional[ProgressCallback] = None
+    on_preview: Optional[PreviewCallback] = None
+
+
 class ComfyUIService:
     """Manages ComfyUI as an embedded service"""
     
     def __init__(self, 
                  comfy_dir: str = None,
                  host: str = "127.0.0.1",
-                 port: int = 8188):
+                 port: int = 8188,
+                 checkpoint: str = "v1-5-pruned.safetensors",
+                 start_timeout: float = 60.0,
+                 idle_seconds: float = 0.0,
+                 idle_action: str = "unload"):
         """
         Initialize ComfyUI service
         
@@ -29,13 +86,39 @@ class ComfyUIService:
             comfy_dir: Path to ComfyUI installation (defaults to felix/comfy)
             host: Host to bind ComfyUI server to
             port: Port to bind ComfyUI server to
+            checkpoint: Checkpoint preloaded by warm_up()
+            start_timeout: Seconds to wait for the server to answer
+            idle_seconds: Quiet time before idle_action (0 disables)
+            idle_action: "unload" models (process stays up) or "stop" ComfyUI
         """
         self.comfy_dir = Path(comfy_dir) if comfy_dir else Path(__file__).parent.parent / "comfy"
         self.host = host
         self.port = port
-        self.process: Optional[subprocess.Popen] = None
+        self.checkpoint = checkpoint
+        self.start_timeout = start_timeout
+        self.idle_seconds = idle_seconds
+        self.idle_action = idle_action
+        self.process: Optional[asyncio.subprocess.Process] = None
         self.client: Optional[httpx.AsyncClient] = None
         self._is_ready = False
+        self._models_loaded = False
+        
+        # Lifecycle: one start at a time, optional background warm start,
+        # log draining and idle unloading
+        self._start_lock = asyncio.Lock()
+        self._start_task: Optional[asyncio.Task] = None
+        self._log_task: Optional[asyncio.Task] = None
+        self._idle_task: Optional[asyncio.Task] = None
+        self._log_tail: deque[str] = deque(maxlen=200)
+        self._last_used = time.monotonic()
+        
+        # One event subscription per service; ComfyUI sends a prompt's
+        # events only to the socket whose clientId queued it
+        self.client_id = uuid.uuid4().hex
+        self._jobs: Dict[str, ComfyJob] = {}
+        self._events_task: Optional[asyncio.Task] = None
+        self._events_connected = asyncio.Event()
+        self._executing: Optional[str] = None  # Prompt that previews belong to
         
         if not self.comfy_dir.exists():
             raise FileNotFoundError(f"ComfyUI directory not found: {self.comfy_dir}")
@@ -53,7 +136,12 @@ class ComfyUIService:
     @property
     def is_running(self) -> bool:
         """Check if ComfyUI process is running"""
-        return self.process is not None and self.process.poll() is None
+        return self.process is not None and self.process.returncode is None
+    
+    @property
+    def is_starting(self) -> bool:
+        """A background start (and warm-up) is in progress"""
+        return self._start_task is not None and not self._start_task.done()
     
     async def start(self) -> bool:
         """
@@ -62,57 +150,183 @@ class ComfyUIService:
         Returns:
             True if started successfully, False otherwise
         """
-        if self.is_running:
-            logger.warning("comfy_already_running")
-            return True
-        
-        try:
-            # Prepare environment
-            env = os.environ.copy()
-            env['COMFYUI_PORT'] = str(self.port)
-            env['COMFYUI_HOST'] = self.host
-            
-            # Start ComfyUI server
-            cmd = [
-                sys.executable,
-                "main.py",
-                "--listen", self.host,
-                "--port", str(self.port),
-            ]
-            
-            logger.info("starting_comfyui", cmd=" ".join(cmd), cwd=str(self.comfy_dir))
-            
-            self.process = subprocess.Popen(
-                cmd,
-                cwd=self.comfy_dir,
-                env=env,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                preexec_fn=os.setsid  # Create new process group for clean shutdown
-            )
-            
-            # Wait for server to be ready
-            self._is_ready = await self._wait_for_ready(timeout=30)
+        async with self._start_lock:
+            if self.is_running and self._is_ready:
+                return True
+            if self.process is not None:
+                # Previous process exited on its own; clear its tasks first
+                await self._stop_locked()
             
-            if self._is_ready:
-                # Create HTTP client
-                self.client = httpx.AsyncClient(
-                    base_url=self.base_url,
-                    timeout=httpx.Timeout(30.0)
+            try:
+                # Prepare environment
+                env = os.environ.copy()
+                env['COMFYUI_PORT'] = str(self.port)
+                env['COMFYUI_HOST'] = self.host
+                
+                # Start ComfyUI server
+                cmd = [
+                    sys.executable,
+                    "main.py",
+                    "--listen", self.host,
+                    "--port", str(self.port),
+                ]
+                
+                logger.info("starting_comfyui", cmd=" ".join(cmd), cwd=str(self.comfy_dir))
+                
+                self.process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    cwd=self.comfy_dir,
+                    env=env,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT,
+                    start_new_session=True  # New process group for clean shutdown
                 )
-                logger.info("comfyui_started", url=self.base_url)
-                return True
-            else:
-                logger.error("comfyui_failed_to_start")
-                await self.stop()
-                return False
+                # Drain output continuously so a full pipe never blocks ComfyUI
+                self._log_task = asyncio.create_task(self._drain_logs(self.process))
+                
+                # Wait for server to be ready
+                self._is_ready = await self._wait_for_ready(timeout=self.start_timeout)
                 
+                if self._is_ready:
+                    # Create HTTP client
+                    self.client = httpx.AsyncClient(
+                        base_url=self.base_url,
+                        timeout=httpx.Timeout(30.0)
+                    )
+                    self._events_task = asyncio.create_task(self._listen_events())
+                    self._touch()
+                    if self.idle_seconds > 0 and self._idle_task is None:
+                        self._idle_task = asyncio.create_task(self._idle_monitor())
+                    logger.info("comfyui_started", url=self.base_url)
+                    return True
+                else:
+                    logger.error("comfyui_failed_to_start", log_tail=list(self._log_tail)[-20:])
+                    await self._stop_locked()
+                    return False
+                    
+            except asyncio.CancelledError:
+                await self._stop_locked()
+                raise
+            except Exception as e:
+                logger.error("comfyui_start_error", error=str(e))
+                await self._stop_locked()
+                return False
+    
+    def start_background(self, warmup: bool = True) -> asyncio.Task:
+        """
+        Start ComfyUI (and optionally preload the checkpoint) without waiting
+        
+        Image requests that arrive meanwhile wait for this instead of
+        starting a second process (see ensure_ready).
+        """
+        if not self.is_starting:
+            self._start_task = asyncio.create_task(self._start_and_warm(warmup))
+        return self._start_task
+    
+    async def _start_and_warm(self, warmup: bool) -> bool:
+        started_at = time.perf_counter()
+        if not await self.start():
+            return False
+        if warmup:
+            await self.warm_up()
+        logger.info("comfyui_warm", seconds=round(time.perf_counter() - started_at, 1))
+        return True
+    
+    async def ensure_ready(self) -> bool:
+        """
+        Make sure ComfyUI is up for a request
+        
+        Waits for a background start in progress, otherwise starts the
+        process now. Returns whether ComfyUI is usable.
+        """
+        if self.is_starting:
+            await asyncio.shield(self._start_task)
+        if self.is_running and self._is_ready:
+            return True
+        return await self.start()
+    
+    async def warm_up(self) -> bool:
+        """
+        Load the default checkpoint into VRAM with a tiny one-step prompt
+        
+        Returns:
+            True if the warm-up prompt completed
+        """
+        started_at = time.perf_counter()
+        try:
+            job = await self.submit(warmup_workflow(self.checkpoint))
+            await self.wait(job, timeout=self.start_timeout * 4)
         except Exception as e:
-            logger.error("comfyui_start_error", error=str(e))
-            await self.stop()
+            logger.warning("comfyui_warmup_failed", checkpoint=self.checkpoint, error=str(e))
             return False
+        self._models_loaded = True
+        logger.info(
+            "comfyui_warmup_complete",
+            checkpoint=self.checkpoint,
+            seconds=round(time.perf_counter() - started_at, 1),
+        )
+        return True
+    
+    async def free_memory(self) -> None:
+        """Ask ComfyUI to unload models and release VRAM"""
+        if not self.client:
+            raise RuntimeError("ComfyUI service not started")
+        
+        response = await self.client.post("/free", json={"unload_models": True, "free_memory": True})
+        response.raise_for_status()
+        self._models_loaded = False
+        logger.info("comfyui_models_unloaded")
+    
+    @property
+    def models_loaded(self) -> bool:
+        """The checkpoint is (as far as we know) resident in VRAM"""
+        return self._models_loaded
+    
+    @property
+    def idle_for(self) -> float:
+        """Seconds since the last prompt was submitted or finished"""
+        return time.monotonic() - self._last_used
+    
+    def _touch(self) -> None:
+        self._last_used = time.monotonic()
     
-    async def _wait_for_ready(self, timeout: int = 30) -> bool:
+    async def _idle_monitor(self) -> None:
+        """Free VRAM for STT/LLM once image generation has gone quiet."""
+        interval = max(1.0, min(30.0, self.idle_seconds / 4))
+        while self.is_running:
+            await asyncio.sleep(interval)
+            if self._jobs or self.idle_for < self.idle_seconds:
+                continue
+            if self.idle_action == "stop":
+                logger.info("comfyui_idle_stop", idle_seconds=round(self.idle_for))
+                self._idle_task = None  # stop() must not cancel the task running it
+                await self.stop()
+                return
+            if self._models_loaded:
+                logger.info("comfyui_idle_unload", idle_seconds=round(self.idle_for))
+                try:
+                    await self.free_memory()
+                except Exception as e:
+                    logger.warning("comfyui_unload_failed", error=str(e))
+    
+    async def _drain_logs(self, process: asyncio.subprocess.Process) -> None:
+        """Forward ComfyUI's output to our logger, keeping a short tail."""
+        while True:
+            try:
+                line = await process.stdout.readline()
+            except ValueError:
+                # Over-long line (e.g. endless \r progress); take what's buffered
+                line = await process.stdout.read(64 * 1024)
+            if not line:
+                break
+            # Progress bars redraw with carriage returns; keep the last frame
+            text = line.decode("utf-8", errors="replace").rstrip().rsplit("\r", 1)[-1]
+            if not text:
+                continue
+            self._log_tail.append(text)
+            logger.debug("comfyui_log", line=text)
+    
+    async def _wait_for_ready(self, timeout: float = 30) -> bool:
         """
         Wait for ComfyUI server to be ready
         
@@ -124,50 +338,67 @@ class ComfyUIService:
         """
         start_time = asyncio.get_event_loop().time()
         
-        while (asyncio.get_event_loop().time() - start_time) < timeout:
-            if not self.is_running:
-                logger.error("comfyui_process_died")
-                return False
-            
-            try:
-                async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient() as client:
+            while (asyncio.get_event_loop().time() - start_time) < timeout:
+                if not self.is_running:
+                    logger.error("comfyui_process_died", log_tail=list(self._log_tail)[-20:])
+                    return False
+                
+                try:
                     response = await client.get(f"{self.base_url}/system_stats", timeout=2.0)
                     if response.status_code == 200:
                         logger.info("comfyui_ready")
                         return True
-            except (httpx.RequestError, httpx.TimeoutException):
-                pass
-            
-            await asyncio.sleep(1)
+                except (httpx.RequestError, httpx.TimeoutException):
+                    pass
+                
+                await asyncio.sleep(0.5)
         
         logger.error("comfyui_ready_timeout")
         return False
     
     async def stop(self):
         """Stop ComfyUI server"""
+        async with self._start_lock:
+            await self._stop_locked()
+    
+    async def _stop_locked(self):
+        for task in (self._events_task, self._idle_task):
+            if task:
+                task.cancel()
+        self._events_task = None
+        self._idle_task = None
+        self._events_connected.clear()
+        self._fail_jobs(ComfyUIExecutionError("ComfyUI service stopped"))
+        
         if self.client:
             await self.client.aclose()
             self.client = None
         
         if self.process:
             try:
-                # Send SIGTERM to process group
-                os.killpg(os.getpgid(self.process.pid), signal.SIGTERM)
-                
-                # Wait for graceful shutdown
-                try:
-                    self.process.wait(timeout=10)
-                except subprocess.TimeoutExpired:
-                    # Force kill if not stopped
-                    os.killpg(os.getpgid(self.process.pid), signal.SIGKILL)
-                    self.process.wait()
+                if self.process.returncode is None:
+                    # Send SIGTERM to process group
+                    os.killpg(self.process.pid, signal.SIGTERM)
+                    
+                    # Wait for graceful shutdown
+                    try:
+                        await asyncio.wait_for(self.process.wait(), timeout=10)
+                    except asyncio.TimeoutError:
+                        # Force kill if not stopped
+                        os.killpg(self.process.pid, signal.SIGKILL)
+                        await self.process.wait()
                 
                 logger.info("comfyui_stopped")
             except Exception as e:
                 logger.error("comfyui_stop_error", error=str(e))
             finally:
+                if self._log_task:
+                    self._log_task.cancel()
+                    self._log_task = None
                 self.process = None
                 self._is_ready = False
+                self._models_loaded = False
     
     async def health_check(self) -> bool:
         """
@@ -214,21 +445,223 @@ class ComfyUIService:
         Returns:
             Prompt ID
         """
+        job = await self.submit(prompt)
+        return job.prompt_id
+    
+    async def submit(
+        self,
+        prompt: Dict[str, Any],
+        on_progress: Optional[ProgressCallback] = None,
+        on_preview: Optional[PreviewCallback] = None,
+    ) -> ComfyJob:
+        """
+        Queue a workflow and track it through the event socket
+        
+        The prompt ID is chosen here and the job registered before the
+        request is sent, so events for a fast prompt cannot be missed.
+        
+        Args:
+            prompt: ComfyUI workflow prompt dictionary
+            on_progress: Called with (value, max, node) for sampler steps
+            on_preview: Called with (mime type, image bytes) for latent previews
+            
+        Returns:
+            Job to pass to wait()
+        """
         if not self.client:
             raise RuntimeError("ComfyUI service not started")
         
+        # Give a (re)connecting socket a moment so progress isn't missed;
+        # completion is still caught by the history fallback in wait()
+        if not self._events_connected.is_set():
+            try:
+                await asyncio.wait_for(self._events_connected.wait(), timeout=2.0)
+            except asyncio.TimeoutError:
+                logger.warning("comfy_events_not_connected")
+        
+        prompt_id = uuid.uuid4().hex
+        job = ComfyJob(
+            prompt_id=prompt_id,
+            future=asyncio.get_running_loop().create_future(),
+            on_progress=on_progress,
+            on_preview=on_preview,
+        )
+        self._jobs[prompt_id] = job
+        self._touch()
+        
         payload = {
             "prompt": prompt,
-            "client_id": "felix"
+            "client_id": self.client_id,
+            "prompt_id": prompt_id,
         }
         
-        response = await self.client.post("/prompt", json=payload)
-        response.raise_for_status()
-        result = response.json()
+        try:
+            response = await self.client.post("/prompt", json=payload)
+            response.raise_for_status()
+        except Exception:
+            self._jobs.pop(prompt_id, None)
+            raise
         
-        prompt_id = result.get("prompt_id")
         logger.info("prompt_queued", prompt_id=prompt_id)
-        return prompt_id
+        return job
+    
+    async def wait(self, job: ComfyJob, timeout: float = 120.0) -> Dict[str, Any]:
+        """
+        Wait for a submitted prompt to finish
+        
+        Returns the moment ComfyUI reports completion over the event
+        socket. History is only fetched while the socket is down.
+        
+        Returns:
+            Outputs by node ID (e.g. {"9": {"images": [...]}})
+            
+        Raises:
+            ComfyUIExecutionError: The prompt failed or was interrupted
+            asyncio.TimeoutError: Not finished within timeout
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    # Last chance for a completion event that was missed
+                    await self._check_history(job)
+                    if job.future.done():
+                        return job.future.result()
+                    raise asyncio.TimeoutError()
+                
+                connected = self._events_connected.is_set()
+                try:
+                    return await asyncio.wait_for(
+                        asyncio.shield(job.future),
+                        timeout=remaining if connected else min(remaining, EVENTS_FALLBACK_POLL),
+                    )
+                except asyncio.TimeoutError:
+                    if not connected:
+                        await self._check_history(job)
+                        if job.future.done():
+                            return job.future.result()
+        finally:
+            self._jobs.pop(job.prompt_id, None)
+    
+    async def _check_history(self, job: ComfyJob) -> None:
+        """Resolve a job from /history if its completion event was missed."""
+        try:
+            history = await self.get_history(job.prompt_id)
+        except Exception as e:
+            logger.debug("comfy_history_check_failed", prompt_id=job.prompt_id, error=str(e))
+            return
+        entry = history.get(job.prompt_id)
+        if not entry:
+            return
+        status = entry.get("status", {})
+        if status.get("status_str") == "error":
+            self._finish(job.prompt_id, error=ComfyUIExecutionError("Prompt failed in ComfyUI"))
+        elif status.get("completed", "outputs" in entry):
+            job.outputs.update(entry.get("outputs", {}))
+            self._finish(job.prompt_id)
+    
+    def _finish(self, prompt_id: str, error: Optional[Exception] = None) -> None:
+        job = self._jobs.get(prompt_id)
+        if job is None or job.future.done():
+            return
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(job.outputs)
+            self._models_loaded = True
+        self._touch()
+        logger.info("prompt_finished", prompt_id=prompt_id, success=error is None)
+    
+    def _fail_jobs(self, error: Exception) -> None:
+        for prompt_id in list(self._jobs):
+            self._finish(prompt_id, error=error)
+    
+    async def _listen_events(self) -> None:
+        """Keep the event socket connected while the service runs."""
+        import websockets
+        
+        url = f"ws://{self.host}:{self.port}/ws?clientId={self.client_id}"
+        backoff = 0.5
+        while self.is_running:
+            try:
+                async with websockets.connect(url, max_size=None) as ws:
+                    self._events_connected.set()
+                    backoff = 0.5
+                    logger.info("comfy_events_connected", client_id=self.client_id)
+                    
+                    # Catch completions that happened while disconnected
+                    for job in list(self._jobs.values()):
+                        await self._check_history(job)
+                    
+                    async for message in ws:
+                        await self._handle_event(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("comfy_events_disconnected", error=str(e))
+            finally:
+                self._events_connected.clear()
+            
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 10.0)
+    
+    async def _handle_event(self, message) -> None:
+        """Route one WebSocket message to the job it belongs to."""
+        if isinstance(message, bytes):
+            await self._handle_binary(message)
+            return
+        
+        try:
+            event = json.loads(message)
+        except ValueError:
+            return
+        kind = event.get("type")
+        data = event.get("data") or {}
+        prompt_id = data.get("prompt_id")
+        job = self._jobs.get(prompt_id) if prompt_id else None
+        
+        if kind == "execution_start":
+            self._executing = prompt_id
+        elif kind == "executing":
+            if data.get("node") is None:
+                # node=None is ComfyUI's "prompt done" signal
+                if prompt_id == self._executing:
+                    self._executing = None
+                self._finish(prompt_id)
+            else:
+                self._executing = prompt_id
+        elif kind == "executed" and job is not None:
+            if data.get("output") is not None:
+                job.outputs[data["node"]] = data["output"]
+        elif kind == "execution_success":
+            self._finish(prompt_id)
+        elif kind == "execution_error":
+            message = data.get("exception_message") or "Prompt failed in ComfyUI"
+            self._finish(prompt_id, error=ComfyUIExecutionError(message.strip()))
+        elif kind == "execution_interrupted":
+            self._finish(prompt_id, error=ComfyUIExecutionError("Prompt was interrupted"))
+        elif kind == "progress" and job is not None and job.on_progress:
+            try:
+                await job.on_progress(data.get("value", 0), data.get("max", 0), data.get("node"))
+            except Exception as e:
+                logger.debug("comfy_progress_callback_failed", error=str(e))
+    
+    async def _handle_binary(self, message: bytes) -> None:
+        """Forward latent previews to the job that is currently executing."""
+        if len(message) < 8:
+            return
+        event, image_format = struct.unpack(">II", message[:8])
+        if event != PREVIEW_IMAGE_EVENT:
+            return
+        job = self._jobs.get(self._executing) if self._executing else None
+        if job is None or job.on_preview is None:
+            return
+        try:
+            await job.on_preview(PREVIEW_MIME_TYPES.get(image_format, "image/jpeg"), message[8:])
+        except Exception as e:
+            logger.debug("comfy_preview_callback_failed", error=str(e))
     
     async def get_image(self, filename: str, subfolder: str = "", folder_type: str = "output") -> bytes:
         """
@@ -296,7 +729,12 @@ async def initialize_comfy_service(auto_start: bool = True) -> Optional[ComfyUIS
     global _comfy_service
     
     try:
-        _comfy_service = ComfyUIService()
+        _comfy_service = ComfyUIService(
+            checkpoint=settings.comfy_checkpoint,
+            start_timeout=settings.comfy_start_timeout,
+            idle_seconds=settings.comfy_idle_seconds,
+            idle_action=settings.comfy_idle_action,
+        )
         
         if auto_start:
             success = await _comfy_service.start()
@@ -318,5 +756,7 @@ async def shutdown_comfy_service():
     global _comfy_service
     
     if _comfy_service:
+        if _comfy_service.is_starting:
+            _comfy_service._start_task.cancel()
         await _comfy_service.stop()
         _comfy_service = None
@@ -27,10 +27,24 @@ class Settings(BaseSettings):
     ollama_model: str = Field(default="llama3.2", description="Ollama model")
     ollama_temperature: float = Field(default=0.7, ge=0, le=2)
     ollama_max_tokens: int = Field(default=500, ge=1)
+    llm_endpoints: dict[str, list[str]] = Field(
+        default_factory=dict,
+        description='Route models across several backend URLs, e.g. {"llama3.2": ["http://gpu1:11434", "http://gpu2:11434"]}; "*" matches any model',
+    )
+    llm_router_sticky_slack: int = Field(default=1, ge=0, description="Extra in-flight requests tolerated to keep a session on its endpoint")
+    llm_router_health_interval: float = Field(default=10.0, gt=0, description="Seconds between endpoint health probes")
+    llm_speculative_enabled: bool = Field(default=False, description="Start the LLM on stable interim transcripts")
+    llm_speculative_stable_ms: int = Field(default=200, ge=0, description="Pause after an interim transcript before speculating")
     
     # TTS Settings (Piper - local)
     tts_engine: Literal["piper", "clone"] = Field(default="piper")
     tts_voice: str = Field(default="amy", description="Voice: amy, lessac, ryan")
+    tts_cache_enabled: bool = Field(default=True, description="Cache synthesized audio by voice, rate and text")
+    tts_cache_memory_mb: int = Field(default=64, ge=0, description="In-memory TTS cache budget")
+    tts_cache_disk_mb: int = Field(default=512, ge=0, description="On-disk TTS cache budget (0 disables the disk tier)")
+    tts_cache_dir: str = Field(default="", description="On-disk TTS cache directory (default: data/tts_cache)")
+    tts_cache_prewarm: bool = Field(default=True, description="Synthesize common phrases into the cache at startup")
+    tts_cache_prewarm_file: str = Field(default="", description="Extra phrases to prewarm, one per line")
     
     # Server Settings
     server_host: str = Field(default="0.0.0.0")
@@ -40,12 +54,70 @@ class Settings(BaseSettings):
     audio_sample_rate: int = Field(default=16000)
     audio_channels: int = Field(default=1)
     audio_chunk_ms: int = Field(default=30)
+    vad_model_dir: str = Field(default="models/vad", description="Local Silero VAD weights (silero_vad.jit) used before torch.hub")
+    audio_ingest_max_frames: int = Field(default=64, description="Per-session microphone frame queue capacity")
+    audio_ingest_coalesce_ms: int = Field(default=1000, description="Largest batch of queued frames merged when behind")
+    
+    # Session Governance
+    session_audio_max_seconds: float = Field(default=30.0, gt=0, description="Longest utterance buffered per session")
+    session_history_max_kb: int = Field(default=256, ge=1, description="Conversation text kept in memory per session")
+    session_idle_seconds: float = Field(default=900.0, gt=0, description="Idle time before a connected session's history is spilled to disk")
+    session_resume_ttl: float = Field(default=300.0, ge=0, description="How long a disconnected session stays in memory for instant resume")
+    session_store_dir: str = Field(default="", description="Spilled session history directory (default: data/sessions)")
+    session_store_max_age_hours: float = Field(default=168.0, gt=0, description="Spilled sessions older than this cannot be resumed")
+    
+    # End-of-turn Settings
+    endpoint_min_silence_ms: int = Field(default=300, description="Trailing silence that ends a turn by default")
+    endpoint_fast_silence_ms: int = Field(default=150, description="Trailing silence when the user is clearly finished")
+    endpoint_max_silence_ms: int = Field(default=900, description="Trailing silence when the user is mid-thought")
+    endpoint_min_utterance_ms: int = Field(default=500, description="Shortest utterance sent to STT")
+    endpoint_use_transcript: bool = Field(default=False, description="Transcribe pauses and use sentence completeness as a hint")
     
     # Barge-in Settings
     barge_in_enabled: bool = Field(default=True)
     barge_in_threshold: float = Field(default=0.5, ge=0, le=1)
     barge_in_min_speech_ms: int = Field(default=150)
     
+    # ComfyUI (image generation)
+    comfy_autostart: bool = Field(default=True, description="Start ComfyUI in the background at startup when image tools are enabled")
+    comfy_warmup: bool = Field(default=True, description="Preload the default checkpoint with a one-step prompt after starting")
+    comfy_checkpoint: str = Field(default="v1-5-pruned.safetensors", description="Checkpoint used for image generation and warm-up")
+    comfy_start_timeout: float = Field(default=60.0, gt=0, description="Seconds to wait for ComfyUI to answer after launch")
+    comfy_idle_seconds: float = Field(default=600.0, ge=0, description="Idle time before freeing VRAM (0 keeps models loaded)")
+    comfy_idle_action: Literal["unload", "stop"] = Field(default="unload", description="On idle: unload models or stop ComfyUI")
+    
+    # Tools
+    tools_disabled: list[str] = Field(
+        default_factory=list,
+        description='Tool categories or modules to leave out, e.g. ["music", "memory", "image"]',
+    )
+    tool_blocking_workers: int = Field(default=4, ge=1, description="Threads for tools that block (model inference, psutil sampling)")
+    tool_auto_offload: list[str] = Field(
+        default_factory=list,
+        description='Async tools checked to use nothing bound to the server loop; moved to the blocking pool once they stall it, e.g. ["web_search"]',
+    )
+    
+    # web_search deep mode: read the top result pages and digest them
+    web_deep_pages: int = Field(default=4, ge=1, le=10, description="Result pages fetched by web_search(deep=true)")
+    web_deep_budget: float = Field(default=6.0, gt=0, description="Total seconds a deep search may take, search included")
+    web_fetch_timeout: float = Field(default=4.0, gt=0, description="Connect/read timeout per page")
+    web_per_host: int = Field(default=2, ge=1, description="Concurrent page fetches per host")
+    web_digest_chars: int = Field(default=1800, ge=200, description="Longest digest returned by a deep search")
+    web_cache_pages: int = Field(default=128, ge=0, description="Extracted pages kept in memory")
+    web_cache_fresh_seconds: float = Field(default=600.0, ge=0, description="Age after which a cached page is revalidated (ETag/Last-Modified)")
+    
+    # Event-loop monitoring
+    loop_stall_threshold_ms: float = Field(default=100.0, gt=0, description="Event-loop lag reported as a stall, with the stalled stack")
+    
+    # Model worker processes (empty runs every model in the web process)
+    model_workers: dict[str, int] = Field(
+        default_factory=dict,
+        description='Model families run in worker processes, and how many of each, e.g. {"stt": 2, "embeddings": 1}',
+    )
+    worker_audio_slots: int = Field(default=4, ge=1, description="Shared-memory audio slots per worker process")
+    worker_max_restarts: int = Field(default=5, ge=0, description="Restarts per worker within five minutes before it is left down")
+    worker_call_timeout: float = Field(default=60.0, gt=0, description="Longest a worker call may run before the worker is restarted")
+    
     # Logging
     log_level: str = Field(default="INFO")
     
@@ -53,6 +125,13 @@ class Settings(BaseSettings):
     otel_enabled: bool = Field(default=False, description="Enable OpenTelemetry tracing")
     otel_endpoint: str = Field(default="http://localhost:4318/v1/traces", description="OTLP endpoint")
     
+    # Startup
+    startup_warmup: bool = Field(default=True, description="Run one inference per model at startup")
+    startup_timeout: float = Field(default=300.0, gt=0, description="Seconds allowed per startup component")
+    
+    # Metrics
+    metrics_enabled: bool = Field(default=True, description="Serve Prometheus metrics at /metrics")
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
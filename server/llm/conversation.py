@@ -2,9 +2,10 @@
 Conversation History Management
 Maintains context for LLM interactions.
 """
-from dataclasses import dataclass, field
-from typing import Optional
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Optional
 from collections import deque
+import json
 import time
 
 
@@ -17,6 +18,14 @@ class Message:
     name: Optional[str] = None  # For tool messages
     tool_call_id: Optional[str] = None  # For tool responses
     tool_calls: Optional[list] = None  # For assistant tool calls
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the message text."""
+        size = len(self.content.encode("utf-8"))
+        if self.tool_calls:
+            size += len(json.dumps(self.tool_calls))
+        return size
 
 
 class ConversationHistory:
@@ -29,6 +38,7 @@ class ConversationHistory:
         system_prompt: str = None,
         max_messages: int = 50,
         max_tokens_estimate: int = 4000,
+        max_bytes: Optional[int] = None,
     ):
         """
         Initialize conversation history.
@@ -37,12 +47,59 @@ class ConversationHistory:
             system_prompt: System message for the conversation
             max_messages: Maximum messages to keep
             max_tokens_estimate: Rough token limit for context
+            max_bytes: Cap on message text held in memory (oldest dropped first)
         """
         self.system_prompt = system_prompt or self._default_system_prompt()
         self.max_messages = max_messages
         self.max_tokens_estimate = max_tokens_estimate
+        self.max_bytes = max_bytes
+        
+        self._history: deque[Message] = deque(maxlen=max_messages)
+        self._loader: Optional[Callable[[], list[dict]]] = None
+    
+    @property
+    def _messages(self) -> deque[Message]:
+        """Messages, loading spilled history on first access."""
+        if self._loader is not None:
+            loader, self._loader = self._loader, None
+            restored = [Message(**record) for record in loader()]
+            # Anything added before the load is newer than the spilled history
+            newer = list(self._history)
+            self._history.clear()
+            self._history.extend(restored + newer)
+            self._enforce_byte_cap()
+        return self._history
+    
+    @property
+    def loaded(self) -> bool:
+        """False while spilled history is waiting to be read back."""
+        return self._loader is None
+    
+    def defer(self, loader: Callable[[], list[dict]]) -> None:
+        """
+        Drop messages from memory; `loader` returns them on next access.
         
-        self._messages: deque[Message] = deque(maxlen=max_messages)
+        Args:
+            loader: Returns the records written by to_records()
+        """
+        self._history.clear()
+        self._loader = loader
+    
+    def to_records(self) -> list[dict]:
+        """Messages as plain dicts for storage."""
+        return [asdict(msg) for msg in self._messages]
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by messages (0 while spilled)."""
+        return sum(msg.nbytes for msg in self._history)
+    
+    def _enforce_byte_cap(self) -> None:
+        if self.max_bytes is None:
+            return
+        size = self.nbytes
+        while size > self.max_bytes and len(self._history) > 2:
+            size -= self._history.popleft().nbytes
     
     def _default_system_prompt(self) -> str:
         return """You are a helpful voice assistant named Nova. Your responses will be spoken aloud.
@@ -81,6 +138,7 @@ IMPORTANT: Use knowledge_search FIRST for any factual questions. It contains loc
     def add_user_message(self, content: str) -> None:
         """Add a user message."""
         self._messages.append(Message(role="user", content=content))
+        self._enforce_byte_cap()
     
     def add_assistant_message(
         self,
@@ -93,6 +151,7 @@ IMPORTANT: Use knowledge_search FIRST for any factual questions. It contains loc
             content=content,
             tool_calls=tool_calls
         ))
+        self._enforce_byte_cap()
     
     def add_tool_result(
         self,
@@ -107,6 +166,7 @@ IMPORTANT: Use knowledge_search FIRST for any factual questions. It contains loc
             name=tool_name,
             tool_call_id=tool_call_id
         ))
+        self._enforce_byte_cap()
     
     def get_messages(self, include_system: bool = True) -> list[dict]:
         """
@@ -158,7 +218,11 @@ IMPORTANT: Use knowledge_search FIRST for any factual questions. It contains loc
     
     def clear(self) -> None:
         """Clear conversation history."""
-        self._messages.clear()
+        self._loader = None
+        self._history.clear()
+    
+    def __len__(self) -> int:
+        return len(self._messages)
     
     def estimate_tokens(self) -> int:
         """Rough estimate of token count."""
@@ -6,12 +6,17 @@ Streaming responses with function/tool calling support.
 import asyncio
 import json
 import re
+import time
 from typing import AsyncGenerator, Optional, Any, Literal
 import httpx
 import structlog
 
+from .. import metrics
 from ..config import settings
 from .conversation import ConversationHistory
+from .profile import LLMProfile
+from .router import RETRYABLE_ERRORS, LLMRouter, NoHealthyEndpoint, get_llm_router
+from .transport import get_transport_pool
 
 logger = structlog.get_logger()
 
@@ -191,7 +196,6 @@ class LLMClient:
         self.max_tokens = max_tokens or settings.ollama_max_tokens
         self.api_key = api_key or getattr(settings, 'openai_api_key', '')
         
-        self._client: Optional[httpx.AsyncClient] = None
         self._tools: list[dict] = []
         self._tool_handlers: dict[str, callable] = {}
         
@@ -203,6 +207,30 @@ class LLMClient:
             temperature=self.temperature
         )
     
+    @classmethod
+    def from_profile(cls, profile: LLMProfile) -> "LLMClient":
+        """Client for one session's profile, on the shared transports."""
+        return cls(
+            backend=profile.backend,
+            base_url=profile.base_url,
+            model=profile.model,
+            temperature=profile.temperature,
+            max_tokens=profile.max_tokens,
+            api_key=profile.api_key,
+        )
+    
+    @property
+    def profile(self) -> LLMProfile:
+        """Current configuration as an immutable profile."""
+        return LLMProfile(
+            backend=self.backend,
+            base_url=self.base_url,
+            model=self.model,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            api_key=self.api_key,
+        )
+    
     def update_config(
         self,
         backend: BackendType = None,
@@ -212,7 +240,9 @@ class LLMClient:
     ) -> None:
         """
         Update client configuration.
-        Closes existing client connection to force reconnection.
+        
+        Connections live in the shared transport pool and are not closed;
+        requests simply go to the pooled client for the new URL.
         """
         if backend:
             self.backend = backend
@@ -223,11 +253,6 @@ class LLMClient:
         if api_key is not None:
             self.api_key = api_key
         
-        # Close existing client so it reconnects with new config
-        if self._client:
-            asyncio.create_task(self._client.aclose())
-            self._client = None
-        
         logger.info(
             "llm_client_reconfigured",
             backend=self.backend,
@@ -235,26 +260,27 @@ class LLMClient:
             model=self.model
         )
     
+    def _auth_headers(self) -> dict:
+        """Request headers carrying the API key, if any."""
+        headers = {}
+        # Add API key for OpenAI-compatible backends
+        if self.api_key and self.backend in ("openai", "lmstudio"):
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+    
     async def _get_client(self) -> httpx.AsyncClient:
-        """Get or create HTTP client."""
-        if self._client is None:
-            headers = {}
-            # Add API key for OpenAI-compatible backends
-            if self.api_key and self.backend in ("openai", "lmstudio"):
-                headers["Authorization"] = f"Bearer {self.api_key}"
-            
-            self._client = httpx.AsyncClient(
-                base_url=self.base_url,
-                headers=headers,
-                timeout=httpx.Timeout(60.0, connect=10.0)
-            )
-        return self._client
+        """Get the shared HTTP client for this URL and API key."""
+        return get_transport_pool().client(self.base_url, self._auth_headers())
+    
+    def _get_router(self) -> Optional[LLMRouter]:
+        """The endpoint router, if one is configured for this backend and model."""
+        router = get_llm_router()
+        if router is not None and router.backend == self.backend and router.routes(self.model):
+            return router
+        return None
     
     async def close(self) -> None:
-        """Close the HTTP client."""
-        if self._client:
-            await self._client.aclose()
-            self._client = None
+        """Release the client; pooled connections stay open for other users."""
     
     def register_tool(
         self,
@@ -331,20 +357,31 @@ class LLMClient:
         self,
         messages: list[dict],
         stream: bool = True,
+        execute_tools: bool = True,
+        session_key: Optional[str] = None,
     ) -> AsyncGenerator[dict, None]:
         """
         Send a chat completion request with streaming.
         
+        When an endpoint router is configured for the model, streaming
+        requests go to the least-loaded endpoint and fail over to another
+        one on connection errors.
+        
         Args:
             messages: Conversation messages
             stream: Whether to stream the response
+            execute_tools: Run tool handlers and yield "tool_result" chunks;
+                set False to only report tool calls (e.g. speculative runs)
+            session_key: Session id used to keep a conversation on the same
+                endpoint (KV-cache locality) when routing
             
         Yields:
-            Response chunks with type: "text", "tool_call", or "tool_result"
+            Response chunks with type: "text", "tool_call", "tool_result",
+            or "usage" (timing and token counts for metrics)
         """
-        client = await self._get_client()
         endpoint = self._get_api_endpoint()
         request_body = self._build_request_body(messages, stream)
+        router = self._get_router() if stream else None
         
         logger.info(
             "chat_request_start", 
@@ -356,13 +393,26 @@ class LLMClient:
         )
         
         try:
-            if stream:
-                async for chunk in self._stream_chat(client, request_body, endpoint):
+            if router is not None:
+                async for chunk in self._routed_chat(router, request_body, endpoint, execute_tools, session_key):
+                    yield chunk
+            elif stream:
+                client = await self._get_client()
+                async for chunk in self._stream_chat(client, request_body, endpoint, execute_tools):
                     yield chunk
             else:
+                client = await self._get_client()
+                started = time.perf_counter()
                 response = await client.post(endpoint, json=request_body)
                 response.raise_for_status()
                 data = response.json()
+                elapsed = time.perf_counter() - started
+                yield {
+                    "type": "usage",
+                    "backend": self.backend,
+                    "ttft_seconds": elapsed,
+                    **self._usage_from_final(data, elapsed),
+                }
                 
                 # Handle response based on backend format
                 if self.backend == "ollama" and "message" in data:
@@ -387,11 +437,59 @@ class LLMClient:
             logger.error("chat_error", error=str(e), backend=self.backend)
             raise
     
+    async def _routed_chat(
+        self,
+        router: LLMRouter,
+        request_body: dict,
+        endpoint: str,
+        execute_tools: bool,
+        session_key: Optional[str],
+    ) -> AsyncGenerator[dict, None]:
+        """
+        Stream from a routed endpoint, failing over on connection errors.
+        
+        `_stream_chat` yields nothing until the backend has finished, so a
+        connection that drops mid-generation can be retried on another
+        endpoint without the caller seeing a partial answer.
+        """
+        tried: set[str] = set()
+        last_error: Optional[BaseException] = None
+        while True:
+            try:
+                target = router.select(self.model, session_key, frozenset(tried))
+            except NoHealthyEndpoint:
+                if last_error is not None:
+                    raise last_error
+                raise
+            tried.add(target.url)
+            client = router.client_for(target, self._auth_headers())
+            yielded = False
+            
+            with router.track(target) as lease:
+                try:
+                    async for chunk in self._stream_chat(client, request_body, endpoint, execute_tools):
+                        if chunk["type"] == "usage":
+                            # Backend is done; tool execution is not its load
+                            lease.release()
+                            router.record_success(target, chunk.get("ttft_seconds"))
+                        yielded = True
+                        yield chunk
+                    return
+                except RETRYABLE_ERRORS as e:
+                    router.record_failure(target, e)
+                    if yielded:
+                        raise
+                    last_error = e
+            
+            metrics.LLM_ENDPOINT_FAILOVERS.inc()
+            logger.warning("llm_failover", endpoint=target.url, model=self.model, error=str(last_error))
+    
     async def _stream_chat(
         self,
         client: httpx.AsyncClient,
         request_body: dict,
-        endpoint: str
+        endpoint: str,
+        execute_tools: bool = True,
     ) -> AsyncGenerator[dict, None]:
         """Stream chat completion responses."""
         
@@ -404,6 +502,11 @@ class LLMClient:
         recent_phrases = []
         repetition_threshold = 4  # Stop if same phrase repeated 4+ times
         
+        # Timing for the usage chunk
+        started = time.perf_counter()
+        first_token_at: Optional[float] = None
+        final_data: dict = {}
+        
         async with client.stream("POST", endpoint, json=request_body) as response:
             response.raise_for_status()
             
@@ -422,6 +525,11 @@ class LLMClient:
                 except json.JSONDecodeError:
                     continue
                 
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                if "eval_count" in data or "usage" in data:
+                    final_data = data
+                
                 # Handle streaming content based on backend format
                 if self.backend == "ollama" and "message" in data:
                     message = data["message"]
@@ -495,6 +603,19 @@ class LLMClient:
                     if repetition_detected:
                         break  # Exit the line iteration loop
         
+        finished = time.perf_counter()
+        first_token_at = first_token_at or finished
+        usage = {
+            "type": "usage",
+            "backend": self.backend,
+            "ttft_seconds": first_token_at - started,
+            **self._usage_from_final(final_data, finished - first_token_at),
+        }
+        if not usage.get("output_tokens") and accumulated_content:
+            # Rough estimate: ~4 chars per token
+            usage["output_tokens"] = max(1, len(accumulated_content) // 4)
+        yield usage
+        
         # After streaming completes, decide what to yield
         # If we got tool calls via API, DON'T yield the text content
         # (llama3.2 sometimes outputs partial JSON in content when using tools)
@@ -659,6 +780,9 @@ class LLMClient:
                 "arguments": tool_args
             }
             
+            if not execute_tools:
+                continue
+            
             # Execute tool
             try:
                 handler = self._tool_handlers[tool_name]
@@ -680,6 +804,22 @@ class LLMClient:
                     "result": f"Error: {str(e)}"
                 }
         
+    @staticmethod
+    def _usage_from_final(data: dict, decode_seconds: float) -> dict:
+        """Extract token counts from a final Ollama or OpenAI-style payload."""
+        if "eval_count" in data:
+            # Ollama reports decode time in nanoseconds
+            eval_ns = data.get("eval_duration") or 0
+            return {
+                "output_tokens": data["eval_count"],
+                "decode_seconds": eval_ns / 1e9 if eval_ns else decode_seconds,
+            }
+        usage = data.get("usage") or {}
+        return {
+            "output_tokens": usage.get("completion_tokens"),
+            "decode_seconds": decode_seconds,
+        }
+    
     async def generate_response(
         self,
         user_input: str,
@@ -800,7 +940,7 @@ async def list_models_for_backend(
 ) -> list[dict]:
     """
     List models for a specific backend configuration.
-    Creates a temporary client to fetch models.
+    Creates a temporary client (on the shared transports) to fetch models.
     
     Args:
         backend: Backend type (ollama, lmstudio, openai)
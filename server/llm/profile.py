@@ -0,0 +1,54 @@
+"""
+Per-session LLM Profiles
+Immutable description of which backend, URL and model a session uses.
+"""
+from dataclasses import dataclass, replace
+
+from ..config import settings
+
+DEFAULT_URLS = {
+    "ollama": "ollama_url",
+    "lmstudio": "lmstudio_url",
+    "openai": "openai_url",
+}
+
+
+@dataclass(frozen=True)
+class LLMProfile:
+    """
+    One session's LLM selection.
+
+    Sessions swap in a new profile instead of mutating shared clients, so
+    concurrent sessions can use different models and backends.
+    """
+    backend: str = "ollama"
+    base_url: str = "http://localhost:11434"
+    model: str = "llama3.2"
+    temperature: float = 0.7
+    max_tokens: int = 500
+    api_key: str = ""
+
+    @classmethod
+    def from_settings(cls) -> "LLMProfile":
+        """Server-wide defaults."""
+        backend = settings.llm_backend
+        return cls(
+            backend=backend,
+            base_url=default_url(backend),
+            model=settings.ollama_model,
+            temperature=settings.ollama_temperature,
+            max_tokens=settings.ollama_max_tokens,
+            api_key=settings.openai_api_key,
+        )
+
+    def updated(self, **changes) -> "LLMProfile":
+        """Copy with the given (non-None) fields changed."""
+        changes = {k: v for k, v in changes.items() if v is not None}
+        if "base_url" in changes:
+            changes["base_url"] = changes["base_url"].rstrip("/")
+        return replace(self, **changes)
+
+
+def default_url(backend: str) -> str:
+    """Configured URL for a backend type."""
+    return getattr(settings, DEFAULT_URLS.get(backend, "ollama_url")).rstrip("/")
@@ -0,0 +1,280 @@
+"""
+LLM Endpoint Router
+Spreads chat requests for a model across several backend instances
+(e.g. one Ollama per GPU) with least-loaded routing, session stickiness,
+health tracking and failover.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+import httpx
+import structlog
+
+from .. import metrics
+from ..config import settings
+from .transport import get_transport_pool
+
+logger = structlog.get_logger()
+
+# Any model without its own endpoint list uses this key
+DEFAULT_MODEL_KEY = "*"
+
+# Connection-level failures that are safe to retry on another endpoint
+RETRYABLE_ERRORS = (httpx.TransportError,)
+
+
+class NoHealthyEndpoint(RuntimeError):
+    """Every endpoint for a model is down or already tried."""
+
+
+@dataclass
+class Endpoint:
+    """One backend instance and its live load and health."""
+    url: str
+    in_flight: int = 0
+    latency_ewma: float = 0.0       # Seconds to first token, smoothed
+    failures: int = 0               # Consecutive failures
+    down_until: float = 0.0         # Monotonic time it may be retried
+    requests: int = 0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def load_score(self, default_latency: float = 1.0) -> float:
+        """Expected wait: queue depth times typical latency (lower is better)."""
+        return (self.in_flight + 1) * (self.latency_ewma or default_latency)
+
+
+@dataclass
+class _Sticky:
+    url: str
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class _Lease:
+    """One in-flight request on an endpoint."""
+
+    def __init__(self, endpoint: Endpoint):
+        self.endpoint = endpoint
+        self._gauge = metrics.LLM_ENDPOINT_IN_FLIGHT.labels(endpoint=endpoint.url)
+        self._released = False
+        endpoint.in_flight += 1
+        endpoint.requests += 1
+        self._gauge.set(endpoint.in_flight)
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self.endpoint.in_flight -= 1
+            self._gauge.set(self.endpoint.in_flight)
+
+    def __enter__(self) -> "_Lease":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class LLMRouter:
+    """
+    Routes chat requests for a model to one of its endpoints.
+
+    Selection prefers the session's previous endpoint (its KV cache holds
+    the conversation prefix) unless that endpoint is down or clearly busier
+    than the least-loaded one; otherwise the endpoint with the lowest
+    (in-flight + 1) x latency score wins. Failed endpoints back off
+    exponentially and are brought back by health checks or the backoff
+    expiring.
+    """
+
+    def __init__(
+        self,
+        endpoints: dict[str, list[str]],
+        backend: str = "ollama",
+        sticky_slack: int = 1,
+        sticky_ttl: float = 600.0,
+        max_backoff: float = 30.0,
+        latency_alpha: float = 0.3,
+    ):
+        """
+        Args:
+            endpoints: Model name -> base URLs ("*" for any other model)
+            backend: API flavour shared by all endpoints
+            sticky_slack: Extra in-flight requests tolerated to stay sticky
+            sticky_ttl: Seconds a session keeps its endpoint while idle
+            max_backoff: Longest time an endpoint is skipped after failures
+            latency_alpha: EWMA weight of the newest latency sample
+        """
+        self.backend = backend
+        self.sticky_slack = sticky_slack
+        self.sticky_ttl = sticky_ttl
+        self.max_backoff = max_backoff
+        self.latency_alpha = latency_alpha
+
+        self._endpoints: dict[str, Endpoint] = {}
+        self._models: dict[str, list[Endpoint]] = {}
+        for model, urls in endpoints.items():
+            pool = []
+            for url in urls:
+                url = url.rstrip("/")
+                endpoint = self._endpoints.setdefault(url, Endpoint(url))
+                pool.append(endpoint)
+            if pool:
+                self._models[model] = pool
+
+        self._sticky: dict[str, _Sticky] = {}
+
+    @property
+    def endpoints(self) -> list[Endpoint]:
+        return list(self._endpoints.values())
+
+    def routes(self, model: str) -> bool:
+        """Whether requests for `model` go through the router."""
+        return model in self._models or DEFAULT_MODEL_KEY in self._models
+
+    def _pool(self, model: str) -> list[Endpoint]:
+        return self._models.get(model) or self._models.get(DEFAULT_MODEL_KEY, [])
+
+    def select(
+        self,
+        model: str,
+        session_key: Optional[str] = None,
+        exclude: frozenset[str] = frozenset(),
+    ) -> Endpoint:
+        """
+        Pick an endpoint for one request.
+
+        Args:
+            model: Model being requested
+            session_key: Stable per-session id for KV-cache stickiness
+            exclude: URLs already tried for this request
+
+        Raises:
+            NoHealthyEndpoint: Nothing left to try
+        """
+        candidates = [e for e in self._pool(model) if e.url not in exclude]
+        if not candidates:
+            raise NoHealthyEndpoint(f"No endpoints left for model '{model}'")
+
+        healthy = [e for e in candidates if e.healthy]
+        if not healthy:
+            # All backing off: try the one that comes back soonest
+            healthy = [min(candidates, key=lambda e: e.down_until)]
+
+        # Unmeasured endpoints are assumed to be as fast as the measured average
+        measured = [e.latency_ewma for e in healthy if e.latency_ewma]
+        default_latency = sum(measured) / len(measured) if measured else 1.0
+        best = min(healthy, key=lambda e: (e.load_score(default_latency), e.in_flight))
+
+        if session_key is not None:
+            sticky = self._sticky.get(session_key)
+            if sticky is not None and time.monotonic() - sticky.last_used < self.sticky_ttl:
+                previous = next((e for e in healthy if e.url == sticky.url), None)
+                if previous is not None and previous.in_flight <= best.in_flight + self.sticky_slack:
+                    best = previous
+            self._sticky[session_key] = _Sticky(best.url)
+
+        return best
+
+    def forget(self, session_key: str) -> None:
+        """Drop a session's stickiness (e.g. on disconnect)."""
+        self._sticky.pop(session_key, None)
+
+    def track(self, endpoint: Endpoint) -> "_Lease":
+        """
+        Count a request as in flight on `endpoint`.
+
+        Use as a context manager; call `release()` to end it early (e.g.
+        once the HTTP stream is finished but tools are still running).
+        """
+        return _Lease(endpoint)
+
+    def record_success(self, endpoint: Endpoint, latency: Optional[float] = None) -> None:
+        """Mark an endpoint healthy and fold in a latency sample."""
+        if endpoint.failures:
+            logger.info("llm_endpoint_recovered", endpoint=endpoint.url)
+        endpoint.failures = 0
+        endpoint.down_until = 0.0
+        if latency is not None and latency >= 0:
+            if endpoint.latency_ewma:
+                alpha = self.latency_alpha
+                endpoint.latency_ewma = alpha * latency + (1 - alpha) * endpoint.latency_ewma
+            else:
+                endpoint.latency_ewma = latency
+        metrics.LLM_ENDPOINT_HEALTHY.labels(endpoint=endpoint.url).set(1)
+
+    def record_failure(self, endpoint: Endpoint, error: Optional[BaseException] = None) -> None:
+        """Back off an endpoint after a connection-level failure."""
+        endpoint.failures += 1
+        backoff = min(self.max_backoff, 0.5 * 2 ** (endpoint.failures - 1))
+        endpoint.down_until = time.monotonic() + backoff
+        metrics.LLM_ENDPOINT_HEALTHY.labels(endpoint=endpoint.url).set(0)
+        logger.warning(
+            "llm_endpoint_failed",
+            endpoint=endpoint.url,
+            failures=endpoint.failures,
+            backoff=backoff,
+            error=str(error) if error else None,
+        )
+
+    def client_for(self, endpoint: Endpoint, headers: Optional[dict] = None) -> httpx.AsyncClient:
+        """Shared HTTP client for an endpoint."""
+        return get_transport_pool().client(endpoint.url, headers)
+
+    async def check_health(self) -> None:
+        """Probe every endpoint once."""
+        path = "/api/tags" if self.backend == "ollama" else "/v1/models"
+
+        async def probe(endpoint: Endpoint) -> None:
+            try:
+                response = await self.client_for(endpoint).get(path, timeout=5.0)
+                if response.status_code < 500:
+                    self.record_success(endpoint)
+                else:
+                    self.record_failure(endpoint, RuntimeError(f"HTTP {response.status_code}"))
+            except httpx.HTTPError as e:
+                self.record_failure(endpoint, e)
+
+        await asyncio.gather(*(probe(e) for e in self._endpoints.values()))
+
+    async def run_health_checks(self, interval: float = 10.0) -> None:
+        """Probe endpoints forever; run as a background task."""
+        while True:
+            await self.check_health()
+            await asyncio.sleep(interval)
+
+    def status(self) -> list[dict]:
+        """Endpoint snapshot for /health."""
+        return [
+            {
+                "url": e.url,
+                "healthy": e.healthy,
+                "in_flight": e.in_flight,
+                "latency_ms": round(e.latency_ewma * 1000, 1),
+                "requests": e.requests,
+            }
+            for e in self._endpoints.values()
+        ]
+
+
+# Global instance
+_router: Optional[LLMRouter] = None
+
+
+def get_llm_router() -> Optional[LLMRouter]:
+    """Get the shared router, or None if no endpoints are configured."""
+    global _router
+    if _router is None and settings.llm_endpoints:
+        _router = LLMRouter(
+            settings.llm_endpoints,
+            backend=settings.llm_backend,
+            sticky_slack=settings.llm_router_sticky_slack,
+        )
+        logger.info(
+            "llm_router_init",
+            models=list(settings.llm_endpoints),
+            endpoints=[e.url for e in _router.endpoints],
+        )
+    return _router
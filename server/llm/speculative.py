@@ -0,0 +1,150 @@
+"""
+Speculative LLM Responses
+Start generating on a stable interim transcript and keep the result only
+if the final transcript says the same thing.
+"""
+import asyncio
+import re
+import time
+from typing import AsyncGenerator, AsyncIterator, Optional
+import structlog
+
+from .. import metrics
+
+logger = structlog.get_logger()
+
+_PUNCTUATION = re.compile(r"[^\w\s']")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_transcript(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace for comparison."""
+    text = _PUNCTUATION.sub(" ", text.lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class SpeculativeResponse:
+    """
+    One speculative chat stream, buffered until committed or cancelled.
+
+    The stream must not have side effects (use `execute_tools=False`): tool
+    calls are only recorded and are executed by the caller on commit.
+    """
+
+    def __init__(self, transcript: str, stream: AsyncIterator[dict]):
+        """
+        Args:
+            transcript: Interim transcript the request was built from
+            stream: Chat chunk stream, e.g. `client.chat(..., execute_tools=False)`
+        """
+        self.transcript = transcript
+        self.normalized = normalize_transcript(transcript)
+        self._stream = stream
+        self._chunks: list[dict] = []
+        self._changed = asyncio.Event()
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._task: Optional[asyncio.Task] = None
+        self._settled = False
+        self._started_at = 0.0
+
+    def start(self) -> "SpeculativeResponse":
+        """Begin consuming the stream in the background."""
+        if self._task is None:
+            self._started_at = time.perf_counter()
+            self._task = asyncio.create_task(self._consume())
+            logger.info("llm_speculation_started", transcript=self.transcript[:100])
+        return self
+
+    async def _consume(self) -> None:
+        try:
+            async for chunk in self._stream:
+                self._chunks.append(chunk)
+                self._changed.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._error = e
+        finally:
+            self._done = True
+            self._changed.set()
+
+    def matches(self, final_transcript: str) -> bool:
+        """Whether the final transcript is the one this run speculated on."""
+        return bool(self.normalized) and normalize_transcript(final_transcript) == self.normalized
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def _output_tokens(self) -> int:
+        for chunk in self._chunks:
+            if chunk.get("type") == "usage" and chunk.get("output_tokens"):
+                return int(chunk["output_tokens"])
+        chars = sum(len(chunk.get("content", "")) for chunk in self._chunks if chunk.get("type") == "text")
+        return chars // 4
+
+    async def commit(self) -> AsyncGenerator[dict, None]:
+        """
+        Take over the stream: replay buffered chunks, then follow live ones.
+
+        Errors from the underlying stream are re-raised here, as they would
+        be from the original `chat()` call. Closing this generator early
+        (e.g. the turn was cancelled) stops the underlying stream too.
+        """
+        if not self._settled:
+            self._settled = True
+            metrics.LLM_SPECULATION_TOTAL.labels(outcome="hit").inc()
+            logger.info("llm_speculation_hit", buffered_chunks=len(self._chunks), finished=self._done)
+
+        index = 0
+        try:
+            while True:
+                if index < len(self._chunks):
+                    yield self._chunks[index]
+                    index += 1
+                    continue
+                if self._done:
+                    break
+                self._changed.clear()
+                await self._changed.wait()
+        finally:
+            if self._task is not None and not self._task.done():
+                self._task.cancel()
+
+        if self._error is not None:
+            raise self._error
+
+    async def cancel(self, outcome: str = "miss") -> int:
+        """
+        Discard the run and record it. Returns the wasted output tokens.
+
+        Backends report token counts only when a response completes, so a
+        run cancelled mid-generation counts its wasted time, not tokens.
+
+        Args:
+            outcome: Metric label, "miss" when the final transcript differed
+                or "abandoned" when the user kept talking
+        """
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        close = getattr(self._stream, "aclose", None)
+        if close is not None:
+            try:
+                await close()
+            except Exception:
+                pass
+
+        wasted = self._output_tokens()
+        if not self._settled:
+            self._settled = True
+            elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+            metrics.LLM_SPECULATION_TOTAL.labels(outcome=outcome).inc()
+            metrics.LLM_SPECULATION_WASTED_TOKENS.inc(wasted)
+            metrics.LLM_SPECULATION_WASTED_SECONDS.inc(elapsed)
+            logger.info("llm_speculation_discarded", outcome=outcome, wasted_tokens=wasted, wasted_seconds=round(elapsed, 3))
+        return wasted
@@ -0,0 +1,69 @@
+"""
+Shared LLM Transports
+One pooled httpx.AsyncClient per backend URL and credentials, shared by
+every session that talks to that endpoint.
+"""
+from typing import Optional
+import httpx
+import structlog
+
+logger = structlog.get_logger()
+
+
+class TransportPool:
+    """
+    Keyed pool of long-lived HTTP clients.
+
+    Clients are never closed because one session changed settings; they
+    live until `close()` at shutdown, so keep-alive connections are reused
+    across sessions and turns.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[httpx.Timeout] = None,
+        limits: Optional[httpx.Limits] = None,
+    ):
+        self.timeout = timeout or httpx.Timeout(60.0, connect=10.0)
+        self.limits = limits or httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        self._clients: dict[tuple[str, tuple], httpx.AsyncClient] = {}
+
+    @staticmethod
+    def _key(base_url: str, headers: Optional[dict]) -> tuple[str, tuple]:
+        return base_url.rstrip("/"), tuple(sorted((headers or {}).items()))
+
+    def client(self, base_url: str, headers: Optional[dict] = None) -> httpx.AsyncClient:
+        """Get (or create) the shared client for a URL and header set."""
+        key = self._key(base_url, headers)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                base_url=key[0],
+                headers=headers or {},
+                timeout=self.timeout,
+                limits=self.limits,
+            )
+            self._clients[key] = client
+            logger.info("llm_transport_opened", base_url=key[0], pooled=len(self._clients))
+        return client
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    async def close(self) -> None:
+        """Close every pooled client."""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+
+# Global instance
+_pool: Optional[TransportPool] = None
+
+
+def get_transport_pool() -> TransportPool:
+    """Get the process-wide transport pool."""
+    global _pool
+    if _pool is None:
+        _pool = TransportPool()
+    return _pool
@@ -0,0 +1,169 @@
+"""
+Event Loop Monitor
+Samples asyncio scheduling delay and catches stalls. A watchdog thread
+notices when the loop stops ticking, captures the loop thread's stack
+while it is still stuck, and attributes the stall to the tool or server
+function that was running, so one blocking call shows up by name instead
+of as unexplained audio jitter.
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from types import CodeType, FrameType
+from typing import Callable, Optional
+import structlog
+
+from . import metrics
+
+logger = structlog.get_logger()
+
+# Frames kept from a stalled stack (innermost last)
+STACK_LIMIT = 12
+
+# Code objects with a known owner, e.g. tool handlers -> "tool:<name>"
+_labels: dict[CodeType, str] = {}
+
+
+def label_code(code: CodeType, label: str) -> None:
+    """Attribute stalls inside `code` to `label`."""
+    _labels[code] = label
+
+
+@dataclass
+class Stall:
+    """One period the event loop could not run other tasks."""
+    seconds: float
+    source: str                 # "tool:<name>", "<module>.<function>" or "other"
+    stack: list[str] = field(default_factory=list)
+    at: float = field(default_factory=time.time)
+
+    @property
+    def tool(self) -> Optional[str]:
+        """Name of the tool that stalled the loop, if it was one."""
+        return self.source[len("tool:"):] if self.source.startswith("tool:") else None
+
+
+def attribute(frame: Optional[FrameType]) -> str:
+    """
+    Name the code responsible for a stalled stack.
+
+    A labelled frame (a tool handler) anywhere on the stack wins; otherwise
+    the innermost frame in the server package is used.
+    """
+    innermost_server = None
+    while frame is not None:
+        label = _labels.get(frame.f_code)
+        if label is not None:
+            return label
+        module = frame.f_globals.get("__name__", "")
+        if innermost_server is None and module.startswith("server.") and module != __name__:
+            innermost_server = f"{module[len('server.'):]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return innermost_server or "other"
+
+
+class LoopMonitor:
+    """
+    Event-loop lag sampler with stall capture.
+
+    `run()` sleeps for `interval` in a loop and records how late each
+    wakeup was. A daemon thread checks the last tick every half threshold;
+    once the loop is `stall_threshold` behind it snapshots the loop
+    thread's stack. When the loop recovers the stall is logged, counted
+    per source and passed to `on_stall`.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        stall_threshold: float = 0.1,
+        on_stall: Optional[Callable[[Stall], None]] = None,
+    ):
+        """
+        Args:
+            interval: Sampling period in seconds
+            stall_threshold: Lag that counts as a stall, in seconds
+            on_stall: Called on the loop with each stall once it ends
+        """
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.on_stall = on_stall
+        self.recent: deque[Stall] = deque(maxlen=20)
+
+        self._thread_id: Optional[int] = None
+        self._tick = 0
+        self._tick_at = time.monotonic()
+        self._captured: Optional[tuple[int, str, list[str]]] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    async def run(self) -> None:
+        """Sample forever; run as a background task for the server's lifetime."""
+        self._thread_id = threading.get_ident()
+        self._tick_at = time.monotonic()
+        self._stop.clear()
+        watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        watchdog.start()
+        try:
+            while True:
+                start = time.perf_counter()
+                await asyncio.sleep(self.interval)
+                lag = max(0.0, time.perf_counter() - start - self.interval)
+                metrics.EVENT_LOOP_LAG_SECONDS.observe(lag)
+
+                with self._lock:
+                    captured = self._captured if self._captured and self._captured[0] == self._tick else None
+                    self._captured = None
+                    self._tick += 1
+                    self._tick_at = time.monotonic()
+
+                if lag >= self.stall_threshold:
+                    source, stack = captured[1:] if captured else ("other", [])
+                    self._record(Stall(seconds=lag, source=source, stack=stack))
+        finally:
+            self._stop.set()
+
+    def _watch(self) -> None:
+        """Watchdog thread: snapshot the loop's stack while it is stalled."""
+        while not self._stop.wait(self.stall_threshold / 2):
+            with self._lock:
+                tick, tick_at = self._tick, self._tick_at
+                already = self._captured is not None and self._captured[0] == tick
+            if already or time.monotonic() - tick_at - self.interval < self.stall_threshold:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            source = attribute(frame)
+            stack = [line.rstrip() for line in traceback.format_stack(frame, limit=STACK_LIMIT)]
+            del frame
+            with self._lock:
+                if self._tick == tick:
+                    self._captured = (tick, source, stack)
+
+    def _record(self, stall: Stall) -> None:
+        self.recent.append(stall)
+        metrics.LOOP_STALLS.labels(source=stall.source).inc()
+        metrics.LOOP_STALL_SECONDS.observe(stall.seconds)
+        logger.warning(
+            "event_loop_stall",
+            ms=round(stall.seconds * 1000, 1),
+            source=stall.source,
+            frames=stall.stack[-4:],
+        )
+        if self.on_stall is not None:
+            try:
+                self.on_stall(stall)
+            except Exception as e:
+                logger.error("loop_stall_callback_error", error=str(e))
+
+    def report(self) -> list[dict]:
+        """Recent stalls, newest last."""
+        return [
+            {"ms": round(s.seconds * 1000, 1), "source": s.source, "at": s.at}
+            for s in self.recent
+        ]
@@ -4,25 +4,40 @@ Production-ready with AMD MI50 GPU acceleration.
 """
 import asyncio
 import json
+import threading
 import base64
+import time
 from pathlib import Path
 from typing import Optional
 from contextlib import asynccontextmanager
+from functools import partial
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 import structlog
 
 from .config import settings
 from .session import Session, SessionState
+from .session_manager import SessionManager, get_session_manager
+from .loopmon import LoopMonitor, Stall
+from .workers import get_worker_pool, shutdown_worker_pools, worker_report
 from .audio.vad import create_vad, SileroVAD
 from .stt.whisper import get_stt  # faster-whisper with CUDA
-from .llm.ollama import get_llm_client, list_models_for_backend
-from .tts.piper_tts import get_tts, list_voices  # Piper local TTS
+from .llm.ollama import LLMClient, list_models_for_backend
+from .llm.transport import get_transport_pool
+from .llm.router import get_llm_router
+from .llm.speculative import SpeculativeResponse
+from .tts.piper_tts import PiperTTS, get_tts, list_voices  # Piper local TTS
+from .tts import cache as tts_cache
 from .tools import tool_registry, tool_executor
-from .tracing import init_tracing, get_tracer, start_stt_span, start_llm_span, start_tool_span, start_tts_span
+from .tracing import init_tracing, get_tracer, start_stt_span, start_llm_span, start_tool_span, start_tts_span, record_llm_usage
+from .audio.buffer import wav_duration_seconds
+from .audio.ingest import AudioIngestQueue
+from .audio.endpointing import EndpointConfig, EndpointDetector
+from . import metrics
 from .comfy_service import initialize_comfy_service, shutdown_comfy_service, get_comfy_service
+from .startup import StartupOrchestrator, get_startup
 
 
 # Configure structured logging
@@ -43,46 +58,156 @@ structlog.configure(
 logger = structlog.get_logger()
 
 
+async def _load_stt():
+    return await get_stt()
+
+
+async def _warm_stt(stt) -> None:
+    # Half a second of silence runs the full decode path once
+    await stt.transcribe(bytes(settings.audio_sample_rate))
+
+
+async def _load_vad():
+    return await asyncio.to_thread(get_vad)
+
+
+async def _warm_vad(vad) -> None:
+    probe = vad.clone()
+    await asyncio.to_thread(probe.process_chunk, bytes(2048))
+
+
+async def _load_tts():
+    tts = get_tts()
+    logger.info("Piper ready", voices=[v["id"] for v in list_voices()])
+    return tts
+
+
+async def _warm_tts(tts) -> None:
+    # Own instance so the shared one's voice and rate stay untouched
+    await PiperTTS(voice=tts.voice_config.id).synthesize("Ready.")
+
+
+async def _load_tools():
+    tools = tool_registry.list_tools()
+    logger.info("Registered tools", count=len(tools), tools=[t.name for t in tools])
+    return tools
+
+
+async def _load_embeddings():
+    pool = get_worker_pool("embeddings")
+    await asyncio.to_thread(pool.start)
+    return pool
+
+
+async def _load_tracing():
+    init_tracing(service_name="voice-agent")
+
+
+async def _load_comfy():
+    comfy_service = await initialize_comfy_service(auto_start=False)
+    if comfy_service:
+        logger.info("ComfyUI service initialized", url=comfy_service.base_url)
+    else:
+        raise RuntimeError("ComfyUI service not available (image generation tools will be disabled)")
+    
+    # Launch and preload in the background so the first image request does
+    # not pay for process start plus checkpoint load; readiness doesn't wait
+    image_tools = "server.tools.builtin.image_tools"
+    if settings.comfy_autostart and not tool_registry.is_disabled("image", image_tools):
+        comfy_service.start_background(warmup=settings.comfy_warmup)
+    return comfy_service
+
+
+def _offload_stalling_tool(stall: Stall) -> None:
+    """Run a tool caught stalling the event loop in the blocking pool from now on, if allowed."""
+    if stall.tool:
+        tool_registry.mark_blocking(stall.tool)
+
+
+_loop_monitor: Optional[LoopMonitor] = None
+
+
+def get_loop_monitor() -> LoopMonitor:
+    """Get the server's event-loop monitor."""
+    global _loop_monitor
+    if _loop_monitor is None:
+        _loop_monitor = LoopMonitor(
+            stall_threshold=settings.loop_stall_threshold_ms / 1000,
+            on_stall=_offload_stalling_tool,
+        )
+    return _loop_monitor
+
+
+def build_startup() -> StartupOrchestrator:
+    """Register every component the server needs before its first turn."""
+    startup = get_startup()
+    warm = settings.startup_warmup
+    timeout = settings.startup_timeout
+    startup.add("stt", _load_stt, _warm_stt if warm else None, timeout=timeout)
+    startup.add("vad", _load_vad, _warm_vad if warm else None, timeout=timeout)
+    startup.add("tts", _load_tts, _warm_tts if warm else None, timeout=timeout)
+    startup.add("tools", _load_tools, timeout=timeout)
+    if get_worker_pool("embeddings") is not None:
+        startup.add("embeddings", _load_embeddings, required=False, timeout=timeout)
+    startup.add("tracing", _load_tracing, required=False, timeout=timeout)
+    startup.add("comfyui", _load_comfy, required=False, timeout=timeout)
+    return startup
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifecycle management."""
     logger.info("Starting Voice Agent server...")
     
-    # Initialize STT (faster-whisper with CUDA)
-    logger.info("Loading Whisper model on CUDA GPU...")
-    await get_stt()
-    logger.info("Whisper ready", model=settings.whisper_model)
+    # Load STT, VAD, TTS, tools, tracing and ComfyUI concurrently; the
+    # server accepts connections meanwhile and /ready reports progress
+    startup = build_startup()
+    startup_task = asyncio.create_task(startup.run())
     
-    # Initialize TTS (Piper)
-    logger.info("Initializing Piper TTS...")
-    get_tts()
-    voices = list_voices()
-    logger.info("Piper ready", voices=[v["id"] for v in voices])
+    # Fill the TTS cache with common phrases in the background
+    prewarm_task = None
+    if settings.tts_cache_enabled and settings.tts_cache_prewarm:
+        prewarm_task = asyncio.create_task(tts_cache.prewarm_voice(settings.tts_voice))
     
-    # Log registered tools
-    tools = tool_registry.list_tools()
-    logger.info("Registered tools", count=len(tools), tools=[t.name for t in tools])
+    # Probe routed LLM endpoints so failed ones come back
+    router_health = None
+    router = get_llm_router()
+    if router is not None:
+        router_health = asyncio.create_task(
+            router.run_health_checks(settings.llm_router_health_interval)
+        )
     
-    # Initialize OpenTelemetry tracing
-    logger.info("Initializing tracing...")
-    init_tracing(service_name="voice-agent")
+    # Sample event-loop lag and catch stalls (a tool or handler blocking
+    # the loop delays every session's audio)
+    loop_monitor = asyncio.create_task(get_loop_monitor().run())
     
-    # Initialize ComfyUI service
-    logger.info("Initializing ComfyUI service...")
-    comfy_service = await initialize_comfy_service(auto_start=False)  # Don't auto-start, start on-demand
-    if comfy_service:
-        logger.info("ComfyUI service initialized", url=comfy_service.base_url)
-    else:
-        logger.warning("ComfyUI service not available (image generation tools will be disabled)")
+    # Spill idle sessions to disk and drop expired disconnected ones
+    sessions = get_session_manager()
+    eviction_task = asyncio.create_task(sessions.run_eviction())
     
     yield
     
     logger.info("Shutting down Voice Agent server...")
     
+    startup_task.cancel()
+    eviction_task.cancel()
+    loop_monitor.cancel()
+    if sessions.store is not None:
+        await sessions.spill_all()
+        await asyncio.to_thread(sessions.store.prune)
+    if prewarm_task:
+        prewarm_task.cancel()
+    if router_health:
+        router_health.cancel()
+    await get_transport_pool().close()
+    
     # Shutdown ComfyUI service
-    if comfy_service:
+    if get_comfy_service():
         logger.info("Shutting down ComfyUI service...")
         await shutdown_comfy_service()
+    
+    # Stop model worker processes
+    await asyncio.to_thread(shutdown_worker_pools)
 
 
 # Create FastAPI app
@@ -154,7 +279,7 @@ async def health():
         else:
             comfy_status = "stopped"
 
-    return {
+    status = {
         "status": "ok",
         "stt": stt_backend,
         "tts": tts_backend,
@@ -162,6 +287,39 @@ async def health():
         "tools_registered": len(tool_registry.list_tools()),
         "comfyui": comfy_status,
     }
+    router = get_llm_router()
+    if router is not None:
+        status["llm_endpoints"] = router.status()
+    report = get_session_manager().report()
+    status["sessions"] = {"connected": report["connected"], "detached": report["detached"]}
+    workers = worker_report()
+    if workers:
+        status["workers"] = workers
+    stalls = get_loop_monitor().report()
+    if stalls:
+        status["loop_stalls"] = stalls[-5:]
+    return status
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness: 200 once every required component is loaded and warm."""
+    startup = get_startup()
+    return JSONResponse(startup.report(), status_code=200 if startup.ready else 503)
+
+
+@app.get("/api/sessions")
+async def sessions_report():
+    """In-memory session counts and the memory they hold."""
+    return get_session_manager().report()
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus scrape endpoint with per-stage latency histograms."""
+    if not settings.metrics_enabled:
+        return Response(status_code=404)
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 
 @app.get("/api/voices")
@@ -211,36 +369,46 @@ async def get_models(
 
 
 class ConnectionManager:
-    """Manages WebSocket connections and their sessions."""
+    """Manages WebSocket connections; sessions live in the SessionManager."""
     
-    def __init__(self):
+    def __init__(self, sessions: SessionManager):
         self.active_connections: dict[str, WebSocket] = {}
-        self.sessions: dict[str, Session] = {}
+        self.sessions = sessions
     
-    async def connect(self, websocket: WebSocket, client_id: str):
+    async def connect(self, websocket: WebSocket, client_id: str, resume_token: Optional[str] = None) -> Session:
         await websocket.accept()
         self.active_connections[client_id] = websocket
-        self.sessions[client_id] = Session()
-        logger.info("Client connected", client_id=client_id)
+        session, resumed = self.sessions.open(client_id, resume_token)
+        logger.info("Client connected", client_id=client_id, resumed=resumed)
+        # The client reconnects with ?resume=<token> to keep its conversation
+        await self.send_json(client_id, {
+            "type": "session",
+            "token": session.token,
+            "resumed": resumed is not None,
+        })
+        return session
     
     def disconnect(self, client_id: str):
         if client_id in self.active_connections:
             del self.active_connections[client_id]
-        if client_id in self.sessions:
-            del self.sessions[client_id]
+        self.sessions.detach(client_id)
         logger.info("Client disconnected", client_id=client_id)
     
     async def send_json(self, client_id: str, data: dict):
         if client_id in self.active_connections:
             try:
+                started = time.perf_counter()
                 await self.active_connections[client_id].send_json(data)
+                metrics.WS_SEND_SECONDS.labels(kind="json").observe(time.perf_counter() - started)
             except Exception as e:
                 logger.error("Failed to send JSON", client_id=client_id, error=str(e))
     
     async def send_bytes(self, client_id: str, data: bytes):
         if client_id in self.active_connections:
             try:
+                started = time.perf_counter()
                 await self.active_connections[client_id].send_bytes(data)
+                metrics.WS_SEND_SECONDS.labels(kind="bytes").observe(time.perf_counter() - started)
             except Exception as e:
                 logger.error("Failed to send bytes", client_id=client_id, error=str(e))
     
@@ -248,26 +416,122 @@ class ConnectionManager:
         return self.sessions.get(client_id)
 
 
-manager = ConnectionManager()
+manager = ConnectionManager(get_session_manager())
 
 # Global VAD instance (singleton to avoid repeated loading)
 _global_vad: Optional[SileroVAD] = None
+_global_vad_lock = threading.Lock()
 
 def get_vad() -> SileroVAD:
-    """Get or create the global VAD instance."""
+    """Get or create the global VAD instance (safe to call from threads)."""
     global _global_vad
-    if _global_vad is None:
-        _global_vad = create_vad(
-            vad_type="silero",
-            threshold=settings.barge_in_threshold,
-            sample_rate=settings.audio_sample_rate,
-            min_speech_ms=settings.barge_in_min_speech_ms,
-            device=settings.whisper_device,
-            use_onnx=settings.whisper_device == "cpu",
-        )
+    with _global_vad_lock:
+        if _global_vad is None:
+            _global_vad = create_vad(
+                vad_type="silero",
+                threshold=settings.barge_in_threshold,
+                sample_rate=settings.audio_sample_rate,
+                min_speech_ms=settings.barge_in_min_speech_ms,
+                device=settings.whisper_device,
+                use_onnx=settings.whisper_device == "cpu",
+                model_dir=settings.vad_model_dir,
+            )
     return _global_vad
 
 
+def get_session_vad(session: Session) -> SileroVAD:
+    """Get the session's own VAD, cloned from the shared model on first use."""
+    if session.vad is None:
+        session.vad = get_vad().clone(endpointer=session.endpointer)
+    return session.vad
+
+
+async def prepare_llm_client(session: Session) -> LLMClient:
+    """
+    Get the session's LLM client for its current profile, tools registered.
+    
+    Each session has its own lightweight client; HTTP connections come from
+    the shared transport pool, so changing one session's model or backend
+    never touches another session's requests.
+    """
+    ollama = session.llm_client
+    if ollama is None or ollama.profile != session.llm_profile:
+        ollama = LLMClient.from_profile(session.llm_profile)
+        
+        # Register tools for LLM function calling
+        for tool in tool_registry.list_tools():
+            ollama.register_tool(
+                tool.name,
+                tool.description,
+                tool.parameters,
+                tool.execute
+            )
+        session.llm_client = ollama
+    return ollama
+
+
+async def close_llm_streams(*streams) -> None:
+    """
+    Close chat streams as soon as the turn is done with them.
+
+    A cancelled or abandoned `async for` leaves the generator suspended with
+    its HTTP response open, so the backend keeps decoding until garbage
+    collection. Closing it drops the connection and Ollama stops the request.
+    """
+    for stream in streams:
+        if stream is not None:
+            try:
+                await stream.aclose()
+            except Exception as e:
+                logger.debug("llm_stream_close_failed", error=str(e))
+
+
+async def start_speculation(client_id: str, session: Session, transcript: str, model: str) -> None:
+    """Start the LLM on an interim transcript before the user's turn ends."""
+    ollama = await prepare_llm_client(session)
+    messages = session.conversation_history.get_messages()
+    messages.append({"role": "user", "content": transcript})
+    session.speculation = SpeculativeResponse(
+        transcript, ollama.chat(messages, execute_tools=False, session_key=client_id)
+    ).start()
+
+
+async def transcribe_interim(
+    client_id: str,
+    session: Session,
+    audio_bytes: bytes,
+    model: str,
+) -> None:
+    """
+    Transcribe the audio up to a pause and hand it to the endpointer.
+    
+    With speculative LLM enabled, a transcript that is still current after
+    llm_speculative_stable_ms of continued pause starts the LLM early.
+    """
+    try:
+        stt = await get_stt()
+        text = await stt.transcribe(audio_bytes)
+    except Exception as e:
+        logger.warning("interim_transcription_failed", error=str(e), client_id=client_id)
+        return
+    
+    endpointer = session.endpointer
+    # Only useful if the user is still paused on the same utterance
+    if endpointer is not None and endpointer.silence_ms > 0 and text and text.strip():
+        endpointer.set_transcript(text)
+        await manager.send_json(client_id, {
+            "type": "transcript",
+            "text": text,
+            "is_final": False
+        })
+        
+        if settings.llm_speculative_enabled and session.speculation is None:
+            await asyncio.sleep(settings.llm_speculative_stable_ms / 1000)
+            # Speech resuming or the turn ending clears the transcript
+            if endpointer.transcript is text and session.state == SessionState.LISTENING:
+                await start_speculation(client_id, session, text, model)
+
+
 async def process_audio_pipeline(
     client_id: str,
     audio_data: bytes,
@@ -277,11 +541,17 @@ async def process_audio_pipeline(
     tts_playing: bool = False,
     voice_speed: float = 1.0,
 ):
-    """Process audio through the full pipeline."""
+    """
+    Handle one batch of microphone audio for a session.
+
+    Called in order by the session's AudioIngestQueue. Runs VAD, detects
+    barge-in and end of speech, and hands finished utterances to
+    process_voice_turn without waiting for them.
+    """
     print(f"[DEBUG] process_audio_pipeline: state={session.state.name}, tts_playing={tts_playing}, audio_len={len(audio_data)}", flush=True)
     try:
-        # Get VAD instance
-        vad = get_vad()
+        # Get this session's VAD instance
+        vad = get_session_vad(session)
         
     # BARGE-IN: Check for interrupts when client reports TTS is playing
         if tts_playing:
@@ -299,15 +569,19 @@ async def process_audio_pipeline(
             if is_speaking:
                 logger.info("BARGE-IN DETECTED!", client_id=client_id)
                 
-                # Trigger interrupt
+                # Trigger interrupt and abort whatever the turn is still doing
                 session.interrupt()
+                await session.cancel_turn("barge_in")
                 await manager.send_json(client_id, {
                     "type": "state", 
                     "state": "interrupted"
                 })
                 
-                # Clear buffer and reset VAD for fresh start
+                # Clear buffer, drop frames captured during playback and
+                # reset VAD for fresh start
                 session.audio_buffer.clear()
+                if session.audio_ingest is not None:
+                    session.audio_ingest.drain(playback_only=True)
                 vad.reset()
                 
                 # Go back to listening immediately
@@ -335,18 +609,38 @@ async def process_audio_pipeline(
             vad.process_chunk, audio_data
         )
         
-        print(f"[DEBUG] VAD: is_speech={is_speech}, is_speaking={is_speaking}, speech_ended={speech_ended}, buffer={len(session.audio_buffer)}", flush=True)
+        print(f"[DEBUG] VAD: is_speech={is_speech}, is_speaking={is_speaking}, speech_ended={speech_ended}, buffer={session.audio_buffer.nbytes}", flush=True)
         
         # Only process when speech has ended AND we have enough audio
         if not speech_ended:
+            endpointer = session.endpointer
+            if session.speculation is not None and endpointer is not None and endpointer.transcript is None:
+                # User kept talking; the speculative answer is stale
+                await session.speculation.cancel("abandoned")
+                session.speculation = None
+            if (
+                endpointer is not None
+                and (endpointer.config.use_transcript or settings.llm_speculative_enabled)
+                and endpointer.silence_ms > 0
+                and endpointer.transcript is None
+                and (session.interim_task is None or session.interim_task.done())
+            ):
+                # User paused: get a transcript hint while we wait
+                session.interim_task = asyncio.create_task(
+                    transcribe_interim(client_id, session, session.audio_buffer.tobytes(), model)
+                )
             return
         
-        print(f"[DEBUG] Speech ended. Buffer size: {len(session.audio_buffer)}", flush=True)
+        if session.interim_task is not None and not session.interim_task.done():
+            session.interim_task.cancel()
+        
+        print(f"[DEBUG] Speech ended. Buffer size: {session.audio_buffer.nbytes}", flush=True)
 
         # Need minimum audio
-        if len(session.audio_buffer) < 16000 * 0.5:  # 0.5 second minimum
-            logger.debug("not_enough_audio", bytes=len(session.audio_buffer))
-            print(f"[DEBUG] Not enough audio: {len(session.audio_buffer)}", flush=True)
+        endpoint_config = session.endpointer.config if session.endpointer else EndpointConfig()
+        if session.audio_buffer.nbytes < settings.audio_sample_rate * 2 * endpoint_config.min_utterance_ms // 1000:
+            logger.debug("not_enough_audio", bytes=session.audio_buffer.nbytes)
+            print(f"[DEBUG] Not enough audio: {session.audio_buffer.nbytes}", flush=True)
             return
         
         # Try to acquire lock - if already processing, skip
@@ -355,27 +649,42 @@ async def process_audio_pipeline(
             print("[DEBUG] Pipeline already running", flush=True)
             return
         
-        print("[DEBUG] Acquiring lock...", flush=True)
+        # Get audio and clear buffer
+        audio_bytes = session.audio_buffer.tobytes()
+        session.audio_buffer.clear()
+        
+        # Reset VAD for next utterance
+        vad.reset()
+        
+        # Hand the utterance to its own task so this consumer keeps reading
+        # frames (and can detect barge-in) while the turn runs
+        session.set_state(SessionState.PROCESSING)
+        session.start_turn(
+            process_voice_turn(client_id, audio_bytes, session, voice, model, voice_speed)
+        )
+    
+    except Exception as e:
+        logger.error("Pipeline error", error=str(e), client_id=client_id)
+        await manager.send_json(client_id, {
+            "type": "error",
+            "message": str(e)
+        })
+        session.set_state(SessionState.IDLE)
+
+
+async def process_voice_turn(
+    client_id: str,
+    audio_bytes: bytes,
+    session: Session,
+    voice: str,
+    model: str,
+    voice_speed: float = 1.0,
+):
+    """Run one finished utterance through STT, LLM, tools and TTS."""
+    try:
         async with session._processing_lock:
-            print(f"[DEBUG] Lock acquired. State: {session.state}", flush=True)
-            # Double-check state after acquiring lock
-            if session.state != SessionState.LISTENING:
-                print(f"[DEBUG] State mismatch: {session.state}", flush=True)
-                return
-            
-            if len(session.audio_buffer) < 16000:  # 0.5 sec at 16kHz, 16-bit
-                print(f"[DEBUG] Buffer too small inside lock: {len(session.audio_buffer)}", flush=True)
-                return
-            
-            logger.info("processing_audio", buffer_bytes=len(session.audio_buffer))
-            print(f"[DEBUG] Processing audio! Bytes: {len(session.audio_buffer)}", flush=True)
-            
-            # Get audio and clear buffer
-            audio_bytes = bytes(session.audio_buffer)
-            session.audio_buffer.clear()
-            
-            # Reset VAD for next utterance
-            vad.reset()
+            logger.info("processing_audio", buffer_bytes=len(audio_bytes))
+            print(f"[DEBUG] Processing audio! Bytes: {len(audio_bytes)}", flush=True)
             
             # Start pipeline trace
             tracer = get_tracer()
@@ -392,7 +701,12 @@ async def process_audio_pipeline(
                     transcript = await stt.transcribe(audio_bytes)
                     stt_span.set_attribute("transcript_length", len(transcript) if transcript else 0)
                 
+                # Any speculative run now belongs to this turn
+                speculation, session.speculation = session.speculation, None
+                
                 if not transcript or not transcript.strip():
+                    if speculation is not None:
+                        await speculation.cancel("miss")
                     session.set_state(SessionState.LISTENING)
                     await manager.send_json(client_id, {"type": "state", "state": "listening"})
                     return
@@ -411,26 +725,23 @@ async def process_audio_pipeline(
                 session.conversation_history.add_user_message(transcript)
                 
                 # Get LLM client (uses backend settings from client config)
-                ollama = await get_llm_client()
-                ollama.model = model  # Update model from client settings
-                
-                # Register tools for LLM function calling
-                ollama.clear_tools()  # Clear any previously registered tools
-                for tool in tool_registry.list_tools():
-                    ollama.register_tool(
-                        tool.name,
-                        tool.description,
-                        tool.parameters,
-                        tool.handler
-                    )
+                ollama = await prepare_llm_client(session)
                 
                 full_response = ""
+                llm_stream = followup_stream = None
                 
                 try:
                     with start_llm_span(model, len(session.conversation_history.get_messages()), bool(tool_registry.list_tools())) as llm_span:
-                        async for chunk in ollama.chat(
-                            session.conversation_history.get_messages()
-                        ):
+                        # Reuse a speculative run started on the same interim transcript
+                        if speculation is not None and speculation.matches(transcript):
+                            llm_span.set_attribute("speculative", True)
+                            llm_stream = speculation.commit()
+                        else:
+                            if speculation is not None:
+                                await speculation.cancel("miss")
+                            llm_stream = ollama.chat(session.conversation_history.get_messages(), session_key=client_id)
+                        
+                        async for chunk in llm_stream:
                             if chunk["type"] == "text":
                                 full_response += chunk["content"]
                                 await manager.send_json(client_id, {
@@ -438,6 +749,9 @@ async def process_audio_pipeline(
                                     "text": full_response
                                 })
                         
+                            elif chunk["type"] == "usage":
+                                record_llm_usage(llm_span, chunk)
+                        
                             elif chunk["type"] == "tool_call":
                                 tool_call_id = chunk.get("id", f"call_{chunk['name']}")
                                 tool_name = chunk["name"]
@@ -452,7 +766,9 @@ async def process_audio_pipeline(
                             
                                 # Execute tool with tracing
                                 with start_tool_span(tool_name, arguments) as tool_span:
-                                    result = await tool_executor.execute(tool_name, arguments)
+                                    result = await tool_executor.execute(
+                                        tool_name, arguments, notify=partial(manager.send_json, client_id)
+                                    )
                                     tool_span.set_attribute("success", result.success)
                                     logger.info("tool_result_raw", success=result.success, result_type=type(result.result).__name__, result=str(result.result)[:500])
                             
@@ -497,15 +813,16 @@ async def process_audio_pipeline(
                                 logger.info("Getting follow-up response after tool execution")
                                 with start_llm_span(model, len(session.conversation_history.get_messages()), False) as followup_span:
                                     followup_span.set_attribute("is_followup", True)
-                                    async for chunk in ollama.chat(
-                                        session.conversation_history.get_messages()
-                                    ):
+                                    followup_stream = ollama.chat(session.conversation_history.get_messages(), session_key=client_id)
+                                    async for chunk in followup_stream:
                                         if chunk["type"] == "text":
                                             full_response += chunk["content"]
                                             await manager.send_json(client_id, {
                                                 "type": "response_chunk",
                                                 "text": full_response
                                             })
+                                        elif chunk["type"] == "usage":
+                                            record_llm_usage(followup_span, chunk)
                                     followup_span.set_attribute("response_length", len(full_response))
                 
                 except Exception as llm_error:
@@ -529,6 +846,8 @@ async def process_audio_pipeline(
                     session.set_state(SessionState.LISTENING)
                     await manager.send_json(client_id, {"type": "state", "state": "listening"})
                     return
+                finally:
+                    await close_llm_streams(llm_stream, followup_stream)
                 
                 if not full_response:
                     session.set_state(SessionState.LISTENING)
@@ -555,7 +874,16 @@ async def process_audio_pipeline(
                     tts.speaking_rate = voice_speed  # Apply voice speed setting
                     
                     audio_chunks_sent = 0
+                    audio_seconds = 0.0
+                    # Synthesis time excludes sending: only time spent waiting on the TTS counts
+                    synthesis_seconds = 0.0
+                    synth_started = waiting_since = time.perf_counter()
                     async for audio_chunk in tts.synthesize_streaming(full_response):
+                        chunk_ready = time.perf_counter()
+                        synthesis_seconds += chunk_ready - waiting_since
+                        if audio_chunks_sent == 0:
+                            tts_span.set_attribute("first_audio_seconds", chunk_ready - synth_started)
+                        
                         # Check for interruption (barge-in)
                         if session.should_stop():
                             logger.info("TTS interrupted", client_id=client_id)
@@ -564,18 +892,25 @@ async def process_audio_pipeline(
                             break
                         
                         audio_chunks_sent += 1
+                        audio_seconds += wav_duration_seconds(audio_chunk)
                         # Send audio as base64
                         await manager.send_json(client_id, {
                             "type": "audio",
                             "data": base64.b64encode(audio_chunk).decode('utf-8')
                         })
+                        waiting_since = time.perf_counter()
                     
                     tts_span.set_attribute("audio_chunks", audio_chunks_sent)
+                    tts_span.set_attribute("audio_seconds", audio_seconds)
+                    tts_span.set_attribute("synthesis_seconds", synthesis_seconds)
                 
                 # Stay in SPEAKING state - client will send playback_done when finished
                 # This allows interrupt detection while audio plays on client
                 logger.info("Audio sent, waiting for playback", client_id=client_id)
         
+    except asyncio.CancelledError:
+        logger.info("voice_turn_cancelled", client_id=client_id, state=session.state.name)
+        raise
     except Exception as e:
         logger.error("Pipeline error", error=str(e), client_id=client_id)
         await manager.send_json(client_id, {
@@ -608,26 +943,15 @@ async def process_text_message(
                 session.conversation_history.add_user_message(text)
                 
                 # Get LLM client
-                ollama = await get_llm_client()
-                ollama.model = model
-                
-                # Register tools
-                ollama.clear_tools()
-                for tool in tool_registry.list_tools():
-                    ollama.register_tool(
-                        tool.name,
-                        tool.description,
-                        tool.parameters,
-                        tool.handler
-                    )
+                ollama = await prepare_llm_client(session)
                 
                 full_response = ""
+                llm_stream = followup_stream = None
                 
                 try:
                     with start_llm_span(model, len(session.conversation_history.get_messages()), bool(tool_registry.list_tools())) as llm_span:
-                        async for chunk in ollama.chat(
-                            session.conversation_history.get_messages()
-                        ):
+                        llm_stream = ollama.chat(session.conversation_history.get_messages(), session_key=client_id)
+                        async for chunk in llm_stream:
                             if chunk["type"] == "text":
                                 full_response += chunk["content"]
                                 await manager.send_json(client_id, {
@@ -635,6 +959,9 @@ async def process_text_message(
                                     "text": full_response
                                 })
                             
+                            elif chunk["type"] == "usage":
+                                record_llm_usage(llm_span, chunk)
+                            
                             elif chunk["type"] == "tool_call":
                                 tool_call_id = chunk.get("id", f"call_{chunk['name']}")
                                 tool_name = chunk["name"]
@@ -649,7 +976,9 @@ async def process_text_message(
                                 
                                 # Execute tool with tracing
                                 with start_tool_span(tool_name, arguments) as tool_span:
-                                    result = await tool_executor.execute(tool_name, arguments)
+                                    result = await tool_executor.execute(
+                                        tool_name, arguments, notify=partial(manager.send_json, client_id)
+                                    )
                                     tool_span.set_attribute("success", result.success)
                                 
                                 # Handle structured results with flyout data
@@ -686,9 +1015,8 @@ async def process_text_message(
                         if not full_response and session.conversation_history.get_messages():
                             last_msg = session.conversation_history.get_messages()[-1]
                             if last_msg.get("role") == "tool":
-                                async for chunk in ollama.chat(
-                                    session.conversation_history.get_messages()
-                                ):
+                                followup_stream = ollama.chat(session.conversation_history.get_messages(), session_key=client_id)
+                                async for chunk in followup_stream:
                                     if chunk["type"] == "text":
                                         full_response += chunk["content"]
                                         await manager.send_json(client_id, {
@@ -706,6 +1034,8 @@ async def process_text_message(
                     session.set_state(SessionState.LISTENING)
                     await manager.send_json(client_id, {"type": "state", "state": "listening"})
                     return
+                finally:
+                    await close_llm_streams(llm_stream, followup_stream)
                 
                 if not full_response:
                     session.set_state(SessionState.LISTENING)
@@ -730,7 +1060,16 @@ async def process_text_message(
                     tts.speaking_rate = voice_speed
                     
                     audio_chunks_sent = 0
+                    audio_seconds = 0.0
+                    # Synthesis time excludes sending: only time spent waiting on the TTS counts
+                    synthesis_seconds = 0.0
+                    synth_started = waiting_since = time.perf_counter()
                     async for audio_chunk in tts.synthesize_streaming(full_response):
+                        chunk_ready = time.perf_counter()
+                        synthesis_seconds += chunk_ready - waiting_since
+                        if audio_chunks_sent == 0:
+                            tts_span.set_attribute("first_audio_seconds", chunk_ready - synth_started)
+                        
                         if session.should_stop():
                             logger.info("TTS interrupted", client_id=client_id)
                             tts_span.set_attribute("interrupted", True)
@@ -738,15 +1077,22 @@ async def process_text_message(
                             break
                         
                         audio_chunks_sent += 1
+                        audio_seconds += wav_duration_seconds(audio_chunk)
                         await manager.send_json(client_id, {
                             "type": "audio",
                             "data": base64.b64encode(audio_chunk).decode('utf-8')
                         })
+                        waiting_since = time.perf_counter()
                     
                     tts_span.set_attribute("audio_chunks", audio_chunks_sent)
+                    tts_span.set_attribute("audio_seconds", audio_seconds)
+                    tts_span.set_attribute("synthesis_seconds", synthesis_seconds)
                 
                 logger.info("Text message processed, audio sent", client_id=client_id)
         
+    except asyncio.CancelledError:
+        logger.info("text_turn_cancelled", client_id=client_id, state=session.state.name)
+        raise
     except Exception as e:
         logger.error("Text pipeline error", error=str(e), client_id=client_id)
         await manager.send_json(client_id, {
@@ -762,13 +1108,42 @@ async def websocket_endpoint(websocket: WebSocket):
     import uuid
     client_id = str(uuid.uuid4())[:8]
     
-    await manager.connect(websocket, client_id)
+    await manager.connect(websocket, client_id, websocket.query_params.get("resume"))
     
     # Client settings (read from actual settings)
     voice = settings.tts_voice if hasattr(settings, 'tts_voice') else 'amy'
     model = settings.ollama_model  # Read from .env properly
     voice_speed = 1.0  # Default speaking rate multiplier
     
+    # End-of-turn detection, tunable per session via the settings message
+    session_state = manager.get_session(client_id)
+    session_state.endpointer = EndpointDetector(
+        EndpointConfig.from_settings(), settings.audio_sample_rate
+    )
+    
+    async def handle_audio(audio_data: bytes, tts_playing: bool) -> None:
+        # Hold audio in the ingest queue until the models are loaded so the
+        # first frame never pays for (or blocks on) a cold load
+        startup = get_startup()
+        if not startup.done:
+            await startup.wait()
+        # Reads voice/model/voice_speed at call time so settings changes apply
+        session = manager.get_session(client_id)
+        if session:
+            await process_audio_pipeline(
+                client_id, audio_data, session, voice, model, tts_playing, voice_speed
+            )
+    
+    # Single ordered consumer per session instead of a task per frame
+    ingest = AudioIngestQueue(
+        handle_audio,
+        max_frames=settings.audio_ingest_max_frames,
+        max_coalesce_bytes=settings.audio_sample_rate * 2 * settings.audio_ingest_coalesce_ms // 1000,
+        name=client_id,
+    )
+    session_state.audio_ingest = ingest
+    ingest.start()
+    
     try:
         while True:
             # Receive message
@@ -792,12 +1167,8 @@ async def websocket_endpoint(websocket: WebSocket):
                 tts_playing = raw_bytes[0] == 1 if len(raw_bytes) > 0 else False
                 audio_data = raw_bytes[1:] if len(raw_bytes) > 1 else raw_bytes
                 
-                # Process in background to not block
-                asyncio.create_task(
-                    process_audio_pipeline(
-                        client_id, audio_data, session, voice, model, tts_playing, voice_speed
-                    )
-                )
+                # Queue for the session's consumer; never blocks the receive loop
+                ingest.put(audio_data, tts_playing)
             
             elif "text" in message:
                 # JSON control message
@@ -844,6 +1215,22 @@ async def websocket_endpoint(websocket: WebSocket):
                             # Voice speed multiplier (0.5 to 2.0)
                             voice_speed = max(0.5, min(2.0, float(data["voiceSpeed"])))
                         
+                        # End-of-turn thresholds (milliseconds)
+                        endpoint_fields = {
+                            "endpointSilenceMs": "min_silence_ms",
+                            "endpointFastSilenceMs": "fast_silence_ms",
+                            "endpointMaxSilenceMs": "max_silence_ms",
+                            "endpointMinUtteranceMs": "min_utterance_ms",
+                        }
+                        endpoint_changes = {
+                            field: max(0, min(5000, int(data[key])))
+                            for key, field in endpoint_fields.items() if key in data
+                        }
+                        if "endpointUseTranscript" in data:
+                            endpoint_changes["use_transcript"] = bool(data["endpointUseTranscript"])
+                        if endpoint_changes and session.endpointer is not None:
+                            session.endpointer.config = session.endpointer.config.updated(**endpoint_changes)
+                        
                         # Handle backend settings
                         llm_backend = data.get("llmBackend", "ollama")
                         if llm_backend not in valid_backends:
@@ -860,9 +1247,9 @@ async def websocket_endpoint(websocket: WebSocket):
                             llm_url = data.get("openaiUrl", "https://api.openai.com")
                             llm_api_key = data.get("openaiApiKey", "")
                         
-                        # Update the LLM client configuration
-                        llm_client = await get_llm_client()
-                        llm_client.update_config(
+                        # Swap this session's LLM profile; other sessions and
+                        # the pooled connections are unaffected
+                        session.llm_profile = session.llm_profile.updated(
                             backend=llm_backend,
                             base_url=llm_url,
                             model=model,
@@ -888,10 +1275,18 @@ async def websocket_endpoint(websocket: WebSocket):
                     
                     elif msg_type == "interrupt":
                         session.interrupt()
+                        ingest.drain()
+                        await session.cancel_turn("interrupt")
                         await manager.send_json(client_id, {
                             "type": "state",
                             "state": "interrupted"
                         })
+                        if session.state != SessionState.IDLE:
+                            session.set_state(SessionState.LISTENING)
+                            await manager.send_json(client_id, {
+                                "type": "state",
+                                "state": "listening"
+                            })
                     
                     elif msg_type == "playback_done":
                         # Client finished playing audio, go back to listening
@@ -945,7 +1340,7 @@ async def websocket_endpoint(websocket: WebSocket):
                             })
                             
                             # Process the text message through LLM pipeline
-                            asyncio.create_task(
+                            session.start_turn(
                                 process_text_message(
                                     client_id, text, session,
                                     voice, model, voice_speed
@@ -964,7 +1359,7 @@ async def websocket_endpoint(websocket: WebSocket):
                                 
                                 tool = tool_registry.get_tool(command)
                                 if tool:
-                                    result = await tool["function"](**params)
+                                    result = await tool.execute(**params)
                                     
                                     # Send music state update back
                                     if isinstance(result, dict):
@@ -985,10 +1380,17 @@ async def websocket_endpoint(websocket: WebSocket):
                     logger.warning("Invalid JSON", client_id=client_id)
     
     except WebSocketDisconnect:
-        manager.disconnect(client_id)
+        pass
     except Exception as e:
         logger.error("WebSocket error", error=str(e), client_id=client_id)
+    finally:
+        await ingest.stop()
+        await session_state.cancel_turn("disconnect")
+        # After the turn has unwound, so nothing touches released buffers
         manager.disconnect(client_id)
+        router = get_llm_router()
+        if router is not None:
+            router.forget(client_id)
 
 
 def main():
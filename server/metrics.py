@@ -0,0 +1,393 @@
+"""
+Prometheus metrics for Voice Agent.
+
+Lightweight, dependency-free metric types rendered in the Prometheus text
+exposition format and served from `/metrics`. Observations are a bisect and
+two additions under a per-series lock, so they are safe to call from the
+event loop and from `asyncio.to_thread` workers alike.
+
+Most series are fed from the `start_*_span` helpers in `tracing.py`, so they
+are collected whether or not OpenTelemetry export is enabled.
+"""
+import threading
+from bisect import bisect_left
+from typing import Iterable, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bucket presets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+RTF_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0)
+RATE_BUCKETS = (5, 10, 20, 30, 50, 75, 100, 150, 200, 300)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Base class: a named family of series keyed by label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: dict[tuple[str, ...], "_Metric"] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values, **kwvalues):
+        """Get (or create) the child series for the given label values."""
+        if kwvalues:
+            values = tuple(str(kwvalues[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._series.get(values)
+        if child is None:
+            with self._lock:
+                child = self._series.get(values)
+                if child is None:
+                    child = self._new_child()
+                    self._series[values] = child
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _default(self):
+        """Unlabelled metrics have a single implicit series."""
+        return self.labels()
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def _samples(self) -> list[str]:
+        return [
+            f"{self.name}_total{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+            for values, child in list(self._series.items())
+        ]
+
+
+class _GaugeChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def _samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+            for values, child in list(self._series.items())
+        ]
+
+
+class _HistogramChild:
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> tuple[list[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class Histogram(_Metric):
+    """Distribution of observations in fixed cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def _samples(self) -> list[str]:
+        lines = []
+        for values, child in list(self._series.items()):
+            counts, total, count = child.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text exposition format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+# Global registry
+registry = MetricsRegistry()
+
+# Audio / VAD
+VAD_WINDOW_SECONDS = registry.histogram(
+    "felix_vad_window_seconds", "Silero VAD inference time per window", buckets=FAST_BUCKETS
+)
+AUDIO_FRAMES_DROPPED = registry.counter(
+    "felix_audio_frames_dropped", "Microphone frames dropped because the ingest queue was full"
+)
+AUDIO_FRAMES_COALESCED = registry.counter(
+    "felix_audio_frames_coalesced", "Microphone frames merged into a larger batch while behind"
+)
+AUDIO_FRAMES_DRAINED = registry.counter(
+    "felix_audio_frames_drained", "Queued microphone frames discarded on barge-in"
+)
+
+# Speech-to-text
+STT_DECODE_SECONDS = registry.histogram(
+    "felix_stt_decode_seconds", "Whisper transcription wall time per utterance"
+)
+STT_REAL_TIME_FACTOR = registry.histogram(
+    "felix_stt_real_time_factor", "STT decode time divided by audio duration", buckets=RTF_BUCKETS
+)
+
+# LLM
+LLM_TTFT_SECONDS = registry.histogram(
+    "felix_llm_time_to_first_token_seconds", "Time from chat request to first streamed token", ["backend"]
+)
+LLM_TOKENS_PER_SECOND = registry.histogram(
+    "felix_llm_tokens_per_second", "LLM decode throughput", ["backend"], buckets=RATE_BUCKETS
+)
+LLM_ENDPOINT_IN_FLIGHT = registry.gauge(
+    "felix_llm_endpoint_in_flight", "Chat requests streaming from each routed LLM endpoint", ["endpoint"]
+)
+LLM_ENDPOINT_HEALTHY = registry.gauge(
+    "felix_llm_endpoint_healthy", "1 if a routed LLM endpoint is accepting requests", ["endpoint"]
+)
+LLM_ENDPOINT_FAILOVERS = registry.counter(
+    "felix_llm_endpoint_failovers", "Chat requests retried on another endpoint after a connection error"
+)
+LLM_SPECULATION_TOTAL = registry.counter(
+    "felix_llm_speculation", "Speculative LLM runs by outcome (hit, miss, abandoned)", ["outcome"]
+)
+LLM_SPECULATION_WASTED_TOKENS = registry.counter(
+    "felix_llm_speculation_wasted_tokens", "Output tokens generated by discarded speculative runs"
+)
+LLM_SPECULATION_WASTED_SECONDS = registry.counter(
+    "felix_llm_speculation_wasted_seconds", "Backend time spent on discarded speculative runs"
+)
+
+# Tools
+TOOL_SECONDS = registry.histogram(
+    "felix_tool_duration_seconds", "Tool execution latency", ["tool"]
+)
+
+# Text-to-speech
+TTS_SYNTHESIS_SECONDS = registry.histogram(
+    "felix_tts_synthesis_seconds", "TTS synthesis time per response, summed over chunks"
+)
+TTS_FIRST_AUDIO_SECONDS = registry.histogram(
+    "felix_tts_first_audio_seconds", "Time from starting TTS to its first audio chunk"
+)
+TTS_REAL_TIME_FACTOR = registry.histogram(
+    "felix_tts_real_time_factor", "TTS synthesis time divided by audio duration", buckets=RTF_BUCKETS
+)
+TTS_CACHE_LOOKUPS = registry.counter(
+    "felix_tts_cache_lookups", "TTS cache lookups by result (memory_hit, disk_hit, miss)", ["result"]
+)
+TTS_CACHE_BYTES = registry.gauge(
+    "felix_tts_cache_bytes", "Bytes held by the TTS cache per tier", ["tier"]
+)
+
+# Transport / runtime
+WS_SEND_SECONDS = registry.histogram(
+    "felix_websocket_send_seconds", "Time to hand a message to the WebSocket", ["kind"], buckets=FAST_BUCKETS
+)
+EVENT_LOOP_LAG_SECONDS = registry.histogram(
+    "felix_event_loop_lag_seconds", "Scheduling delay of the asyncio event loop", buckets=FAST_BUCKETS
+)
+LOOP_STALLS = registry.counter(
+    "felix_event_loop_stalls", "Event-loop stalls over the threshold, by the code that was running", ["source"]
+)
+LOOP_STALL_SECONDS = registry.histogram(
+    "felix_event_loop_stall_seconds", "Duration of event-loop stalls", buckets=LATENCY_BUCKETS
+)
+TOOLS_OFFLOADED = registry.counter(
+    "felix_tools_offloaded", "Opted-in async tools moved to the blocking worker pool after stalling the event loop", ["tool"]
+)
+WEB_PAGE_FETCHES = registry.counter(
+    "felix_web_page_fetches", "Result pages read by deep web search, by outcome (fetched, cached, revalidated, skipped, failed, timeout)", ["result"]
+)
+ACTIVE_SESSIONS = registry.gauge(
+    "felix_active_sessions", "Connected WebSocket sessions"
+)
+SESSION_MEMORY_BYTES = registry.gauge(
+    "felix_session_memory_bytes", "Memory held by in-memory sessions per kind (audio, ingest, history)", ["kind"]
+)
+SESSIONS_EVICTED = registry.counter(
+    "felix_sessions_evicted", "Sessions spilled to disk or dropped from memory", ["reason"]
+)
+SESSIONS_RESUMED = registry.counter(
+    "felix_sessions_resumed", "Reconnects that resumed a session, by where it was found", ["source"]
+)
+QUEUE_DEPTH = registry.gauge(
+    "felix_queue_depth", "Items waiting or in flight per internal queue", ["queue"]
+)
+STARTUP_SECONDS = registry.gauge(
+    "felix_startup_seconds", "Wall time from process start until every component was loaded"
+)
+STARTUP_COMPONENT_SECONDS = registry.gauge(
+    "felix_startup_component_seconds", "Load and warm-up time per startup component", ["component", "phase"]
+)
+MODEL_WORKER_CALL_SECONDS = registry.histogram(
+    "felix_model_worker_call_seconds", "Round trip of calls to model worker processes", ["family", "method"], buckets=LATENCY_BUCKETS
+)
+MODEL_WORKER_RESTARTS = registry.counter(
+    "felix_model_worker_restarts", "Model worker processes restarted after crashing or hanging", ["family"]
+)
+TURNS_CANCELLED = registry.counter(
+    "felix_turns_cancelled", "In-flight turns aborted before completion", ["reason"]
+)
+
+
+def observe_tts(synthesis_seconds: float, audio_seconds: float, first_audio_seconds: float | None = None) -> None:
+    """Record one TTS response; RTF is total synthesis time over audio length."""
+    if first_audio_seconds is not None:
+        TTS_FIRST_AUDIO_SECONDS.observe(first_audio_seconds)
+    TTS_SYNTHESIS_SECONDS.observe(synthesis_seconds)
+    if audio_seconds > 0:
+        TTS_REAL_TIME_FACTOR.observe(synthesis_seconds / audio_seconds)
+
+
+def render() -> str:
+    """Render the global registry."""
+    return registry.render()
+
@@ -3,15 +3,39 @@ Session State Management
 Handles the state machine for voice conversations.
 """
 import asyncio
+import secrets
 import time
 from enum import Enum, auto
 from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Coroutine, Optional
+import numpy as np
 import structlog
 
+from . import metrics
+from .config import settings
+from .audio.buffer import RingBuffer
 from .llm.conversation import ConversationHistory
+from .llm.profile import LLMProfile
+
+if TYPE_CHECKING:
+    from .audio.endpointing import EndpointDetector
+    from .audio.ingest import AudioIngestQueue
+    from .audio.vad import SileroVAD
+    from .llm.ollama import LLMClient
+    from .llm.speculative import SpeculativeResponse
 
 logger = structlog.get_logger()
 
+# How long cancel_turn waits for a cancelled turn to unwind
+TURN_CANCEL_TIMEOUT = 2.0
+
+# Longest utterance kept for STT; older audio is dropped
+MAX_UTTERANCE_SAMPLES = int(settings.session_audio_max_seconds * settings.audio_sample_rate)
+
+
+def _new_history() -> ConversationHistory:
+    return ConversationHistory(max_bytes=settings.session_history_max_kb * 1024)
+
 
 class SessionState(Enum):
     """Voice session states."""
@@ -30,11 +54,20 @@ class Session:
     """
     state: SessionState = SessionState.IDLE
     
-    # Audio buffer for accumulating audio data
-    audio_buffer: bytearray = field(default_factory=bytearray)
+    # Identity: the resume token survives reconnects, the client id does not
+    token: str = field(default_factory=lambda: secrets.token_urlsafe(16))
+    client_id: Optional[str] = None
+    attached: bool = True
+    
+    # Utterance audio, allocated on first use (see audio_buffer)
+    _audio: Optional[RingBuffer] = None
     
     # Conversation history
-    conversation_history: ConversationHistory = field(default_factory=ConversationHistory)
+    conversation_history: ConversationHistory = field(default_factory=_new_history)
+    
+    # LLM selection for this session and the client built from it
+    llm_profile: LLMProfile = field(default_factory=LLMProfile.from_settings)
+    llm_client: Optional["LLMClient"] = None
     
     # Control flags
     _stop_requested: bool = False
@@ -42,14 +75,45 @@ class Session:
     # Processing lock - prevents multiple simultaneous pipeline runs
     _processing_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
     
+    # Ordered microphone frame queue and the turn task it last started
+    audio_ingest: Optional["AudioIngestQueue"] = None
+    turn_task: Optional[asyncio.Task] = None
+    _turn_tasks: set[asyncio.Task] = field(default_factory=set)
+    
+    # Per-session VAD and end-of-turn detection
+    vad: Optional["SileroVAD"] = None
+    endpointer: Optional["EndpointDetector"] = None
+    interim_task: Optional[asyncio.Task] = None
+    speculation: Optional["SpeculativeResponse"] = None
+    
     # Timing
     last_activity: float = field(default_factory=time.time)
     
+    @property
+    def audio_buffer(self) -> RingBuffer:
+        """Buffer for accumulating utterance audio (capped at MAX_UTTERANCE_SAMPLES)."""
+        if self._audio is None:
+            self._audio = RingBuffer(MAX_UTTERANCE_SAMPLES, np.int16)
+        return self._audio
+    
+    def release_audio(self) -> None:
+        """Free the audio buffer's storage; it is reallocated on next use."""
+        self._audio = None
+    
+    def memory_bytes(self) -> dict[str, int]:
+        """Approximate memory held by this session, by kind."""
+        audio = self._audio.allocated_bytes if self._audio is not None else 0
+        ingest = self.audio_ingest.queued_bytes if self.audio_ingest is not None else 0
+        return {
+            "audio": audio,
+            "ingest": ingest,
+            "history": self.conversation_history.nbytes,
+        }
+    
     def set_state(self, new_state: SessionState) -> None:
         """Update session state."""
         old_state = self.state
         self.state = new_state
-        self._stop_requested = False
         self.last_activity = time.time()
         logger.info("state_change", old=old_state.name, new=new_state.name)
     
@@ -67,3 +131,60 @@ class Session:
     def reset_stop_flag(self) -> None:
         """Reset the stop flag."""
         self._stop_requested = False
+    
+    def start_turn(self, coro: Coroutine) -> asyncio.Task:
+        """
+        Run one turn (STT → LLM → tools → TTS) as a cancellable task.
+        
+        The task is the turn's cancellation scope: everything it awaits,
+        including the LLM HTTP stream, tool calls and the Piper process,
+        is torn down by cancel_turn().
+        """
+        self._stop_requested = False
+        task = asyncio.create_task(coro)
+        self._turn_tasks.add(task)
+        task.add_done_callback(self._turn_tasks.discard)
+        self.turn_task = task
+        return task
+    
+    @property
+    def turn_active(self) -> bool:
+        """Whether a turn is still running."""
+        return any(not task.done() for task in self._turn_tasks)
+    
+    async def cancel_turn(self, reason: str = "barge_in") -> bool:
+        """
+        Abort in-flight turns and their side work (barge-in).
+        
+        Sets the stop flag, cancels running turn and interim-transcript
+        tasks and waits briefly for them to unwind, and discards any
+        speculative LLM run. Does not change the session state.
+        
+        Args:
+            reason: Metric label, e.g. "barge_in" or "interrupt"
+        
+        Returns:
+            True if a running turn was cancelled
+        """
+        self._stop_requested = True
+        current = asyncio.current_task()
+        turns = [t for t in self._turn_tasks if not t.done() and t is not current]
+        pending = list(turns)
+        if self.interim_task is not None and not self.interim_task.done():
+            pending.append(self.interim_task)
+        
+        for task in pending:
+            task.cancel()
+        if pending:
+            _, still_running = await asyncio.wait(pending, timeout=TURN_CANCEL_TIMEOUT)
+            if still_running:
+                logger.warning("turn_cancel_slow", tasks=len(still_running))
+        
+        if self.speculation is not None:
+            speculation, self.speculation = self.speculation, None
+            await speculation.cancel("abandoned")
+        
+        if turns:
+            metrics.TURNS_CANCELLED.labels(reason=reason).inc()
+            logger.info("turn_cancelled", reason=reason, tasks=len(turns))
+        return bool(turns)
@@ -0,0 +1,238 @@
+"""
+Session Manager
+Owns every in-memory session: attaches them to connections, keeps
+disconnected ones around briefly for resume, and spills idle history to
+the session store so long-running servers do not grow without bound.
+"""
+import asyncio
+import time
+from functools import partial
+from pathlib import Path
+from typing import Optional
+import structlog
+
+from . import metrics
+from .config import settings
+from .session import Session, SessionState
+from .session_store import DEFAULT_STORE_DIR, SessionStore, valid_token
+
+logger = structlog.get_logger()
+
+
+class SessionManager:
+    """
+    Session lifecycle: open, detach, resume and evict.
+
+    Connected sessions are keyed by client id. A disconnected session is
+    kept (without its audio buffers, VAD or LLM client) under its resume
+    token for `resume_ttl` seconds; after that its history is written to
+    the store and it is dropped. Connected sessions idle for
+    `idle_seconds` keep running but their history moves to disk and is
+    read back on the next turn.
+    """
+
+    def __init__(
+        self,
+        store: Optional[SessionStore] = None,
+        idle_seconds: float = 900.0,
+        resume_ttl: float = 300.0,
+    ):
+        """
+        Args:
+            store: Where spilled history goes (None keeps everything in memory)
+            idle_seconds: Idle time before a connected session is spilled
+            resume_ttl: How long a disconnected session stays in memory
+        """
+        self.store = store
+        self.idle_seconds = idle_seconds
+        self.resume_ttl = resume_ttl
+
+        self._sessions: dict[str, Session] = {}
+        self._detached: dict[str, Session] = {}
+
+    def open(self, client_id: str, resume_token: Optional[str] = None) -> tuple[Session, Optional[str]]:
+        """
+        Attach a session to a new connection.
+
+        Args:
+            client_id: Connection id
+            resume_token: Token the client got from a previous connection
+
+        Returns:
+            (session, source) where source is "memory" or "disk" when an
+            earlier session was resumed, else None
+        """
+        session = None
+        source = None
+        if valid_token(resume_token) and not self._is_attached(resume_token):
+            session = self._detached.pop(resume_token, None)
+            if session is not None:
+                source = "memory"
+            elif self.store is not None and self.store.exists(resume_token):
+                session = Session(token=resume_token)
+                session.conversation_history.defer(partial(self.store.load, resume_token))
+                source = "disk"
+
+        if session is None:
+            session = Session()
+        session.client_id = client_id
+        session.attached = True
+        session.last_activity = time.time()
+        self._sessions[client_id] = session
+
+        if source is not None:
+            metrics.SESSIONS_RESUMED.labels(source=source).inc()
+            logger.info("session_resumed", client_id=client_id, source=source)
+        self.update_metrics()
+        return session, source
+
+    def get(self, client_id: str) -> Optional[Session]:
+        return self._sessions.get(client_id)
+
+    def detach(self, client_id: str) -> Optional[Session]:
+        """
+        Release a closed connection's session.
+
+        Per-connection resources are dropped now; the conversation is kept
+        for resume until the next eviction sweep past `resume_ttl`.
+        """
+        session = self._sessions.pop(client_id, None)
+        if session is None:
+            return None
+
+        session.attached = False
+        session.client_id = None
+        session.release_audio()
+        session.audio_ingest = None
+        session.vad = None
+        session.endpointer = None
+        session.speculation = None
+        session.llm_client = None
+        session.last_activity = time.time()
+        self._detached[session.token] = session
+        self.update_metrics()
+        return session
+
+    def _is_attached(self, token: str) -> bool:
+        return any(session.token == token for session in self._sessions.values())
+
+    async def _spill(self, session: Session) -> bool:
+        """Write a session's history to the store. Returns False if nothing was written."""
+        history = session.conversation_history
+        if self.store is None or not history.loaded or len(history) == 0:
+            return False
+        records = history.to_records()
+        try:
+            await asyncio.to_thread(self.store.save, session.token, records)
+        except (OSError, ValueError) as e:
+            logger.warning("session_spill_failed", error=str(e))
+            return False
+        return True
+
+    async def evict_idle(self, now: Optional[float] = None) -> int:
+        """
+        One eviction sweep.
+
+        Returns:
+            Sessions evicted or spilled
+        """
+        now = time.time() if now is None else now
+        evicted = 0
+
+        for token, session in list(self._detached.items()):
+            if now - session.last_activity < self.resume_ttl:
+                continue
+            # Drop before the write so a resume mid-spill reads the file
+            # (or starts fresh) instead of racing on this object
+            del self._detached[token]
+            await self._spill(session)
+            metrics.SESSIONS_EVICTED.labels(reason="disconnected").inc()
+            evicted += 1
+
+        for session in list(self._sessions.values()):
+            if (
+                now - session.last_activity < self.idle_seconds
+                or session.state != SessionState.IDLE
+                or session.turn_active
+                or not session.conversation_history.loaded
+            ):
+                continue
+            stamp = session.last_activity
+            size = len(session.conversation_history)
+            spilled = await self._spill(session)
+            # A turn that started during the write keeps its history in memory
+            if session.last_activity != stamp or len(session.conversation_history) != size:
+                continue
+            if spilled:
+                session.conversation_history.defer(partial(self.store.load, session.token))
+            session.release_audio()
+            metrics.SESSIONS_EVICTED.labels(reason="idle").inc()
+            evicted += 1
+
+        if evicted:
+            logger.info("sessions_evicted", count=evicted, connected=len(self._sessions),
+                        detached=len(self._detached))
+        self.update_metrics()
+        return evicted
+
+    async def run_eviction(self, interval: float = 30.0) -> None:
+        """Sweep forever; run as a background task for the server's lifetime."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.evict_idle()
+            except Exception as e:
+                logger.error("session_eviction_error", error=str(e))
+
+    async def spill_all(self) -> int:
+        """Write every session's history to the store (server shutdown)."""
+        written = 0
+        for session in list(self._sessions.values()) + list(self._detached.values()):
+            if await self._spill(session):
+                written += 1
+        return written
+
+    def memory_bytes(self) -> dict[str, int]:
+        """Memory held by all in-memory sessions, by kind."""
+        totals = {"audio": 0, "ingest": 0, "history": 0}
+        for session in list(self._sessions.values()) + list(self._detached.values()):
+            for kind, size in session.memory_bytes().items():
+                totals[kind] += size
+        return totals
+
+    def update_metrics(self) -> None:
+        metrics.ACTIVE_SESSIONS.set(len(self._sessions))
+        for kind, size in self.memory_bytes().items():
+            metrics.SESSION_MEMORY_BYTES.labels(kind=kind).set(size)
+
+    def report(self) -> dict:
+        """Session counts and memory (tokens are never included)."""
+        return {
+            "connected": len(self._sessions),
+            "detached": len(self._detached),
+            "spilled": sum(
+                1 for session in self._sessions.values()
+                if not session.conversation_history.loaded
+            ),
+            "memory_bytes": self.memory_bytes(),
+        }
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+# Global instance
+_session_manager: Optional[SessionManager] = None
+
+
+def get_session_manager() -> SessionManager:
+    """Get the server's session manager, configured from settings."""
+    global _session_manager
+    if _session_manager is None:
+        directory = Path(settings.session_store_dir) if settings.session_store_dir else DEFAULT_STORE_DIR
+        _session_manager = SessionManager(
+            store=SessionStore(directory, settings.session_store_max_age_hours * 3600),
+            idle_seconds=settings.session_idle_seconds,
+            resume_ttl=settings.session_resume_ttl,
+        )
+    return _session_manager
@@ -0,0 +1,100 @@
+"""
+Session Store
+Compact on-disk copies of conversation history, keyed by resume token,
+so evicted or disconnected sessions can be rehydrated on reconnect.
+"""
+import json
+import os
+import re
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+import structlog
+
+logger = structlog.get_logger()
+
+DEFAULT_STORE_DIR = Path(__file__).parent.parent / "data" / "sessions"
+
+# Resume tokens come from clients; only accept what secrets.token_urlsafe makes
+_TOKEN = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+
+def valid_token(token: Optional[str]) -> bool:
+    """Whether a client-supplied resume token is well formed."""
+    return bool(token) and _TOKEN.match(token) is not None
+
+
+class SessionStore:
+    """
+    One zlib-compressed JSON file per session.
+
+    Files are written atomically and are small (history only), so reads
+    and writes are cheap enough for a worker thread.
+    """
+
+    def __init__(self, directory: Path, max_age_seconds: float = 7 * 24 * 3600):
+        """
+        Args:
+            directory: Where session files live
+            max_age_seconds: Files untouched this long are pruned
+        """
+        self.directory = Path(directory)
+        self.max_age_seconds = max_age_seconds
+
+    def _path(self, token: str) -> Path:
+        if not valid_token(token):
+            raise ValueError("Invalid session token")
+        return self.directory / f"{token}.json.z"
+
+    def save(self, token: str, records: list[dict]) -> int:
+        """
+        Write a session's history.
+
+        Returns:
+            Bytes written
+        """
+        data = zlib.compress(json.dumps({"messages": records}, separators=(",", ":")).encode("utf-8"), 6)
+        path = self._path(token)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        return len(data)
+
+    def load(self, token: str) -> list[dict]:
+        """Read a session's history (empty if missing or unreadable)."""
+        try:
+            raw = zlib.decompress(self._path(token).read_bytes())
+            return json.loads(raw)["messages"]
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError, KeyError, zlib.error) as e:
+            logger.warning("session_store_read_failed", error=str(e))
+            return []
+
+    def exists(self, token: str) -> bool:
+        return valid_token(token) and self._path(token).exists()
+
+    def delete(self, token: str) -> None:
+        try:
+            self._path(token).unlink()
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def prune(self) -> int:
+        """Delete files older than max_age_seconds. Returns files removed."""
+        if not self.directory.exists():
+            return 0
+        cutoff = time.time() - self.max_age_seconds
+        removed = 0
+        for path in self.directory.glob("*.json.z"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        if removed:
+            logger.info("session_store_pruned", removed=removed)
+        return removed
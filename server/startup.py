@@ -0,0 +1,171 @@
+"""
+Startup Orchestration
+Loads independent components concurrently, warms each one up with a real
+inference, and tracks readiness for the /ready endpoint.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+import structlog
+
+from . import metrics
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class Component:
+    """One startup step: load, then optionally warm up."""
+    name: str
+    load: Callable[[], Awaitable[Any]]
+    warmup: Optional[Callable[[Any], Awaitable[Any]]] = None
+    required: bool = True
+    timeout: float = 300.0
+
+    status: str = "pending"       # pending, loading, warming, ready, failed
+    load_seconds: float = 0.0
+    warmup_seconds: float = 0.0
+    error: Optional[str] = None
+
+    def report(self) -> dict:
+        return {
+            "status": self.status,
+            "required": self.required,
+            "load_ms": round(self.load_seconds * 1000, 1),
+            "warmup_ms": round(self.warmup_seconds * 1000, 1),
+            **({"error": self.error} if self.error else {}),
+        }
+
+
+class StartupOrchestrator:
+    """
+    Run component loaders concurrently and gate readiness on them.
+
+    Loaders that block (model loading) should hand their work to a thread
+    themselves (`asyncio.to_thread`) so components genuinely overlap. A
+    failing optional component is logged and reported but does not keep
+    the server from becoming ready.
+    """
+
+    def __init__(self):
+        self.components: dict[str, Component] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._done = asyncio.Event()
+
+    def add(
+        self,
+        name: str,
+        load: Callable[[], Awaitable[Any]],
+        warmup: Optional[Callable[[Any], Awaitable[Any]]] = None,
+        required: bool = True,
+        timeout: float = 300.0,
+    ) -> None:
+        """
+        Register a component.
+
+        Args:
+            name: Component name shown in /ready
+            load: Coroutine function returning the loaded object
+            warmup: Coroutine function run on the loaded object
+            required: Whether readiness waits for it to succeed
+            timeout: Seconds allowed for load plus warm-up
+        """
+        self.components[name] = Component(name, load, warmup, required, timeout)
+
+    async def _run_one(self, component: Component) -> None:
+        try:
+            await asyncio.wait_for(self._load_and_warm(component), component.timeout)
+            component.status = "ready"
+        except Exception as e:
+            component.status = "failed"
+            component.error = str(e) or type(e).__name__
+            log = logger.error if component.required else logger.warning
+            log("startup_component_failed", component=component.name, error=component.error)
+
+        metrics.STARTUP_COMPONENT_SECONDS.labels(component=component.name, phase="load").set(component.load_seconds)
+        metrics.STARTUP_COMPONENT_SECONDS.labels(component=component.name, phase="warmup").set(component.warmup_seconds)
+
+    async def _load_and_warm(self, component: Component) -> None:
+        component.status = "loading"
+        started = time.perf_counter()
+        try:
+            loaded = await component.load()
+        finally:
+            component.load_seconds = time.perf_counter() - started
+
+        if component.warmup is not None:
+            component.status = "warming"
+            started = time.perf_counter()
+            try:
+                await component.warmup(loaded)
+            finally:
+                component.warmup_seconds = time.perf_counter() - started
+
+        logger.info(
+            "startup_component_ready",
+            component=component.name,
+            load_ms=round(component.load_seconds * 1000),
+            warmup_ms=round(component.warmup_seconds * 1000),
+        )
+
+    async def run(self) -> bool:
+        """Load every component concurrently. Returns readiness."""
+        self.started_at = time.perf_counter()
+        await asyncio.gather(*(self._run_one(c) for c in self.components.values()))
+        self.finished_at = time.perf_counter()
+        self._done.set()
+
+        serial = sum(c.load_seconds + c.warmup_seconds for c in self.components.values())
+        logger.info(
+            "startup_complete",
+            ready=self.ready,
+            total_ms=round(self.elapsed * 1000),
+            serial_ms=round(serial * 1000),
+        )
+        metrics.STARTUP_SECONDS.set(self.elapsed)
+        return self.ready
+
+    async def wait(self) -> bool:
+        """Wait for startup to finish. Returns readiness."""
+        await self._done.wait()
+        return self.ready
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def ready(self) -> bool:
+        """All required components loaded and warmed up."""
+        return self.done and all(
+            c.status == "ready" for c in self.components.values() if c.required
+        )
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    def report(self) -> dict:
+        """Readiness with a per-component timing breakdown."""
+        return {
+            "ready": self.ready,
+            "elapsed_ms": round(self.elapsed * 1000, 1),
+            "components": {name: c.report() for name, c in self.components.items()},
+        }
+
+
+# Global instance
+_orchestrator: Optional[StartupOrchestrator] = None
+
+
+def get_startup() -> StartupOrchestrator:
+    """Get the server's startup orchestrator."""
+    global _orchestrator
+    if _orchestrator is None:
+        _orchestrator = StartupOrchestrator()
+    return _orchestrator
@@ -0,0 +1,459 @@
+"""
+Batch Transcription
+Offline transcription of many recordings: files are decoded to 16 kHz
+mono as a stream, cut into speech chunks with VAD, and the chunks of all
+files are transcribed by a pool of threads sharing one faster-whisper
+model. Results are appended to a JSONL log (which makes runs resumable)
+and optionally written as SRT next to it.
+"""
+import json
+import os
+import queue
+import threading
+import time
+import wave
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+SAMPLE_RATE = 16000
+AUDIO_EXTENSIONS = {".wav", ".flac", ".mp3", ".ogg", ".opus", ".m4a", ".aac", ".webm"}
+
+# Longest chunk handed to Whisper (its context window)
+MAX_CHUNK_SECONDS = 30.0
+# Audio scanned by VAD at a time; bounds memory for hour-long files
+VAD_WINDOW_SECONDS = 300.0
+
+# Chunks are independent speech regions, so no cross-chunk conditioning
+# and no second VAD pass
+DECODE_OPTIONS = dict(
+    task="transcribe",
+    beam_size=5,
+    condition_on_previous_text=False,
+    vad_filter=False,
+    word_timestamps=False,
+)
+
+# (audio, sample_rate) -> [(start_sample, end_sample), ...]
+SpeechDetector = Callable[[np.ndarray], list[tuple[int, int]]]
+
+
+@dataclass
+class Chunk:
+    """A speech region of one file."""
+    index: int
+    start: float        # seconds from the start of the file
+    audio: np.ndarray   # float32, SAMPLE_RATE
+
+
+@dataclass
+class FileResult:
+    """Transcript of one file."""
+    path: str
+    duration: float = 0.0
+    segments: list[dict] = field(default_factory=list)
+    language: Optional[str] = None
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        return " ".join(s["text"] for s in self.segments)
+
+    @property
+    def rtf(self) -> float:
+        return self.seconds / self.duration if self.duration else 0.0
+
+    def to_record(self) -> dict:
+        return {
+            "path": self.path,
+            "duration": round(self.duration, 2),
+            "language": self.language,
+            "text": self.text,
+            "segments": self.segments,
+            "transcribe_seconds": round(self.seconds, 2),
+            "rtf": round(self.rtf, 4),
+        }
+
+
+def find_audio_files(inputs: Iterable[str]) -> list[Path]:
+    """Expand files and directories (recursively) into audio files, sorted."""
+    files = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            files.extend(p for p in path.rglob("*") if p.suffix.lower() in AUDIO_EXTENSIONS)
+        else:
+            files.append(path)
+    return sorted(set(files))
+
+
+def iter_audio(path: Path, block_seconds: float = 60.0) -> Iterator[np.ndarray]:
+    """
+    Decode any audio file to float32 mono at SAMPLE_RATE, in blocks.
+
+    Uses PyAV (installed with faster-whisper) for WAV/FLAC/MP3/Opus/...;
+    without it only PCM WAV can be read.
+    """
+    try:
+        import av
+    except ImportError:
+        yield from _iter_wav(path, block_seconds)
+        return
+
+    resampler = av.audio.resampler.AudioResampler(format="s16", layout="mono", rate=SAMPLE_RATE)
+    block = int(block_seconds * SAMPLE_RATE)
+    pieces: list[np.ndarray] = []
+    size = 0
+
+    def converted(frame) -> list[np.ndarray]:
+        out = resampler.resample(frame)
+        frames = out if isinstance(out, list) else [out] if out is not None else []
+        return [f.to_ndarray().reshape(-1) for f in frames]
+
+    with av.open(str(path), metadata_errors="ignore") as container:
+        for frame in container.decode(audio=0):
+            frame.pts = None
+            for samples in converted(frame):
+                pieces.append(samples)
+                size += len(samples)
+            if size >= block:
+                yield np.concatenate(pieces).astype(np.float32) / 32768.0
+                pieces, size = [], 0
+        for samples in converted(None):
+            pieces.append(samples)
+    if pieces:
+        yield np.concatenate(pieces).astype(np.float32) / 32768.0
+
+
+def _iter_wav(path: Path, block_seconds: float) -> Iterator[np.ndarray]:
+    """PCM16 WAV without PyAV; other rates are linearly resampled."""
+    with wave.open(str(path), "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path.name}: only 16-bit WAV is supported without PyAV")
+        rate, channels = wav.getframerate(), wav.getnchannels()
+        frames = int(block_seconds * rate)
+        while True:
+            raw = wav.readframes(frames)
+            if not raw:
+                break
+            samples = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+            if channels > 1:
+                samples = samples.reshape(-1, channels).mean(axis=1)
+            if rate != SAMPLE_RATE:
+                positions = np.arange(0, len(samples), rate / SAMPLE_RATE)
+                samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+            yield samples
+
+
+def silero_detector(min_silence_ms: int = 500, speech_pad_ms: int = 200) -> SpeechDetector:
+    """faster-whisper's bundled Silero VAD."""
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    options = VadOptions(min_silence_duration_ms=min_silence_ms, speech_pad_ms=speech_pad_ms)
+
+    def detect(audio: np.ndarray) -> list[tuple[int, int]]:
+        return [(ts["start"], ts["end"]) for ts in get_speech_timestamps(audio, options)]
+
+    return detect
+
+
+def plan_chunks(spans: list[tuple[int, int]], max_samples: int) -> list[tuple[int, int]]:
+    """Merge neighbouring speech spans into chunks of at most max_samples."""
+    chunks: list[tuple[int, int]] = []
+    for start, end in spans:
+        while end - start > max_samples:
+            chunks.append((start, start + max_samples))
+            start += max_samples
+        if chunks and end - chunks[-1][0] <= max_samples:
+            chunks[-1] = (chunks[-1][0], end)
+        else:
+            chunks.append((start, end))
+    return chunks
+
+
+def iter_chunks(
+    blocks: Iterable[np.ndarray],
+    detect: SpeechDetector,
+    max_chunk_seconds: float = MAX_CHUNK_SECONDS,
+    window_seconds: float = VAD_WINDOW_SECONDS,
+) -> Iterator[Chunk]:
+    """
+    Cut a decoded stream into speech chunks.
+
+    VAD runs over windows of `window_seconds`. Speech within the last
+    chunk-length of a window may continue into the next block, so it is
+    carried over instead of being cut.
+    """
+    max_samples = int(max_chunk_seconds * SAMPLE_RATE)
+    window = max(int(window_seconds * SAMPLE_RATE), 2 * max_samples)
+    buffer = np.zeros(0, dtype=np.float32)
+    base = 0
+    index = 0
+
+    for block in _with_end(blocks):
+        final = block is None
+        if not final:
+            buffer = np.concatenate([buffer, block])
+            if len(buffer) < window:
+                continue
+        if len(buffer) == 0:
+            break
+
+        spans = detect(buffer)
+        if final:
+            cut = len(buffer)
+        else:
+            horizon = len(buffer) - max_samples
+            later = [s for s in spans if s[1] > horizon]
+            cut = later[0][0] if later else horizon
+            if len(buffer) - cut > window - max_samples:
+                # Speech runs through most of the window: split it on chunk
+                # boundaries rather than carrying an ever-growing tail
+                cut += max(1, (horizon - cut) // max_samples) * max_samples
+            spans = [(s, min(e, cut)) for s, e in spans if s < cut]
+
+        for start, end in plan_chunks(spans, max_samples):
+            yield Chunk(index=index, start=(base + start) / SAMPLE_RATE, audio=buffer[start:end].copy())
+            index += 1
+        buffer = buffer[cut:]
+        base += cut
+
+
+def _with_end(blocks: Iterable[np.ndarray]) -> Iterator[Optional[np.ndarray]]:
+    yield from blocks
+    yield None
+
+
+def format_srt(segments: list[dict]) -> str:
+    """SubRip subtitles for a file's segments."""
+    def stamp(seconds: float) -> str:
+        ms = int(round(seconds * 1000))
+        hours, ms = divmod(ms, 3_600_000)
+        minutes, ms = divmod(ms, 60_000)
+        secs, ms = divmod(ms, 1000)
+        return f"{hours:02d}:{minutes:02d}:{secs:02d},{ms:03d}"
+
+    blocks = [
+        f"{i}\n{stamp(s['start'])} --> {stamp(s['end'])}\n{s['text']}\n"
+        for i, s in enumerate(segments, 1)
+    ]
+    return "\n".join(blocks)
+
+
+def srt_paths(files: list[Path], srt_dir: Path) -> dict[Path, Path]:
+    """
+    Where each file's subtitles go: its path relative to the folder all
+    inputs share, with an .srt suffix, so same-named recordings in
+    different subfolders don't collide. Inputs sharing a stem in one
+    folder (a.wav, a.mp3) keep their extension: a.wav.srt, a.mp3.srt.
+    """
+    if not files:
+        return {}
+    resolved = {f: f.resolve() for f in files}
+    root = Path(os.path.commonpath([str(r.parent) for r in resolved.values()]))
+    relative = {f: r.relative_to(root) for f, r in resolved.items()}
+    stems = Counter(r.with_suffix("") for r in relative.values())
+    return {
+        f: srt_dir / (r.with_suffix(".srt") if stems[r.with_suffix("")] == 1 else r.with_name(r.name + ".srt"))
+        for f, r in relative.items()
+    }
+
+
+def completed_paths(log_path: Path) -> set[str]:
+    """Files already in a JSONL log (skipped when resuming)."""
+    done = set()
+    if not log_path.exists():
+        return done
+    with log_path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["path"])
+            except (ValueError, KeyError):
+                continue  # a line cut short by an interrupted run
+    return done
+
+
+class _FileJob:
+    """Chunks of one file in flight."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.result = FileResult(path=str(path))
+        self.started = time.perf_counter()
+        self.pending = 0
+        self.decoded = False
+        self.chunks: dict[int, list[dict]] = {}
+        self.languages: Counter = Counter()  # detected language -> seconds of audio
+
+
+class BatchTranscriber:
+    """
+    Pipelined transcription of many files.
+
+    Decoder threads stream and segment files into a bounded chunk queue;
+    transcriber threads feed the chunks of all files to the model, which
+    keeps the model busy while the next files decode. Each finished file
+    is appended to the JSONL log and passed to `on_file`.
+    """
+
+    def __init__(
+        self,
+        model,
+        detect: SpeechDetector,
+        language: Optional[str] = "en",
+        workers: int = 2,
+        decoders: int = 2,
+        queue_chunks: int = 16,
+    ):
+        """
+        Args:
+            model: faster-whisper WhisperModel (create it with num_workers=workers)
+            detect: Speech detector used to cut files into chunks
+            language: Language code, or None to detect per chunk
+            workers: Concurrent transcriptions
+            decoders: Files decoded concurrently
+            queue_chunks: Decoded chunks buffered ahead of the model
+        """
+        self.model = model
+        self.detect = detect
+        self.language = language
+        self.workers = max(1, workers)
+        self.decoders = max(1, decoders)
+        self.queue_chunks = queue_chunks
+        self._lock = threading.Lock()
+
+    def run(
+        self,
+        files: list[Path],
+        log_path: Path,
+        srt_dir: Optional[Path] = None,
+        on_file: Optional[Callable[[FileResult], None]] = None,
+    ) -> dict:
+        """
+        Transcribe `files`, skipping any already in `log_path`.
+
+        Returns:
+            Summary with file counts, audio and wall seconds, and the
+            aggregate real-time factor
+        """
+        done = completed_paths(log_path)
+        todo = [f for f in files if str(f) not in done]
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+
+        files_queue: queue.Queue = queue.Queue()
+        for path in todo:
+            files_queue.put(path)
+        chunks: queue.Queue = queue.Queue(maxsize=self.queue_chunks)
+        summary = {"files": len(todo), "skipped": len(files) - len(todo), "failed": 0, "audio_seconds": 0.0}
+        started = time.perf_counter()
+
+        srt_files = srt_paths(files, srt_dir) if srt_dir is not None else {}
+        finish_lock = threading.Lock()
+
+        with log_path.open("a", encoding="utf-8") as log:
+            def finish(job: _FileJob) -> None:
+                # Called from decoder and transcriber threads
+                with finish_lock:
+                    result = job.result
+                    result.seconds = time.perf_counter() - job.started
+                    if result.error is None:
+                        result.segments = [s for i in sorted(job.chunks) for s in job.chunks[i]]
+                        result.language = self.language or (job.languages.most_common(1)[0][0] if job.languages else None)
+                        log.write(json.dumps(result.to_record(), ensure_ascii=False) + "\n")
+                        log.flush()
+                        if srt_dir is not None:
+                            srt_file = srt_files[job.path]
+                            srt_file.parent.mkdir(parents=True, exist_ok=True)
+                            srt_file.write_text(format_srt(result.segments), encoding="utf-8")
+                        summary["audio_seconds"] += result.duration
+                    else:
+                        summary["failed"] += 1
+                    if on_file is not None:
+                        on_file(result)
+
+            def decode() -> None:
+                while True:
+                    try:
+                        path = files_queue.get_nowait()
+                    except queue.Empty:
+                        return
+                    job = _FileJob(path)
+                    samples = 0
+
+                    def counted(blocks):
+                        nonlocal samples
+                        for block in blocks:
+                            samples += len(block)
+                            yield block
+
+                    try:
+                        for chunk in iter_chunks(counted(iter_audio(path)), self.detect):
+                            with self._lock:
+                                job.pending += 1
+                            chunks.put((job, chunk))
+                    except Exception as e:
+                        logger.error("batch_decode_failed", path=str(path), error=str(e))
+                        job.result.error = f"decode: {e}"
+                    with self._lock:
+                        job.result.duration = samples / SAMPLE_RATE
+                        job.decoded = True
+                        complete = job.pending == 0
+                    if complete:
+                        finish(job)
+
+            def transcribe() -> None:
+                while True:
+                    item = chunks.get()
+                    if item is None:
+                        return
+                    job, chunk = item
+                    language = None
+                    try:
+                        segments, language = self._transcribe(chunk)
+                    except Exception as e:
+                        logger.error("batch_transcribe_failed", path=str(job.path), error=str(e))
+                        segments = []
+                        job.result.error = f"transcribe: {e}"
+                    with self._lock:
+                        job.chunks[chunk.index] = segments
+                        if language:
+                            job.languages[language] += len(chunk.audio) / SAMPLE_RATE
+                        job.pending -= 1
+                        complete = job.decoded and job.pending == 0
+                    if complete:
+                        finish(job)
+
+            transcribers = [threading.Thread(target=transcribe, name=f"transcribe-{i}") for i in range(self.workers)]
+            decoders = [threading.Thread(target=decode, name=f"decode-{i}") for i in range(self.decoders)]
+            for thread in transcribers + decoders:
+                thread.start()
+            for thread in decoders:
+                thread.join()
+            for _ in transcribers:
+                chunks.put(None)
+            for thread in transcribers:
+                thread.join()
+
+        summary["wall_seconds"] = time.perf_counter() - started
+        summary["rtf"] = summary["wall_seconds"] / summary["audio_seconds"] if summary["audio_seconds"] else 0.0
+        return summary
+
+    def _transcribe(self, chunk: Chunk) -> tuple[list[dict], Optional[str]]:
+        """Segments of a chunk, offset into its file, and the language it was decoded in."""
+        segments, info = self.model.transcribe(chunk.audio, language=self.language, **DECODE_OPTIONS)
+        out = []
+        for segment in segments:
+            text = segment.text.strip()
+            if text:
+                out.append({
+                    "start": round(chunk.start + segment.start, 2),
+                    "end": round(chunk.start + segment.end, 2),
+                    "text": text,
+                })
+        return out, getattr(info, "language", None)
@@ -3,16 +3,25 @@ Speech-to-Text using faster-whisper
 GPU-accelerated transcription optimized for AMD MI50.
 """
 import asyncio
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, Union
 import numpy as np
 from faster_whisper import WhisperModel
 import structlog
 
 from ..config import settings
+from ..workers import get_worker_pool
+
+if TYPE_CHECKING:
+    from ..workers import WorkerPool
 
 logger = structlog.get_logger()
 
 
+def pcm16_to_float(audio_data) -> np.ndarray:
+    """PCM16 bytes (or a buffer over them) to float32 samples in [-1, 1]."""
+    return np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
+
+
 class WhisperSTT:
     """
     faster-whisper based speech-to-text.
@@ -24,6 +33,7 @@ class WhisperSTT:
         model_name: str = None,
         device: str = None,
         compute_type: str = None,
+        num_workers: int = 1,
     ):
         """
         Initialize Whisper STT.
@@ -32,10 +42,13 @@ class WhisperSTT:
             model_name: Model size (tiny, base, small, medium, large-v2, large-v3)
             device: cuda, cpu, or auto
             compute_type: float16, int8, int8_float16
+            num_workers: Transcriptions the model can run concurrently from
+                different threads (used by batch transcription)
         """
         self.model_name = model_name or settings.whisper_model
         self.device = device or settings.whisper_device
         self.compute_type = compute_type or settings.whisper_compute_type
+        self.num_workers = num_workers
         
         self.model: Optional[WhisperModel] = None
         self._lock = asyncio.Lock()
@@ -73,7 +86,8 @@ class WhisperSTT:
             # Download to cache
             download_root=None,
             # CPU threads if using CPU
-            cpu_threads=4 if self.device == "cpu" else 0
+            cpu_threads=4 if self.device == "cpu" else 0,
+            num_workers=self.num_workers,
         )
     
     async def transcribe(
@@ -97,30 +111,40 @@ class WhisperSTT:
             await self.initialize()
         
         # Convert bytes to float32 numpy array
-        audio_array = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
+        audio_array = pcm16_to_float(audio_data)
         
         # Run transcription in thread pool
         loop = asyncio.get_event_loop()
-        segments, info = await loop.run_in_executor(
-            None,
-            lambda: self.model.transcribe(
-                audio_array,
-                language=language,
-                task="transcribe",
-                beam_size=5,
-                best_of=5,
-                patience=1.0,
-                length_penalty=1.0,
-                temperature=[0.0, 0.2, 0.4, 0.6, 0.8, 1.0],
-                compression_ratio_threshold=2.4,
-                log_prob_threshold=-1.0,
-                no_speech_threshold=0.6,
-                condition_on_previous_text=True,
-                initial_prompt=None,
-                word_timestamps=False,
-                # Enable whisper's internal VAD to help trim residual silence
-                vad_filter=True,
-            )
+        return await loop.run_in_executor(None, self.transcribe_array, audio_array, language)
+    
+    def transcribe_array(self, audio_array: np.ndarray, language: str = "en") -> str:
+        """
+        Transcribe float32 audio synchronously (thread or worker process).
+        
+        Args:
+            audio_array: Mono float32 samples in [-1, 1]
+            language: Language code or None for auto-detect
+            
+        Returns:
+            Transcribed text
+        """
+        segments, info = self.model.transcribe(
+            audio_array,
+            language=language,
+            task="transcribe",
+            beam_size=5,
+            best_of=5,
+            patience=1.0,
+            length_penalty=1.0,
+            temperature=[0.0, 0.2, 0.4, 0.6, 0.8, 1.0],
+            compression_ratio_threshold=2.4,
+            log_prob_threshold=-1.0,
+            no_speech_threshold=0.6,
+            condition_on_previous_text=True,
+            initial_prompt=None,
+            word_timestamps=False,
+            # Enable whisper's internal VAD to help trim residual silence
+            vad_filter=True,
         )
         
         # Combine segments into full transcript
@@ -164,7 +188,7 @@ class WhisperSTT:
             
             # Process when we have enough audio
             if len(buffer) >= min_audio_length:
-                audio_array = np.frombuffer(buffer, dtype=np.int16).astype(np.float32) / 32768.0
+                audio_array = pcm16_to_float(buffer)
                 
                 # Get interim transcription
                 loop = asyncio.get_event_loop()
@@ -189,15 +213,41 @@ class WhisperSTT:
                 yield {"text": final_text, "is_final": True}
 
 
+class WorkerSTT:
+    """
+    WhisperSTT's transcribe() served by a pool of worker processes.
+    
+    Audio goes to the workers through shared memory, so decoding never
+    competes with the event loop for the GIL.
+    """
+    
+    def __init__(self, pool: "WorkerPool"):
+        self.pool = pool
+    
+    async def initialize(self) -> None:
+        """Start the workers and wait for their models to load."""
+        await asyncio.to_thread(self.pool.start)
+    
+    async def transcribe(
+        self,
+        audio_data: bytes,
+        sample_rate: int = 16000,
+        language: str = "en",
+    ) -> str:
+        """Transcribe PCM16 audio in a worker process."""
+        return await self.pool.call("transcribe", audio=audio_data, language=language)
+
+
 # Global STT instance
-_stt_instance: Optional[WhisperSTT] = None
+_stt_instance: Optional[Union[WhisperSTT, WorkerSTT]] = None
 
 
-async def get_stt() -> WhisperSTT:
-    """Get or create the global STT instance."""
+async def get_stt() -> Union[WhisperSTT, WorkerSTT]:
+    """Get or create the global STT instance (in-process or worker-backed)."""
     global _stt_instance
     if _stt_instance is None:
-        _stt_instance = WhisperSTT()
+        pool = get_worker_pool("stt")
+        _stt_instance = WorkerSTT(pool) if pool is not None else WhisperSTT()
         await _stt_instance.initialize()
     return _stt_instance
 
@@ -3,7 +3,7 @@ Tools package.
 """
 
 from .registry import tool_registry, Tool
-from .executor import tool_executor, execute_tool, ToolResult
+from .executor import tool_executor, execute_tool, get_notifier, ToolResult
 
 # Import builtin tools to register them
 from . import builtin
@@ -14,6 +14,7 @@ __all__ = [
     "tool_executor",
     "execute_tool",
     "ToolResult",
+    "get_notifier",
 ]
 
 # Convenience function
@@ -0,0 +1,8 @@
+"""
+Regenerate the built-in tool manifest: python -m server.tools [--check]
+"""
+import sys
+
+from .manifest import main
+
+sys.exit(main(sys.argv[1:]))
@@ -1,29 +1,34 @@
 """
 Built-in tools package.
-Import all tools to register them with the tool registry.
+Tools are registered from the static manifest (manifest.json) and each
+module is imported the first time one of its tools is called, so unused
+tools never load their dependencies. Regenerate the manifest after
+changing a tool:
+
+    python -m server.tools
 """
+import importlib
+import structlog
+
+from ...config import settings
+from ..manifest import BUILTIN_MODULES, BUILTIN_PACKAGE, load_manifest
+from ..registry import configure_blocking_pool, tool_registry
+
+logger = structlog.get_logger()
 
-# Import all tool modules to trigger registration
-from . import datetime_tools
-from . import weather_tools
-from . import web_tools
-from . import system_tools
-from . import knowledge_tools
-from . import help_tools
-from . import memory_tools
-from . import music_tools
-from . import onboarding_tools
-from . import image_tools
+tool_registry.disable(settings.tools_disabled)
+tool_registry.allow_offload(settings.tool_auto_offload)
+configure_blocking_pool(settings.tool_blocking_workers)
 
-__all__ = [
-    "datetime_tools",
-    "weather_tools", 
-    "web_tools",
-    "system_tools",
-    "knowledge_tools",
-    "help_tools",
-    "memory_tools",
-    "music_tools",
-    "onboarding_tools",
-    "image_tools",
-]
+_manifest = load_manifest()
+if _manifest is not None:
+    tool_registry.register_manifest(_manifest)
+else:
+    # No manifest (e.g. a source checkout that removed it): import eagerly,
+    # skipping modules whose dependencies are missing
+    logger.warning("tool_manifest_missing", fallback="eager_import")
+    for _name in BUILTIN_MODULES:
+        try:
+            importlib.import_module(f"{BUILTIN_PACKAGE}.{_name}")
+        except Exception as e:
+            logger.error("tool_module_import_failed", module=_name, error=str(e))
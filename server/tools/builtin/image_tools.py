@@ -5,15 +5,21 @@ Provides text-to-image, image-to-image, and other AI image generation capabiliti
 
 import asyncio
 import base64
+import copy
+import random
 from pathlib import Path
 from typing import Optional
 import structlog
 
+from ..executor import get_notifier
 from ..registry import tool_registry
 from ...comfy_service import get_comfy_service
 
 logger = structlog.get_logger(__name__)
 
+# Longest wait for one image
+GENERATION_TIMEOUT = 120.0
+
 # Default workflow for text-to-image (Stable Diffusion 1.5 format)
 DEFAULT_TEXT2IMG_WORKFLOW = {
     "3": {
@@ -107,16 +113,16 @@ async def generate_image(
     if not service:
         return "❌ Image generation is not available. ComfyUI service is not initialized."
     
-    # Start ComfyUI if not running
-    if not service.is_running:
-        logger.info("starting_comfyui_for_generation")
-        started = await service.start()
+    # Start ComfyUI if not running, or wait for the background warm start
+    if service.is_starting or not service.is_running:
+        logger.info("waiting_for_comfyui", starting=service.is_starting)
+        started = await service.ensure_ready()
         if not started:
             return "❌ Failed to start image generation service. Please check ComfyUI installation."
     
     try:
         # Create workflow from template
-        workflow = DEFAULT_TEXT2IMG_WORKFLOW.copy()
+        workflow = copy.deepcopy(DEFAULT_TEXT2IMG_WORKFLOW)
         
         # Update parameters
         workflow["6"]["inputs"]["text"] = prompt
@@ -125,51 +131,64 @@ async def generate_image(
         workflow["5"]["inputs"]["height"] = height
         workflow["3"]["inputs"]["steps"] = steps
         workflow["3"]["inputs"]["cfg"] = cfg_scale
-        workflow["3"]["inputs"]["seed"] = -1  # Random seed
+        workflow["3"]["inputs"]["seed"] = random.randint(0, 2**32 - 1)
+        workflow["4"]["inputs"]["ckpt_name"] = service.checkpoint
         
         logger.info("queueing_image_generation", prompt=prompt[:50])
         
-        # Queue the prompt
-        prompt_id = await service.queue_prompt(workflow)
+        # Stream sampler progress and latent previews to the requesting client
+        on_progress, on_preview = _progress_forwarders()
+        job = await service.submit(workflow, on_progress=on_progress, on_preview=on_preview)
+        
+        # Completion arrives over ComfyUI's event socket
+        try:
+            outputs = await service.wait(job, timeout=GENERATION_TIMEOUT)
+        except asyncio.TimeoutError:
+            return "⏱️ Image generation timed out. The image may still be processing."
         
-        # Wait for completion (poll history)
-        max_wait = 120  # 2 minutes max
-        waited = 0
+        # Get the image from SaveImage node (node 9)
+        images = outputs.get("9", {}).get("images", [])
+        if not images:
+            return "❌ Image generation finished without producing an image."
         
-        while waited < max_wait:
-            await asyncio.sleep(2)
-            waited += 2
-            
-            history = await service.get_history(prompt_id)
-            if prompt_id in history:
-                result = history[prompt_id]
-                
-                # Check if completed
-                if "outputs" in result:
-                    # Get the image from SaveImage node (node 9)
-                    if "9" in result["outputs"]:
-                        images = result["outputs"]["9"].get("images", [])
-                        if images:
-                            img_info = images[0]
-                            filename = img_info["filename"]
-                            subfolder = img_info.get("subfolder", "")
-                            
-                            logger.info("image_generated", filename=filename)
-                            
-                            # Return the image path info
-                            image_url = f"{service.base_url}/view?filename={filename}&type=output"
-                            if subfolder:
-                                image_url += f"&subfolder={subfolder}"
-                            
-                            return f"✅ Image generated successfully!\n\nPrompt: {prompt}\n\n**View image**: {image_url}\n\n_(Image saved as: {filename})_"
+        img_info = images[0]
+        filename = img_info["filename"]
+        subfolder = img_info.get("subfolder", "")
         
-        return "⏱️ Image generation timed out. The image may still be processing."
+        logger.info("image_generated", filename=filename, prompt_id=job.prompt_id)
+        
+        # Return the image path info
+        image_url = f"{service.base_url}/view?filename={filename}&type=output"
+        if subfolder:
+            image_url += f"&subfolder={subfolder}"
+        
+        return f"✅ Image generated successfully!\n\nPrompt: {prompt}\n\n**View image**: {image_url}\n\n_(Image saved as: {filename})_"
         
     except Exception as e:
         logger.error("image_generation_error", error=str(e))
         return f"❌ Image generation failed: {str(e)}"
 
 
+def _progress_forwarders():
+    """Callbacks that send generation progress to the calling client, if any."""
+    notify = get_notifier()
+    if notify is None:
+        return None, None
+    
+    async def on_progress(value: int, maximum: int, node: Optional[str]) -> None:
+        await notify({"type": "image_progress", "value": value, "max": maximum})
+    
+    async def on_preview(mime: str, data: bytes) -> None:
+        encoded = base64.b64encode(data).decode("ascii")
+        await notify({
+            "type": "flyout",
+            "flyout_type": "preview",
+            "content": f"data:{mime};base64,{encoded}",
+        })
+    
+    return on_progress, on_preview
+
+
 @tool_registry.register(
     description="Get the status of ComfyUI image generation service",
     category="image"
@@ -186,6 +205,9 @@ async def image_service_status() -> str:
     if not service:
         return "❌ ComfyUI service is not available"
     
+    if service.is_starting:
+        return "⏳ ComfyUI service is starting and loading its model"
+    
     if not service.is_running:
         return "⏸️ ComfyUI service is stopped (will start automatically when needed)"
     
@@ -200,6 +222,7 @@ async def image_service_status() -> str:
         
         status = f"✅ ComfyUI service is running\n\n"
         status += f"URL: {service.base_url}\n"
+        status += f"Model: {service.checkpoint} ({'loaded' if service.models_loaded else 'unloaded, loads on next image'})\n"
         status += f"Queue: {queue_running} running, {queue_pending} pending"
         
         return status
@@ -225,11 +248,11 @@ async def start_image_service() -> str:
     if not service:
         return "❌ ComfyUI service is not available"
     
-    if service.is_running:
+    if service.is_running and not service.is_starting:
         return "ℹ️ ComfyUI service is already running"
     
     logger.info("manually_starting_comfyui")
-    started = await service.start()
+    started = await service.ensure_ready()
     
     if started:
         return f"✅ ComfyUI service started successfully at {service.base_url}"
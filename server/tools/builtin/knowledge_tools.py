@@ -8,6 +8,7 @@ from typing import Any, Optional
 import structlog
 
 from ..registry import tool_registry
+from ...workers import get_worker_pool
 
 logger = structlog.get_logger()
 
@@ -131,6 +132,14 @@ def _get_model(model_name: str):
     return _model_cache[model_name]
 
 
+def _encode(texts: list[str], model_name: str):
+    """Embed texts in the embeddings worker process if one is configured."""
+    pool = get_worker_pool("embeddings")
+    if pool is not None:
+        return pool.call_sync("encode", texts=texts, model_name=model_name)
+    return _get_model(model_name).encode(texts, convert_to_numpy=True)
+
+
 def _get_index_and_docs(dataset_name: str) -> tuple[Any, list, str]:
     """Get or load a cached FAISS index and documents."""
     if dataset_name not in _index_cache:
@@ -165,6 +174,7 @@ def _get_index_and_docs(dataset_name: str) -> tuple[Any, list, str]:
 @tool_registry.register(
     description="PRIORITY TOOL: Search local knowledge bases FIRST before web_search. Contains test-facts, documentation, and local information that web_search cannot find. Always try this tool first for factual questions.",
     category="knowledge",
+    blocking=True,
     parameters={
         "type": "object",
         "properties": {
@@ -228,8 +238,7 @@ async def knowledge_search(
                     if faiss_index.ntotal == 0:
                         continue
                     
-                    model = _get_model(model_name)
-                    query_embedding = model.encode([query], convert_to_numpy=True)
+                    query_embedding = _encode([query], model_name)
                     query_vec = query_embedding.astype('float32')
                     faiss.normalize_L2(query_vec)
                     
@@ -279,8 +288,7 @@ async def knowledge_search(
             }
         
         # Get cached model and encode query
-        model = _get_model(model_name)
-        query_embedding = model.encode([query], convert_to_numpy=True)
+        query_embedding = _encode([query], model_name)
         query_vec = query_embedding.astype('float32')
         faiss.normalize_L2(query_vec)
         
@@ -336,6 +344,7 @@ async def knowledge_search(
 @tool_registry.register(
     description="List available knowledge datasets that can be searched.",
     category="knowledge",
+    blocking=True,
     parameters={
         "type": "object",
         "properties": {},
@@ -17,7 +17,6 @@ logger = logging.getLogger(__name__)
 
 # OpenMemory configuration
 MEMORY_DB_PATH = Path(__file__).parent.parent.parent.parent / "data" / "memory.db"
-MEMORY_DB_PATH.parent.mkdir(exist_ok=True)
 
 # Lazy-loaded singleton
 _memory: Optional[OpenMemory] = None
@@ -27,6 +26,7 @@ def _get_memory() -> OpenMemory:
     """Get or create the OpenMemory instance."""
     global _memory
     if _memory is None:
+        MEMORY_DB_PATH.parent.mkdir(exist_ok=True)
         _memory = OpenMemory(
             mode="local",
             path=str(MEMORY_DB_PATH),
@@ -11,6 +11,7 @@ from ..registry import tool_registry
 
 @tool_registry.register(
     description="Get system information about the computer",
+    blocking=True,
 )
 async def get_system_info() -> str:
     """
@@ -47,6 +48,7 @@ async def get_system_info() -> str:
 
 @tool_registry.register(
     description="Get current CPU and memory usage",
+    blocking=True,
 )
 async def get_resource_usage() -> str:
     """
@@ -77,6 +79,7 @@ async def get_resource_usage() -> str:
 
 @tool_registry.register(
     description="Get disk space information",
+    blocking=True,
 )
 async def get_disk_space(
     path: str = "/"
@@ -1,13 +1,18 @@
 """
 Built-in web/search tools for the voice agent.
-Uses DuckDuckGo for web search (no API key required).
+Uses DuckDuckGo for web search (no API key required); deep searches read
+the result pages through ..webpages.
 """
 import httpx
 import re
+import time
+from html import unescape
 from typing import Optional
 from dataclasses import dataclass
 
+from ...config import settings
 from ..registry import tool_registry
+from ..webpages import build_digest, fetch_pages, get_page_cache, result_url
 
 
 @dataclass
@@ -19,11 +24,12 @@ class FlyoutResult:
 
 
 @tool_registry.register(
-    description="FALLBACK: Search the web using DuckDuckGo. Only use this if knowledge_search returns no results.",
+    description="FALLBACK: Search the web using DuckDuckGo. Only use this if knowledge_search returns no results. Set deep=true to read the top pages and get the relevant passages instead of short snippets.",
 )
 async def web_search(
     query: str,
     num_results: int = 5,
+    deep: bool = False,
 ) -> str:
     """
     Search the web using DuckDuckGo.
@@ -31,11 +37,14 @@ async def web_search(
     Args:
         query: Search query
         num_results: Maximum number of results to return (1-10)
+        deep: Fetch the top result pages and return a digest of the
+            passages that best match the query
         
     Returns:
         Search results summary
     """
     num_results = min(max(num_results, 1), 10)
+    started = time.monotonic()
     
     # DuckDuckGo HTML search (no API key needed)
     async with httpx.AsyncClient(timeout=15.0) as client:
@@ -62,7 +71,7 @@ async def web_search(
     links = re.findall(result_pattern, html)
     snippets = re.findall(snippet_pattern, html)
     
-    for i, (url, title) in enumerate(links[:num_results]):
+    for i, (href, title) in enumerate(links[:num_results]):
         snippet = snippets[i] if i < len(snippets) else ""
         # Clean up snippet (remove HTML tags)
         snippet = re.sub(r'<[^>]+>', '', snippet).strip()
@@ -70,11 +79,17 @@ async def web_search(
         results.append({
             "title": title.strip(),
             "snippet": snippet[:200],
+            "url": result_url(unescape(href)),
         })
     
     if not results:
         return f"No results found for: {query}"
     
+    if deep:
+        digest = await _deep_digest(query, results, started)
+        if digest:
+            return f"From the top pages for '{query}':\n\n{digest}"
+    
     # Format output
     lines = [f"Search results for '{query}':"]
     for i, r in enumerate(results, 1):
@@ -85,6 +100,18 @@ async def web_search(
     return "\n".join(lines)
 
 
+async def _deep_digest(query: str, results: list[dict], started: float) -> str:
+    """Read the top result pages within the deep-search budget and digest them."""
+    urls = list(dict.fromkeys(r["url"] for r in results if r["url"]))[:settings.web_deep_pages]
+    budget = settings.web_deep_budget - (time.monotonic() - started)
+    if not urls or budget <= 0:
+        return ""
+    
+    async with httpx.AsyncClient(timeout=settings.web_fetch_timeout, follow_redirects=True) as client:
+        pages = await fetch_pages(client, urls, get_page_cache(), budget, settings.web_per_host)
+    return build_digest(query, pages, settings.web_digest_chars)
+
+
 @tool_registry.register(
     description="Get a quick answer or definition",
 )
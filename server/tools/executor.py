@@ -3,11 +3,13 @@ Async Tool Executor
 Handles tool execution with timeout, retries, and parallel execution.
 """
 import asyncio
-from typing import Any, Optional
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Optional
 from dataclasses import dataclass
 import structlog
 
 from .registry import tool_registry, Tool
+from .. import metrics
 
 logger = structlog.get_logger()
 
@@ -23,6 +25,21 @@ class ToolResult:
     flyout: Optional[dict] = None  # {"type": "browser|code|terminal", "content": str}
 
 
+# Sends a JSON message to the client whose turn called the running tool
+Notifier = Callable[[dict], Awaitable[None]]
+_notifier: ContextVar[Optional[Notifier]] = ContextVar("tool_notifier", default=None)
+
+
+def get_notifier() -> Optional[Notifier]:
+    """
+    The running tool's channel back to its client, if any.
+    
+    Lets long-running tools stream progress while they work; None when the
+    tool was not called from a client turn.
+    """
+    return _notifier.get()
+
+
 class ToolExecutor:
     """
     Executes tools with proper error handling, timeouts, and concurrency.
@@ -48,6 +65,7 @@ class ToolExecutor:
         tool_name: str,
         arguments: dict,
         timeout: float = None,
+        notify: Optional[Notifier] = None,
     ) -> ToolResult:
         """
         Execute a single tool.
@@ -56,12 +74,29 @@ class ToolExecutor:
             tool_name: Name of the tool to execute
             arguments: Arguments to pass to the tool
             timeout: Optional timeout override
+            notify: Sends progress messages to the calling client
             
         Returns:
             ToolResult with execution details
         """
         timeout = timeout or self.default_timeout
         
+        queue_depth = metrics.QUEUE_DEPTH.labels(queue="tool_executor")
+        queue_depth.inc()
+        token = _notifier.set(notify)
+        try:
+            return await self._execute_limited(tool_name, arguments, timeout)
+        finally:
+            _notifier.reset(token)
+            queue_depth.dec()
+    
+    async def _execute_limited(
+        self,
+        tool_name: str,
+        arguments: dict,
+        timeout: float,
+    ) -> ToolResult:
+        """Execute a tool once a concurrency slot is free."""
         async with self._semaphore:
             import time
             start_time = time.time()
@@ -0,0 +1,155 @@
+"""
+Tool Manifest
+Static description of the built-in tools (name, description, JSON schema,
+category and implementing module), generated from the tool sources
+without importing them so the registry can advertise tools to the LLM
+before (or without) loading their dependencies.
+
+Regenerate after adding or changing a tool:
+
+    python -m server.tools          # write manifest.json
+    python -m server.tools --check  # fail if it is stale
+"""
+import ast
+import json
+from pathlib import Path
+from typing import Optional
+import structlog
+
+logger = structlog.get_logger()
+
+BUILTIN_PACKAGE = "server.tools.builtin"
+BUILTIN_DIR = Path(__file__).parent / "builtin"
+MANIFEST_PATH = BUILTIN_DIR / "manifest.json"
+
+# Modules whose tools are served; order is the order tools are listed in
+BUILTIN_MODULES = [
+    "datetime_tools",
+    "weather_tools",
+    "web_tools",
+    "system_tools",
+    "knowledge_tools",
+    "help_tools",
+    "memory_tools",
+    "music_tools",
+    "onboarding_tools",
+    "image_tools",
+]
+
+# Mirrors ToolRegistry._python_type_to_json for inferred parameters
+_JSON_TYPES = {
+    "str": "string",
+    "int": "integer",
+    "float": "number",
+    "bool": "boolean",
+    "list": "array",
+    "dict": "object",
+}
+
+
+def module_group(module: str) -> str:
+    """Short name used to disable a module's tools, e.g. music_tools -> music."""
+    name = module.rsplit(".", 1)[-1]
+    return name[:-len("_tools")] if name.endswith("_tools") else name
+
+
+def _is_register_call(decorator: ast.expr) -> bool:
+    """Match @tool_registry.register(...) and @register_tool(...)."""
+    if not isinstance(decorator, ast.Call):
+        return False
+    func = decorator.func
+    if isinstance(func, ast.Attribute):
+        return func.attr == "register"
+    return isinstance(func, ast.Name) and func.id == "register_tool"
+
+
+def _infer_parameters(func: ast.AsyncFunctionDef | ast.FunctionDef) -> dict:
+    """Schema the registry would infer from the signature at import time."""
+    args = func.args
+    positional = args.posonlyargs + args.args
+    first_default = len(positional) - len(args.defaults)
+
+    properties = {}
+    required = []
+    params = [(arg, i < first_default) for i, arg in enumerate(positional)]
+    params += [(arg, default is None) for arg, default in zip(args.kwonlyargs, args.kw_defaults)]
+    for arg, is_required in params:
+        if arg.arg in ("self", "cls"):
+            continue
+        annotation = arg.annotation
+        type_name = annotation.id if isinstance(annotation, ast.Name) else None
+        properties[arg.arg] = {
+            "type": _JSON_TYPES.get(type_name, "string") if annotation is not None else "string",
+            "description": f"Parameter: {arg.arg}",
+        }
+        if is_required:
+            required.append(arg.arg)
+
+    return {"type": "object", "properties": properties, "required": required}
+
+
+def scan_module(path: Path, module: str) -> list[dict]:
+    """Extract the tools a module registers from its source."""
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    entries = []
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for decorator in node.decorator_list:
+            if not _is_register_call(decorator):
+                continue
+            options = {kw.arg: ast.literal_eval(kw.value) for kw in decorator.keywords}
+            description = (
+                options.get("description")
+                or ast.get_docstring(node, clean=False)
+                or "No description"
+            )
+            entries.append({
+                "name": options.get("name") or node.name,
+                "description": description,
+                "parameters": options.get("parameters") or _infer_parameters(node),
+                "category": options.get("category", "general"),
+                "requires_confirmation": options.get("requires_confirmation", False),
+                "blocking": options.get("blocking", False),
+                "module": module,
+            })
+    return entries
+
+
+def build_manifest(modules: Optional[list[str]] = None) -> list[dict]:
+    """Scan the built-in tool modules."""
+    entries = []
+    for name in modules or BUILTIN_MODULES:
+        entries.extend(scan_module(BUILTIN_DIR / f"{name}.py", f"{BUILTIN_PACKAGE}.{name}"))
+    return entries
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> Optional[list[dict]]:
+    """Read the generated manifest, or None if it is missing or unreadable."""
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))["tools"]
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning("tool_manifest_unreadable", path=str(path), error=str(e))
+        return None
+
+
+def write_manifest(path: Path = MANIFEST_PATH) -> list[dict]:
+    """Regenerate the manifest file."""
+    entries = build_manifest()
+    path.write_text(json.dumps({"tools": entries}, indent=2) + "\n", encoding="utf-8")
+    return entries
+
+
+def main(argv: list[str]) -> int:
+    if "--check" in argv:
+        if load_manifest() != build_manifest():
+            print(f"{MANIFEST_PATH} is stale; run: python -m server.tools")
+            return 1
+        print("Tool manifest is up to date")
+        return 0
+
+    entries = write_manifest()
+    print(f"Wrote {len(entries)} tools to {MANIFEST_PATH}")
+    return 0
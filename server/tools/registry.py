@@ -3,32 +3,93 @@ Tool Registry System
 Extensible tool registration and discovery.
 """
 import asyncio
+import contextvars
+import importlib
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Callable, Any, Optional, get_type_hints
+from typing import Callable, Any, Iterable, Optional, get_type_hints
 import inspect
 import structlog
 
+from .manifest import module_group
+from .. import loopmon, metrics
+
 logger = structlog.get_logger()
 
+# Worker threads for blocking tools, so they never run on the event loop
+_blocking_workers = 4
+_blocking_pool: Optional[ThreadPoolExecutor] = None
+
+
+def configure_blocking_pool(workers: int) -> None:
+    """Set how many blocking tool calls may run at once."""
+    global _blocking_workers, _blocking_pool
+    _blocking_workers = max(1, workers)
+    if _blocking_pool is not None:
+        _blocking_pool.shutdown(wait=False)
+        _blocking_pool = None
+
+
+def _get_blocking_pool() -> ThreadPoolExecutor:
+    global _blocking_pool
+    if _blocking_pool is None:
+        _blocking_pool = ThreadPoolExecutor(max_workers=_blocking_workers, thread_name_prefix="tool-blocking")
+    return _blocking_pool
+
+
+async def run_blocking(handler: Callable, kwargs: dict) -> Any:
+    """
+    Run a tool handler in the blocking pool.
+
+    Coroutine handlers get their own event loop in the worker thread; they
+    must not touch objects bound to the server's loop. Cancelling the
+    caller does not interrupt a call that has already started.
+    """
+    if asyncio.iscoroutinefunction(handler):
+        def call():
+            return asyncio.run(handler(**kwargs))
+    else:
+        def call():
+            return handler(**kwargs)
+    ctx = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(_get_blocking_pool(), ctx.run, call)
+
 
 @dataclass
 class Tool:
     """Represents a registered tool."""
     name: str
     description: str
-    handler: Callable
+    handler: Optional[Callable]  # None until a manifest tool's module is imported
     parameters: dict  # JSON Schema
     category: str = "general"
     requires_confirmation: bool = False
+    module: Optional[str] = None  # Implementing module, imported on first call
+    blocking: bool = False  # Runs in the blocking worker pool, off the event loop
+    
+    @property
+    def loaded(self) -> bool:
+        return self.handler is not None
+    
+    async def load(self) -> None:
+        """Import the implementing module; its decorator fills in the handler."""
+        if self.handler is None and self.module:
+            try:
+                await asyncio.to_thread(importlib.import_module, self.module)
+            except Exception as e:
+                logger.error("tool_module_import_failed", name=self.name, module=self.module, error=str(e))
+                raise RuntimeError(f"Tool '{self.name}' is unavailable: {e}") from e
+            logger.info("tool_module_loaded", name=self.name, module=self.module)
+        if self.handler is None:
+            raise RuntimeError(f"Tool '{self.name}' is not provided by {self.module}")
     
     async def execute(self, **kwargs) -> Any:
         """Execute the tool with given arguments."""
-        if asyncio.iscoroutinefunction(self.handler):
-            return await self.handler(**kwargs)
-        else:
-            # Run sync functions in thread pool
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(None, lambda: self.handler(**kwargs))
+        if self.handler is None:
+            await self.load()
+        if self.blocking or not asyncio.iscoroutinefunction(self.handler):
+            return await run_blocking(self.handler, kwargs)
+        return await self.handler(**kwargs)
 
 
 class ToolRegistry:
@@ -40,6 +101,59 @@ class ToolRegistry:
     def __init__(self):
         self._tools: dict[str, Tool] = {}
         self._categories: dict[str, list[str]] = {}
+        self._disabled: set[str] = set()
+        self._offloadable: set[str] = set()
+    
+    def disable(self, groups: Iterable[str]) -> None:
+        """
+        Leave out tools by category or module (e.g. "image", "music").
+        
+        Applies to tools registered afterwards, so call it before loading
+        the manifest.
+        """
+        self._disabled.update(g.strip().lower() for g in groups if g.strip())
+    
+    def is_disabled(self, category: str, module: Optional[str]) -> bool:
+        if category.lower() in self._disabled:
+            return True
+        return bool(module) and module_group(module) in self._disabled
+    
+    def _add(self, tool: Tool) -> None:
+        self._tools[tool.name] = tool
+        if tool.category not in self._categories:
+            self._categories[tool.category] = []
+        if tool.name not in self._categories[tool.category]:
+            self._categories[tool.category].append(tool.name)
+    
+    def register_manifest(self, entries: Iterable[dict]) -> int:
+        """
+        Register tools from the static manifest without importing them.
+        
+        Each tool's module is imported the first time one of its tools
+        runs; until then the manifest's description and schema are served.
+        
+        Returns:
+            Number of tools registered
+        """
+        count = 0
+        for entry in entries:
+            if entry["name"] in self._tools:
+                continue
+            if self.is_disabled(entry.get("category", "general"), entry["module"]):
+                continue
+            self._add(Tool(
+                name=entry["name"],
+                description=entry["description"],
+                handler=None,
+                parameters=entry["parameters"],
+                category=entry.get("category", "general"),
+                requires_confirmation=entry.get("requires_confirmation", False),
+                module=entry["module"],
+                blocking=entry.get("blocking", False),
+            ))
+            count += 1
+        logger.info("tool_manifest_registered", count=count, disabled=sorted(self._disabled))
+        return count
     
     def register(
         self,
@@ -48,10 +162,15 @@ class ToolRegistry:
         parameters: dict = None,
         category: str = "general",
         requires_confirmation: bool = False,
+        blocking: bool = False,
     ) -> Callable:
         """
         Decorator to register a function as a tool.
         
+        Pass blocking=True for tools that do CPU work or blocking I/O
+        (model inference, psutil sampling); they run in a worker pool so
+        they cannot stall other sessions' audio.
+        
         Usage:
             @registry.register(
                 name="get_weather",
@@ -69,24 +188,33 @@ class ToolRegistry:
         """
         def decorator(func: Callable) -> Callable:
             tool_name = name or func.__name__
+            if self.is_disabled(category, func.__module__):
+                return func
+            
             tool_desc = description or func.__doc__ or "No description"
             tool_params = parameters or self._infer_parameters(func)
+            loopmon.label_code(func.__code__, f"tool:{tool_name}")
             
-            tool = Tool(
+            existing = self._tools.get(tool_name)
+            if existing is not None and not existing.loaded:
+                # Manifest entry: fill in the handler in place so callers
+                # holding the Tool see the import
+                existing.handler = func
+                existing.description = tool_desc
+                existing.parameters = tool_params
+                existing.blocking = existing.blocking or blocking
+                return func
+            
+            self._add(Tool(
                 name=tool_name,
                 description=tool_desc,
                 handler=func,
                 parameters=tool_params,
                 category=category,
                 requires_confirmation=requires_confirmation,
-            )
-            
-            self._tools[tool_name] = tool
-            
-            # Track by category
-            if category not in self._categories:
-                self._categories[category] = []
-            self._categories[category].append(tool_name)
+                module=func.__module__,
+                blocking=blocking,
+            ))
             
             logger.info("tool_registered", name=tool_name, category=category)
             
@@ -135,6 +263,32 @@ class ToolRegistry:
         }
         return type_map.get(python_type, "string")
     
+    def allow_offload(self, names: Iterable[str]) -> None:
+        """Async tools that mark_blocking may move to the blocking pool (TOOL_AUTO_OFFLOAD)."""
+        self._offloadable.update(n.strip() for n in names if n.strip())
+    
+    def mark_blocking(self, name: str) -> bool:
+        """
+        Move an async tool to the blocking worker pool from now on.
+        
+        Called when the loop monitor catches the tool stalling the event
+        loop. In the pool a coroutine handler runs on a private loop, where
+        anything bound to the server's loop (the notifier, the ComfyUI
+        service, locks and futures it created) breaks, so only tools listed
+        with allow_offload() are moved; other stalls are only reported by
+        the monitor. Plain-function handlers always run in the pool.
+        Returns True if the tool was changed.
+        """
+        tool = self._tools.get(name)
+        if tool is None or tool.blocking or name not in self._offloadable:
+            return False
+        if not asyncio.iscoroutinefunction(tool.handler):
+            return False
+        tool.blocking = True
+        metrics.TOOLS_OFFLOADED.labels(tool=name).inc()
+        logger.warning("tool_offloaded", name=name, reason="event_loop_stall")
+        return True
+    
     def get_tool(self, name: str) -> Optional[Tool]:
         """Get a tool by name."""
         return self._tools.get(name)
@@ -191,6 +345,7 @@ class ToolRegistry:
         """Clear all registered tools."""
         self._tools.clear()
         self._categories.clear()
+        self._disabled.clear()
 
 
 # Global tool registry
@@ -202,6 +357,7 @@ def register_tool(
     description: str = None,
     parameters: dict = None,
     category: str = "general",
+    blocking: bool = False,
 ) -> Callable:
     """Convenience decorator using global registry."""
     return tool_registry.register(
@@ -209,4 +365,5 @@ def register_tool(
         description=description,
         parameters=parameters,
         category=category,
+        blocking=blocking,
     )
@@ -0,0 +1,366 @@
+"""
+Web Page Reader
+Fetches search-result pages concurrently, extracts their main text while
+the body streams in, and ranks passages against the query so a single
+web_search call can return an answer-sized digest instead of snippets.
+
+Pages are cached by URL with their ETag/Last-Modified validators; stale
+entries are revalidated with a conditional request rather than refetched.
+"""
+import asyncio
+import codecs
+import math
+import re
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+import httpx
+import structlog
+
+from .. import metrics
+
+logger = structlog.get_logger()
+
+USER_AGENT = "Mozilla/5.0 (compatible; VoiceAgent/1.0)"
+
+# Stop reading a page after this much HTML or extracted text
+MAX_PAGE_BYTES = 768 * 1024
+MAX_PAGE_CHARS = 40_000
+
+# Passage sizes handed to the ranker
+PASSAGE_MIN_CHARS = 200
+PASSAGE_MAX_CHARS = 600
+
+# Elements whose text is never content
+_SKIP_TAGS = {
+    "script", "style", "noscript", "template", "svg", "iframe", "nav",
+    "header", "footer", "aside", "form", "button", "select", "menu",
+}
+# Elements that end a paragraph of text
+_BLOCK_TAGS = {
+    "p", "div", "li", "ul", "ol", "dd", "dt", "h1", "h2", "h3", "h4", "h5",
+    "h6", "article", "section", "main", "blockquote", "pre", "table", "tr",
+    "td", "th", "figcaption", "br", "hr",
+}
+# Shorter blocks are usually menus, bylines or buttons
+_MIN_BLOCK_CHARS = 40
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "do", "does", "for",
+    "from", "how", "in", "is", "it", "of", "on", "or", "that", "the", "this",
+    "to", "was", "what", "when", "where", "which", "who", "why", "with",
+}
+
+
+class TextExtractor(HTMLParser):
+    """
+    Incremental main-text extractor.
+
+    Feed decoded HTML as it arrives; `paragraphs` collects text blocks
+    outside navigation, scripts and forms. `full` turns true once enough
+    text has been gathered to stop downloading.
+    """
+
+    def __init__(self, max_chars: int = MAX_PAGE_CHARS):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.title = ""
+        self.paragraphs: list[str] = []
+        self.chars = 0
+        self._skip = 0
+        self._in_title = False
+        self._buffer: list[str] = []
+
+    @property
+    def full(self) -> bool:
+        return self.chars >= self.max_chars
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip:
+            self._buffer.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+        self.title = " ".join(self.title.split())
+
+    def _flush(self):
+        text = " ".join("".join(self._buffer).split())
+        self._buffer = []
+        if len(text) >= _MIN_BLOCK_CHARS and not self.full:
+            self.paragraphs.append(text)
+            self.chars += len(text)
+
+
+@dataclass
+class Page:
+    """Extracted text of one URL, with its cache validators."""
+    url: str
+    title: str = ""
+    paragraphs: list[str] = field(default_factory=list)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = field(default_factory=time.monotonic)
+
+
+class PageCache:
+    """LRU of extracted pages keyed by URL."""
+
+    def __init__(self, max_entries: int = 128, fresh_seconds: float = 600.0):
+        """
+        Args:
+            max_entries: Pages kept
+            fresh_seconds: Age under which a page is served without asking
+                the origin; older pages are revalidated
+        """
+        self.max_entries = max_entries
+        self.fresh_seconds = fresh_seconds
+        self._pages: OrderedDict[str, Page] = OrderedDict()
+
+    def get(self, url: str) -> Optional[Page]:
+        page = self._pages.get(url)
+        if page is not None:
+            self._pages.move_to_end(url)
+        return page
+
+    def is_fresh(self, page: Page) -> bool:
+        return time.monotonic() - page.fetched_at < self.fresh_seconds
+
+    def put(self, page: Page) -> None:
+        self._pages[page.url] = page
+        self._pages.move_to_end(page.url)
+        while len(self._pages) > self.max_entries:
+            self._pages.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+
+def result_url(href: str) -> Optional[str]:
+    """Target of a DuckDuckGo result link; None for ads and internal links."""
+    if href.startswith("//"):
+        href = "https:" + href
+    parsed = urlparse(href)
+    if parsed.netloc.endswith("duckduckgo.com"):
+        if parsed.path != "/l/":
+            return None
+        target = parse_qs(parsed.query).get("uddg", [None])[0]
+        return target if target and target.startswith(("http://", "https://")) else None
+    return href if parsed.scheme in ("http", "https") else None
+
+
+async def fetch_page(
+    client: httpx.AsyncClient,
+    url: str,
+    cache: PageCache,
+    host_limits: dict[str, asyncio.Semaphore],
+    per_host: int = 2,
+) -> Optional[Page]:
+    """
+    Fetch and extract one page, using and refreshing the cache.
+
+    Returns None for non-HTML responses and errors.
+    """
+    cached = cache.get(url)
+    if cached is not None and cache.is_fresh(cached):
+        metrics.WEB_PAGE_FETCHES.labels(result="cached").inc()
+        return cached
+
+    headers = {"User-Agent": USER_AGENT, "Accept": "text/html,text/plain;q=0.9"}
+    if cached is not None:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+    host = urlparse(url).netloc
+    limit = host_limits.setdefault(host, asyncio.Semaphore(per_host))
+    try:
+        async with limit, client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304 and cached is not None:
+                cached.fetched_at = time.monotonic()
+                cache.put(cached)
+                metrics.WEB_PAGE_FETCHES.labels(result="revalidated").inc()
+                return cached
+            content_type = response.headers.get("content-type", "text/html")
+            if response.status_code != 200 or not content_type.startswith(("text/html", "text/plain", "application/xhtml")):
+                metrics.WEB_PAGE_FETCHES.labels(result="skipped").inc()
+                return None
+
+            extractor = TextExtractor()
+            decoder = codecs.getincrementaldecoder(_charset(response))(errors="replace")
+            received = 0
+            async for chunk in response.aiter_bytes():
+                received += len(chunk)
+                extractor.feed(decoder.decode(chunk))
+                if extractor.full or received >= MAX_PAGE_BYTES:
+                    break
+            extractor.feed(decoder.decode(b"", final=True))
+            extractor.close()
+    except (httpx.HTTPError, UnicodeError) as e:
+        metrics.WEB_PAGE_FETCHES.labels(result="failed").inc()
+        logger.debug("web_page_fetch_failed", url=url, error=str(e))
+        return None
+
+    page = Page(
+        url=url,
+        title=extractor.title,
+        paragraphs=extractor.paragraphs,
+        etag=response.headers.get("etag"),
+        last_modified=response.headers.get("last-modified"),
+    )
+    cache.put(page)
+    metrics.WEB_PAGE_FETCHES.labels(result="fetched").inc()
+    return page
+
+
+def _charset(response: httpx.Response) -> str:
+    charset = response.charset_encoding or "utf-8"
+    try:
+        codecs.lookup(charset)
+    except LookupError:
+        charset = "utf-8"
+    return charset
+
+
+async def fetch_pages(
+    client: httpx.AsyncClient,
+    urls: list[str],
+    cache: PageCache,
+    budget: float,
+    per_host: int = 2,
+) -> list[Page]:
+    """
+    Fetch pages concurrently within a total time budget.
+
+    Pages still loading when the budget runs out are abandoned. Results
+    keep the order of `urls`.
+    """
+    host_limits: dict[str, asyncio.Semaphore] = {}
+    tasks = [asyncio.create_task(fetch_page(client, url, cache, host_limits, per_host)) for url in urls]
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+    for task in pending:
+        task.cancel()
+    if pending:
+        metrics.WEB_PAGE_FETCHES.labels(result="timeout").inc(len(pending))
+        await asyncio.gather(*pending, return_exceptions=True)
+    return [t.result() for t in tasks if t in done and not t.exception() and t.result() is not None]
+
+
+def _terms(text: str) -> list[str]:
+    return [w for w in re.findall(r"\w+", text.lower()) if w not in _STOPWORDS]
+
+
+def split_passages(paragraphs: list[str]) -> list[str]:
+    """Group paragraphs into passages of roughly PASSAGE_MIN..MAX_CHARS."""
+    passages: list[str] = []
+    current = ""
+    for paragraph in paragraphs:
+        sentences = re.split(r"(?<=[.!?])\s+", paragraph) if len(paragraph) > PASSAGE_MAX_CHARS else [paragraph]
+        for sentence in sentences:
+            if current and len(current) + len(sentence) > PASSAGE_MAX_CHARS:
+                passages.append(current)
+                current = ""
+            current = f"{current} {sentence}".strip()
+            if len(current) >= PASSAGE_MIN_CHARS:
+                passages.append(current[:PASSAGE_MAX_CHARS])
+                current = ""
+    if current:
+        passages.append(current)
+    return passages
+
+
+def rank_passages(query: str, pages: list[Page], max_per_page: int = 2) -> list[tuple[float, int, str]]:
+    """
+    Score every passage of `pages` against `query` with BM25.
+
+    Returns (score, page index, passage) for passages that match at least
+    one query term, best first, at most `max_per_page` per page.
+    """
+    query_terms = set(_terms(query))
+    candidates = [
+        (index, passage, Counter(_terms(passage)))
+        for index, page in enumerate(pages)
+        for passage in split_passages(page.paragraphs)
+    ]
+    if not candidates or not query_terms:
+        return []
+
+    k1, b = 1.2, 0.75
+    count = len(candidates)
+    avg_len = sum(sum(tf.values()) for _, _, tf in candidates) / count or 1.0
+    df = {t: sum(1 for _, _, tf in candidates if t in tf) for t in query_terms}
+    idf = {t: math.log(1 + (count - n + 0.5) / (n + 0.5)) for t, n in df.items()}
+
+    scored = []
+    for index, passage, tf in candidates:
+        length = sum(tf.values())
+        score = sum(
+            idf[t] * tf[t] * (k1 + 1) / (tf[t] + k1 * (1 - b + b * length / avg_len))
+            for t in query_terms if t in tf
+        )
+        if score > 0:
+            scored.append((score, index, passage))
+    scored.sort(key=lambda s: -s[0])
+
+    per_page: Counter = Counter()
+    best = []
+    for score, index, passage in scored:
+        if per_page[index] < max_per_page:
+            per_page[index] += 1
+            best.append((score, index, passage))
+    return best
+
+
+def build_digest(query: str, pages: list[Page], max_chars: int) -> str:
+    """Compact, source-attributed digest of the passages best matching `query`."""
+    used = 0
+    chosen: dict[int, list[str]] = {}
+    for _, index, passage in rank_passages(query, pages):
+        if used + len(passage) > max_chars:
+            if chosen:
+                continue
+            passage = passage[:max_chars].rsplit(" ", 1)[0] + " ..."
+        chosen.setdefault(index, []).append(passage)
+        used += len(passage)
+
+    blocks = []
+    for number, index in enumerate(sorted(chosen), 1):
+        page = pages[index]
+        title = page.title or urlparse(page.url).netloc
+        blocks.append(f"[{number}] {title} ({page.url})\n" + "\n".join(f"- {p}" for p in chosen[index]))
+    return "\n\n".join(blocks)
+
+
+# Global instance
+_page_cache: Optional[PageCache] = None
+
+
+def get_page_cache() -> PageCache:
+    """Get the shared page cache."""
+    global _page_cache
+    if _page_cache is None:
+        from ..config import settings
+        _page_cache = PageCache(settings.web_cache_pages, settings.web_cache_fresh_seconds)
+    return _page_cache
@@ -2,6 +2,9 @@
 OpenTelemetry tracing setup for Voice Agent.
 
 Traces the full voice pipeline: STT → LLM → Tool Execution → TTS
+
+The `start_*_span` helpers also feed the Prometheus histograms in
+`metrics.py` when the span ends, independent of whether OTLP export is on.
 """
 
 from opentelemetry import trace
@@ -12,8 +15,12 @@ from opentelemetry.sdk.resources import Resource
 from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
 from opentelemetry.trace import Status, StatusCode
 from functools import wraps
+from typing import Callable, Optional
 import structlog
 import os
+import time
+
+from . import metrics
 
 logger = structlog.get_logger(__name__)
 
@@ -141,13 +148,35 @@ def trace_span(name: str, attributes: dict = None):
     return decorator
 
 
+class _RecordedSpan:
+    """Span proxy that remembers attributes so metric hooks can read them."""
+    
+    def __init__(self, span, attributes: dict):
+        self._span = span
+        self._attributes = attributes
+    
+    def set_attribute(self, key: str, value) -> None:
+        self._attributes[key] = value
+        self._span.set_attribute(key, value)
+    
+    def __getattr__(self, name):
+        return getattr(self._span, name)
+
+
 class SpanContext:
-    """Context manager for creating traced spans with attributes."""
+    """
+    Context manager for creating traced spans with attributes.
+    
+    If `on_end` is given it is called as `on_end(elapsed_seconds, attributes,
+    ok)` when the span closes, with every attribute set during the span.
+    """
     
-    def __init__(self, name: str, **attributes):
+    def __init__(self, name: str, on_end: Optional[Callable[[float, dict, bool], None]] = None, **attributes):
         self.name = name
         self.attributes = attributes
+        self.on_end = on_end
         self.span = None
+        self._start = 0.0
     
     def __enter__(self):
         tracer = get_tracer()
@@ -156,18 +185,72 @@ class SpanContext:
         for key, value in self.attributes.items():
             if value is not None:
                 self.span.set_attribute(key, value)
-        return self.span
+        self._start = time.perf_counter()
+        return _RecordedSpan(self.span, self.attributes)
     
     def __exit__(self, exc_type, exc_val, exc_tb):
+        elapsed = time.perf_counter() - self._start
         if exc_type is not None:
             self.span.set_status(Status(StatusCode.ERROR, str(exc_val)))
             self.span.record_exception(exc_val)
         else:
             self.span.set_status(Status(StatusCode.OK))
         self.span.__exit__(exc_type, exc_val, exc_tb)
+        if self.on_end is not None:
+            try:
+                self.on_end(elapsed, self.attributes, exc_type is None)
+            except Exception as e:
+                logger.debug("span_metrics_error", span=self.name, error=str(e))
         return False
 
 
+# Metric hooks for the convenience spans
+def _input_sample_rate() -> int:
+    """Input audio sample rate (PCM16 mono)."""
+    from .config import settings
+    return settings.audio_sample_rate
+
+
+def _record_stt(elapsed: float, attributes: dict, ok: bool) -> None:
+    metrics.STT_DECODE_SECONDS.observe(elapsed)
+    audio_seconds = (attributes.get("audio_bytes") or 0) / (2 * _input_sample_rate())
+    if audio_seconds > 0:
+        metrics.STT_REAL_TIME_FACTOR.observe(elapsed / audio_seconds)
+
+
+def _record_llm(elapsed: float, attributes: dict, ok: bool) -> None:
+    backend = attributes.get("backend") or "unknown"
+    ttft = attributes.get("ttft_seconds")
+    if ttft is not None:
+        metrics.LLM_TTFT_SECONDS.labels(backend=backend).observe(ttft)
+    tokens = attributes.get("output_tokens")
+    decode_seconds = attributes.get("decode_seconds")
+    if tokens and decode_seconds:
+        metrics.LLM_TOKENS_PER_SECOND.labels(backend=backend).observe(tokens / decode_seconds)
+
+
+def _record_tool(elapsed: float, attributes: dict, ok: bool) -> None:
+    metrics.TOOL_SECONDS.labels(tool=attributes.get("tool_name", "unknown")).observe(elapsed)
+
+
+def _record_tts(elapsed: float, attributes: dict, ok: bool) -> None:
+    if attributes.get("interrupted"):
+        return
+    # Summed over chunks, without the time spent sending them
+    metrics.observe_tts(
+        attributes.get("synthesis_seconds", elapsed),
+        attributes.get("audio_seconds") or 0,
+        attributes.get("first_audio_seconds"),
+    )
+
+
+def record_llm_usage(span, usage: dict) -> None:
+    """Copy a `usage` chunk from `LLMClient.chat` onto an LLM span."""
+    for key in ("backend", "ttft_seconds", "output_tokens", "decode_seconds"):
+        if usage.get(key) is not None:
+            span.set_attribute(key, usage[key])
+
+
 # Convenience functions for common span types
 def start_pipeline_span(client_id: str, transcript: str = None):
     """Start a span for the full voice pipeline."""
@@ -182,6 +265,7 @@ def start_stt_span(audio_bytes: int, model: str = None):
     """Start a span for STT transcription."""
     return SpanContext(
         "stt.transcribe",
+        on_end=_record_stt,
         audio_bytes=audio_bytes,
         model=model or "whisper-large-v3-turbo"
     )
@@ -191,6 +275,7 @@ def start_llm_span(model: str, messages_count: int, has_tools: bool = False):
     """Start a span for LLM generation."""
     return SpanContext(
         "llm.generate",
+        on_end=_record_llm,
         model=model,
         messages_count=messages_count,
         has_tools=has_tools
@@ -201,6 +286,7 @@ def start_tool_span(tool_name: str, arguments: dict = None):
     """Start a span for tool execution."""
     return SpanContext(
         f"tool.{tool_name}",
+        on_end=_record_tool,
         tool_name=tool_name,
         arguments=str(arguments) if arguments else None
     )
@@ -210,6 +296,7 @@ def start_tts_span(text_length: int, voice: str):
     """Start a span for TTS synthesis."""
     return SpanContext(
         "tts.synthesize",
+        on_end=_record_tts,
         text_length=text_length,
         voice=voice
     )
@@ -3,5 +3,6 @@ TTS package - Text to Speech using Piper (local).
 """
 
 from .piper_tts import PiperTTS, get_tts, list_voices
+from .cache import TTSCache, get_tts_cache
 
-__all__ = ["PiperTTS", "get_tts", "list_voices"]
+__all__ = ["PiperTTS", "get_tts", "list_voices", "TTSCache", "get_tts_cache"]
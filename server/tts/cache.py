@@ -0,0 +1,302 @@
+"""
+TTS Audio Cache
+Content-addressed cache of synthesized speech keyed by voice, speaking
+rate and normalized text, with an in-memory LRU and a compressed disk tier.
+"""
+import asyncio
+import hashlib
+import io
+import os
+import re
+import wave
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional
+import structlog
+
+from .. import metrics
+from ..config import settings
+
+logger = structlog.get_logger()
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent.parent / "data" / "tts_cache"
+
+# Piper inserts this much silence between sentences by default
+SENTENCE_GAP_MS = 200
+
+_WHITESPACE = re.compile(r"\s+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=\S)")
+
+# Phrases spoken often enough to synthesize ahead of time
+PREWARM_PHRASES = [
+    "Hello! This is a test of the text to speech system. I hope you can hear me clearly.",
+    "Sure.",
+    "Okay.",
+    "Got it.",
+    "Done.",
+    "One moment.",
+    "Let me check.",
+    "Sorry, I didn't catch that.",
+    "I apologize, I had trouble responding. Could you please rephrase your question?",
+]
+
+
+def normalize_tts_text(text: str) -> str:
+    """Collapse whitespace; case and punctuation are kept since they change prosody."""
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text into sentences on terminal punctuation."""
+    return [s for s in _SENTENCE_END.split(normalize_tts_text(text)) if s]
+
+
+def cache_key(voice: str, speaking_rate: float, text: str) -> str:
+    """Content address for one utterance."""
+    material = f"{voice}|{speaking_rate:.2f}|{normalize_tts_text(text)}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def join_wavs(wavs: list[bytes], gap_ms: int = SENTENCE_GAP_MS) -> bytes:
+    """Concatenate WAV clips of the same format with silence in between."""
+    if len(wavs) == 1:
+        return wavs[0]
+
+    params = None
+    frames: list[bytes] = []
+    for index, data in enumerate(wavs):
+        with wave.open(io.BytesIO(data), "rb") as clip:
+            if params is None:
+                params = clip.getparams()
+            if index:
+                gap_frames = params.framerate * gap_ms // 1000
+                frames.append(b"\x00" * gap_frames * params.sampwidth * params.nchannels)
+            frames.append(clip.readframes(clip.getnframes()))
+
+    output = io.BytesIO()
+    with wave.open(output, "wb") as joined:
+        joined.setnchannels(params.nchannels)
+        joined.setsampwidth(params.sampwidth)
+        joined.setframerate(params.framerate)
+        joined.writeframes(b"".join(frames))
+    return output.getvalue()
+
+
+class TTSCache:
+    """
+    Two-tier cache of synthesized WAV audio.
+
+    The memory tier is an LRU bounded by total bytes. The disk tier stores
+    zlib-compressed WAV files named by content hash and is bounded by total
+    compressed bytes, evicting least recently used files first.
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        cache_dir: Optional[Path] = None,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_memory_bytes: Memory tier budget
+            cache_dir: Disk tier directory (None disables the disk tier)
+            max_disk_bytes: Disk tier budget (compressed size)
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(p.stat().st_size for p in self.cache_dir.glob("*/*.wav.z"))
+            metrics.TTS_CACHE_BYTES.labels(tier="disk").set(self._disk_bytes)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.wav.z"
+
+    def _remember(self, key: str, audio: bytes) -> None:
+        """Insert into the memory LRU, evicting as needed."""
+        if len(audio) > self.max_memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+        metrics.TTS_CACHE_BYTES.labels(tier="memory").set(self._memory_bytes)
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            audio = zlib.decompress(path.read_bytes())
+            os.utime(path)  # Touch for LRU eviction
+            return audio
+        except FileNotFoundError:
+            return None
+        except (OSError, zlib.error) as e:
+            logger.warning("tts_cache_read_failed", key=key, error=str(e))
+            return None
+
+    def _write_disk(self, key: str, audio: bytes) -> None:
+        path = self._path(key)
+        if path.exists():
+            return
+        data = zlib.compress(audio, 6)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        self._disk_bytes += len(data)
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict_disk()
+        metrics.TTS_CACHE_BYTES.labels(tier="disk").set(self._disk_bytes)
+
+    def _evict_disk(self) -> None:
+        """Drop least recently used files until 90% of the budget."""
+        files = sorted(self.cache_dir.glob("*/*.wav.z"), key=lambda p: p.stat().st_mtime)
+        target = self.max_disk_bytes * 0.9
+        for path in files:
+            if self._disk_bytes <= target:
+                break
+            try:
+                size = path.stat().st_size
+                path.unlink()
+                self._disk_bytes -= size
+            except OSError:
+                continue
+        logger.info("tts_cache_disk_evicted", bytes=self._disk_bytes)
+
+    async def get(self, voice: str, speaking_rate: float, text: str) -> Optional[bytes]:
+        """Look up audio for text; memory first, then disk."""
+        key = cache_key(voice, speaking_rate, text)
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+            metrics.TTS_CACHE_LOOKUPS.labels(result="memory_hit").inc()
+            return audio
+
+        if self.cache_dir is not None:
+            audio = await asyncio.to_thread(self._read_disk, key)
+            if audio is not None:
+                self._remember(key, audio)
+                metrics.TTS_CACHE_LOOKUPS.labels(result="disk_hit").inc()
+                return audio
+
+        metrics.TTS_CACHE_LOOKUPS.labels(result="miss").inc()
+        return None
+
+    async def put(self, voice: str, speaking_rate: float, text: str, audio: bytes) -> None:
+        """Store synthesized audio in both tiers."""
+        if not audio:
+            return
+        key = cache_key(voice, speaking_rate, text)
+        self._remember(key, audio)
+        if self.cache_dir is not None:
+            try:
+                await asyncio.to_thread(self._write_disk, key, audio)
+            except OSError as e:
+                logger.warning("tts_cache_write_failed", key=key, error=str(e))
+
+    def clear_memory(self) -> None:
+        """Drop the memory tier."""
+        self._memory.clear()
+        self._memory_bytes = 0
+        metrics.TTS_CACHE_BYTES.labels(tier="memory").set(0)
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    @property
+    def disk_bytes(self) -> int:
+        return self._disk_bytes
+
+
+# Global instance
+_tts_cache: Optional[TTSCache] = None
+
+
+def get_tts_cache() -> Optional[TTSCache]:
+    """Get the shared TTS cache, or None if caching is disabled."""
+    global _tts_cache
+    if not settings.tts_cache_enabled:
+        return None
+    if _tts_cache is None:
+        cache_dir = settings.tts_cache_dir or DEFAULT_CACHE_DIR
+        _tts_cache = TTSCache(
+            max_memory_bytes=settings.tts_cache_memory_mb * 1024 * 1024,
+            cache_dir=cache_dir if settings.tts_cache_disk_mb > 0 else None,
+            max_disk_bytes=settings.tts_cache_disk_mb * 1024 * 1024,
+        )
+    return _tts_cache
+
+
+def prewarm_phrases() -> list[str]:
+    """Built-in phrases plus onboarding questions and the optional prewarm file."""
+    phrases = list(PREWARM_PHRASES)
+    try:
+        from ..tools.builtin.onboarding_tools import ONBOARDING_QUESTIONS
+        for questions in ONBOARDING_QUESTIONS.values():
+            phrases.extend(questions)
+    except Exception as e:  # Tool imports may pull optional dependencies
+        logger.debug("tts_prewarm_onboarding_unavailable", error=str(e))
+
+    if settings.tts_cache_prewarm_file:
+        try:
+            lines = Path(settings.tts_cache_prewarm_file).read_text(encoding="utf-8").splitlines()
+            phrases.extend(line.strip() for line in lines if line.strip())
+        except OSError as e:
+            logger.warning("tts_prewarm_file_unreadable", path=settings.tts_cache_prewarm_file, error=str(e))
+    return phrases
+
+
+async def prewarm(tts, phrases: Optional[Iterable[str]] = None) -> int:
+    """
+    Synthesize phrases into the cache ahead of time.
+
+    Args:
+        tts: PiperTTS instance (its current voice and rate are used)
+        phrases: Texts to warm (defaults to prewarm_phrases())
+
+    Returns:
+        Number of phrases newly synthesized
+    """
+    cache = get_tts_cache()
+    if cache is None:
+        return 0
+
+    synthesized = 0
+    for phrase in phrases if phrases is not None else prewarm_phrases():
+        if await cache.get(tts.voice_config.id, tts.speaking_rate, phrase) is not None:
+            continue
+        if await tts.synthesize(phrase):
+            synthesized += 1
+    logger.info("tts_cache_prewarmed", synthesized=synthesized, memory_bytes=cache.memory_bytes)
+    return synthesized
+
+
+async def prewarm_voice(voice: str, phrases: Optional[Iterable[str]] = None) -> int:
+    """
+    prewarm() with a PiperTTS built for voice. Meant to run as a background
+    task: a missing Piper binary or voice model is logged (the "tts"
+    startup component reports it) instead of raised.
+    """
+    from .piper_tts import PiperTTS
+
+    try:
+        tts = PiperTTS(voice=voice)
+    except (RuntimeError, ValueError) as e:
+        logger.warning("tts_prewarm_skipped", voice=voice, error=str(e))
+        return 0
+    return await prewarm(tts, phrases)
@@ -13,6 +13,7 @@ from dataclasses import dataclass
 import structlog
 
 from server.config import settings
+from .cache import get_tts_cache, join_wavs, split_sentences
 
 logger = structlog.get_logger()
 
@@ -155,6 +156,11 @@ class PiperTTS:
         """
         Synthesize text to audio.
         
+        Uses the TTS cache when enabled: a cached full text is returned as
+        is; otherwise cached sentences are reused and the missing ones are
+        synthesized in a single Piper run, one WAV per sentence, so each
+        can be reused inside later responses.
+        
         Args:
             text: Text to synthesize
         
@@ -166,47 +172,144 @@ class PiperTTS:
         
         self._cancelled = False
         
+        # The instance is shared between sessions, which change its voice
+        # and rate per turn: read them once so the audio matches its key
+        voice, model_path, rate = self.voice_config.id, self.model_path, self.speaking_rate
+        
+        cache = get_tts_cache()
+        if cache is None:
+            return await self._synthesize_piper(text, model_path, rate)
+        
+        cached = await cache.get(voice, rate, text)
+        if cached is not None:
+            return cached
+        
+        sentences = split_sentences(text)
+        if len(sentences) <= 1:
+            audio = await self._synthesize_piper(text, model_path, rate)
+            if audio and not self._cancelled:
+                await cache.put(voice, rate, text, audio)
+            return audio
+        
+        parts: list[Optional[bytes]] = [await cache.get(voice, rate, s) for s in sentences]
+        missing = [i for i, part in enumerate(parts) if part is None]
+        if missing:
+            audios = await self._synthesize_sentences([sentences[i] for i in missing], model_path, rate)
+            if self._cancelled:
+                return b''
+            if audios is None:
+                # Per-sentence output failed; fall back to one plain run
+                audio = await self._synthesize_piper(text, model_path, rate)
+                if audio and not self._cancelled:
+                    await cache.put(voice, rate, text, audio)
+                return audio
+            for i, audio in zip(missing, audios):
+                parts[i] = audio
+                await cache.put(voice, rate, sentences[i], audio)
+        
+        try:
+            audio = join_wavs(parts)
+        except Exception as e:
+            logger.warning("tts_cache_join_failed", error=str(e))
+            return await self._synthesize_piper(text, model_path, rate)
+        await cache.put(voice, rate, text, audio)
+        return audio
+    
+    @staticmethod
+    def _piper_command(model_path: Path, rate: float, *output_args: str) -> list[str]:
+        """Piper command line for a voice model and rate."""
+        cmd = [str(PIPER_BIN), "--model", str(model_path), *output_args]
+        
+        # Add length scale for speaking rate
+        # length_scale < 1.0 = faster, > 1.0 = slower
+        if rate != 1.0:
+            length_scale = 1.0 / rate
+            cmd.extend(["--length_scale", str(length_scale)])
+        return cmd
+    
+    async def _run_piper(self, cmd: list[str], text: str, timeout: float = 30.0) -> tuple[int, str, str]:
+        """
+        Run Piper with text on stdin.
+        
+        The process is killed if the calling task is cancelled (barge-in)
+        or the timeout expires, so no synthesis outlives its turn.
+        
+        Returns:
+            (returncode, stdout, stderr)
+        """
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(text.encode("utf-8")), timeout=timeout
+            )
+        except (asyncio.CancelledError, asyncio.TimeoutError) as e:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+                logger.info("piper_process_killed", reason=type(e).__name__)
+            if isinstance(e, asyncio.TimeoutError):
+                raise subprocess.TimeoutExpired(cmd, timeout) from e
+            raise
+        return process.returncode, stdout.decode("utf-8", "replace"), stderr.decode("utf-8", "replace")
+    
+    async def _synthesize_sentences(self, sentences: list[str], model_path: Path, rate: float) -> Optional[list[bytes]]:
+        """
+        Synthesize several sentences in one Piper run, one WAV each.
+        
+        Piper's --output_dir mode writes a file per input line and prints
+        its path. Returns None if the output does not line up.
+        """
+        with tempfile.TemporaryDirectory(prefix="piper_") as output_dir:
+            cmd = self._piper_command(model_path, rate, "--output_dir", output_dir)
+            
+            try:
+                returncode, stdout, _ = await self._run_piper(cmd, "\n".join(sentences) + "\n")
+                paths = [line.strip() for line in stdout.splitlines() if line.strip()]
+                if returncode != 0 or len(paths) != len(sentences):
+                    logger.warning(
+                        "piper_sentence_output_mismatch",
+                        returncode=returncode,
+                        expected=len(sentences),
+                        got=len(paths),
+                    )
+                    return None
+                audios = [Path(path).read_bytes() for path in paths]
+            except (subprocess.TimeoutExpired, OSError) as e:
+                logger.error("piper_error", error=str(e))
+                return None
+        
+        logger.info(
+            "piper_synthesized",
+            sentences=len(sentences),
+            audio_bytes=sum(len(a) for a in audios)
+        )
+        return audios
+    
+    async def _synthesize_piper(self, text: str, model_path: Path, rate: float) -> bytes:
+        """Run Piper on text with a voice model and rate, bypassing the cache."""
         with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
             output_path = f.name
         
         try:
-            # Build command
-            cmd = [
-                str(PIPER_BIN),
-                "--model", str(self.model_path),
-                "--output_file", output_path,
-            ]
-            
-            # Add length scale for speaking rate
-            # length_scale < 1.0 = faster, > 1.0 = slower
-            if self.speaking_rate != 1.0:
-                length_scale = 1.0 / self.speaking_rate
-                cmd.extend(["--length_scale", str(length_scale)])
+            cmd = self._piper_command(model_path, rate, "--output_file", output_path)
             
             # Run piper with text input via stdin
-            loop = asyncio.get_event_loop()
-            
-            def _run_piper():
-                process = subprocess.run(
-                    cmd,
-                    input=text,
-                    capture_output=True,
-                    text=True,
-                    timeout=30,
-                )
-                return process
-            
-            result = await loop.run_in_executor(None, _run_piper)
+            returncode, _, stderr = await self._run_piper(cmd, text)
             
             if self._cancelled:
                 logger.info("piper_synthesis_cancelled")
                 return b''
             
-            if result.returncode != 0:
+            if returncode != 0:
                 logger.error(
                     "piper_failed",
-                    returncode=result.returncode,
-                    stderr=result.stderr[:500] if result.stderr else ""
+                    returncode=returncode,
+                    stderr=stderr[:500] if stderr else ""
                 )
                 return b''
             
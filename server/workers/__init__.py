@@ -0,0 +1,72 @@
+"""
+Model Workers
+Optional deployment mode that runs model families in their own processes
+so inference never competes with the WebSocket event loop for the GIL.
+PCM goes to the workers through shared memory; crashed or wedged workers
+are restarted. Enabled per family with MODEL_WORKERS, e.g.
+{"stt": 2, "embeddings": 1}.
+"""
+import threading
+from typing import Optional
+import structlog
+
+from ..config import settings
+from .pool import SharedAudio, WorkerCrashed, WorkerPool, WorkerProcess
+
+logger = structlog.get_logger()
+
+# Model family -> handler built in each worker process
+FAMILIES = {
+    "stt": "server.workers.families:WhisperWorker",
+    "embeddings": "server.workers.families:EmbeddingWorker",
+}
+
+_pools: dict[str, WorkerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_worker_pool(family: str) -> Optional[WorkerPool]:
+    """The pool serving `family`, or None if it runs in-process."""
+    processes = settings.model_workers.get(family, 0)
+    if processes <= 0 or family not in FAMILIES:
+        return None
+    with _pools_lock:
+        pool = _pools.get(family)
+        if pool is None:
+            pool = _pools[family] = WorkerPool(
+                family,
+                FAMILIES[family],
+                processes=processes,
+                slots_per_process=settings.worker_audio_slots,
+                # Room for the longest utterance a session buffers
+                slot_bytes=int(settings.session_audio_max_seconds * settings.audio_sample_rate) * 2,
+                max_restarts=settings.worker_max_restarts,
+                call_timeout=settings.worker_call_timeout,
+            )
+    return pool
+
+
+def worker_report() -> dict:
+    """Per-family worker status."""
+    return {family: pool.report() for family, pool in _pools.items()}
+
+
+def shutdown_worker_pools() -> None:
+    """Stop every worker process and free shared memory."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.stop()
+
+
+__all__ = [
+    "FAMILIES",
+    "SharedAudio",
+    "WorkerCrashed",
+    "WorkerPool",
+    "WorkerProcess",
+    "get_worker_pool",
+    "shutdown_worker_pools",
+    "worker_report",
+]
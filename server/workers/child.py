@@ -0,0 +1,84 @@
+"""
+Worker Process Entry Point
+Runs inside a spawned worker: builds the model handler, then serves
+requests from the parent's pipe until it is closed.
+"""
+import importlib
+import os
+import signal
+from multiprocessing import shared_memory
+
+
+def _resolve(path: str):
+    """Import "package.module:Name"."""
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to the parent's audio block without taking ownership of it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: registration goes to the parent's resource
+        # tracker (shared with spawned children), where it is a no-op
+        return shared_memory.SharedMemory(name=name)
+
+
+def worker_main(conn, factory: str, shm_name: str, slot_bytes: int) -> None:
+    """
+    Serve model calls.
+
+    Requests are (id, method, slot, nbytes, inline, kwargs). Audio is read
+    from shared-memory slot `slot` when given, else taken from `inline`,
+    and passed as the handler method's first argument. Replies are
+    (id, ok, result-or-error). A None request or a closed pipe ends the
+    worker.
+    """
+    # Ctrl-C goes to the whole process group; the parent stops us in order
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    try:
+        handler = _resolve(factory)()
+        shm = _attach(shm_name)
+    except BaseException as e:
+        conn.send(("failed", f"{type(e).__name__}: {e}"))
+        return
+    conn.send(("ready", os.getpid()))
+
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            break
+        if request is None:
+            break
+
+        req_id, method, slot, nbytes, inline, kwargs = request
+        view = None
+        try:
+            if method.startswith("_"):
+                raise AttributeError(f"{method} is not callable remotely")
+            func = getattr(handler, method)
+            if slot is not None:
+                view = shm.buf[slot * slot_bytes: slot * slot_bytes + nbytes]
+                result = func(view, **kwargs)
+            elif inline is not None:
+                result = func(inline, **kwargs)
+            else:
+                result = func(**kwargs)
+            reply = (req_id, True, result)
+        except Exception as e:
+            reply = (req_id, False, f"{type(e).__name__}: {e}")
+        finally:
+            if view is not None:
+                try:
+                    view.release()
+                except BufferError:
+                    pass
+        conn.send(reply)
+
+    try:
+        shm.close()
+    except BufferError:
+        pass
@@ -0,0 +1,36 @@
+"""
+Worker Model Families
+Handlers built inside worker processes. Each public method can be called
+from the web process; audio arrives as a buffer over shared memory.
+"""
+
+
+class WhisperWorker:
+    """faster-whisper transcription."""
+
+    def __init__(self):
+        from ..stt.whisper import WhisperSTT
+
+        self.stt = WhisperSTT()
+        self.stt.model = self.stt._load_model()
+
+    def transcribe(self, audio, language: str = "en") -> str:
+        from ..stt.whisper import pcm16_to_float
+
+        return self.stt.transcribe_array(pcm16_to_float(audio), language)
+
+
+class EmbeddingWorker:
+    """sentence-transformers embeddings (knowledge search)."""
+
+    def __init__(self):
+        from sentence_transformers import SentenceTransformer
+
+        self._factory = SentenceTransformer
+        self._models = {}
+
+    def encode(self, texts: list[str], model_name: str):
+        model = self._models.get(model_name)
+        if model is None:
+            model = self._models[model_name] = self._factory(model_name)
+        return model.encode(texts, convert_to_numpy=True)
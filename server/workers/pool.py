@@ -0,0 +1,486 @@
+"""
+Model Worker Pools
+Parent side of the worker processes: shared-memory audio slots, one
+supervised process per worker and a pool that spreads calls across them.
+"""
+import asyncio
+import itertools
+import multiprocessing as mp
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Any, Callable, Optional
+import structlog
+
+from .. import metrics
+from .child import worker_main
+
+logger = structlog.get_logger()
+
+
+class WorkerCrashed(RuntimeError):
+    """The worker handling a call died or is not running."""
+
+
+class SharedAudio:
+    """
+    Fixed-size PCM slots in one shared-memory block.
+
+    The parent copies a call's audio into a free slot and sends only the
+    slot number; the worker reads it in place. Slots are returned when
+    the reply (or the worker's death) comes back.
+    """
+
+    def __init__(self, slots: int, slot_bytes: int):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        self._free = list(range(slots))
+        self._cond = threading.Condition()
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def acquire(self, timeout: Optional[float] = 0) -> Optional[int]:
+        """Take a free slot, waiting up to `timeout` seconds (None waits forever)."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._free, timeout):
+                return None
+            return self._free.pop()
+
+    def write(self, slot: int, data: bytes) -> None:
+        offset = slot * self.slot_bytes
+        self.shm.buf[offset:offset + len(data)] = data
+
+    def release(self, slot: int) -> None:
+        with self._cond:
+            self._free.append(slot)
+            self._cond.notify()
+
+    @property
+    def in_use(self) -> int:
+        return self.slots - len(self._free)
+
+    def close(self) -> None:
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class WorkerProcess:
+    """
+    One supervised worker process.
+
+    A reader thread resolves calls as replies arrive. When the process
+    exits unexpectedly its in-flight calls fail with WorkerCrashed and it
+    is restarted with backoff, up to `max_restarts` within
+    `restart_window` seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: str,
+        audio: SharedAudio,
+        max_restarts: int = 5,
+        restart_window: float = 300.0,
+        ready_timeout: float = 600.0,
+        on_restart: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Args:
+            name: Label for logs, e.g. "stt-0"
+            factory: "module:Class" building the model handler in the worker
+            audio: The pool's shared audio slots
+            max_restarts: Restarts allowed within restart_window
+            restart_window: Seconds over which restarts are counted
+            ready_timeout: Longest model load before startup fails
+            on_restart: Called after each restart
+        """
+        self.name = name
+        self.factory = factory
+        self.audio = audio
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.ready_timeout = ready_timeout
+        self.on_restart = on_restart
+
+        self.pid: Optional[int] = None
+        self.restarts = 0
+        self.error: Optional[str] = None
+
+        self._process = None
+        self._conn = None
+        self._ids = itertools.count()
+        self._pending: dict[int, tuple[Future, Optional[int]]] = {}
+        self._lock = threading.Lock()        # pending calls and ready state
+        self._send_lock = threading.Lock()   # writes to the pipe
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+        self._restart_times: deque[float] = deque()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        """Spawn the process and block until its model is loaded."""
+        self._stopped.clear()
+        self._spawn()
+
+    def _spawn(self) -> None:
+        ctx = mp.get_context("spawn")
+        conn, child_conn = ctx.Pipe()
+        process = ctx.Process(
+            target=worker_main,
+            args=(child_conn, self.factory, self.audio.name, self.audio.slot_bytes),
+            name=f"felix-{self.name}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+
+        try:
+            if not conn.poll(self.ready_timeout):
+                raise RuntimeError(f"{self.name} worker did not load within {self.ready_timeout:.0f}s")
+            kind, detail = conn.recv()
+            if kind != "ready":
+                raise RuntimeError(f"{self.name} worker failed to load: {detail}")
+        except EOFError:
+            process.join(timeout=1)
+            conn.close()
+            raise RuntimeError(f"{self.name} worker exited while loading (code {process.exitcode})")
+        except BaseException:
+            process.kill()
+            conn.close()
+            raise
+
+        with self._lock:
+            self._process, self._conn, self.pid = process, conn, detail
+            self.error = None
+            self._ready.set()
+        threading.Thread(
+            target=self._read, args=(process, conn), name=f"{self.name}-reader", daemon=True
+        ).start()
+        logger.info("model_worker_ready", worker=self.name, pid=detail)
+
+    def submit(
+        self,
+        method: str,
+        slot: Optional[int] = None,
+        nbytes: int = 0,
+        inline: Optional[bytes] = None,
+        kwargs: Optional[dict] = None,
+    ) -> Future:
+        """
+        Send one call. The slot, if any, is released when the call ends.
+
+        Raises:
+            WorkerCrashed: If the worker is not running
+        """
+        future: Future = Future()
+        with self._lock:
+            if not self._ready.is_set():
+                if slot is not None:
+                    self.audio.release(slot)
+                raise WorkerCrashed(f"{self.name} worker is not running")
+            req_id = next(self._ids)
+            self._pending[req_id] = (future, slot)
+            conn = self._conn
+        # Not under _lock: a large send can wait on the worker, which may be
+        # waiting on the reader thread to take its reply
+        try:
+            with self._send_lock:
+                conn.send((req_id, method, slot, nbytes, inline, kwargs or {}))
+        except (OSError, ValueError) as e:
+            with self._lock:
+                entry = self._pending.pop(req_id, None)
+            if entry is not None and slot is not None:
+                self.audio.release(slot)
+            raise WorkerCrashed(f"{self.name} worker pipe closed: {e}") from e
+        return future
+
+    def _read(self, process, conn) -> None:
+        """Reader thread: resolve calls until the process goes away."""
+        while True:
+            try:
+                req_id, ok, payload = conn.recv()
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                entry = self._pending.pop(req_id, None)
+            if entry is None:
+                continue
+            future, slot = entry
+            if slot is not None:
+                self.audio.release(slot)
+            if future.done():
+                continue
+            if ok:
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(payload))
+        self._on_exit(process, conn)
+
+    def _on_exit(self, process, conn) -> None:
+        process.join(timeout=5)
+        with self._lock:
+            self._ready.clear()
+            pending, self._pending = self._pending, {}
+        conn.close()
+        for future, slot in pending.values():
+            if slot is not None:
+                self.audio.release(slot)
+            if not future.done():
+                future.set_exception(WorkerCrashed(f"{self.name} worker exited (code {process.exitcode})"))
+
+        if self._stopped.is_set():
+            return
+        logger.error("model_worker_exited", worker=self.name, code=process.exitcode, failed_calls=len(pending))
+        self._restart()
+
+    def _restart(self) -> None:
+        while not self._stopped.is_set():
+            now = time.monotonic()
+            while self._restart_times and now - self._restart_times[0] > self.restart_window:
+                self._restart_times.popleft()
+            if len(self._restart_times) >= self.max_restarts:
+                self.error = f"gave up after {self.max_restarts} restarts in {self.restart_window:.0f}s"
+                logger.error("model_worker_abandoned", worker=self.name, error=self.error)
+                return
+            self._restart_times.append(now)
+            # 0.5 s, 1 s, 2 s ... between attempts
+            if self._stopped.wait(min(0.5 * 2 ** (len(self._restart_times) - 1), 30.0)):
+                return
+            try:
+                self._spawn()
+            except Exception as e:
+                self.error = str(e)
+                logger.error("model_worker_restart_failed", worker=self.name, error=str(e))
+                continue
+            self.restarts += 1
+            if self.on_restart is not None:
+                self.on_restart()
+            return
+
+    def kill(self, reason: str) -> None:
+        """Kill a wedged worker; the reader thread restarts it."""
+        process = self._process
+        if process is not None and process.is_alive():
+            logger.warning("model_worker_killed", worker=self.name, reason=reason)
+            with self._lock:
+                self._ready.clear()
+            process.kill()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Ask the worker to exit, killing it if it does not."""
+        self._stopped.set()
+        process, conn = self._process, self._conn
+        if process is None:
+            return
+        try:
+            with self._send_lock:
+                conn.send(None)
+        except (OSError, ValueError):
+            pass
+        process.join(timeout)
+        if process.is_alive():
+            process.kill()
+            process.join(timeout)
+
+    def report(self) -> dict:
+        return {
+            "pid": self.pid,
+            "ready": self.ready,
+            "pending": self.pending,
+            "restarts": self.restarts,
+            "error": self.error,
+        }
+
+
+class WorkerPool:
+    """
+    Processes serving one model family.
+
+    Calls go to the ready worker with the fewest calls in flight. Audio
+    travels through shared memory when it fits a slot. A call that runs
+    past `call_timeout` kills its worker, which is then restarted.
+    """
+
+    def __init__(
+        self,
+        family: str,
+        factory: str,
+        processes: int = 1,
+        slots_per_process: int = 4,
+        slot_bytes: int = 30 * 16000 * 2,
+        max_restarts: int = 5,
+        call_timeout: float = 60.0,
+    ):
+        """
+        Args:
+            family: Model family name, e.g. "stt"
+            factory: "module:Class" building the handler in each worker
+            processes: Worker processes to run
+            slots_per_process: Shared audio slots per worker
+            slot_bytes: Largest audio passed through shared memory
+            max_restarts: Restarts allowed per worker in five minutes
+            call_timeout: Longest a call may run before its worker is killed
+        """
+        self.family = family
+        self.factory = factory
+        self.call_timeout = call_timeout
+        self.audio = SharedAudio(processes * slots_per_process, slot_bytes)
+        self.workers = [
+            WorkerProcess(
+                f"{family}-{i}",
+                factory,
+                self.audio,
+                max_restarts=max_restarts,
+                on_restart=metrics.MODEL_WORKER_RESTARTS.labels(family=family).inc,
+            )
+            for i in range(max(1, processes))
+        ]
+        self._start_lock = threading.Lock()
+        self._started = False
+        self._closed = False
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    def start(self) -> None:
+        """Start every worker concurrently and wait for their models (blocking)."""
+        with self._start_lock:
+            if self._started:
+                return
+            errors = []
+
+            def start_one(worker: WorkerProcess) -> None:
+                try:
+                    worker.start()
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=start_one, args=(w,)) for w in self.workers]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            if errors:
+                for worker in self.workers:
+                    worker.stop()
+                raise errors[0]
+            self._started = True
+            logger.info("model_worker_pool_started", family=self.family, processes=len(self.workers))
+
+    def _pick(self) -> Optional[WorkerProcess]:
+        ready = [w for w in self.workers if w.ready]
+        return min(ready, key=lambda w: w.pending) if ready else None
+
+    def submit(self, method: str, audio: Optional[bytes] = None, **kwargs) -> Future:
+        """
+        Send a call (blocking until a worker and, if needed, a slot are free).
+
+        Raises:
+            WorkerCrashed: If no worker comes back within call_timeout
+        """
+        if not self._started:
+            self.start()
+        deadline = time.monotonic() + self.call_timeout
+        worker = self._pick()
+        while worker is None:
+            if time.monotonic() > deadline or all(w.error for w in self.workers):
+                raise WorkerCrashed(f"No {self.family} worker is running")
+            time.sleep(0.05)
+            worker = self._pick()
+
+        slot = None
+        if audio is not None and len(audio) <= self.audio.slot_bytes:
+            slot = self.audio.acquire(timeout=max(0.0, deadline - time.monotonic()))
+        return self._send(worker, method, audio, slot, kwargs)
+
+    def _send(self, worker: WorkerProcess, method: str, audio, slot: Optional[int], kwargs: dict) -> Future:
+        if audio is None:
+            return worker.submit(method, kwargs=kwargs)
+        if slot is None:
+            return worker.submit(method, inline=bytes(audio), kwargs=kwargs)
+        self.audio.write(slot, audio)
+        return worker.submit(method, slot=slot, nbytes=len(audio), kwargs=kwargs)
+
+    def _kill_owner(self, future: Future, reason: str) -> None:
+        for worker in self.workers:
+            if any(entry[0] is future for entry in list(worker._pending.values())):
+                worker.kill(reason)
+
+    async def call(self, method: str, audio: Optional[bytes] = None, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run `method` on a worker from the event loop.
+
+        The common case (a worker ready, a slot free) sends without
+        leaving the loop; anything that would wait is done in a thread.
+        """
+        timeout = timeout or self.call_timeout
+        depth = metrics.QUEUE_DEPTH.labels(queue=f"worker_{self.family}")
+        depth.inc()
+        started = time.perf_counter()
+        try:
+            worker = self._pick() if self._started else None
+            slot = None
+            fits = audio is None or len(audio) <= self.audio.slot_bytes
+            if worker is not None and audio is not None and fits:
+                slot = self.audio.acquire(timeout=0)
+            if worker is not None and fits and (audio is None or slot is not None):
+                future = self._send(worker, method, audio, slot, kwargs)
+            else:
+                future = await asyncio.to_thread(self.submit, method, audio, **kwargs)
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+            except asyncio.TimeoutError:
+                self._kill_owner(future, f"{method} exceeded {timeout:g}s")
+                raise
+        finally:
+            depth.dec()
+            metrics.MODEL_WORKER_CALL_SECONDS.labels(family=self.family, method=method).observe(
+                time.perf_counter() - started
+            )
+
+    def call_sync(self, method: str, audio: Optional[bytes] = None, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run `method` on a worker from a thread (e.g. a blocking tool)."""
+        timeout = timeout or self.call_timeout
+        started = time.perf_counter()
+        future = self.submit(method, audio, **kwargs)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            self._kill_owner(future, f"{method} exceeded {timeout:g}s")
+            raise
+        finally:
+            metrics.MODEL_WORKER_CALL_SECONDS.labels(family=self.family, method=method).observe(
+                time.perf_counter() - started
+            )
+
+    def stop(self) -> None:
+        """Stop the workers and free the shared memory."""
+        if self._closed:
+            return
+        self._closed = True
+        for worker in self.workers:
+            worker.stop()
+        self.audio.close()
+        self._started = False
+
+    def report(self) -> dict:
+        return {
+            "processes": [w.report() for w in self.workers],
+            "audio_slots_in_use": self.audio.in_use,
+        }
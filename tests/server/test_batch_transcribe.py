@@ -0,0 +1,149 @@
+"""
+Tests for batch transcription: chunking, output formats and resume.
+"""
+import json
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+
+SR = 16000
+
+
+def energy_detector(audio):
+    """Speech = runs of non-zero samples (stands in for Silero VAD)."""
+    active = np.abs(audio) > 0
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], active.astype(np.int8), [0]])))
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+
+def tone(seconds):
+    return np.full(int(seconds * SR), 0.1, dtype=np.float32)
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * SR), dtype=np.float32)
+
+
+class FakeModel:
+    """Returns one segment per chunk giving the chunk length; chunks of 2s or more "are" German."""
+
+    def transcribe(self, audio, language=None, **kwargs):
+        seconds = len(audio) / SR
+        info = SimpleNamespace(language=language or ("de" if seconds >= 2 else "en"))
+        return iter([SimpleNamespace(start=0.0, end=seconds, text=f" speech {seconds:.0f}s")]), info
+
+
+def write_wav(path, audio, rate=SR):
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes((audio * 32767).astype(np.int16).tobytes())
+
+
+class TestChunking:
+    """Tests for VAD chunk planning."""
+
+    def test_plan_merges_and_splits(self):
+        """Short spans are merged up to the limit; long ones are split."""
+        from server.stt.batch import plan_chunks
+
+        assert plan_chunks([(0, 10), (15, 25), (30, 45)], 30) == [(0, 25), (30, 45)]
+        assert plan_chunks([(0, 70)], 30) == [(0, 30), (30, 60), (60, 70)]
+
+    def test_chunks_across_windows(self):
+        """Speech straddling a VAD window edge is kept in one chunk."""
+        from server.stt.batch import iter_chunks
+
+        audio = np.concatenate([silence(5), tone(10), silence(30), tone(20), silence(5), tone(8), silence(2)])
+        blocks = np.array_split(audio, 8)
+        chunks = list(iter_chunks(blocks, energy_detector, max_chunk_seconds=10, window_seconds=25))
+
+        assert [round(c.start) for c in chunks] == [5, 45, 55, 70]
+        assert [round(len(c.audio) / SR) for c in chunks] == [10, 10, 10, 8]
+        assert [c.index for c in chunks] == [0, 1, 2, 3]
+
+    def test_continuous_speech_is_bounded(self):
+        """Unbroken speech is still emitted in chunks, never buffered whole."""
+        from server.stt.batch import iter_chunks
+
+        blocks = [tone(10) for _ in range(12)]
+        chunks = list(iter_chunks(blocks, energy_detector, max_chunk_seconds=10, window_seconds=30))
+
+        assert all(len(c.audio) <= 10 * SR for c in chunks)
+        assert sum(len(c.audio) for c in chunks) == 120 * SR
+
+
+class TestBatchTranscriber:
+    """Tests for the file pipeline."""
+
+    def test_srt_format(self):
+        """SRT timestamps use hours, minutes, seconds and milliseconds."""
+        from server.stt.batch import format_srt
+
+        srt = format_srt([{"start": 1.5, "end": 3661.25, "text": "hello"}])
+        assert srt == "1\n00:00:01,500 --> 01:01:01,250\nhello\n"
+
+    def test_transcribes_and_resumes(self, tmp_path):
+        """Files are logged with offsets and RTF; a rerun skips them."""
+        from server.stt.batch import BatchTranscriber
+
+        first, second = tmp_path / "a.wav", tmp_path / "b.wav"
+        write_wav(first, np.concatenate([silence(1), tone(2), silence(2), tone(1)]))
+        write_wav(second, np.concatenate([tone(3), silence(1)])[::2], rate=8000)
+        log = tmp_path / "out" / "transcripts.jsonl"
+
+        transcriber = BatchTranscriber(FakeModel(), energy_detector, workers=3)
+        summary = transcriber.run([first, second], log, srt_dir=tmp_path / "out")
+
+        assert summary["files"] == 2 and summary["failed"] == 0
+        records = {r["path"]: r for r in map(json.loads, log.read_text().splitlines())}
+        assert records[str(first)]["duration"] == 6.0
+        assert records[str(first)]["segments"][0]["start"] == 1.0
+        assert records[str(second)]["text"] == "speech 3s"
+        assert (tmp_path / "out" / "a.srt").read_text().startswith("1\n00:00:01,000")
+
+        again = transcriber.run([first, second], log)
+        assert again["files"] == 0 and again["skipped"] == 2
+        assert len(log.read_text().splitlines()) == 2
+
+    def test_detected_language_is_recorded(self, tmp_path):
+        """With language detection each file gets the language of most of its audio."""
+        from server.stt.batch import BatchTranscriber
+
+        audio = tmp_path / "call.wav"
+        write_wav(audio, np.concatenate([tone(1), silence(2), tone(3), silence(2), tone(1)]))
+        log = tmp_path / "t.jsonl"
+
+        BatchTranscriber(FakeModel(), energy_detector, language=None).run([audio], log)
+
+        assert json.loads(log.read_text())["language"] == "de"
+
+    def test_srt_paths_do_not_collide(self, tmp_path):
+        """Subtitles mirror input subfolders; same-stem inputs keep their extension."""
+        from server.stt.batch import srt_paths
+
+        files = [tmp_path / "mon" / "a.wav", tmp_path / "tue" / "a.wav", tmp_path / "tue" / "b.wav", tmp_path / "tue" / "b.mp3"]
+        paths = srt_paths(files, tmp_path / "srt")
+
+        assert [p.relative_to(tmp_path / "srt").as_posix() for p in paths.values()] == [
+            "mon/a.srt", "tue/a.srt", "tue/b.wav.srt", "tue/b.mp3.srt",
+        ]
+
+    def test_bad_file_is_reported(self, tmp_path):
+        """An undecodable file fails on its own without stopping the batch."""
+        from server.stt.batch import BatchTranscriber
+
+        good, bad = tmp_path / "good.wav", tmp_path / "bad.wav"
+        write_wav(good, tone(1))
+        bad.write_bytes(b"not audio")
+        failed = []
+
+        summary = BatchTranscriber(FakeModel(), energy_detector).run(
+            [bad, good], tmp_path / "t.jsonl",
+            on_file=lambda r: r.error and failed.append(r.path),
+        )
+
+        assert summary["failed"] == 1 and failed == [str(bad)]
+        assert str(bad) not in (tmp_path / "t.jsonl").read_text()
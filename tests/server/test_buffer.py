@@ -0,0 +1,104 @@
+"""
+Tests for the NumPy ring buffer and the audio buffers built on it.
+"""
+import numpy as np
+import pytest
+
+
+class TestRingBuffer:
+    """Test mirrored ring buffer reads and writes."""
+
+    def test_latest_is_contiguous_across_wrap(self):
+        """Reads spanning the wrap point come back in order without copying."""
+        from server.audio.buffer import RingBuffer
+
+        ring = RingBuffer(8, np.int16)
+        ring.write(np.arange(6, dtype=np.int16))
+        ring.write(np.arange(6, 11, dtype=np.int16))
+
+        latest = ring.latest()
+
+        assert latest.tolist() == [3, 4, 5, 6, 7, 8, 9, 10]
+        assert latest.base is not None  # a view, not a copy
+        assert not latest.flags.writeable
+
+    def test_overflow_reports_dropped_samples(self):
+        """Writing past capacity drops the oldest samples."""
+        from server.audio.buffer import RingBuffer
+
+        ring = RingBuffer(4, np.int16)
+        ring.write(np.arange(3, dtype=np.int16))
+
+        assert ring.write(np.arange(3, 13, dtype=np.int16)) == 9
+        assert ring.latest().tolist() == [9, 10, 11, 12]
+
+    def test_windows_consume_and_keep_remainder(self):
+        """Full windows are consumed; a partial window stays buffered."""
+        from server.audio.buffer import RingBuffer
+
+        ring = RingBuffer(16, np.int16)
+        ring.extend(np.arange(10, dtype=np.int16).tobytes())
+
+        windows = [w.tolist() for w in ring.windows(4)]
+
+        assert windows == [[0, 1, 2, 3], [4, 5, 6, 7]]
+        assert ring.latest().tolist() == [8, 9]
+
+    def test_bytes_and_nbytes(self):
+        """PCM bytes round-trip through the buffer."""
+        from server.audio.buffer import RingBuffer
+
+        pcm = np.arange(5, dtype=np.int16).tobytes()
+        ring = RingBuffer(10, np.int16)
+        ring.extend(pcm)
+
+        assert ring.nbytes == len(pcm)
+        assert bytes(ring) == pcm
+
+    def test_invalid_capacity(self):
+        """Capacity must be positive."""
+        from server.audio.buffer import RingBuffer
+
+        with pytest.raises(ValueError):
+            RingBuffer(0)
+
+
+class TestAudioBuffers:
+    """Test AudioBuffer and ChunkedAudioBuffer on top of the ring."""
+
+    def test_audio_buffer_read_last_samples(self):
+        """AudioBuffer keeps the newest max_seconds of audio."""
+        from server.audio.buffer import AudioBuffer
+
+        buffer = AudioBuffer(max_seconds=1.0, sample_rate=4)
+        buffer.write(np.arange(6, dtype=np.int16).tobytes())
+
+        assert buffer.num_samples == 4
+        assert buffer.read(2).tolist() == [4, 5]
+        assert buffer.read_bytes() == np.arange(2, 6, dtype=np.int16).tobytes()
+
+    def test_chunked_buffer_splits_chunks(self):
+        """ChunkedAudioBuffer returns fixed-size chunks and holds the rest."""
+        from server.audio.buffer import ChunkedAudioBuffer
+
+        buffer = ChunkedAudioBuffer(chunk_ms=1, sample_rate=4000)  # 4 samples per chunk
+        added = buffer.write(np.arange(10, dtype=np.int16).tobytes())
+
+        assert added == 2
+        assert buffer.num_chunks == 2
+        assert buffer.write(np.arange(10, 12, dtype=np.int16).tobytes()) == 1
+        chunks = buffer.read_all_chunks()
+        assert [np.frombuffer(c, dtype=np.int16).tolist() for c in chunks] == [
+            [0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10, 11]
+        ]
+        assert buffer.read_chunk() is None
+
+    def test_chunked_buffer_caps_chunks(self):
+        """Only the newest max_chunks chunks are kept."""
+        from server.audio.buffer import ChunkedAudioBuffer
+
+        buffer = ChunkedAudioBuffer(chunk_ms=1, sample_rate=2000, max_chunks=2)  # 2 samples per chunk
+        buffer.write(np.arange(8, dtype=np.int16).tobytes())
+
+        assert buffer.num_chunks == 2
+        assert np.frombuffer(buffer.read_chunk(), dtype=np.int16).tolist() == [4, 5]
@@ -0,0 +1,108 @@
+"""
+Tests for event-driven ComfyUI job tracking.
+"""
+import asyncio
+import json
+import struct
+
+import httpx
+import pytest
+
+
+def make_service(tmp_path, history=None):
+    """Service with a mocked HTTP API and no ComfyUI process."""
+    from server.comfy_service import ComfyUIService
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/prompt":
+            body = json.loads(request.content)
+            return httpx.Response(200, json={"prompt_id": body["prompt_id"], "number": 1})
+        if request.url.path.startswith("/history/"):
+            return httpx.Response(200, json=history or {})
+        return httpx.Response(404)
+
+    service = ComfyUIService(comfy_dir=str(tmp_path))
+    service.client = httpx.AsyncClient(
+        base_url=service.base_url, transport=httpx.MockTransport(handler)
+    )
+    service._events_connected.set()
+    return service
+
+
+def event(kind, **data):
+    return json.dumps({"type": kind, "data": data})
+
+
+class TestComfyJobTracking:
+    """Test that WebSocket events resolve queued prompts."""
+
+    async def test_completion_resolves_with_outputs(self, tmp_path):
+        """A prompt resolves as soon as ComfyUI reports it done."""
+        service = make_service(tmp_path)
+        job = await service.submit({"9": {}})
+        image = {"filename": "felix_gen_00001_.png", "subfolder": "", "type": "output"}
+
+        await service._handle_event(event("execution_start", prompt_id=job.prompt_id))
+        await service._handle_event(event("executed", node="9", output={"images": [image]}, prompt_id=job.prompt_id))
+        await service._handle_event(event("executing", node=None, prompt_id=job.prompt_id))
+
+        outputs = await service.wait(job, timeout=1.0)
+        assert outputs["9"]["images"] == [image]
+        assert job.prompt_id not in service._jobs
+
+    async def test_execution_error_raises(self, tmp_path):
+        """Errors inside ComfyUI surface as ComfyUIExecutionError."""
+        from server.comfy_service import ComfyUIExecutionError
+
+        service = make_service(tmp_path)
+        job = await service.submit({})
+        await service._handle_event(
+            event("execution_error", prompt_id=job.prompt_id, exception_message="out of memory\n")
+        )
+
+        with pytest.raises(ComfyUIExecutionError, match="out of memory"):
+            await service.wait(job, timeout=1.0)
+
+    async def test_events_for_other_prompts_ignored(self, tmp_path):
+        """Completion of another prompt does not resolve this one."""
+        service = make_service(tmp_path)
+        job = await service.submit({})
+        await service._handle_event(event("executing", node=None, prompt_id="someone-else"))
+
+        with pytest.raises(asyncio.TimeoutError):
+            await service.wait(job, timeout=0.05)
+
+    async def test_progress_and_previews_forwarded(self, tmp_path):
+        """Step progress and binary latent previews reach the job's callbacks."""
+        service = make_service(tmp_path)
+        progress, previews = [], []
+
+        async def on_progress(value, maximum, node):
+            progress.append((value, maximum))
+
+        async def on_preview(mime, data):
+            previews.append((mime, data))
+
+        job = await service.submit({}, on_progress=on_progress, on_preview=on_preview)
+        await service._handle_event(event("executing", node="3", prompt_id=job.prompt_id))
+        await service._handle_event(event("progress", value=5, max=20, node="3", prompt_id=job.prompt_id))
+        await service._handle_event(struct.pack(">II", 1, 1) + b"jpeg-bytes")
+
+        assert progress == [(5, 20)]
+        assert previews == [("image/jpeg", b"jpeg-bytes")]
+
+    async def test_history_fallback_when_disconnected(self, tmp_path, monkeypatch):
+        """Without the event socket, completion is found through /history."""
+        from server import comfy_service
+
+        monkeypatch.setattr(comfy_service, "EVENTS_FALLBACK_POLL", 0.01)
+        service = make_service(tmp_path)
+        job = await service.submit({})
+        service._events_connected.clear()
+
+        async def finished_history(prompt_id=None):
+            return {prompt_id: {"outputs": {"9": {"images": []}}, "status": {"completed": True}}}
+
+        service.get_history = finished_history
+        outputs = await service.wait(job, timeout=1.0)
+        assert outputs == {"9": {"images": []}}
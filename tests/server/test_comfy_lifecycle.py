@@ -0,0 +1,122 @@
+"""
+Tests for the ComfyUI process lifecycle (start, log draining, idle unload).
+"""
+import asyncio
+import socket
+import textwrap
+
+import pytest
+
+
+FAKE_COMFY = textwrap.dedent('''
+    import sys
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    port = int(sys.argv[sys.argv.index("--port") + 1])
+
+    # More output than a pipe buffer holds; blocks unless it is drained
+    for i in range(4000):
+        print(f"loading custom node {i:05d} " + "x" * 40, flush=True)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200 if self.path == "/system_stats" else 404)
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def do_POST(self):
+            if self.path == "/free":
+                print("FREE_CALLED", flush=True)
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    HTTPServer(("127.0.0.1", port), Handler).serve_forever()
+''')
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def fake_comfy(tmp_path):
+    (tmp_path / "main.py").write_text(FAKE_COMFY)
+    return tmp_path
+
+
+class TestComfyLifecycle:
+    """Test starting, draining, idling and stopping ComfyUI."""
+
+    async def test_start_drains_output(self, fake_comfy):
+        """A chatty ComfyUI starts because its output is drained, not piped up."""
+        from server.comfy_service import ComfyUIService
+
+        service = ComfyUIService(comfy_dir=str(fake_comfy), port=free_port(), start_timeout=10)
+        try:
+            assert await service.start()
+            assert service.is_running
+            assert any("loading custom node 03999" in line for line in service._log_tail)
+        finally:
+            await service.stop()
+        assert not service.is_running
+
+    async def test_requests_wait_for_background_start(self, fake_comfy):
+        """ensure_ready joins the background start instead of launching again."""
+        from server.comfy_service import ComfyUIService
+
+        service = ComfyUIService(comfy_dir=str(fake_comfy), port=free_port(), start_timeout=10)
+        try:
+            service.start_background(warmup=False)
+            assert service.is_starting
+            first = await asyncio.gather(service.ensure_ready(), service.ensure_ready())
+            assert first == [True, True]
+            pid = service.process.pid
+            assert await service.ensure_ready()
+            assert service.process.pid == pid
+        finally:
+            await service.stop()
+
+    async def test_idle_unloads_models(self, fake_comfy):
+        """After the idle period the models are unloaded but the process stays up."""
+        from server.comfy_service import ComfyUIService
+
+        service = ComfyUIService(
+            comfy_dir=str(fake_comfy), port=free_port(), start_timeout=10,
+            idle_seconds=0.2, idle_action="unload",
+        )
+        try:
+            assert await service.start()
+            service._models_loaded = True
+            for _ in range(40):
+                if not service.models_loaded:
+                    break
+                await asyncio.sleep(0.1)
+            assert not service.models_loaded
+            assert service.is_running
+            await asyncio.sleep(0.2)
+            assert "FREE_CALLED" in service._log_tail
+        finally:
+            await service.stop()
+
+    async def test_idle_stop(self, fake_comfy):
+        """idle_action=stop shuts the process down to free all of its memory."""
+        from server.comfy_service import ComfyUIService
+
+        service = ComfyUIService(
+            comfy_dir=str(fake_comfy), port=free_port(), start_timeout=10,
+            idle_seconds=0.2, idle_action="stop",
+        )
+        try:
+            assert await service.start()
+            for _ in range(40):
+                if not service.is_running:
+                    break
+                await asyncio.sleep(0.1)
+            assert not service.is_running
+        finally:
+            await service.stop()
@@ -0,0 +1,100 @@
+"""
+Tests for adaptive end-of-turn detection.
+"""
+
+WINDOW = 512  # Silero window at 16 kHz (32 ms)
+
+
+def feed(detector, probability, windows):
+    """Feed identical VAD windows; return True as soon as the turn ends."""
+    threshold = 0.5
+    for _ in range(windows):
+        detector.observe(probability, probability >= threshold, WINDOW)
+        if detector.should_end():
+            return True
+    return False
+
+
+class TestTranscriptCompleteness:
+    """Test the syntactic completeness heuristic."""
+
+    def test_terminal_punctuation_is_complete(self):
+        from server.audio.endpointing import transcript_is_complete
+
+        assert transcript_is_complete("What time is it?") is True
+
+    def test_trailing_conjunction_is_incomplete(self):
+        from server.audio.endpointing import transcript_is_complete
+
+        assert transcript_is_complete("Turn on the lights and") is False
+        assert transcript_is_complete("I was thinking,") is False
+
+    def test_no_signal(self):
+        from server.audio.endpointing import transcript_is_complete
+
+        assert transcript_is_complete("") is None
+        assert transcript_is_complete("play some music") is None
+
+
+class TestEndpointDetector:
+    """Test how the required silence adapts."""
+
+    def test_short_confident_pause_ends_fast(self):
+        """A short reply followed by clear silence ends on fast_silence_ms."""
+        from server.audio.endpointing import EndpointDetector
+
+        detector = EndpointDetector()
+        feed(detector, 0.9, 15)  # ~480 ms of speech
+
+        assert detector.required_silence_ms() == detector.config.min_silence_ms
+        assert feed(detector, 0.02, 5)  # 160 ms of silence
+        assert detector.silence_ms < detector.config.min_silence_ms
+
+    def test_hesitation_waits_longer(self):
+        """Silence hovering near the threshold waits for max_silence_ms."""
+        from server.audio.endpointing import EndpointDetector
+
+        detector = EndpointDetector()
+        feed(detector, 0.9, 60)  # ~1.9 s of speech
+
+        assert not feed(detector, 0.4, 20)  # 640 ms, longer than the default
+        assert detector.required_silence_ms() == detector.config.max_silence_ms
+
+    def test_long_utterance_uses_default(self):
+        """Long speech with clear silence falls back to min_silence_ms."""
+        from server.audio.endpointing import EndpointDetector
+
+        detector = EndpointDetector()
+        feed(detector, 0.9, 60)
+        feed(detector, 0.02, 1)
+
+        assert detector.required_silence_ms() == detector.config.min_silence_ms
+
+    def test_transcript_hint(self):
+        """An unfinished sentence extends the wait when transcripts are enabled."""
+        from server.audio.endpointing import EndpointConfig, EndpointDetector
+
+        detector = EndpointDetector(EndpointConfig(use_transcript=True))
+        feed(detector, 0.9, 60)
+        feed(detector, 0.02, 1)
+        detector.set_transcript("Remind me to call my mom and")
+
+        assert detector.required_silence_ms() == detector.config.max_silence_ms
+
+        detector.set_transcript("Remind me to call my mom.")
+        assert detector.required_silence_ms() == detector.config.fast_silence_ms
+
+    def test_no_end_without_speech(self):
+        """Silence alone never ends a turn."""
+        from server.audio.endpointing import EndpointDetector
+
+        assert not feed(EndpointDetector(), 0.0, 100)
+
+    def test_config_updated_keeps_order(self):
+        """Per-session updates keep fast <= default <= max."""
+        from server.audio.endpointing import EndpointConfig
+
+        config = EndpointConfig().updated(min_silence_ms=200, fast_silence_ms=400, max_silence_ms=100)
+
+        assert config.fast_silence_ms == 200
+        assert config.max_silence_ms == 200
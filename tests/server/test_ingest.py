@@ -0,0 +1,97 @@
+"""
+Tests for the per-session audio ingest queue.
+"""
+import asyncio
+
+
+class TestAudioIngestQueue:
+    """Test ordering, coalescing, overload and drain behaviour."""
+
+    async def test_frames_processed_in_order(self):
+        """A single consumer sees frames in arrival order."""
+        from server.audio.ingest import AudioIngestQueue
+
+        seen = []
+
+        async def handler(data, tts_playing):
+            seen.append(data)
+            await asyncio.sleep(0)
+
+        queue = AudioIngestQueue(handler, max_coalesce_bytes=1)
+        queue.start()
+        for i in range(10):
+            queue.put(bytes([i]), False)
+        await asyncio.sleep(0.05)
+        await queue.stop()
+
+        assert seen == [bytes([i]) for i in range(10)]
+
+    async def test_coalesces_when_behind(self):
+        """Frames queued behind a slow handler are merged."""
+        from server.audio.ingest import AudioIngestQueue
+
+        seen = []
+
+        async def handler(data, tts_playing):
+            seen.append(data)
+
+        queue = AudioIngestQueue(handler, max_coalesce_bytes=1024)
+        for i in range(4):
+            queue.put(bytes([i]) * 2, False)
+        queue.start()
+        await asyncio.sleep(0.05)
+        await queue.stop()
+
+        assert seen == [b"\x00\x00\x01\x01\x02\x02\x03\x03"]
+        assert queue.frames_coalesced == 3
+
+    async def test_does_not_coalesce_across_tts_flag(self):
+        """Playback and non-playback audio stay in separate batches."""
+        from server.audio.ingest import AudioIngestQueue
+
+        seen = []
+
+        async def handler(data, tts_playing):
+            seen.append((data, tts_playing))
+
+        queue = AudioIngestQueue(handler)
+        queue.put(b"a", True)
+        queue.put(b"b", True)
+        queue.put(b"c", False)
+        queue.start()
+        await asyncio.sleep(0.05)
+        await queue.stop()
+
+        assert seen == [(b"ab", True), (b"c", False)]
+
+    def test_overload_drops_oldest(self):
+        """A full ring drops the oldest frame and reports it."""
+        from server.audio.ingest import AudioIngestQueue
+
+        async def handler(data, tts_playing):
+            pass
+
+        queue = AudioIngestQueue(handler, max_frames=2)
+
+        assert queue.put(b"1", False)
+        assert queue.put(b"2", False)
+        assert not queue.put(b"3", False)
+        assert queue.frames_dropped == 1
+        assert [f.data for f in queue._frames] == [b"2", b"3"]
+
+    def test_drain_playback_only(self):
+        """Barge-in drain keeps speech captured after playback stopped."""
+        from server.audio.ingest import AudioIngestQueue
+
+        async def handler(data, tts_playing):
+            pass
+
+        queue = AudioIngestQueue(handler)
+        queue.put(b"a", True)
+        queue.put(b"b", False)
+        queue.put(b"c", True)
+
+        assert queue.drain(playback_only=True) == 2
+        assert [f.data for f in queue._frames] == [b"b"]
+        assert queue.drain() == 1
+        assert len(queue) == 0
@@ -0,0 +1,77 @@
+"""
+Tests for per-session LLM profiles and shared transports.
+"""
+
+
+class TestLLMProfile:
+    """Test immutable session profiles."""
+
+    def test_from_settings(self):
+        from server.config import settings
+        from server.llm.profile import LLMProfile
+
+        profile = LLMProfile.from_settings()
+
+        assert profile.backend == settings.llm_backend
+        assert profile.model == settings.ollama_model
+
+    def test_updated_is_a_copy(self):
+        from server.llm.profile import LLMProfile
+
+        profile = LLMProfile()
+        changed = profile.updated(model="qwen3", base_url="http://gpu2:11434/", api_key=None)
+
+        assert profile.model == "llama3.2"
+        assert changed.model == "qwen3"
+        assert changed.base_url == "http://gpu2:11434"
+        assert changed.api_key == profile.api_key
+
+    def test_sessions_have_independent_profiles(self):
+        from server.session import Session
+
+        a, b = Session(), Session()
+        a.llm_profile = a.llm_profile.updated(model="qwen3")
+
+        assert b.llm_profile.model != "qwen3"
+
+
+class TestTransportPool:
+    """Test shared per-endpoint HTTP clients."""
+
+    async def test_clients_share_transport_per_url(self, monkeypatch):
+        from server.llm import ollama
+        from server.llm.profile import LLMProfile
+        from server.llm.transport import TransportPool
+
+        pool = TransportPool()
+        monkeypatch.setattr(ollama, "get_transport_pool", lambda: pool)
+        base = LLMProfile(base_url="http://gpu1:11434")
+        a = ollama.LLMClient.from_profile(base)
+        b = ollama.LLMClient.from_profile(base.updated(model="qwen3"))
+        c = ollama.LLMClient.from_profile(base.updated(base_url="http://gpu2:11434"))
+
+        assert await a._get_client() is await b._get_client()
+        assert await a._get_client() is not await c._get_client()
+        assert len(pool) == 2
+        await pool.close()
+
+    async def test_reconfigure_keeps_connections_open(self):
+        from server.llm.transport import TransportPool
+
+        pool = TransportPool()
+        client = pool.client("http://gpu1:11434")
+        pool.client("http://gpu2:11434")  # Another session switches URL
+
+        assert not client.is_closed
+        assert pool.client("http://gpu1:11434") is client
+        await pool.close()
+        assert client.is_closed
+
+    def test_credentials_are_not_shared(self):
+        from server.llm.transport import TransportPool
+
+        pool = TransportPool()
+
+        assert pool.client("http://api", {"Authorization": "Bearer a"}) is not pool.client(
+            "http://api", {"Authorization": "Bearer b"}
+        )
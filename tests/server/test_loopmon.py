@@ -0,0 +1,54 @@
+"""
+Tests for the event-loop stall monitor.
+"""
+import asyncio
+import time
+
+
+class TestLoopMonitor:
+    """Test stall detection and attribution."""
+
+    async def test_stall_attributed_to_labelled_code(self):
+        """A blocking call is reported with the label of the code that ran it."""
+        from server import loopmon
+
+        def slow_tool():
+            time.sleep(0.3)
+
+        loopmon.label_code(slow_tool.__code__, "tool:slow_tool")
+        stalls = []
+        monitor = loopmon.LoopMonitor(interval=0.02, stall_threshold=0.1, on_stall=stalls.append)
+        task = asyncio.create_task(monitor.run())
+        await asyncio.sleep(0.1)
+
+        slow_tool()
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+        assert len(stalls) == 1
+        assert stalls[0].source == "tool:slow_tool"
+        assert stalls[0].tool == "slow_tool"
+        assert stalls[0].seconds >= 0.2
+        assert any("slow_tool" in line for line in stalls[0].stack)
+
+    async def test_short_pauses_are_not_stalls(self):
+        """Lag under the threshold is sampled but not reported."""
+        from server.loopmon import LoopMonitor
+
+        stalls = []
+        monitor = LoopMonitor(interval=0.02, stall_threshold=0.2, on_stall=stalls.append)
+        task = asyncio.create_task(monitor.run())
+        await asyncio.sleep(0.05)
+        time.sleep(0.05)
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+        assert stalls == []
+        assert monitor.report() == []
+
+    def test_unlabelled_stack_uses_innermost_server_frame(self):
+        """Without a label the innermost server function names the stall."""
+        import sys
+        from server.loopmon import attribute
+
+        assert attribute(sys._getframe()) == "other"
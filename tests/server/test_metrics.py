@@ -0,0 +1,127 @@
+"""
+Tests for the Prometheus metrics module.
+"""
+import pytest
+
+
+class TestMetricTypes:
+    """Test counter, gauge and histogram rendering."""
+
+    def test_counter_renders_total(self):
+        """Counters render with a _total suffix."""
+        from server.metrics import MetricsRegistry
+
+        registry = MetricsRegistry()
+        counter = registry.counter("test_events", "Events seen")
+        counter.inc()
+        counter.inc(2)
+
+        output = registry.render()
+
+        assert "# TYPE test_events counter" in output
+        assert "test_events_total 3" in output
+
+    def test_gauge_set_and_inc(self):
+        """Gauges can go up and down."""
+        from server.metrics import MetricsRegistry
+
+        registry = MetricsRegistry()
+        gauge = registry.gauge("test_depth", "Queue depth", ["queue"])
+        gauge.labels(queue="audio").set(5)
+        gauge.labels(queue="audio").dec()
+
+        assert 'test_depth{queue="audio"} 4' in registry.render()
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Histogram buckets accumulate and include +Inf, sum and count."""
+        from server.metrics import MetricsRegistry
+
+        registry = MetricsRegistry()
+        histogram = registry.histogram("test_latency_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+
+        output = registry.render()
+
+        assert 'test_latency_seconds_bucket{le="0.1"} 1' in output
+        assert 'test_latency_seconds_bucket{le="1"} 2' in output
+        assert 'test_latency_seconds_bucket{le="+Inf"} 3' in output
+        assert "test_latency_seconds_count 3" in output
+        assert "test_latency_seconds_sum 5.55" in output
+
+    def test_histogram_labels(self):
+        """Labelled histograms keep one series per label value."""
+        from server.metrics import MetricsRegistry
+
+        registry = MetricsRegistry()
+        histogram = registry.histogram("test_tool_seconds", "Tool latency", ["tool"], buckets=(1.0,))
+        histogram.labels(tool="web_search").observe(0.5)
+        histogram.labels("get_weather").observe(2.0)
+
+        output = registry.render()
+
+        assert 'test_tool_seconds_bucket{tool="web_search",le="1"} 1' in output
+        assert 'test_tool_seconds_bucket{tool="get_weather",le="1"} 0' in output
+
+    def test_wrong_label_count_raises(self):
+        """Label arity is validated."""
+        from server.metrics import MetricsRegistry
+
+        registry = MetricsRegistry()
+        histogram = registry.histogram("test_bad_labels", "Bad", ["tool"])
+
+        with pytest.raises(ValueError):
+            histogram.labels("a", "b")
+
+    def test_duplicate_registration_raises(self):
+        """Metric names are unique per registry."""
+        from server.metrics import MetricsRegistry
+
+        registry = MetricsRegistry()
+        registry.counter("test_dup", "First")
+
+        with pytest.raises(ValueError):
+            registry.counter("test_dup", "Second")
+
+
+class TestGlobalRegistry:
+    """Test the server-wide metric families."""
+
+    def test_pipeline_metrics_registered(self):
+        """All pipeline stages expose a metric family."""
+        from server.metrics import render
+
+        output = render()
+
+        for name in (
+            "felix_vad_window_seconds",
+            "felix_stt_decode_seconds",
+            "felix_stt_real_time_factor",
+            "felix_llm_time_to_first_token_seconds",
+            "felix_llm_tokens_per_second",
+            "felix_tool_duration_seconds",
+            "felix_tts_real_time_factor",
+            "felix_websocket_send_seconds",
+            "felix_event_loop_lag_seconds",
+            "felix_active_sessions",
+            "felix_queue_depth",
+        ):
+            assert f"# TYPE {name}" in output
+
+    def test_tts_rtf_uses_full_synthesis_time(self):
+        """TTS RTF divides total synthesis time by audio length; first-audio latency is separate."""
+        from unittest.mock import patch
+        from server.metrics import Histogram
+        from server.metrics import observe_tts
+
+        rtf = Histogram("test_tts_rtf", "RTF")
+        synthesis = Histogram("test_tts_synthesis", "Synthesis")
+        first_audio = Histogram("test_tts_first_audio", "First audio")
+        with patch("server.metrics.TTS_REAL_TIME_FACTOR", rtf), \
+             patch("server.metrics.TTS_SYNTHESIS_SECONDS", synthesis), \
+             patch("server.metrics.TTS_FIRST_AUDIO_SECONDS", first_audio):
+            observe_tts(2.0, 8.0, first_audio_seconds=0.2)
+
+        assert rtf._default().snapshot()[1] == 0.25
+        assert synthesis._default().snapshot()[1] == 2.0
+        assert first_audio._default().snapshot()[1] == 0.2
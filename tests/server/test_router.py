@@ -0,0 +1,121 @@
+"""
+Tests for the multi-endpoint LLM router.
+"""
+import json
+import logging
+
+import httpx
+import pytest
+import structlog
+
+
+def make_router(urls, **kwargs):
+    from server.llm.router import LLMRouter
+
+    return LLMRouter({"llama3.2": urls}, **kwargs)
+
+
+class TestSelection:
+    """Test least-loaded selection and stickiness."""
+
+    def test_least_loaded(self):
+        router = make_router(["http://a", "http://b"])
+        a, b = router.endpoints
+
+        with router.track(a):
+            assert router.select("llama3.2") is b
+        assert a.in_flight == 0
+
+    def test_spreads_concurrent_requests(self):
+        router = make_router(["http://a", "http://b", "http://c"])
+        leases = [router.track(router.select("llama3.2")) for _ in range(6)]
+
+        assert [e.in_flight for e in router.endpoints] == [2, 2, 2]
+        for lease in leases:
+            lease.release()
+
+    def test_prefers_faster_endpoint(self):
+        router = make_router(["http://a", "http://b"])
+        a, b = router.endpoints
+        router.record_success(a, 2.0)
+        router.record_success(b, 0.5)
+
+        assert router.select("llama3.2") is b
+
+    def test_session_stickiness(self):
+        router = make_router(["http://a", "http://b"], sticky_slack=1)
+        first = router.select("llama3.2", session_key="s1")
+        other = router.endpoints[1] if first is router.endpoints[0] else router.endpoints[0]
+
+        # One extra request on the sticky endpoint is tolerated...
+        with router.track(first):
+            assert router.select("llama3.2", session_key="s1") is first
+            # ...two is not
+            with router.track(first):
+                assert router.select("llama3.2", session_key="s1") is other
+
+    def test_failed_endpoint_is_skipped(self):
+        router = make_router(["http://a", "http://b"])
+        a, b = router.endpoints
+        router.record_failure(a)
+
+        assert not a.healthy
+        assert router.select("llama3.2") is b
+
+        router.record_success(a)
+        assert a.healthy
+
+    def test_unrouted_model(self):
+        from server.llm.router import NoHealthyEndpoint
+
+        router = make_router(["http://a"])
+
+        assert not router.routes("mistral")
+        with pytest.raises(NoHealthyEndpoint):
+            router.select("mistral")
+
+
+class TestFailover:
+    """Test retrying a chat on another endpoint."""
+
+    async def test_connection_error_fails_over(self, monkeypatch):
+        """A refused connection is retried elsewhere without the caller noticing."""
+        from server import metrics
+        from server.llm import ollama
+
+        router = make_router(["http://down", "http://up"])
+        down, up = router.endpoints
+
+        def handler(request):
+            if request.url.host == "down":
+                raise httpx.ConnectError("refused", request=request)
+            lines = [
+                {"message": {"content": "Hello"}, "done": False},
+                {"message": {"content": " there"}, "done": True, "eval_count": 2},
+            ]
+            return httpx.Response(200, content="\n".join(json.dumps(l) for l in lines))
+
+        clients = {
+            endpoint.url: httpx.AsyncClient(base_url=endpoint.url, transport=httpx.MockTransport(handler))
+            for endpoint in router.endpoints
+        }
+        monkeypatch.setattr(router, "client_for", lambda endpoint, headers=None: clients[endpoint.url])
+        monkeypatch.setattr(ollama, "get_llm_router", lambda: router)
+        # The server configures stdlib-backed loggers, which _stream_chat relies on
+        monkeypatch.setattr(ollama, "logger", structlog.wrap_logger(
+            logging.getLogger("test_router"), wrapper_class=structlog.stdlib.BoundLogger
+        ))
+        failovers = metrics.LLM_ENDPOINT_FAILOVERS.labels().value
+
+        client = ollama.LLMClient(backend="ollama", model="llama3.2")
+        # Make the dead endpoint look like the best choice
+        router.record_success(down, 0.01)
+        router.record_success(up, 1.0)
+        chunks = [c async for c in client.chat([{"role": "user", "content": "hi"}])]
+
+        assert [c["content"] for c in chunks if c["type"] == "text"] == ["Hello there"]
+        assert not down.healthy
+        assert up.in_flight == 0
+        assert metrics.LLM_ENDPOINT_FAILOVERS.labels().value == failovers + 1
+        for http in clients.values():
+            await http.aclose()
@@ -156,3 +156,77 @@ class TestSessionStateTransitions:
         session.reset_stop_flag()
         
         assert session.should_stop() == False
+
+
+class TestTurnCancellation:
+    """Test per-turn cancellation (barge-in)."""
+    
+    def test_set_state_keeps_stop_flag(self):
+        """A state change must not swallow a pending interrupt."""
+        from server.session import Session, SessionState
+        
+        session = Session()
+        session.interrupt()
+        session.set_state(SessionState.LISTENING)
+        
+        assert session.should_stop() == True
+    
+    async def test_start_turn_resets_stop_flag(self):
+        """Each new turn starts uninterrupted."""
+        from server.session import Session
+        
+        session = Session()
+        session.interrupt()
+        await session.start_turn(asyncio.sleep(0))
+        
+        assert session.should_stop() == False
+    
+    async def test_cancel_turn_closes_llm_stream(self):
+        """Cancelling the turn tears down the stream it was reading."""
+        from server.session import Session
+        
+        closed = asyncio.Event()
+        
+        async def stream():
+            try:
+                while True:
+                    yield "token"
+                    await asyncio.sleep(0.01)
+            finally:
+                closed.set()
+        
+        async def turn():
+            async for _ in stream():
+                await asyncio.sleep(0.01)
+        
+        session = Session()
+        task = session.start_turn(turn())
+        await asyncio.sleep(0.05)
+        
+        assert await session.cancel_turn("interrupt") == True
+        assert task.cancelled()
+        assert closed.is_set()
+        assert not session.turn_active
+    
+    async def test_cancel_turn_without_turn(self):
+        """Cancelling with nothing running is a no-op."""
+        from server.session import Session
+        
+        session = Session()
+        
+        assert await session.cancel_turn() == False
+        assert session.should_stop() == True
+    
+    async def test_piper_process_killed_on_cancel(self):
+        """The synthesis subprocess does not outlive a cancelled turn."""
+        from server.tts.piper_tts import PiperTTS
+        
+        tts = PiperTTS.__new__(PiperTTS)
+        started = asyncio.get_running_loop().time()
+        task = asyncio.create_task(tts._run_piper(["sleep", "30"], ""))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert asyncio.get_running_loop().time() - started < 5
@@ -0,0 +1,154 @@
+"""
+Tests for session lifecycle: memory caps, spill to disk and resume.
+"""
+import time
+
+
+class TestHistoryCaps:
+    """Test the conversation byte cap and deferred loading."""
+
+    def test_byte_cap_drops_oldest(self):
+        """History over max_bytes drops the oldest messages first."""
+        from server.llm.conversation import ConversationHistory
+
+        history = ConversationHistory(max_bytes=1000)
+        for i in range(20):
+            history.add_user_message(f"{i:02d}" + "x" * 98)
+
+        assert history.nbytes <= 1000
+        assert history.get_messages(include_system=False)[-1]["content"].startswith("19")
+        assert len(history) == 10
+
+    def test_deferred_history_loads_on_access(self):
+        """Deferred history is read back once, ahead of newer messages."""
+        from server.llm.conversation import ConversationHistory
+
+        history = ConversationHistory()
+        history.add_user_message("hello")
+        history.add_assistant_message("hi there")
+        records = history.to_records()
+
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return records
+
+        history.defer(loader)
+        assert not history.loaded
+        assert history.nbytes == 0
+
+        history.add_user_message("still there?")
+        contents = [m["content"] for m in history.get_messages(include_system=False)]
+        assert contents == ["hello", "hi there", "still there?"]
+        assert history.loaded
+        assert calls == [1]
+
+
+class TestSessionStore:
+    """Test the on-disk session store."""
+
+    def test_round_trip(self, tmp_path):
+        """Saved records load back unchanged."""
+        from server.session_store import SessionStore
+
+        store = SessionStore(tmp_path)
+        token = "a" * 22
+        records = [{"role": "user", "content": "hi", "timestamp": 1.0,
+                    "name": None, "tool_call_id": None, "tool_calls": None}]
+        store.save(token, records)
+
+        assert store.exists(token)
+        assert store.load(token) == records
+        store.delete(token)
+        assert not store.exists(token)
+        assert store.load(token) == []
+
+    def test_rejects_malformed_tokens(self, tmp_path):
+        """Tokens that could escape the directory are refused."""
+        from server.session_store import SessionStore, valid_token
+
+        assert not valid_token("../../etc/passwd")
+        assert not valid_token("short")
+        assert not valid_token(None)
+        assert not SessionStore(tmp_path).exists("../" + "a" * 20)
+
+
+class TestSessionManager:
+    """Test open, detach, resume and eviction."""
+
+    def test_resume_from_memory(self, tmp_path):
+        """A reconnect with the token gets the same session back."""
+        from server.session_manager import SessionManager
+        from server.session_store import SessionStore
+
+        manager = SessionManager(SessionStore(tmp_path))
+        session, source = manager.open("c1")
+        assert source is None
+        session.conversation_history.add_user_message("remember me")
+        session.audio_buffer.extend(b"\x00\x01" * 160)
+
+        manager.detach("c1")
+        assert session.memory_bytes()["audio"] == 0
+        assert manager.get("c1") is None
+
+        resumed, source = manager.open("c2", session.token)
+        assert resumed is session
+        assert source == "memory"
+        assert resumed.client_id == "c2"
+        assert len(resumed.conversation_history) == 1
+
+    def test_unknown_or_attached_token_starts_fresh(self, tmp_path):
+        """Unknown tokens, and tokens of a live connection, get a new session."""
+        from server.session_manager import SessionManager
+        from server.session_store import SessionStore
+
+        manager = SessionManager(SessionStore(tmp_path))
+        first, _ = manager.open("c1")
+
+        other, source = manager.open("c2", first.token)
+        assert other is not first
+        assert source is None
+
+        fresh, source = manager.open("c3", "b" * 22)
+        assert source is None
+        assert fresh.token != "b" * 22
+
+    async def test_expired_detached_session_resumes_from_disk(self, tmp_path):
+        """After the resume TTL the history is spilled and read back on resume."""
+        from server.session_manager import SessionManager
+        from server.session_store import SessionStore
+
+        manager = SessionManager(SessionStore(tmp_path), resume_ttl=60)
+        session, _ = manager.open("c1")
+        session.conversation_history.add_user_message("what's the weather")
+        session.conversation_history.add_assistant_message("Sunny.")
+        manager.detach("c1")
+
+        assert await manager.evict_idle(now=time.time() + 61) == 1
+        assert manager.report()["detached"] == 0
+
+        resumed, source = manager.open("c2", session.token)
+        assert source == "disk"
+        assert resumed is not session
+        assert not resumed.conversation_history.loaded
+        contents = [m["content"] for m in resumed.conversation_history.get_messages(include_system=False)]
+        assert contents == ["what's the weather", "Sunny."]
+
+    async def test_idle_connected_session_spills(self, tmp_path):
+        """An idle connected session frees its history and audio but stays open."""
+        from server.session_manager import SessionManager
+        from server.session_store import SessionStore
+
+        manager = SessionManager(SessionStore(tmp_path), idle_seconds=60)
+        session, _ = manager.open("c1")
+        session.conversation_history.add_user_message("x" * 500)
+        session.audio_buffer.extend(b"\x00\x01" * 160)
+
+        assert await manager.evict_idle(now=time.time() + 30) == 0
+        assert await manager.evict_idle(now=time.time() + 61) == 1
+
+        assert manager.get("c1") is session
+        assert session.memory_bytes() == {"audio": 0, "ingest": 0, "history": 0}
+        assert manager.report()["spilled"] == 1
+        assert session.conversation_history.get_messages(include_system=False)[0]["content"] == "x" * 500
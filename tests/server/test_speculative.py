@@ -0,0 +1,122 @@
+"""
+Tests for speculative LLM responses.
+"""
+import asyncio
+
+
+async def fake_stream(chunks, delay=0.0):
+    """Stand-in for LLMClient.chat output."""
+    for chunk in chunks:
+        if delay:
+            await asyncio.sleep(delay)
+        yield chunk
+
+
+class TestNormalization:
+    """Test transcript comparison."""
+
+    def test_ignores_case_and_punctuation(self):
+        from server.llm.speculative import normalize_transcript
+
+        assert normalize_transcript("What's the  weather?") == normalize_transcript("what's the weather")
+
+    def test_matches(self):
+        from server.llm.speculative import SpeculativeResponse
+
+        speculation = SpeculativeResponse("Set a timer.", fake_stream([]))
+
+        assert speculation.matches("set a timer")
+        assert not speculation.matches("set a timer for five minutes")
+
+
+class TestSpeculativeResponse:
+    """Test buffering, commit and cancel."""
+
+    async def test_commit_replays_buffered_and_live_chunks(self):
+        """Chunks produced before and after commit all reach the caller in order."""
+        from server.llm.speculative import SpeculativeResponse
+
+        chunks = [{"type": "text", "content": str(i)} for i in range(5)]
+        speculation = SpeculativeResponse("hi", fake_stream(chunks, delay=0.01)).start()
+        await asyncio.sleep(0.025)
+
+        received = [chunk async for chunk in speculation.commit()]
+
+        assert received == chunks
+
+    async def test_commit_reraises_stream_error(self):
+        """Backend errors surface from commit like they would from chat()."""
+        from server.llm.speculative import SpeculativeResponse
+
+        async def failing():
+            yield {"type": "text", "content": "a"}
+            raise RuntimeError("connection refused")
+
+        speculation = SpeculativeResponse("hi", failing()).start()
+        received = []
+        try:
+            async for chunk in speculation.commit():
+                received.append(chunk)
+        except RuntimeError as e:
+            assert "connection" in str(e)
+        else:
+            raise AssertionError("expected RuntimeError")
+        assert received == [{"type": "text", "content": "a"}]
+
+    async def test_cancel_counts_wasted_tokens(self):
+        """Discarded runs report tokens from the usage chunk."""
+        from server.llm.speculative import SpeculativeResponse
+        from server import metrics
+
+        before = metrics.LLM_SPECULATION_WASTED_TOKENS.labels().value
+        chunks = [
+            {"type": "usage", "output_tokens": 42},
+            {"type": "text", "content": "Sure."},
+        ]
+        speculation = SpeculativeResponse("hi", fake_stream(chunks)).start()
+        await asyncio.sleep(0.01)
+
+        assert await speculation.cancel() == 42
+        assert metrics.LLM_SPECULATION_WASTED_TOKENS.labels().value == before + 42
+
+    async def test_cancel_stops_running_stream(self):
+        """Cancelling mid-generation stops consuming the stream."""
+        from server.llm.speculative import SpeculativeResponse
+
+        consumed = []
+
+        async def slow():
+            for i in range(100):
+                await asyncio.sleep(0.01)
+                consumed.append(i)
+                yield {"type": "text", "content": "x"}
+
+        speculation = SpeculativeResponse("hi", slow()).start()
+        await asyncio.sleep(0.03)
+        await speculation.cancel("abandoned")
+        count = len(consumed)
+        await asyncio.sleep(0.03)
+
+        assert len(consumed) == count < 100
+
+    async def test_closing_commit_stops_stream(self):
+        """Closing a committed stream early (turn cancelled) stops generation."""
+        from server.llm.speculative import SpeculativeResponse
+
+        consumed = []
+
+        async def slow():
+            for i in range(100):
+                await asyncio.sleep(0.01)
+                consumed.append(i)
+                yield {"type": "text", "content": "x"}
+
+        speculation = SpeculativeResponse("hi", slow()).start()
+        stream = speculation.commit()
+        await stream.__anext__()
+        await stream.aclose()
+        await asyncio.sleep(0.01)
+        count = len(consumed)
+        await asyncio.sleep(0.03)
+
+        assert len(consumed) == count < 100
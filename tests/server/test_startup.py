@@ -0,0 +1,99 @@
+"""
+Tests for the startup orchestrator.
+"""
+import asyncio
+import time
+
+
+class TestStartupOrchestrator:
+    """Test concurrent loading and readiness gating."""
+
+    async def test_components_load_concurrently(self):
+        """Independent loaders overlap instead of running back to back."""
+        from server.startup import StartupOrchestrator
+
+        async def slow_load():
+            await asyncio.sleep(0.1)
+
+        startup = StartupOrchestrator()
+        for name in ("stt", "vad", "tts"):
+            startup.add(name, slow_load)
+
+        started = time.perf_counter()
+        assert await startup.run()
+        assert time.perf_counter() - started < 0.25
+
+    async def test_warmup_receives_loaded_object(self):
+        """Warm-up runs on what the loader returned and is timed separately."""
+        from server.startup import StartupOrchestrator
+
+        warmed = []
+
+        async def load():
+            return "model"
+
+        async def warmup(model):
+            warmed.append(model)
+
+        startup = StartupOrchestrator()
+        startup.add("stt", load, warmup)
+        await startup.run()
+
+        assert warmed == ["model"]
+        component = startup.report()["components"]["stt"]
+        assert component["status"] == "ready"
+        assert "warmup_ms" in component
+
+    async def test_optional_failure_keeps_ready(self):
+        """A failing optional component is reported but does not gate readiness."""
+        from server.startup import StartupOrchestrator
+
+        async def ok():
+            return None
+
+        async def broken():
+            raise RuntimeError("not available")
+
+        startup = StartupOrchestrator()
+        startup.add("stt", ok)
+        startup.add("comfyui", broken, required=False)
+
+        assert await startup.run()
+        report = startup.report()
+        assert report["ready"]
+        assert report["components"]["comfyui"]["status"] == "failed"
+        assert report["components"]["comfyui"]["error"] == "not available"
+
+    async def test_required_failure_blocks_ready(self):
+        """A required component that fails or times out keeps the server unready."""
+        from server.startup import StartupOrchestrator
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        startup = StartupOrchestrator()
+        startup.add("vad", hang, timeout=0.05)
+
+        assert not await startup.run()
+        assert startup.components["vad"].status == "failed"
+
+    async def test_not_ready_until_done(self):
+        """Readiness is false while components are still loading."""
+        from server.startup import StartupOrchestrator
+
+        gate = asyncio.Event()
+
+        async def load():
+            await gate.wait()
+
+        startup = StartupOrchestrator()
+        startup.add("tts", load)
+        task = asyncio.create_task(startup.run())
+        await asyncio.sleep(0.01)
+
+        assert not startup.ready
+        assert startup.report()["components"]["tts"]["status"] == "loading"
+
+        gate.set()
+        assert await startup.wait()
+        await task
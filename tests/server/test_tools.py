@@ -207,3 +207,221 @@ class TestToolExecution:
         
         with pytest.raises(ValueError):
             await tool_registry.execute("unknown_tool_that_does_not_exist")
+
+
+class TestToolManifest:
+    """Test lazy tool loading from the static manifest."""
+    
+    def test_manifest_is_current(self):
+        """The committed manifest matches the tool sources."""
+        from server.tools.manifest import build_manifest, load_manifest
+        
+        assert load_manifest() == build_manifest()
+    
+    def test_manifest_tools_listed_without_import(self, tmp_path, monkeypatch):
+        """Manifest tools are served to the LLM before their module loads."""
+        import sys
+        from server.tools.registry import ToolRegistry
+        
+        monkeypatch.syspath_prepend(str(tmp_path))
+        (tmp_path / "lazy_probe_tools.py").write_text("raise ImportError('should not load')\n")
+        
+        registry = ToolRegistry()
+        registry.register_manifest([{
+            "name": "probe",
+            "description": "Probe tool",
+            "parameters": {"type": "object", "properties": {}, "required": []},
+            "module": "lazy_probe_tools",
+        }])
+        
+        assert [t["function"]["name"] for t in registry.get_tools_for_llm()] == ["probe"]
+        assert not registry.get_tool("probe").loaded
+        assert "lazy_probe_tools" not in sys.modules
+    
+    @pytest.mark.asyncio
+    async def test_module_imported_on_first_call(self, tmp_path, monkeypatch):
+        """Calling a manifest tool imports its module and runs the real handler."""
+        from server.tools import registry as registry_module
+        from server.tools.registry import ToolRegistry
+        
+        registry = ToolRegistry()
+        monkeypatch.setattr(registry_module, "tool_registry", registry)
+        monkeypatch.syspath_prepend(str(tmp_path))
+        (tmp_path / "lazy_echo_tools.py").write_text(
+            "from server.tools.registry import tool_registry\n"
+            "@tool_registry.register(description='Echo')\n"
+            "async def echo(text: str) -> str:\n"
+            "    return text\n"
+        )
+        registry.register_manifest([{
+            "name": "echo",
+            "description": "Echo",
+            "parameters": {"type": "object", "properties": {}, "required": []},
+            "module": "lazy_echo_tools",
+        }])
+        
+        assert await registry.execute("echo", text="hi") == "hi"
+        assert registry.get_tool("echo").loaded
+        assert len(registry.list_tools()) == 1
+    
+    @pytest.mark.asyncio
+    async def test_broken_dependency_fails_only_that_tool(self, tmp_path, monkeypatch):
+        """A module that fails to import turns into a failed tool result."""
+        from server.tools.executor import ToolExecutor
+        from server.tools import executor as executor_module
+        from server.tools.registry import ToolRegistry
+        
+        monkeypatch.syspath_prepend(str(tmp_path))
+        (tmp_path / "lazy_broken_tools.py").write_text("import not_installed_dependency\n")
+        registry = ToolRegistry()
+        registry.register_manifest([{
+            "name": "broken",
+            "description": "Broken",
+            "parameters": {"type": "object", "properties": {}, "required": []},
+            "module": "lazy_broken_tools",
+        }])
+        monkeypatch.setattr(executor_module, "tool_registry", registry)
+        
+        result = await ToolExecutor().execute("broken", {})
+        
+        assert not result.success
+        assert "not_installed_dependency" in result.error
+    
+    def test_disabled_groups_skipped(self):
+        """Disabled categories and modules are left out of the registry."""
+        from server.tools.manifest import load_manifest
+        from server.tools.registry import ToolRegistry
+        
+        registry = ToolRegistry()
+        registry.disable(["music", "image"])
+        registry.register_manifest(load_manifest())
+        names = {t.name for t in registry.list_tools()}
+        
+        assert "get_current_time" in names
+        assert not any(name.startswith("music_") for name in names)
+        assert "generate_image" not in names
+
+
+class TestToolNotifier:
+    """Test the per-call channel from tools back to their client."""
+    
+    @pytest.mark.asyncio
+    async def test_notifier_visible_inside_tool(self, monkeypatch):
+        """A tool sees the notifier its call was made with, and only then."""
+        from server.tools import executor as executor_module
+        from server.tools.executor import ToolExecutor, get_notifier
+        from server.tools.registry import ToolRegistry
+        
+        registry = ToolRegistry()
+        
+        @registry.register(description="Report progress")
+        async def report() -> str:
+            notify = get_notifier()
+            if notify is None:
+                return "silent"
+            await notify({"type": "image_progress", "value": 1, "max": 2})
+            return "notified"
+        
+        monkeypatch.setattr(executor_module, "tool_registry", registry)
+        sent = []
+        
+        async def notify(message):
+            sent.append(message)
+        
+        executor = ToolExecutor()
+        assert (await executor.execute("report", {}, notify=notify)).result == "notified"
+        assert (await executor.execute("report", {})).result == "silent"
+        assert sent == [{"type": "image_progress", "value": 1, "max": 2}]
+        assert get_notifier() is None
+
+
+class TestBlockingTools:
+    """Test that blocking tools run off the event loop."""
+    
+    @pytest.mark.asyncio
+    async def test_blocking_tool_leaves_loop_free(self):
+        """A blocking=True tool's sleep does not delay other tasks."""
+        import asyncio
+        import threading
+        import time
+        from server.tools.registry import ToolRegistry
+        
+        registry = ToolRegistry()
+        
+        @registry.register(description="Sample slowly", blocking=True)
+        async def sample() -> str:
+            time.sleep(0.2)
+            return threading.current_thread().name
+        
+        ticks = 0
+        
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        
+        task = asyncio.create_task(ticker())
+        thread_name = await registry.execute("sample")
+        task.cancel()
+        
+        assert thread_name.startswith("tool-blocking")
+        assert ticks >= 5
+    
+    @pytest.mark.asyncio
+    async def test_mark_blocking(self):
+        """An opted-in async tool caught stalling the loop runs in the pool from then on."""
+        import threading
+        from server.tools.registry import ToolRegistry
+        
+        registry = ToolRegistry()
+        registry.allow_offload(["inline"])
+        
+        @registry.register(description="Inline")
+        async def inline() -> str:
+            return threading.current_thread().name
+        
+        @registry.register(description="Plain")
+        def plain() -> str:
+            return "ok"
+        
+        assert not registry.get_tool("inline").blocking
+        assert registry.mark_blocking("inline")
+        assert registry.get_tool("inline").blocking
+        assert (await registry.execute("inline")).startswith("tool-blocking")
+        assert not registry.mark_blocking("inline")
+        assert not registry.mark_blocking("plain")  # Already runs in the pool
+        assert not registry.mark_blocking("missing")
+    
+    @pytest.mark.asyncio
+    async def test_stalling_async_tool_stays_on_loop(self):
+        """An async tool that is not opted in stays on the loop after it is caught stalling."""
+        import asyncio
+        import time
+        from server.tools.registry import ToolRegistry
+        
+        registry = ToolRegistry()
+        lock = asyncio.Lock()  # bound to the server loop on first contended use
+        
+        @registry.register(description="Stall while holding a loop lock")
+        async def stall() -> str:
+            async with lock:
+                time.sleep(0.15)
+                await asyncio.sleep(0)
+                return "ok"
+        
+        assert await registry.execute("stall") == "ok"
+        assert not registry.mark_blocking("stall")
+        assert not registry.get_tool("stall").blocking
+        
+        results = await asyncio.gather(registry.execute("stall"), registry.execute("stall"))
+        assert results == ["ok", "ok"]
+    
+    def test_manifest_carries_blocking_flag(self):
+        """Blocking tools are flagged in the manifest without importing them."""
+        from server.tools.manifest import build_manifest
+        
+        entries = {e["name"]: e for e in build_manifest(["system_tools", "knowledge_tools"])}
+        assert entries["get_resource_usage"]["blocking"]
+        assert entries["knowledge_search"]["blocking"]
+        assert not entries["tell_joke"]["blocking"]
@@ -0,0 +1,152 @@
+"""
+Tests for the TTS audio cache.
+"""
+import io
+import wave
+
+
+def make_wav(num_frames: int, value: int = 1000, rate: int = 22050) -> bytes:
+    """Mono 16-bit WAV filled with a constant sample."""
+    output = io.BytesIO()
+    with wave.open(output, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(value.to_bytes(2, "little", signed=True) * num_frames)
+    return output.getvalue()
+
+
+class TestKeys:
+    """Test text normalization and cache keys."""
+
+    def test_whitespace_is_normalized(self):
+        from server.tts.cache import cache_key
+
+        assert cache_key("amy", 1.0, "Hello   world. ") == cache_key("amy", 1.0, "Hello world.")
+
+    def test_voice_and_rate_are_part_of_the_key(self):
+        from server.tts.cache import cache_key
+
+        base = cache_key("amy", 1.0, "Hello.")
+        assert cache_key("ryan", 1.0, "Hello.") != base
+        assert cache_key("amy", 1.2, "Hello.") != base
+
+    def test_split_sentences(self):
+        from server.tts.cache import split_sentences
+
+        assert split_sentences("Sure. What time?  Done!") == ["Sure.", "What time?", "Done!"]
+        assert split_sentences("3.5 degrees") == ["3.5 degrees"]
+
+
+class TestJoinWavs:
+    """Test sentence audio concatenation."""
+
+    def test_inserts_gap(self):
+        from server.tts.cache import join_wavs
+
+        joined = join_wavs([make_wav(100), make_wav(50)], gap_ms=10)
+
+        with wave.open(io.BytesIO(joined), "rb") as w:
+            assert w.getframerate() == 22050
+            assert w.getnframes() == 100 + 220 + 50
+
+
+class TestTTSCache:
+    """Test the memory and disk tiers."""
+
+    async def test_memory_hit(self):
+        from server.tts.cache import TTSCache
+
+        cache = TTSCache(max_memory_bytes=1024)
+        await cache.put("amy", 1.0, "Hi.", b"audio")
+
+        assert await cache.get("amy", 1.0, "Hi.") == b"audio"
+        assert await cache.get("amy", 1.0, "Bye.") is None
+
+    async def test_lru_respects_byte_budget(self):
+        from server.tts.cache import TTSCache
+
+        cache = TTSCache(max_memory_bytes=10)
+        await cache.put("amy", 1.0, "a", b"12345")
+        await cache.put("amy", 1.0, "b", b"12345")
+        await cache.get("amy", 1.0, "a")  # "b" becomes least recently used
+        await cache.put("amy", 1.0, "c", b"12345")
+
+        assert cache.memory_bytes == 10
+        assert await cache.get("amy", 1.0, "a") == b"12345"
+        assert await cache.get("amy", 1.0, "b") is None
+
+    async def test_disk_tier_survives_memory_loss(self, tmp_path):
+        from server import metrics
+        from server.tts.cache import TTSCache
+
+        audio = make_wav(2000)
+        cache = TTSCache(cache_dir=tmp_path)
+        await cache.put("amy", 1.0, "Hello there.", audio)
+        assert cache.disk_bytes < len(audio)  # Stored compressed
+
+        hits = metrics.TTS_CACHE_LOOKUPS.labels(result="disk_hit")
+        before = hits.value
+        reopened = TTSCache(cache_dir=tmp_path)
+
+        assert reopened.disk_bytes == cache.disk_bytes
+        assert await reopened.get("amy", 1.0, "Hello there.") == audio
+        assert hits.value == before + 1
+
+    async def test_disk_eviction(self, tmp_path):
+        import os
+        from server.tts.cache import TTSCache
+
+        cache = TTSCache(max_memory_bytes=0, cache_dir=tmp_path, max_disk_bytes=3000)
+        for i in range(5):
+            await cache.put("amy", 1.0, f"phrase {i}", os.urandom(1000))
+
+        assert cache.disk_bytes <= 3000
+        assert await cache.get("amy", 1.0, "phrase 4") is not None
+        assert await cache.get("amy", 1.0, "phrase 0") is None
+
+
+class TestPrewarm:
+    """Test filling the cache ahead of time."""
+
+    async def test_missing_voice_does_not_raise(self):
+        from unittest.mock import patch
+        from server.tts.cache import prewarm_voice
+
+        with patch("server.tts.piper_tts.PiperTTS", side_effect=RuntimeError("Piper binary not found")):
+            assert await prewarm_voice("missing") == 0
+
+
+class TestPiperCache:
+    """Test what the shared PiperTTS stores in the cache."""
+
+    async def test_concurrent_rates_keep_their_audio(self, tmp_path):
+        import asyncio
+        from pathlib import Path
+        from unittest.mock import patch
+        from server.tts.cache import TTSCache
+        from server.tts.piper_tts import AVAILABLE_VOICES, PiperTTS
+
+        async def fake_run_piper(self, cmd, text, timeout=30.0):
+            scale = float(cmd[cmd.index("--length_scale") + 1]) if "--length_scale" in cmd else 1.0
+            Path(cmd[cmd.index("--output_file") + 1]).write_bytes(make_wav(100, value=int(scale * 1000)))
+            return 0, "", ""
+
+        # One instance shared by two sessions, without a Piper install
+        tts = object.__new__(PiperTTS)
+        tts.voice_config = AVAILABLE_VOICES["amy"]
+        tts.model_path = tmp_path / "amy.onnx"
+        tts.speaking_rate = 1.0
+        tts._cancelled = False
+        cache = TTSCache(cache_dir=tmp_path / "cache")
+
+        with patch("server.tts.piper_tts.get_tts_cache", return_value=cache), \
+             patch.object(PiperTTS, "_run_piper", fake_run_piper):
+            first = asyncio.create_task(tts.synthesize("Hello."))
+            await asyncio.sleep(0)  # first is reading the disk tier
+            tts.speaking_rate = 2.0
+            second = asyncio.create_task(tts.synthesize("Hello."))
+            await asyncio.gather(first, second)
+
+        assert await cache.get("amy", 1.0, "Hello.") == make_wav(100, value=1000)
+        assert await cache.get("amy", 2.0, "Hello.") == make_wav(100, value=500)
@@ -0,0 +1,104 @@
+"""
+Tests for the deep web search page reader.
+"""
+import asyncio
+
+import httpx
+
+ARTICLE = """<html><head><title>Giant Pandas</title><script>var x = "ignore me entirely";</script></head>
+<body><nav><a href="/">Home</a> <a href="/zoo">All the zoo animals we have on this site</a></nav>
+<article><h1>Giant pandas</h1>
+<p>The giant panda eats bamboo almost exclusively, consuming up to 38 kilograms of bamboo shoots a day.</p>
+<p>Pandas live in mountain forests of central China, at elevations between 1,200 and 3,400 metres.</p>
+</article><footer>Copyright and contact information for the zoo website</footer></body></html>"""
+
+
+class TestExtraction:
+    """Tests for streaming text extraction and ranking."""
+
+    def test_extracts_main_text_in_pieces(self):
+        """Content survives arbitrary chunking; navigation and scripts do not."""
+        from server.tools.webpages import TextExtractor
+
+        extractor = TextExtractor()
+        for i in range(0, len(ARTICLE), 7):
+            extractor.feed(ARTICLE[i:i + 7])
+        extractor.close()
+
+        assert extractor.title == "Giant Pandas"
+        assert len(extractor.paragraphs) == 2
+        assert extractor.paragraphs[0].startswith("The giant panda eats bamboo")
+        assert not any("zoo" in p or "ignore" in p for p in extractor.paragraphs)
+
+    def test_digest_prefers_matching_passages(self):
+        """The digest quotes the passage that answers the query, with its source."""
+        from server.tools.webpages import Page, build_digest
+
+        pages = [
+            Page(url="https://a.example/pandas", title="Pandas", paragraphs=[
+                "Pandas live in mountain forests of central China at high elevations.",
+                "A panda eats bamboo for up to fourteen hours a day, about 38 kg of it.",
+            ]),
+            Page(url="https://b.example/cooking", title="Cooking", paragraphs=[
+                "Stir fry the vegetables in a hot wok with a little oil and garlic.",
+            ]),
+        ]
+        digest = build_digest("how much bamboo does a panda eat", pages, max_chars=400)
+
+        assert digest.startswith("[1] Pandas (https://a.example/pandas)")
+        assert "38 kg" in digest
+        assert "wok" not in digest
+
+        short = build_digest("how much bamboo does a panda eat", pages, max_chars=60)
+        assert short.endswith(" ...") and len(short.split("\n- ", 1)[1]) <= 64
+
+    def test_result_url_unwraps_redirects(self):
+        """DuckDuckGo redirect links resolve to the target; ads are dropped."""
+        from server.tools.webpages import result_url
+
+        assert result_url("//duckduckgo.com/l/?uddg=https%3A%2F%2Fexample.com%2Fa%3Fb%3D1&rut=x") == "https://example.com/a?b=1"
+        assert result_url("https://duckduckgo.com/y.js?ad_domain=x") is None
+        assert result_url("https://example.org/page") == "https://example.org/page"
+
+
+class TestFetching:
+    """Tests for concurrent fetching and the page cache."""
+
+    async def test_revalidates_with_etag(self):
+        """A stale page is revalidated with If-None-Match and reused on 304."""
+        from server.tools.webpages import PageCache, fetch_page
+
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, text=ARTICLE, headers={"content-type": "text/html", "etag": '"v1"'})
+
+        cache = PageCache(fresh_seconds=0)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            first = await fetch_page(client, "https://zoo.example/panda", cache, {})
+            second = await fetch_page(client, "https://zoo.example/panda", cache, {})
+
+        assert len(requests) == 2 and "if-none-match" not in requests[0].headers
+        assert second is first and second.title == "Giant Pandas"
+
+    async def test_budget_abandons_slow_pages(self):
+        """Pages still loading when the budget ends are dropped, not awaited."""
+        from server.tools.webpages import PageCache, fetch_pages
+
+        async def handler(request):
+            if request.url.host == "slow.example":
+                await asyncio.sleep(5)
+            return httpx.Response(200, text=ARTICLE, headers={"content-type": "text/html"})
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            start = asyncio.get_running_loop().time()
+            pages = await fetch_pages(
+                client, ["https://slow.example/a", "https://fast.example/b"], PageCache(), budget=0.3,
+            )
+            elapsed = asyncio.get_running_loop().time() - start
+
+        assert [p.url for p in pages] == ["https://fast.example/b"]
+        assert elapsed < 1.0
@@ -0,0 +1,89 @@
+"""
+Tests for supervised model worker processes.
+"""
+import asyncio
+import os
+import time
+
+import pytest
+
+FACTORY = "tests.server.test_workers:EchoWorker"
+
+
+class EchoWorker:
+    """Stand-in model handler run inside the worker process."""
+
+    def sum(self, audio) -> tuple[int, int, int]:
+        import numpy as np
+
+        samples = np.frombuffer(audio, dtype=np.int16)
+        return int(samples.sum()), len(samples), os.getpid()
+
+    def pid(self) -> int:
+        return os.getpid()
+
+    def crash(self) -> None:
+        os._exit(3)
+
+    def hang(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+    def fail(self) -> None:
+        raise ValueError("bad input")
+
+
+@pytest.fixture
+def pool():
+    from server.workers import WorkerPool
+
+    pool = WorkerPool("echo", FACTORY, processes=1, slots_per_process=2, slot_bytes=4096, call_timeout=5)
+    pool.start()
+    yield pool
+    pool.stop()
+
+
+class TestWorkerPool:
+    """Test calls, shared-memory audio and supervision."""
+
+    async def test_audio_through_shared_memory(self, pool):
+        """PCM is read by the worker; oversize audio falls back to the pipe."""
+        import numpy as np
+
+        small = np.arange(100, dtype=np.int16).tobytes()
+        total, count, pid = await pool.call("sum", audio=small)
+        assert (total, count) == (4950, 100)
+        assert pid != os.getpid()
+
+        large = np.ones(10000, dtype=np.int16).tobytes()
+        assert (await pool.call("sum", audio=large))[:2] == (10000, 10000)
+        assert pool.audio.in_use == 0
+
+    async def test_handler_errors_propagate(self, pool):
+        """An exception in the handler fails the call, not the worker."""
+        with pytest.raises(RuntimeError, match="bad input"):
+            await pool.call("fail")
+        assert await pool.call("pid") == pool.workers[0].pid
+
+    async def test_crashed_worker_restarts(self, pool):
+        """A dead worker fails its call and comes back with a new process."""
+        from server.workers import WorkerCrashed
+
+        first = await pool.call("pid")
+        with pytest.raises(WorkerCrashed):
+            await pool.call("crash")
+
+        second = await pool.call("pid")
+        assert second != first
+        assert pool.workers[0].restarts == 1
+
+    async def test_hung_call_kills_worker(self, pool):
+        """A call past its timeout kills and replaces the worker."""
+        first = await pool.call("pid")
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.call("hang", timeout=0.2, seconds=30)
+
+        assert await pool.call("pid") != first
+
+    def test_call_from_thread(self, pool):
+        """Blocking callers (tools in the worker pool) use call_sync."""
+        assert pool.call_sync("pid") == pool.workers[0].pid
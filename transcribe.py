@@ -1,29 +1,90 @@
+#!/usr/bin/env python3
+"""
+Offline transcription of recordings with the server's Whisper model.
 
+Accepts files or directories (searched recursively for WAV/FLAC/MP3/Opus/
+M4A). Long files are decoded as a stream and cut into speech chunks with
+VAD; chunks from several files are transcribed concurrently. Each finished
+file is appended to <output>/transcripts.jsonl, so an interrupted run picks
+up where it stopped when started again.
+
+Usage:
+    python transcribe.py recording.mp3
+    python transcribe.py archive/ --output transcripts --workers 4 --format jsonl,srt
+"""
+import argparse
 import asyncio
 import sys
+from pathlib import Path
+
+from server.stt.batch import BatchTranscriber, find_audio_files, silero_detector
 from server.stt.whisper import WhisperSTT
 
-async def main():
-    if len(sys.argv) < 2:
-        print("Usage: python transcribe.py <audio_file>")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Batch transcription with Whisper")
+    parser.add_argument("paths", nargs="+", help="Audio files or directories")
+    parser.add_argument("--output", default="transcripts", help="Output directory")
+    parser.add_argument("--workers", type=int, default=2, help="Concurrent transcriptions")
+    parser.add_argument("--decoders", type=int, default=2, help="Files decoded concurrently")
+    parser.add_argument("--format", default="jsonl", help="Comma-separated outputs: jsonl,srt")
+    parser.add_argument("--language", default="en", help="Language code, or 'auto' to detect")
+    parser.add_argument("--overwrite", action="store_true", help="Start over instead of resuming")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    files = find_audio_files(args.paths)
+    missing = [f for f in files if not f.exists()]
+    if missing:
+        print(f"Error: audio file not found: {missing[0]}")
         sys.exit(1)
+    if not files:
+        print("No audio files found")
+        sys.exit(1)
+
+    output = Path(args.output)
+    log_path = output / "transcripts.jsonl"
+    if args.overwrite and log_path.exists():
+        log_path.unlink()
+    formats = {f.strip() for f in args.format.split(",")}
+    srt_dir = output / "srt" if "srt" in formats else None
+
+    stt = WhisperSTT(num_workers=args.workers)
+    asyncio.run(stt.initialize())
+
+    transcriber = BatchTranscriber(
+        stt.model,
+        detect=silero_detector(),
+        language=None if args.language == "auto" else args.language,
+        workers=args.workers,
+        decoders=args.decoders,
+    )
 
-    audio_file = sys.argv[1]
+    def report(result) -> None:
+        if result.error:
+            print(f"FAIL {result.path}: {result.error}")
+        else:
+            print(f"  ok {result.path}  {result.duration:7.1f}s audio  rtf {result.rtf:.3f}")
+            if len(files) == 1:
+                print(f"\n{result.text}")
 
-    stt = WhisperSTT()
-    await stt.initialize()
+    print(f"Transcribing {len(files)} file(s) with {args.workers} worker(s)...")
+    summary = transcriber.run(files, log_path, srt_dir=srt_dir, on_file=report)
 
-    try:
-        with open(audio_file, "rb") as f:
-            audio_data = f.read()
-    except FileNotFoundError:
-        print(f"Error: Audio file not found at {audio_file}")
+    print(
+        f"\n{summary['files']} transcribed, {summary['skipped']} already done, "
+        f"{summary['failed']} failed"
+    )
+    print(
+        f"{summary['audio_seconds']:.1f}s of audio in {summary['wall_seconds']:.1f}s "
+        f"(aggregate RTF {summary['rtf']:.3f})"
+    )
+    print(f"Results: {log_path}")
+    if summary["failed"]:
         sys.exit(1)
 
-    print(f"Transcribing {audio_file}...")
-    transcription = await stt.transcribe(audio_data)
-    print("\nTranscription:")
-    print(transcription)
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()